@@ -0,0 +1,313 @@
+#!/usr/bin/env python
+
+# Copyright (C) 2019 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+
+"""
+.. module:: batch_runner
+   :synopsis: A module to execute a state machine many times with different input data without the GUI
+
+"""
+from builtins import object
+from builtins import range
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+from timeit import default_timer as timer
+
+import rafcon.core.singleton as core_singletons
+from rafcon.core.storage import storage
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+RESULT_FIELDS = ['run', 'final_outcome', 'final_outcome_id', 'duration', 'input_data', 'output_data', 'error']
+
+# the state machine executed by a worker process
+_worker_state_machine = None
+
+
+def to_json_compatible(data):
+    """Converts data into JSON compatible types, values that cannot be represented are replaced by their repr
+
+    :param data: the data to convert
+    :return: the converted data
+    """
+    return json.loads(json.dumps(data, default=repr))
+
+
+def load_state_machine(state_machine_path):
+    """Loads a state machine and adds it to the state machine manager, if it is not open yet
+
+    :param str state_machine_path: the path of the state machine
+    :return: the loaded state machine
+    :rtype: rafcon.core.state_machine.StateMachine
+    """
+    state_machine_manager = core_singletons.state_machine_manager
+    state_machine = state_machine_manager.get_open_state_machine_of_file_system_path(state_machine_path)
+    if state_machine is None:
+        state_machine = storage.load_state_machine_from_path(state_machine_path)
+        state_machine_manager.add_state_machine(state_machine)
+    return state_machine
+
+
+def execute_state_machine_once(state_machine, run=0, input_data=None):
+    """Executes a state machine until it finishes and returns the result of the execution
+
+    The execution histories are removed after the execution, so that a state machine can be executed many times
+    without accumulating memory.
+
+    :param rafcon.core.state_machine.StateMachine state_machine: the state machine to execute
+    :param int run: the number of the execution, which is stored in the result
+    :param dict input_data: values for the input data ports of the root state
+    :return: the run number, final outcome, output data, duration and error (if any) of the execution
+    :rtype: dict
+    """
+    execution_engine = core_singletons.state_machine_execution_engine
+    result = dict.fromkeys(RESULT_FIELDS)
+    result['run'] = run
+    result['input_data'] = to_json_compatible(input_data or {})
+    start = timer()
+    try:
+        execution_engine.start(state_machine.state_machine_id, input_data=input_data)
+        execution_engine.join()
+        root_state = state_machine.root_state
+        if root_state.final_outcome is not None:
+            result['final_outcome'] = root_state.final_outcome.name
+            result['final_outcome_id'] = root_state.final_outcome.outcome_id
+        result['output_data'] = to_json_compatible(root_state.output_data)
+    except Exception as e:
+        logger.exception("Execution {0} of state machine {1} failed".format(run, state_machine.file_system_path))
+        result['error'] = "{0}: {1}".format(e.__class__.__name__, e)
+    finally:
+        execution_engine.stop()
+        state_machine.destroy_execution_histories()
+    result['duration'] = timer() - start
+    return result
+
+
+def _initialize_worker(state_machine_path, config_path):
+    """Prepares a worker process by loading the configuration and the state machine once
+
+    If the worker process is forked, the state machine and libraries already loaded by the parent process are reused.
+    """
+    global _worker_state_machine
+    if config_path is not None:
+        from rafcon.core.start import setup_configuration
+        setup_configuration(config_path)
+    _worker_state_machine = load_state_machine(state_machine_path)
+
+
+def _execute_in_worker(run_and_input_data):
+    run, input_data = run_and_input_data
+    return execute_state_machine_once(_worker_state_machine, run, input_data)
+
+
+class JSONLinesResultSink(object):
+    """Writes each result as JSON object into a separate line of a file
+
+    :param str path: the path of the file
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'w')
+
+    def write(self, result):
+        self._file.write(json.dumps(result) + '\n')
+
+    def close(self):
+        self._file.close()
+
+
+class CSVResultSink(object):
+    """Writes each result as row of a CSV file, input and output data are stored as JSON strings
+
+    :param str path: the path of the file
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'w')
+        self._writer = csv.DictWriter(self._file, fieldnames=RESULT_FIELDS, lineterminator='\n')
+        self._writer.writeheader()
+
+    def write(self, result):
+        row = dict(result)
+        row['input_data'] = json.dumps(result['input_data'])
+        row['output_data'] = json.dumps(result['output_data'])
+        self._writer.writerow(row)
+
+    def close(self):
+        self._file.close()
+
+
+def create_result_sink(path):
+    """Creates a CSV sink for paths ending with `.csv` and a JSON lines sink otherwise
+
+    :param str path: the path of the result file
+    """
+    if os.path.splitext(path)[1].lower() == '.csv':
+        return CSVResultSink(path)
+    return JSONLinesResultSink(path)
+
+
+class BatchReport(object):
+    """Aggregates the results of the executions of a batch
+
+    :ivar int number_of_runs: the number of finished executions
+    :ivar int number_of_errors: the number of executions that raised an error
+    :ivar dict outcomes: the number of executions per final outcome name
+    :ivar float duration: the wall clock time of the batch in seconds
+    :ivar float execution_duration: the summed duration of all executions in seconds
+    """
+
+    def __init__(self):
+        self.number_of_runs = 0
+        self.number_of_errors = 0
+        self.outcomes = {}
+        self.duration = 0.
+        self.execution_duration = 0.
+        self._start = timer()
+
+    def add(self, result):
+        self.number_of_runs += 1
+        if result['error'] is not None:
+            self.number_of_errors += 1
+        self.outcomes[result['final_outcome']] = self.outcomes.get(result['final_outcome'], 0) + 1
+        self.execution_duration += result['duration']
+        self.duration = timer() - self._start
+
+    @property
+    def runs_per_second(self):
+        return self.number_of_runs / self.duration if self.duration > 0 else 0.
+
+    @property
+    def mean_execution_duration(self):
+        return self.execution_duration / self.number_of_runs if self.number_of_runs > 0 else 0.
+
+    def __str__(self):
+        return "{0} runs ({1} errors) in {2:.3f} s: {3:.1f} runs per second, mean execution duration {4:.4f} s, " \
+               "outcomes {5}".format(self.number_of_runs, self.number_of_errors, self.duration,
+                                     self.runs_per_second, self.mean_execution_duration, self.outcomes)
+
+
+class BatchRunner(object):
+    """Executes a state machine many times, either sequentially in this process or in parallel worker processes
+
+    The state machine (and its libraries) is loaded only once per process. Each worker process executes one state
+    machine at a time, as the execution engine is a singleton. The configuration and the library manager have to be
+    set up before the runner is used, e.g. with :func:`rafcon.core.start.setup_configuration`.
+
+    :param str state_machine_path: the path of the state machine
+    :param int number_of_workers: the number of worker processes, 0 to execute in this process
+    :param str config_path: the path of the core config file loaded by the worker processes, None to keep the
+        configuration of the parent process
+    """
+
+    def __init__(self, state_machine_path, number_of_workers=0, config_path=None):
+        self.state_machine_path = state_machine_path
+        self.number_of_workers = number_of_workers
+        self.config_path = config_path
+        self._state_machine = None
+
+    @property
+    def state_machine(self):
+        """The state machine executed in this process, which is loaded on first access"""
+        if self._state_machine is None:
+            self._state_machine = load_state_machine(self.state_machine_path)
+        return self._state_machine
+
+    def run(self, inputs, sink=None):
+        """Executes the state machine once per element of `inputs`
+
+        :param inputs: an iterable of dicts with the input data of each execution; None uses the default values
+        :param sink: an object with a `write` method receiving the result of each execution, in order of completion
+        :return: the aggregated results
+        :rtype: BatchReport
+        """
+        report = BatchReport()
+        if self.number_of_workers > 0:
+            # load the state machine before creating the workers, so that forked workers do not have to load it again
+            load_state_machine(self.state_machine_path)
+            pool = multiprocessing.Pool(self.number_of_workers, initializer=_initialize_worker,
+                                        initargs=(self.state_machine_path, self.config_path))
+            try:
+                results = pool.imap_unordered(_execute_in_worker, enumerate(inputs))
+                for result in results:
+                    self._handle_result(result, report, sink)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for run, input_data in enumerate(inputs):
+                result = execute_state_machine_once(self.state_machine, run, input_data)
+                self._handle_result(result, report, sink)
+        logger.info("Batch of state machine {0} finished: {1}".format(self.state_machine_path, report))
+        return report
+
+    @staticmethod
+    def _handle_result(result, report, sink):
+        report.add(result)
+        if sink is not None:
+            sink.write(result)
+
+
+def read_inputs(path):
+    """Reads the input data of the executions from a JSON lines file, one JSON object per execution
+
+    :param str path: the path of the file
+    :return: a generator of dicts
+    """
+    with open(path) as inputs_file:
+        for line in inputs_file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def setup_argument_parser():
+    parser = argparse.ArgumentParser(description="Executes a state machine many times without GUI")
+    parser.add_argument('state_machine_path', type=str, metavar='path',
+                        help="path of the state machine to be executed")
+    parser.add_argument('-c', '--config', type=str, metavar='path', dest='config_path', default=None,
+                        help="path to the core configuration file config.yaml, by default the default configuration is "
+                             "used")
+    parser.add_argument('-i', '--inputs', type=str, metavar='path', dest='inputs_path', default=None,
+                        help="JSON lines file with the input data of the root state, one line per execution")
+    parser.add_argument('-n', '--runs', type=int, dest='number_of_runs', default=1,
+                        help="number of executions with the default input data, if no input file is given")
+    parser.add_argument('-w', '--workers', type=int, dest='number_of_workers', default=0,
+                        help="number of worker processes, 0 to execute in the main process")
+    parser.add_argument('-r', '--results', type=str, metavar='path', dest='results_path', default=None,
+                        help="file the results are streamed to, as CSV if it ends with .csv, as JSON lines otherwise")
+    return parser
+
+
+def main():
+    from rafcon.core.start import pre_setup_plugins, setup_environment, setup_configuration
+
+    pre_setup_plugins()
+    setup_environment()
+    user_input = setup_argument_parser().parse_args()
+    setup_configuration(user_input.config_path)
+
+    if user_input.inputs_path:
+        inputs = read_inputs(user_input.inputs_path)
+    else:
+        inputs = (None for _ in range(user_input.number_of_runs))
+    sink = create_result_sink(user_input.results_path) if user_input.results_path else None
+    try:
+        # the report is logged by the runner
+        BatchRunner(user_input.state_machine_path, user_input.number_of_workers, user_input.config_path).run(inputs,
+                                                                                                            sink)
+    finally:
+        if sink is not None:
+            sink.close()
+
+
+if __name__ == '__main__':
+    main()
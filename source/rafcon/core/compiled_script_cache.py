@@ -0,0 +1,122 @@
+# Copyright (C) 2019 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+
+"""
+.. module:: compiled_script_cache
+   :synopsis: A module holding a process wide cache of the compiled code of scripts
+
+"""
+from builtins import object
+from collections import OrderedDict
+import hashlib
+import imp
+import marshal
+import os
+import threading
+
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+
+class CompiledScriptCache(object):
+    """Caches the code objects of scripts by the hash of their text and file name
+
+    States with identical scripts, e.g. multiple instances of the same library, share one code object. As the key is
+    derived from the script text, a changed script is always compiled again. The least recently used code objects are
+    evicted if more than `max_size` scripts are cached. If a `path` is given, the code objects are additionally
+    persisted as marshalled bytecode in that folder and reused by later processes.
+
+    :param int max_size: the maximum number of cached code objects, 0 disables the cache
+    :param str path: an optional folder for the persisted bytecode
+    """
+
+    def __init__(self, max_size=0, path=None):
+        self.max_size = max_size
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._code_objects = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def __len__(self):
+        return len(self._code_objects)
+
+    @staticmethod
+    def get_key(script_text, filename):
+        return hashlib.sha1((filename + u'\0' + script_text).encode('utf-8')).hexdigest()
+
+    def get_code(self, script_text, filename):
+        """Returns the code object of a script, which is compiled if it is not cached yet
+
+        :param str script_text: the text of the script
+        :param str filename: the file name of the script
+        :return: the compiled code
+        :raises exceptions.SyntaxError: if the script cannot be compiled
+        """
+        key = self.get_key(script_text, filename)
+        with self._lock:
+            code = self._code_objects.pop(key, None)
+            if code is not None:
+                self._code_objects[key] = code
+                self.hits += 1
+                return code
+            self.misses += 1
+        code = self._load_code(key)
+        if code is None:
+            code = compile(script_text, '%s (%s)' % (filename, key[:8]), 'exec')
+            self._store_code(key, code)
+        with self._lock:
+            self._code_objects[key] = code
+            while len(self._code_objects) > self.max_size:
+                self._code_objects.popitem(last=False)
+        return code
+
+    def _get_file_path(self, key):
+        return os.path.join(self.path, key + '.code')
+
+    def _load_code(self, key):
+        if not self.path:
+            return None
+        file_path = self._get_file_path(key)
+        if not os.path.exists(file_path):
+            return None
+        try:
+            with open(file_path, 'rb') as code_file:
+                # bytecode of other Python versions is ignored
+                if code_file.read(len(imp.get_magic())) != imp.get_magic():
+                    return None
+                return marshal.load(code_file)
+        except Exception:
+            logger.exception("Could not load compiled script {0}".format(file_path))
+            return None
+
+    def _store_code(self, key, code):
+        if not self.path:
+            return
+        file_path = self._get_file_path(key)
+        try:
+            if not os.path.isdir(self.path):
+                os.makedirs(self.path)
+            temporary_path = "{0}.{1}.tmp".format(file_path, threading.current_thread().ident)
+            with open(temporary_path, 'wb') as code_file:
+                code_file.write(imp.get_magic())
+                marshal.dump(code, code_file)
+            os.rename(temporary_path, file_path)
+        except Exception:
+            logger.exception("Could not store compiled script {0}".format(file_path))
+
+    def clear(self):
+        """Removes all code objects from the memory, the persisted bytecode is kept"""
+        with self._lock:
+            self._code_objects.clear()
+            self.hits = 0
+            self.misses = 0
@@ -28,6 +28,19 @@ class LibraryNotFoundException(Exception):
         super(LibraryNotFoundException, self).__init__(message)
 
 
+class LoadingCancelledException(Exception):
+
+    def __init__(self, message):
+        """ A custom exception for the case when the loading of a state machine was cancelled
+
+        :param message: the error message for the exception
+        :return:
+        """
+
+        # Call the base class constructor with the parameters it needs
+        super(LoadingCancelledException, self).__init__(message)
+
+
 class RecoveryModeException(ValueError):
 
     def __init__(self, message, do_delete_item):
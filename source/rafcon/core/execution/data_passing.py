@@ -0,0 +1,91 @@
+# Copyright (C) 2019 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+
+"""
+.. module:: data_passing
+   :synopsis: A module defining how data values are handed from one state to another
+
+"""
+from copy import deepcopy
+from future.utils import string_types
+
+from rafcon.core.config import global_config
+
+try:
+    from numpy import ndarray
+except ImportError:
+    ndarray = None
+
+#: Every value is deep copied when passed to another state or stored in the execution history (default)
+COPY = "copy"
+#: Immutable values are shared, numpy arrays are shared as read-only views and all other values are deep copied
+IMMUTABLE = "immutable"
+#: All values are shared by reference; states must not modify their input data in place
+REFERENCE = "reference"
+
+DATA_PASSING_MODES = (COPY, IMMUTABLE, REFERENCE)
+
+_IMMUTABLE_TYPES = (type(None), bool, int, float, complex, bytes) + tuple(string_types)
+
+
+def get_data_passing_mode():
+    """Returns the configured data passing mode
+
+    :return: one of :data:`COPY`, :data:`IMMUTABLE` and :data:`REFERENCE`
+    :rtype: str
+    """
+    mode = global_config.get_config_value("DATA_PASSING_MODE", COPY)
+    if mode not in DATA_PASSING_MODES:
+        return COPY
+    return mode
+
+
+def is_immutable(value):
+    """Checks whether a value can be shared between states without the risk of being modified
+
+    :param value: the value to be checked
+    :return: True, if the value and all its elements are immutable
+    :rtype: bool
+    """
+    if isinstance(value, _IMMUTABLE_TYPES):
+        return True
+    if isinstance(value, (tuple, frozenset)):
+        return all(is_immutable(element) for element in value)
+    return False
+
+
+def pass_value(value, mode):
+    """Returns the value to be handed to another state
+
+    Depending on the data passing mode, the value is deep copied or shared. Within the :data:`IMMUTABLE` mode, numpy
+    arrays are returned as read-only views on the same buffer. A consumer has to copy such an array before modifying
+    it, so that a copy is only made if the data is actually changed.
+
+    :param value: the value to be passed
+    :param str mode: the data passing mode
+    :return: the value or a copy of it
+    """
+    if mode == REFERENCE or is_immutable(value):
+        return value
+    if mode == IMMUTABLE and ndarray is not None and isinstance(value, ndarray) and not value.dtype.hasobject:
+        view = value.view()
+        view.flags.writeable = False
+        return view
+    return deepcopy(value)
+
+
+def pass_dict(dictionary, mode):
+    """Returns a dictionary of values to be handed to another state, see :func:`pass_value`
+
+    :param dict dictionary: the dictionary to be passed
+    :param str mode: the data passing mode
+    :return: a copy of the dictionary
+    :rtype: dict
+    """
+    if mode == COPY:
+        return deepcopy(dictionary)
+    return {key: pass_value(value, mode) for key, value in dictionary.items()}
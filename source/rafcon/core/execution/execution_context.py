@@ -0,0 +1,124 @@
+# Copyright (C) 2019 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+
+"""
+.. module:: execution_context
+   :synopsis: A module holding execution engines for single state machines, which can run concurrently in one process
+
+"""
+from builtins import object
+
+from rafcon.core.execution import execution_engine
+from rafcon.core.execution.execution_engine import ExecutionEngine
+
+
+class SingleStateMachineManager(object):
+    """Provides the part of the interface of the state machine manager used by the execution engine for one state
+    machine
+
+    :param rafcon.core.state_machine.StateMachine state_machine: the managed state machine
+    """
+
+    def __init__(self, state_machine):
+        self.state_machine = state_machine
+        self._active_state_machine_id = None
+
+    @property
+    def state_machines(self):
+        return {self.state_machine.state_machine_id: self.state_machine}
+
+    @property
+    def active_state_machine_id(self):
+        return self._active_state_machine_id
+
+    @active_state_machine_id.setter
+    def active_state_machine_id(self, state_machine_id):
+        if state_machine_id is not None and state_machine_id != self.state_machine.state_machine_id:
+            raise AttributeError("The execution context of state machine {0} cannot execute state machine {1}".format(
+                self.state_machine.state_machine_id, state_machine_id))
+        self._active_state_machine_id = state_machine_id
+
+    def get_active_state_machine(self):
+        if self._active_state_machine_id is None:
+            return None
+        return self.state_machine
+
+
+class ExecutionContext(ExecutionEngine):
+    """An execution engine executing a single state machine
+
+    In contrast to the execution engine singleton, which executes the active state machine of the state machine
+    manager, an execution context is bound to one state machine. It has its own execution mode, condition variable
+    and step bookkeeping, thus several state machines can be started, paused, stepped, stopped and joined
+    independently of each other in one process. They share the library manager, the global variable manager and the
+    compiled script cache.
+
+    While the context exists, the states of the state machine are controlled by the context instead of the execution
+    engine singleton (see :meth:`rafcon.core.states.state.State.get_execution_engine`). :meth:`close` releases the
+    state machine again.
+
+    :param rafcon.core.state_machine.StateMachine state_machine: the state machine to be executed
+    :raises exceptions.ValueError: if the state machine already has an execution context
+    """
+
+    def __init__(self, state_machine):
+        if state_machine.execution_context is not None:
+            raise ValueError("State machine {0} already has an execution context".format(
+                state_machine.state_machine_id))
+        ExecutionEngine.__init__(self, SingleStateMachineManager(state_machine))
+        self.state_machine = state_machine
+        state_machine.execution_context = self
+
+    def start(self, state_machine_id=None, start_state_path=None, input_data=None):
+        """Starts or resumes the execution of the state machine of the context
+
+        :param state_machine_id: must be None or the id of the state machine of the context
+        :param start_state_path: The path of the state in the state machine, from which the execution will start
+        :param dict input_data: values for the input data ports of the root state, replacing their default values
+        """
+        if state_machine_id is None:
+            state_machine_id = self.state_machine.state_machine_id
+        super(ExecutionContext, self).start(state_machine_id, start_state_path, input_data)
+
+    def execute_state_machine_from_path(self, state_machine=None, path=None, start_state_path=None,
+                                        wait_for_execution_finished=True):
+        """Executes the state machine of the context
+
+        :param state_machine: must be None or the state machine of the context
+        :param path: must be None, as the state machine of the context cannot be replaced
+        :param start_state_path: The path to the state from which the execution will start
+        :return: the state machine of the context
+        :raises exceptions.ValueError: if another state machine or a path is passed
+        """
+        if path is not None or (state_machine is not None and state_machine is not self.state_machine):
+            raise ValueError("The execution context of state machine {0} can only execute this state machine".format(
+                self.state_machine.state_machine_id))
+        return super(ExecutionContext, self).execute_state_machine_from_path(
+            self.state_machine, start_state_path=start_state_path,
+            wait_for_execution_finished=wait_for_execution_finished)
+
+    def _apply_shared_execution_settings(self):
+        # starting a context must not change the settings for state machines running in other contexts, thus they
+        # are only applied if neither the execution engine singleton nor another context applied them before
+        if not execution_engine._shared_execution_settings_applied:
+            super(ExecutionContext, self)._apply_shared_execution_settings()
+
+    def _run_active_state_machine(self, input_data=None):
+        # the step methods can start the execution without passing the state machine id
+        self.state_machine_manager.active_state_machine_id = self.state_machine.state_machine_id
+        super(ExecutionContext, self)._run_active_state_machine(input_data)
+
+    def close(self):
+        """Releases the state machine, whose states are controlled by the execution engine singleton again
+
+        :raises exceptions.RuntimeError: if the state machine is still executed
+        """
+        if not self.finished_or_stopped():
+            raise RuntimeError("The execution context of state machine {0} is still running".format(
+                self.state_machine.state_machine_id))
+        if self.state_machine.execution_context is self:
+            self.state_machine.execution_context = None
@@ -20,7 +20,6 @@
 """
 from future import standard_library
 standard_library.install_aliases()
-import copy
 import threading
 import time
 import queue
@@ -30,12 +29,16 @@ import sys
 from gtkmvc3.observable import Observable
 from rafcon.core.execution.execution_status import ExecutionStatus
 from rafcon.core.execution.execution_status import StateMachineExecutionStatus
+from rafcon.core.execution.state_profiler import measure_state_phase, WAIT
 from rafcon.core.config import global_config
 from rafcon.utils import log
 from rafcon.utils import plugins
 
 logger = log.get_logger(__name__)
 
+# whether the config values of the execution resources shared by all engines of the process were applied
+_shared_execution_settings_applied = False
+
 
 class ExecutionEngine(Observable):
     """A class that cares for the execution of the state machine
@@ -63,7 +66,8 @@ class ExecutionEngine(Observable):
         # the thread, that wants to synchronize, has to acquire the self._status.execution_condition_variable
         # then it can read or set the synchronization_counter; this is only relevant for tests
         self.synchronization_counter = 0
-        # counts how often a state asks for the current execution status
+        # counts how often a state asks for the current execution status, if count_states is enabled
+        self.count_states = True
         self.state_counter = 0
         self.state_counter_lock = Lock()
 
@@ -92,7 +96,7 @@ class ExecutionEngine(Observable):
                (self._status.execution_mode is StateMachineExecutionStatus.FINISHED)
 
     @Observable.observed
-    def start(self, state_machine_id=None, start_state_path=None):
+    def start(self, state_machine_id=None, start_state_path=None, input_data=None):
         """ Start state machine
 
         If no state machine is running start a specific state machine.
@@ -102,6 +106,7 @@ class ExecutionEngine(Observable):
 
         :param state_machine_id: The id if the state machine to be started
         :param start_state_path: The path of the state in the state machine, from which the execution will start
+        :param dict input_data: values for the input data ports of the root state, replacing their default values
         :return:
         """
 
@@ -148,7 +153,7 @@ class ExecutionEngine(Observable):
                         cur_path = cur_path + "/" + path
                     self.start_state_paths.append(cur_path)
 
-            self._run_active_state_machine()
+            self._run_active_state_machine(input_data)
 
     @Observable.observed
     def stop(self):
@@ -195,9 +200,13 @@ class ExecutionEngine(Observable):
         self.run_to_states = []
         self.set_execution_mode(StateMachineExecutionStatus.FINISHED)
 
-    def _run_active_state_machine(self):
+    def _run_active_state_machine(self, input_data=None):
         """Store running state machine and observe its status
+
+        :param dict input_data: values for the input data ports of the root state, replacing their default values
         """
+        self._apply_shared_execution_settings()
+        self.count_states = global_config.get_config_value("EXECUTION_STATE_COUNTER", True)
 
         # Create new concurrency queue for root state to be able to synchronize with the execution
         self.__running_state_machine = self.state_machine_manager.get_active_state_machine()
@@ -206,7 +215,7 @@ class ExecutionEngine(Observable):
         self.__running_state_machine.root_state.concurrency_queue = queue.Queue(maxsize=0)
 
         if self.__running_state_machine:
-            self.__running_state_machine.start()
+            self.__running_state_machine.start(input_data)
 
             self.__wait_for_finishing_thread = threading.Thread(target=self._wait_for_finishing)
             self.__wait_for_finishing_thread.start()
@@ -214,6 +223,21 @@ class ExecutionEngine(Observable):
             logger.warning("Currently no active state machine! Please create a new state machine.")
             self.set_execution_mode(StateMachineExecutionStatus.STOPPED)
 
+    def _apply_shared_execution_settings(self):
+        """Applies the config values of the execution resources shared by all execution engines of the process
+
+        These are the execution thread pool, the compiled script cache and the execution status bus. The execution
+        engine singleton applies them whenever it starts a state machine.
+        """
+        global _shared_execution_settings_applied
+        from rafcon.core.singleton import execution_thread_pool, compiled_script_cache, execution_status_bus
+        execution_thread_pool.max_idle_workers = global_config.get_config_value("EXECUTION_THREAD_POOL_SIZE", 0)
+        compiled_script_cache.max_size = global_config.get_config_value("SCRIPT_COMPILATION_CACHE_SIZE", 0)
+        compiled_script_cache_path = global_config.get_config_value("SCRIPT_COMPILATION_CACHE_PATH", None)
+        compiled_script_cache.path = None if compiled_script_cache_path == "None" else compiled_script_cache_path
+        execution_status_bus.interval = global_config.get_config_value("EXECUTION_STATUS_NOTIFICATION_INTERVAL", 0) / 1000.
+        _shared_execution_settings_applied = True
+
     def _wait_for_finishing(self):
         """Observe running state machine and stop engine if execution has finished"""
         self.state_machine_running = True
@@ -322,12 +346,14 @@ class ExecutionEngine(Observable):
         #    a) a step_over
         #    b) a step_out
         #    c) a run_until
-        for state_path in copy.deepcopy(self.run_to_states):
-            next_child_state_path = None
-            # can be None in case of no transition given
-            if next_child_state_to_execute:
-                next_child_state_path = next_child_state_to_execute.get_path()
-            if state_path == container_state.get_path():
+        # the paths are cached by the states, but only need to be looked up once per step
+        container_state_path = container_state.get_path()
+        next_child_state_path = None
+        # can be None in case of no transition given
+        if next_child_state_to_execute:
+            next_child_state_path = next_child_state_to_execute.get_path()
+        for state_path in list(self.run_to_states):
+            if state_path == container_state_path:
                 # the execution did a whole step_over inside hierarchy state "state" (case a) )
                 # or a whole step_out into the hierarchy state "state" (case b) )
                 # thus we delete its state path from self.run_to_states
@@ -360,6 +386,7 @@ class ExecutionEngine(Observable):
             # container_state was notified => thus, a new user command was issued, which has to be handled!
             container_state.execution_history.new_execution_command_handled = False
 
+    @measure_state_phase(WAIT, state_argument=1)
     def handle_execution_mode(self, container_state, next_child_state_to_execute=None):
         """Checks the current execution status and returns it.
 
@@ -373,9 +400,16 @@ class ExecutionEngine(Observable):
         :param next_child_state_to_execute: is the next child state of :param state to be executed
         :return: the current state machine execution status
         """
-        with self.state_counter_lock:
-            self.state_counter += 1
-            # logger.verbose("Increase state_counter!" + str(self.state_counter))
+        if self.count_states:
+            with self.state_counter_lock:
+                self.state_counter += 1
+                # logger.verbose("Increase state_counter!" + str(self.state_counter))
+
+        # fast path for running to completion: pause, step and stop requests change the execution mode and wake up
+        # waiting states via the condition variable and the state events, thus nothing has to be waited for here
+        if self._status.execution_mode is StateMachineExecutionStatus.STARTED:
+            container_state.execution_history.new_execution_command_handled = True
+            return StateMachineExecutionStatus.STARTED
 
         woke_up_from_pause_or_step_mode = False
 
@@ -455,8 +489,9 @@ class ExecutionEngine(Observable):
         """
         if self._status.execution_mode is StateMachineExecutionStatus.FORWARD_OVER or \
                 self._status.execution_mode is StateMachineExecutionStatus.FORWARD_OUT:
-            for state_path in copy.deepcopy(self.run_to_states):
-                if state_path == state.get_path():
+            path = state.get_path()
+            for state_path in list(self.run_to_states):
+                if state_path == path:
                     logger.verbose("Modifying run_to_states; triggered by state %s!", state.name)
                     self.run_to_states.remove(state_path)
                     from rafcon.core.states.state import State
@@ -484,8 +519,7 @@ class ExecutionEngine(Observable):
             state_machine = storage.load_state_machine_from_path(path)
             rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
 
-        rafcon.core.singleton.state_machine_execution_engine.start(
-            state_machine.state_machine_id, start_state_path=start_state_path)
+        self.start(state_machine.state_machine_id, start_state_path=start_state_path)
 
         if wait_for_execution_finished:
             self.join()
@@ -23,7 +23,7 @@ from builtins import range
 from builtins import str
 import time
 import copy
-from collections import Iterable, Sized
+from collections import Iterable, Sized, namedtuple
 import json
 from jsonconversion.decoder import JSONObjectDecoder
 from jsonconversion.encoder import JSONObjectEncoder
@@ -34,6 +34,7 @@ from enum import Enum
 from gtkmvc3.observable import Observable
 
 from rafcon.core.id_generator import history_item_id_generator
+from rafcon.core.execution.data_passing import get_data_passing_mode, pass_dict, pass_value, COPY
 from rafcon.utils import log
 logger = log.get_logger(__name__)
 import os
@@ -41,6 +42,39 @@ import subprocess
 import pickle
 from weakref import ref
 
+#: The fields of a scoped data entry as stored in a history item
+ScopedDataRecord = namedtuple('ScopedDataRecord', ['name', 'value', 'value_type', 'from_state', 'data_port_type',
+                                                   'timestamp'])
+
+
+def serialize_history_record(record):
+    """Pickle the data values of a record created by :meth:`HistoryItem.to_record`
+
+    The semantic data, scoped data and input/output data values are replaced by their pickled representation. Values
+    that cannot be pickled are stored as tuple of the error and their string representation with the key prefixed by
+    '!'.
+
+    :param dict record: the record of a history item, which is modified in place
+    :return: the serialized record
+    :rtype: dict
+    """
+    for field in ('semantic_data', 'input_output_data'):
+        if field in record:
+            record[field] = _pickle_values(record[field].items())
+    if 'scoped_data' in record:
+        record['scoped_data'] = _pickle_values(record['scoped_data'])
+    return record
+
+
+def _pickle_values(items):
+    pickled_values = {}
+    for key, value in items:
+        try:
+            pickled_values[key] = pickle.dumps(value)
+        except Exception as e:
+            pickled_values['!' + key] = (str(e), str(value))
+    return pickled_values
+
 
 class ExecutionHistoryStorage(object):
     def __init__(self, filename):
@@ -55,6 +89,9 @@ class ExecutionHistoryStorage(object):
         except Exception:
             logger.exception('Exception:')
 
+    def store_history_item(self, history_item):
+        self.store_item(history_item.history_item_id, history_item.to_dict())
+
     def store_item(self, key, value):
         with self.store_lock:
             try:
@@ -98,19 +135,87 @@ class ExecutionHistoryStorage(object):
                 logger.exception('Exception:')
 
 
+class BinaryExecutionHistoryStorage(object):
+    """Stores the history items in an append-only binary log file
+
+    In contrast to :class:`ExecutionHistoryStorage`, items are only appended to the file and the file is not
+    reopened on :meth:`flush`. The log can be read with :class:`rafcon.utils.execution_log_file.ExecutionLogReader`.
+    """
+
+    def __init__(self, filename):
+        from rafcon.utils.execution_log_file import ExecutionLogWriter
+        self.filename = filename
+        self.store_lock = Lock()
+        self.writer = None
+        try:
+            self.writer = ExecutionLogWriter(filename)
+            logger.debug('Openend log file for writing %s' % self.filename)
+        except Exception:
+            logger.exception('Exception:')
+
+    def store_history_item(self, history_item):
+        self.store_item(history_item.history_item_id, history_item.to_dict())
+
+    def store_item(self, key, value):
+        with self.store_lock:
+            try:
+                self.writer.append(key, value)
+            except Exception:
+                logger.exception('Exception:')
+
+    def flush(self):
+        with self.store_lock:
+            try:
+                self.writer.flush()
+                logger.debug('Flushed log file %s' % self.filename)
+            except Exception:
+                logger.exception('Exception:')
+
+    def close(self, make_read_and_writable_for_all=False):
+        from rafcon.utils.execution_log_file import INDEX_SUFFIX
+        with self.store_lock:
+            try:
+                self.writer.close()
+                logger.debug('Closed log file %s' % self.filename)
+                if make_read_and_writable_for_all:
+                    ret = subprocess.call(['chmod', 'a+rw', self.filename, self.filename + INDEX_SUFFIX])
+                    if ret:
+                        logger.debug('Could not make log file readable for all. chmod a+rw failed on %s.' % self.filename)
+                    else:
+                        logger.debug('Set log file readable for all via chmod a+rw, file %s' % self.filename)
+            except Exception:
+                logger.exception('Exception:')
+
+    def __del__(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
 class ExecutionHistory(Observable, Iterable, Sized):
     """A class for the history of a state machine execution
 
         It stores all history elements in a stack wise fashion.
 
+        If `max_items` is set, the history is bounded: the oldest items are evicted if more than `max_items` items were
+        pushed, so that memory does not grow during long executions. Evicted items were already written to the
+        execution log, if one is enabled, and the oldest retained item keeps the id of its evicted predecessor. The
+        call items of container states, which are still running, are never evicted. Backward stepping is only
+        possible within the retained items, see :meth:`is_backward_step_possible`.
+
         :ivar initial_prev: optional link to a previous element for the first element pushed into this history of
                             type :class:`rafcon.core.execution.execution_history.HistoryItem`
+        :ivar int max_items: the maximum number of retained items, 0 for an unbounded history
+        :ivar int number_of_evicted_items: the number of items evicted from a bounded history
     """
 
-    def __init__(self, initial_prev=None):
+    def __init__(self, initial_prev=None, max_items=0):
         super(ExecutionHistory, self).__init__()
         self._history_items = []            
         self.initial_prev = initial_prev
+        self.max_items = max_items
+        self.number_of_evicted_items = 0
+        # the ids of the retained items, which are followed by evicted items
+        self._items_before_evicted_items = set()
         self.execution_history_storage = None
         self.new_execution_command_handled = True
 
@@ -154,10 +259,12 @@ class ExecutionHistory(Observable, Iterable, Sized):
     def _push_item(self, last_history_item, current_item):
         if last_history_item is None:
             current_item.prev = self.initial_prev
+            if self.initial_prev is not None:
+                current_item.prev_history_item_id = self.initial_prev.history_item_id
         if last_history_item is not None:
             last_history_item.next = current_item
         if self.execution_history_storage is not None:
-            self.execution_history_storage.store_item(current_item.history_item_id, current_item.to_dict())
+            self.execution_history_storage.store_history_item(current_item)
         try:
             self._history_items.append(current_item)
         except AttributeError:
@@ -165,8 +272,111 @@ class ExecutionHistory(Observable, Iterable, Sized):
                 pass # this is fine
             else:
                 raise
+        else:
+            if self.max_items > 0 and len(self._history_items) > self.max_items:
+                self._evict_oldest_items()
         return current_item
 
+    def _evict_oldest_items(self):
+        """Removes the oldest items of a bounded history
+
+        The items are removed in batches of a quarter of the maximum number of items, so that the (linear) removal
+        from the front of the list is only done every few pushes. The call items (and concurrency items) of container
+        states, which did not return yet, are kept, as they are needed to step backward out of these states.
+        """
+        eviction_batch_size = max(1, self.max_items // 4)
+        if len(self._history_items) < self.max_items + eviction_batch_size:
+            return
+        number_of_candidates = len(self._history_items) - self.max_items
+        candidates = self._history_items[:number_of_candidates]
+        # the items of the running container states by their state and run id
+        items_of_running_containers = {}
+        for index, item in enumerate(candidates):
+            key = (id(item.state_reference), item.run_id)
+            if isinstance(item, CallItem) and item.call_type is CallType.CONTAINER:
+                items_of_running_containers.setdefault(key, []).append(item)
+            elif isinstance(item, CallItem):
+                # the call item of the parent state executing a container state is followed by the call item of the
+                # container state itself
+                next_item = self._history_items[index + 1]
+                if isinstance(next_item, CallItem) and next_item.call_type is CallType.CONTAINER and \
+                        next_item.state_reference is item.state_reference:
+                    next_key = (id(next_item.state_reference), next_item.run_id)
+                    items_of_running_containers.setdefault(next_key, []).append(item)
+            elif isinstance(item, ConcurrencyItem) and key in items_of_running_containers:
+                items_of_running_containers[key].append(item)
+            elif isinstance(item, ReturnItem) and item.call_type is CallType.CONTAINER:
+                items_of_running_containers.pop(key, None)
+        kept_item_ids = set(id(item) for items in items_of_running_containers.values() for item in items)
+        kept_items = [item for item in candidates if id(item) in kept_item_ids]
+        evicted_item_ids = set(id(item) for item in candidates if id(item) not in kept_item_ids)
+        # remember the kept items followed by evicted items, stepping backward is not possible beyond these
+        items_before_evicted_items = set()
+        for index, item in enumerate(candidates):
+            if id(item) in kept_item_ids and (id(item) in self._items_before_evicted_items or
+                                              index + 1 < len(candidates) and
+                                              id(candidates[index + 1]) in evicted_item_ids):
+                items_before_evicted_items.add(id(item))
+        self._items_before_evicted_items = items_before_evicted_items
+
+        # unlink the evicted items, so that they are not kept alive by the retained ones, the id of the previous item
+        # is kept in the prev_history_item_id of the retained items following evicted ones
+        for item in kept_items + [self._history_items[number_of_candidates]]:
+            if item.prev is not None and id(item.prev) in evicted_item_ids:
+                item.prev.next = None
+                item.prev = None
+            if item.next is not None and id(item.next) in evicted_item_ids:
+                item.next.prev = None
+                item.next = None
+        self._history_items[:number_of_candidates] = kept_items
+        self.number_of_evicted_items += len(evicted_item_ids)
+
+    def _is_boundary_item(self, history_item):
+        """Checks whether items before or after the given item were evicted from the history"""
+        return history_item.prev is None and history_item.prev_history_item_id is not None or \
+            id(history_item) in self._items_before_evicted_items
+
+    def is_backward_step_possible(self):
+        """Checks whether the last executed state can be stepped backward
+
+        This is the case if the history holds all items of the execution of the state, from its call item to the last
+        (return) item, which is always the case for an unbounded history. If the last item is the call item of a
+        container state, the container state can always be left in backward direction.
+
+        :return: whether the items needed to step backward were not evicted
+        :rtype: bool
+        """
+        last_history_item = self.get_last_history_item()
+        if last_history_item is None:
+            return False
+        if self.number_of_evicted_items == 0:
+            return True
+        if not isinstance(last_history_item, ReturnItem):
+            return id(last_history_item) not in self._items_before_evicted_items
+        for history_item in reversed(self._history_items):
+            if isinstance(history_item, ConcurrencyItem) and \
+                    any(history.number_of_evicted_items > 0 for history in history_item.execution_histories):
+                return False
+            if isinstance(history_item, CallItem) and history_item.call_type is last_history_item.call_type and \
+                    history_item.state_reference is last_history_item.state_reference and \
+                    history_item.run_id == last_history_item.run_id:
+                return True
+            if self._is_boundary_item(history_item):
+                return False
+        return False
+
+    def is_last_item_preceded_by_evicted_items(self):
+        """Checks whether the items before the last item were evicted, so that no further step backward is possible
+
+        :rtype: bool
+        """
+        last_history_item = self.get_last_history_item()
+        if last_history_item is None or self.number_of_evicted_items == 0:
+            return False
+        if last_history_item.prev is None and last_history_item.prev_history_item_id is not None:
+            return True
+        return len(self._history_items) > 1 and id(self._history_items[-2]) in self._items_before_evicted_items
+
     @Observable.observed
     def push_call_history_item(self, state, call_type, state_for_scoped_data, input_data=None):
         """Adds a new call-history-item to the history item list
@@ -223,14 +433,14 @@ class ExecutionHistory(Observable, Iterable, Sized):
         last_history_item = self.get_last_history_item()
         return_item = ConcurrencyItem(state, self.get_last_history_item(),
                                       number_concurrent_threads, state.run_id,
-                                      self.execution_history_storage)
+                                      self.execution_history_storage, self.max_items)
         return self._push_item(last_history_item, return_item)
 
     @Observable.observed
     def push_state_machine_start_history_item(self, state_machine, run_id):
         return_item = StateMachineStartItem(state_machine, run_id)
         if self.execution_history_storage is not None:
-            self.execution_history_storage.store_item(return_item.history_item_id, return_item.to_dict())
+            self.execution_history_storage.store_history_item(return_item)
         self._history_items.append(return_item)
         return return_item
 
@@ -242,9 +452,15 @@ class ExecutionHistory(Observable, Iterable, Sized):
         :rtype: HistoryItem
         """
         try:
-            return self._history_items.pop()
+            history_item = self._history_items.pop()
+            self._items_before_evicted_items.discard(id(history_item))
+            return history_item
         except IndexError:
-            logger.error("No item left in the history item list in the execution history.")
+            if self.number_of_evicted_items > 0:
+                logger.error("No item left in the history item list in the execution history, {0} older items were "
+                             "evicted from the bounded history.".format(self.number_of_evicted_items))
+            else:
+                logger.error("No item left in the history item list in the execution history.")
             return None
 
 
@@ -258,18 +474,26 @@ class HistoryItem(object):
     :ivar path: the state path
     :ivar timestamp: the time of the call/return
     :ivar prev: the previous history item
+    :ivar prev_history_item_id: the id of the previous history item, which is kept if the previous item is evicted
+        from a bounded history
     :ivar next: the next history item
     """
 
+    # a history item is created for every call and return of a state, thus its attributes are stored in slots
+    __slots__ = ('_state_reference', 'path', 'timestamp', 'run_id', 'prev', 'prev_history_item_id', 'next',
+                 'history_item_id', 'state_type')
+
     def __init__(self, state, prev, run_id):
         self._state_reference = state
-        self.path = copy.deepcopy(state.get_path())
+        # the (cached) path string is immutable and thus shared with the state
+        self.path = state.get_path()
         self.timestamp = time.time()
         self.run_id = run_id
         self.prev = prev
+        self.prev_history_item_id = prev.history_item_id if prev is not None else None
         self.next = None
         self.history_item_id = history_item_id_generator()
-        self.state_type = str(type(state).__name__)
+        self.state_type = type(state).__name__
 
     def destroy(self):
         self._state_reference = None
@@ -277,6 +501,7 @@ class HistoryItem(object):
         self.timestamp = None
         self.run_id = None
         self.prev = None
+        self.prev_history_item_id = None
         self.next = None
         self.history_item_id = None
         self.state_type = None
@@ -291,6 +516,19 @@ class HistoryItem(object):
         return "HistoryItem with reference state name %s (time: %s)" % (self.state_reference.name, self.timestamp)
 
     def to_dict(self):
+        """The serialized record of the history item, see :func:`serialize_history_record`"""
+        return serialize_history_record(self.to_record())
+
+    def to_record(self):
+        """Collect the data of the history item without serializing it
+
+        Only the data that can still change after the creation of the item is copied, i.e. the data of the state and
+        the semantic data. The data values are pickled by :func:`serialize_history_record`, which can thus be called
+        from another thread.
+
+        :return: the record of the history item
+        :rtype: dict
+        """
         record = dict()
 
         # here always the correct path is desired
@@ -323,21 +561,12 @@ class HistoryItem(object):
         record['run_id'] = self.run_id  # library state and state copy have the same run_id
         record['history_item_id'] = self.history_item_id
 
-        # semantic data
-        semantic_data_dict = {}
-        for k, v in target_state.semantic_data.items():
-            try:
-                semantic_data_dict[k] = pickle.dumps(v)
-            except Exception as e:
-                semantic_data_dict['!' + k] = (str(e), str(v))
-        record['semantic_data'] = semantic_data_dict
+        # the semantic data can be changed in place, thus it is copied
+        record['semantic_data'] = copy.deepcopy(target_state.semantic_data)
 
         record['description'] = target_state.description
 
-        if self.prev is not None:
-            record['prev_history_item_id'] = self.prev.history_item_id
-        else:
-            record['prev_history_item_id'] = None
+        record['prev_history_item_id'] = self.prev_history_item_id
         # store the specialized class name as item_type,
         # e.g. CallItem, ReturnItem, StatemachineStartItem when saved
         record['item_type'] = self.__class__.__name__
@@ -345,18 +574,20 @@ class HistoryItem(object):
 
 
 class StateMachineStartItem(HistoryItem):
+
+    __slots__ = ('sm_dict', 'os_environment')
+
     def __init__(self, state_machine, run_id):
         HistoryItem.__init__(self, state_machine.root_state, None, run_id)
         from rafcon.core.state_machine import StateMachine
         self.sm_dict = StateMachine.state_machine_to_dict(state_machine)
-        self.prev = None
         self.os_environment = dict(os.environ)
 
     def __str__(self):
         return "StateMachineStartItem with name %s (time: %s)" % (self.sm_dict['root_state_storage_id'], self.timestamp)
 
-    def to_dict(self):
-        record = HistoryItem.to_dict(self)
+    def to_record(self):
+        record = HistoryItem.to_record(self)
         record.update(self.sm_dict)
         record['call_type'] = 'EXECUTE'
         record['state_name'] = 'StateMachineStartItem'
@@ -364,51 +595,81 @@ class StateMachineStartItem(HistoryItem):
         record['path'] = ''
         record['path_by_name'] = ''
         record['os_environment'] = self.os_environment
-        if self.prev is not None:
-            record['prev_history_item_id'] = self.prev.history_item_id
-        else:
-            record['prev_history_item_id'] = None
+        record['prev_history_item_id'] = self.prev_history_item_id
         return record
 
 
 class ScopedDataItem(HistoryItem):
     """A abstract class to represent history items which contains the scoped data of a state
 
+    The scoped data is stored as tuples of the entries' fields, the :class:`rafcon.core.state_elements.scope.ScopedData`
+    objects are only created when the scoped data is accessed, e.g. for stepping backward.
+
     :ivar call_type: the call type of the execution step, i.e. if it refers to a container state or an execution state
     :ivar state_for_scoped_data: the state of which the scoped data will be stored as the context data that is necessary
         to re-execute the state
     """
 
+    __slots__ = ('call_type', '_scoped_data_records', 'child_state_input_output_data')
+
     def __init__(self, state, prev, call_type, state_for_scoped_data, child_state_input_output_data, run_id):
         HistoryItem.__init__(self, state, prev, run_id)
-        if call_type in CallType:
-            self.call_type_str = call_type.name
-        else:
+        if call_type not in CallType:
             raise Exception('unkown calltype, neither CONTAINER nor EXECUTE')
         self.call_type = call_type
-        self.scoped_data = {} if state_for_scoped_data is None else copy.deepcopy(state_for_scoped_data._scoped_data)
-        self.child_state_input_output_data = copy.deepcopy(child_state_input_output_data)
+        data_passing_mode = get_data_passing_mode()
+        if state_for_scoped_data is None:
+            self._scoped_data_records = {}
+        else:
+            self._scoped_data_records = self._create_scoped_data_records(state_for_scoped_data._scoped_data,
+                                                                         data_passing_mode)
+        self.child_state_input_output_data = pass_dict(child_state_input_output_data, data_passing_mode)
 
-    def to_dict(self):
-        record = HistoryItem.to_dict(self)
-        scoped_data_dict = {}
-        for k, v in self.scoped_data.items():
-            try:
-                scoped_data_dict[v.name] = pickle.dumps(v.value)
-            except Exception as e:
-                scoped_data_dict['!' + v.name] = (str(e), str(v.value))
-            # logger.debug('TypeError: Could not serialize one of the scoped data port types.')
-            # record['scoped_data'] = json.dumps({'error_type': 'TypeError',
-            #                                     'error_message': e}, cls=JSONObjectEncoder)
-        record['scoped_data'] = scoped_data_dict
-
-        child_state_input_output_dict = {}
-        for k, v in self.child_state_input_output_data.items():
-            try:
-                child_state_input_output_dict[k] = pickle.dumps(v)
-            except Exception as e:
-                child_state_input_output_dict['!' + k] = (str(e), str(v))
-        record['input_output_data'] = child_state_input_output_dict
+    @staticmethod
+    def _create_scoped_data_records(scoped_data, data_passing_mode):
+        """Store the fields of the scoped data entries while copying or sharing their values according to the data
+        passing mode
+
+        The scoped data of a container state is never changed in place, but its entries are replaced. Thus, records
+        referencing the (shared) values are sufficient to preserve the current scoped data.
+        """
+        keys = list(scoped_data.keys())
+        entries = [scoped_data[key] for key in keys]
+        if data_passing_mode == COPY:
+            # copy all values at once, to preserve references between them
+            values = copy.deepcopy([entry.value for entry in entries])
+        else:
+            values = [pass_value(entry.value, data_passing_mode) for entry in entries]
+        return {key: ScopedDataRecord(entry.name, value, entry.value_type, entry.from_state, entry.data_port_type,
+                                      entry.timestamp)
+                for key, entry, value in zip(keys, entries, values)}
+
+    @property
+    def call_type_str(self):
+        return self.call_type.name
+
+    @property
+    def scoped_data(self):
+        """The stored scoped data as new dict of :class:`rafcon.core.state_elements.scope.ScopedData` objects"""
+        from rafcon.core.state_elements.scope import ScopedData
+        scoped_data = {}
+        for key, record in self._scoped_data_records.items():
+            scoped_data_entry = ScopedData(record.name, record.value, record.value_type, record.from_state,
+                                           record.data_port_type, safe_init=False)
+            scoped_data_entry._timestamp = record.timestamp
+            scoped_data[key] = scoped_data_entry
+        return scoped_data
+
+    @scoped_data.setter
+    def scoped_data(self, scoped_data):
+        self._scoped_data_records = self._create_scoped_data_records(scoped_data, get_data_passing_mode())
+
+    def to_record(self):
+        record = HistoryItem.to_record(self)
+        # the values were already passed according to the data passing mode when the item was created, thus only the
+        # containers are copied
+        record['scoped_data'] = [(v.name, v.value) for v in self._scoped_data_records.values()]
+        record['input_output_data'] = dict(self.child_state_input_output_data)
 
         # from rafcon.core.states.container_state import ContainerState
         # if isinstance(self.state_reference, ContainerState):
@@ -435,6 +696,9 @@ class ScopedDataItem(HistoryItem):
 class CallItem(ScopedDataItem):
     """A history item to represent a state call
     """
+
+    __slots__ = ('outcome',)
+
     def __init__(self, state, prev, call_type, state_for_scoped_data, input_data, run_id):
         ScopedDataItem.__init__(self, state, prev, call_type, state_for_scoped_data, input_data, run_id)
         self.outcome = None
@@ -442,14 +706,17 @@ class CallItem(ScopedDataItem):
     def __str__(self):
         return "CallItem %s" % (ScopedDataItem.__str__(self))
 
-    def to_dict(self):
-        record = ScopedDataItem.to_dict(self)
+    def to_record(self):
+        record = ScopedDataItem.to_record(self)
         return record
 
 
 class ReturnItem(ScopedDataItem):
     """A history item to represent the return of a root state call
     """
+
+    __slots__ = ('outcome',)
+
     def __init__(self, state, prev, call_type, state_for_scoped_data, output_data, run_id):
         ScopedDataItem.__init__(self, state, prev, call_type, state_for_scoped_data, output_data, run_id)
         self.outcome = copy.deepcopy(state.final_outcome)
@@ -457,8 +724,8 @@ class ReturnItem(ScopedDataItem):
     def __str__(self):
         return "ReturnItem %s" % (ScopedDataItem.__str__(self))
 
-    def to_dict(self):
-        record = ScopedDataItem.to_dict(self)
+    def to_record(self):
+        record = ScopedDataItem.to_record(self)
         if self.outcome is not None:
             record['outcome_name'] = self.outcome.to_dict()['name']
             record['outcome_id'] = self.outcome.to_dict()['outcome_id']
@@ -471,20 +738,24 @@ class ReturnItem(ScopedDataItem):
 class ConcurrencyItem(HistoryItem):
     """A class to hold all the data for an invocation of several concurrent threads.
     """
-    def __init__(self, container_state, prev, number_concurrent_threads, run_id, execution_history_storage):
+
+    __slots__ = ('execution_histories',)
+
+    def __init__(self, container_state, prev, number_concurrent_threads, run_id, execution_history_storage,
+                 max_items=0):
         HistoryItem.__init__(self, container_state, prev, run_id)
         self.execution_histories = []
 
         for i in range(number_concurrent_threads):
-            execution_history = ExecutionHistory(initial_prev=self)
+            execution_history = ExecutionHistory(initial_prev=self, max_items=max_items)
             execution_history.set_execution_history_storage(execution_history_storage)
             self.execution_histories.append(execution_history)
 
     def __str__(self):
         return "ConcurrencyItem %s" % (HistoryItem.__str__(self))
 
-    def to_dict(self):
-        record = HistoryItem.to_dict(self)
+    def to_record(self):
+        record = HistoryItem.to_record(self)
         record['call_type'] = 'CONTAINER'
         return record
 
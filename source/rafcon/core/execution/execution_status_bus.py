@@ -0,0 +1,102 @@
+# Copyright (C) 2019 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+
+"""
+.. module:: execution_status_bus
+   :synopsis: A module holding a bus delivering the execution status changes of states in batches
+
+"""
+from builtins import object
+from collections import OrderedDict
+import threading
+
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+STATE_EXECUTION_STATUS_METHOD = 'state_execution_status'
+
+
+def notify_state_execution_status(state, state_execution_status):
+    """Sends the notifications of a change of the execution status to the observers of a state
+
+    The notifications are the same as the ones of a setter decorated with `Observable.observed`.
+
+    :param rafcon.core.states.state.State state: the state whose execution status changed
+    :param rafcon.core.states.state.StateExecutionStatus state_execution_status: the new execution status
+    """
+    args = (state, state_execution_status)
+    state._notify_method_before(state, STATE_EXECUTION_STATUS_METHOD, args, {})
+    state._notify_method_after(state, STATE_EXECUTION_STATUS_METHOD, None, args, {})
+
+
+class ExecutionStatusBus(object):
+    """Delivers the notifications of execution status changes in a background thread
+
+    If an interval is set, the execution status of a state is changed immediately, but the observers of the state are
+    notified by a background thread, which delivers all changes of the last interval in one batch. Several changes of
+    the status of a state within one interval are coalesced, only the latest status is delivered. Thus, the execution
+    does not wait for the observers, independent of how many observers are attached.
+
+    :param float interval: the interval in seconds, 0 to notify the observers synchronously
+    """
+
+    def __init__(self, interval=0.):
+        self.interval = interval
+        self.number_of_published_changes = 0
+        self.number_of_delivered_changes = 0
+        self._pending = OrderedDict()
+        self._lock = threading.Lock()
+        self._delivery_lock = threading.Lock()
+        self._stop = None
+        self._thread = None
+
+    @property
+    def enabled(self):
+        return self.interval > 0
+
+    def publish(self, state, state_execution_status):
+        """Queue the notification of a change of the execution status
+
+        :param rafcon.core.states.state.State state: the state whose execution status changed
+        :param rafcon.core.states.state.StateExecutionStatus state_execution_status: the new execution status
+        """
+        with self._lock:
+            # states are compared by name and id, thus the object id is used as key
+            self._pending[id(state)] = (state, state_execution_status)
+            self.number_of_published_changes += 1
+            if self._thread is None:
+                self._stop = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(self._stop, ), name="ExecutionStatusBus")
+                self._thread.daemon = True
+                self._thread.start()
+
+    def _run(self, stop):
+        while not stop.wait(self.interval if self.interval > 0 else 0.1):
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        """Deliver all queued notifications in the calling thread"""
+        with self._delivery_lock:
+            with self._lock:
+                pending, self._pending = self._pending, OrderedDict()
+            for state, state_execution_status in pending.values():
+                try:
+                    notify_state_execution_status(state, state_execution_status)
+                except Exception:
+                    logger.exception("Error while notifying the execution status of {0}".format(state))
+            self.number_of_delivered_changes += len(pending)
+
+    def shutdown(self):
+        """Deliver all queued notifications and stop the background thread"""
+        with self._lock:
+            thread, stop, self._thread = self._thread, self._stop, None
+        if thread is not None:
+            stop.set()
+            thread.join()
+        self.flush()
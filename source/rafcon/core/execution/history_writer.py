@@ -0,0 +1,185 @@
+# Copyright (C) 2019 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+
+"""
+.. module:: history_writer
+   :synopsis: A module holding a background writer persisting the execution history items
+
+"""
+from builtins import object
+import pickle
+import queue
+import tempfile
+import threading
+import time
+
+from rafcon.core.execution.execution_history import serialize_history_record
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+#: The state machine waits until the writer has space in its queue
+BLOCK = "block"
+#: Items not fitting into the queue are dropped and a warning is logged
+DROP_VERBOSE = "drop-verbose"
+#: Items not fitting into the queue are temporarily written to a spill file and persisted later by the writer
+SPILL = "spill"
+
+BACKPRESSURE_POLICIES = (BLOCK, DROP_VERBOSE, SPILL)
+
+_STOP = object()
+
+
+class ExecutionHistoryWriter(object):
+    """Persists history items in a background thread
+
+    The writer wraps an execution history storage (e.g.
+    :class:`rafcon.core.execution.execution_history.ExecutionHistoryStorage`) and provides the same interface. History
+    items are converted into records on the executing thread, as they refer to mutable data like the previous item and
+    the state. Only this mutable data is copied there. The records are put into a bounded queue, serialized and stored
+    by a background thread. Thus, neither the pickling nor the writing of the items delays the execution of the state
+    machine.
+
+    :param storage: the storage the history items are written to
+    :param int max_queue_size: the maximum number of history items waiting to be stored
+    :param str backpressure: the policy applied if the queue is full, one of :data:`BACKPRESSURE_POLICIES`
+    """
+
+    def __init__(self, storage, max_queue_size=1000, backpressure=BLOCK):
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError("Unknown backpressure policy '{0}', must be one of {1}".format(
+                backpressure, BACKPRESSURE_POLICIES))
+        self.storage = storage
+        self.backpressure = backpressure
+        self._queue = queue.Queue(max_queue_size)
+        self._spill_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._spill_file = None
+        self._number_of_spilled_items = 0
+        self.items_written = 0
+        self.items_dropped = 0
+        self.items_spilled = 0
+        self.lag = 0.
+        self._thread = threading.Thread(target=self._write, name="ExecutionHistoryWriter")
+        self._thread.daemon = True
+        self._thread.start()
+
+    @property
+    def filename(self):
+        return self.storage.filename
+
+    @property
+    def queue_depth(self):
+        """The number of history items waiting to be stored"""
+        return self._queue.qsize() + self._number_of_spilled_items
+
+    def get_metrics(self):
+        """Returns the current metrics of the writer
+
+        :return: a dictionary with the queue depth, the lag of the writer in seconds (the time the item stored last
+            was waiting in the queue) and the number of written, dropped and spilled items
+        :rtype: dict
+        """
+        return {
+            'queue_depth': self.queue_depth,
+            'lag': self.lag,
+            'items_written': self.items_written,
+            'items_dropped': self.items_dropped,
+            'items_spilled': self.items_spilled,
+        }
+
+    def store_history_item(self, history_item):
+        """Hand a history item over to the background thread
+
+        :param rafcon.core.execution.execution_history.HistoryItem history_item: the item to be stored
+        """
+        entry = (time.time(), history_item.history_item_id, history_item.to_record())
+        if self.backpressure == BLOCK:
+            self._queue.put(entry)
+            return
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            if self.backpressure == DROP_VERBOSE:
+                with self._metrics_lock:
+                    self.items_dropped += 1
+                    first_dropped_item = self.items_dropped == 1
+                if first_dropped_item:
+                    logger.warning("The execution history writer cannot keep up, history items are dropped")
+            else:
+                self._spill(entry[1], entry[2])
+
+    def store_item(self, key, value):
+        self.storage.store_item(key, value)
+
+    def _spill(self, history_item_id, record):
+        with self._spill_lock:
+            if self._spill_file is None:
+                self._spill_file = tempfile.TemporaryFile(prefix="rafcon_execution_history_spill_")
+            # the data values are pickled on their own, as not all of them might be picklable
+            pickle.dump((history_item_id, serialize_history_record(record)), self._spill_file, protocol=2)
+            self._number_of_spilled_items += 1
+            self.items_spilled += 1
+
+    def _write_spilled_items(self):
+        with self._spill_lock:
+            spill_file, number_of_spilled_items = self._spill_file, self._number_of_spilled_items
+            self._spill_file = None
+        if spill_file is None:
+            return
+        spill_file.seek(0)
+        for _ in range(number_of_spilled_items):
+            self.storage.store_item(*pickle.load(spill_file))
+            self._count_written_item()
+            with self._spill_lock:
+                self._number_of_spilled_items -= 1
+        spill_file.close()
+
+    def _count_written_item(self):
+        # items are written by the background thread and by the caller of flush
+        with self._metrics_lock:
+            self.items_written += 1
+
+    def _write(self):
+        while True:
+            try:
+                entry = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                self._write_spilled_items()
+                continue
+            if entry is _STOP:
+                self._write_spilled_items()
+                self._queue.task_done()
+                return
+            timestamp, history_item_id, record = entry
+            try:
+                self.storage.store_item(history_item_id, serialize_history_record(record))
+                self._count_written_item()
+            except Exception:
+                logger.exception("Could not store history item")
+            self.lag = time.time() - timestamp
+            self._queue.task_done()
+
+    def flush(self):
+        """Wait until all queued history items are stored and flush the storage"""
+        self._queue.join()
+        self._write_spilled_items()
+        # spilled items might still be written by the background thread
+        while self._number_of_spilled_items:
+            time.sleep(0.01)
+        self.storage.flush()
+
+    def close(self, make_read_and_writable_for_all=False):
+        """Store all remaining history items, stop the background thread and close the storage"""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        if self.items_dropped:
+            logger.warning("{0} history items were dropped by the execution history writer".format(
+                self.items_dropped))
+        self.storage.close(make_read_and_writable_for_all)
@@ -0,0 +1,227 @@
+# Copyright (C) 2019 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+
+"""
+.. module:: state_profiler
+   :synopsis: A module to measure the execution time of the states of state machines
+
+"""
+from builtins import object
+from functools import wraps
+import threading
+import time
+from timeit import default_timer as timer
+
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+# the phases of the execution of a state
+RUN = 'run'
+INPUT = 'input'
+SCRIPT = 'script'
+OUTPUT = 'output'
+WAIT = 'wait'
+PHASES = (RUN, INPUT, SCRIPT, OUTPUT, WAIT)
+
+# the frame names of the phases in the flame graph stacks, the run time of a state is represented by the state frame
+PHASE_FRAMES = {INPUT: '[input]', SCRIPT: '[script]', OUTPUT: '[output]', WAIT: '[wait]'}
+
+if hasattr(time, 'thread_time'):
+    cpu_timer = time.thread_time
+elif hasattr(time, 'process_time'):
+    cpu_timer = time.process_time
+else:
+    cpu_timer = time.clock
+
+# the enabled profiler, which is checked by the decorated methods
+_active_profiler = None
+
+
+def measure_state_phase(phase, state_argument=0):
+    """Decorator measuring the duration of a method as phase of the execution of a state
+
+    The method is called without any overhead besides a check for an enabled profiler.
+
+    :param str phase: the phase the duration is added to
+    :param int state_argument: the index of the positional argument holding the state, 0 for the instance of the
+        method
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _active_profiler
+            if profiler is None:
+                return func(*args, **kwargs)
+            start_wall, start_cpu = timer(), cpu_timer()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.record(args[state_argument], phase, timer() - start_wall, cpu_timer() - start_cpu)
+        return wrapper
+    return decorator
+
+
+class StateStatistics(object):
+    """The execution statistics of one state
+
+    The run time of a state is measured in the thread of the state, it includes the script of an execution state and
+    the execution of the children of a container state. The input and output phases contain the time its parent
+    spends on gathering the input data and on handling the output data of the state. The wait phase of a container
+    state is the time spent in :meth:`rafcon.core.execution.execution_engine.ExecutionEngine.handle_execution_mode`,
+    e.g. while being paused or in step mode.
+
+    :ivar str path: the path of the state
+    :ivar str path_by_name: the path of the state build from the state names
+    :ivar int invocations: the number of runs of the state
+    :ivar dict wall_time: the wall clock time in seconds per phase
+    :ivar dict cpu_time: the CPU time of the executing thread in seconds per phase
+    """
+
+    __slots__ = ('path', 'path_by_name', 'invocations', 'wall_time', 'cpu_time')
+
+    def __init__(self, path, path_by_name):
+        self.path = path
+        self.path_by_name = path_by_name
+        self.invocations = 0
+        self.wall_time = dict.fromkeys(PHASES, 0.)
+        self.cpu_time = dict.fromkeys(PHASES, 0.)
+
+    def to_dict(self):
+        return {'path': self.path, 'path_by_name': self.path_by_name, 'invocations': self.invocations,
+                'wall_time': dict(self.wall_time), 'cpu_time': dict(self.cpu_time)}
+
+    def __str__(self):
+        return "{0}: {1} runs, {2}".format(self.path_by_name, self.invocations, ", ".join(
+            "{0} {1:.6f} s".format(phase, self.wall_time[phase]) for phase in PHASES))
+
+
+class StateProfiler(object):
+    """Records the invocations and the wall clock and CPU time of states per state path and execution phase
+
+    The profiler can be enabled and disabled at any time, also during an execution. Only one profiler can be enabled
+    at once. The statistics of all executions since the last :meth:`reset` are accumulated.
+    """
+
+    def __init__(self):
+        self._statistics = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return _active_profiler is self
+
+    @enabled.setter
+    def enabled(self, enabled):
+        global _active_profiler
+        if enabled:
+            if _active_profiler is not None and _active_profiler is not self:
+                raise ValueError("Another state profiler is already enabled")
+            _active_profiler = self
+        elif _active_profiler is self:
+            _active_profiler = None
+
+    def reset(self):
+        """Remove all recorded statistics"""
+        with self._lock:
+            self._statistics = {}
+
+    def _get_state_statistics(self, state):
+        path = state.get_path()
+        statistics = self._statistics.get(path)
+        if statistics is None:
+            statistics = self._statistics[path] = StateStatistics(path, state.get_path(by_name=True))
+        return statistics
+
+    def record(self, state, phase, wall_time, cpu_time):
+        """Add the duration of an execution phase of a state
+
+        :param rafcon.core.states.state.State state: the executed state
+        :param str phase: the execution phase
+        :param float wall_time: the wall clock time in seconds
+        :param float cpu_time: the CPU time in seconds
+        """
+        with self._lock:
+            statistics = self._get_state_statistics(state)
+            if phase == RUN:
+                statistics.invocations += 1
+            statistics.wall_time[phase] += wall_time
+            statistics.cpu_time[phase] += cpu_time
+
+    def profile_run(self, state, run):
+        """Returns a function calling the run method of a state and recording its duration
+
+        :param rafcon.core.states.state.State state: the state to be executed
+        :param run: the run method of the state
+        """
+        def profiled_run():
+            start_wall, start_cpu = timer(), cpu_timer()
+            try:
+                return run()
+            finally:
+                self.record(state, RUN, timer() - start_wall, cpu_timer() - start_cpu)
+        return profiled_run
+
+    def get_statistics(self):
+        """Returns a copy of the recorded statistics
+
+        :return: the statistics per state path
+        :rtype: dict(str, StateStatistics)
+        """
+        with self._lock:
+            statistics = {}
+            for path, state_statistics in self._statistics.items():
+                copied_statistics = StateStatistics(path, state_statistics.path_by_name)
+                copied_statistics.invocations = state_statistics.invocations
+                copied_statistics.wall_time.update(state_statistics.wall_time)
+                copied_statistics.cpu_time.update(state_statistics.cpu_time)
+                statistics[path] = copied_statistics
+            return statistics
+
+    def get_flame_graph_stacks(self):
+        """Returns the wall clock times as stacks in the collapsed format of flame graph tools
+
+        Each line consists of the state names along the path of a state, separated by semicolons, and the time in
+        microseconds spent in this frame itself. The phases of a state are separate frames on top of the state frame.
+        The self time of a container state is its run time reduced by the times of its children. As the children of
+        concurrency states run in parallel, the self time of these states is zero.
+
+        :return: the lines of the collapsed stacks
+        :rtype: list(str)
+        """
+        statistics = self.get_statistics()
+        children_times = dict.fromkeys(statistics, 0.)
+        for path, state_statistics in statistics.items():
+            parent_path = path.rpartition('/')[0]
+            if parent_path in children_times:
+                wall_time = state_statistics.wall_time
+                children_times[parent_path] += wall_time[RUN] + wall_time[INPUT] + wall_time[OUTPUT]
+
+        lines = []
+        for path in sorted(statistics):
+            state_statistics = statistics[path]
+            wall_time = state_statistics.wall_time
+            stack = ";".join(name.replace(";", ",") for name in state_statistics.path_by_name.split('/'))
+            self_time = wall_time[RUN] - wall_time[SCRIPT] - wall_time[WAIT] - children_times[path]
+            for frame_stack, frame_time in [(stack, self_time)] + [
+                    (stack + ";" + PHASE_FRAMES[phase], wall_time[phase]) for phase in (INPUT, SCRIPT, OUTPUT, WAIT)]:
+                microseconds = int(round(frame_time * 1e6))
+                if microseconds > 0:
+                    lines.append("{0} {1}".format(frame_stack, microseconds))
+        return lines
+
+    def dump_flame_graph(self, path):
+        """Writes the collapsed stacks of :meth:`get_flame_graph_stacks` into a file
+
+        The file can be rendered e.g. with `flamegraph.pl` or `speedscope`.
+
+        :param str path: the path of the file
+        """
+        with open(path, 'w') as stacks_file:
+            for line in self.get_flame_graph_stacks():
+                stacks_file.write(line + "\n")
+        logger.info("The state profile has been written to {0}".format(path))
@@ -0,0 +1,146 @@
+# Copyright (C) 2019 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+
+"""
+.. module:: thread_pool
+   :synopsis: A module holding a pool of reusable worker threads used to run states
+
+"""
+from builtins import object
+import itertools
+import threading
+
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+
+class ExecutionTask(object):
+    """Handle of a callable that was handed to the :class:`ExecutionThreadPool`
+
+    The handle mimics the part of the :class:`threading.Thread` interface used by the states (`join` and `is_alive`),
+    so that a state does not need to know whether it runs in a dedicated or in a pooled thread.
+    """
+
+    __slots__ = ('target', '_finished')
+
+    def __init__(self, target):
+        self.target = target
+        self._finished = threading.Event()
+
+    def run(self):
+        try:
+            self.target()
+        except Exception:
+            logger.exception("Unhandled exception in pooled execution thread")
+        finally:
+            self.target = None
+            self._finished.set()
+
+    def join(self, timeout=None):
+        """Wait until the task finished
+
+        :param float timeout: Maximum time to wait, None if infinitely
+        :return: True, if the task finished, False if the timeout was reached
+        :rtype: bool
+        """
+        return self._finished.wait(timeout)
+
+    def is_alive(self):
+        return not self._finished.is_set()
+
+
+class _Worker(object):
+    """A single worker thread of the pool, which executes tasks one after the other"""
+
+    def __init__(self, pool, task):
+        self._pool = pool
+        self._task = task
+        self._task_available = threading.Condition(pool.lock)
+        self.thread = threading.Thread(target=self._work, name="ExecutionWorker-{}".format(next(pool.worker_numbers)))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def assign(self, task):
+        """Hand a new task to the idle worker; the pool lock must be held by the caller"""
+        self._task = task
+        self._task_available.notify()
+
+    def _work(self):
+        task = self._task
+        while task is not None:
+            task.run()
+            task = self._pool.wait_for_next_task(self)
+
+    def wait_for_task(self, timeout):
+        """Wait for the next task; the pool lock must be held by the caller
+
+        :return: the next task or None, if the timeout was reached
+        """
+        self._task = None
+        self._task_available.wait(timeout)
+        return self._task
+
+
+class ExecutionThreadPool(object):
+    """A pool of reusable threads to run states
+
+    Instead of creating a new :class:`threading.Thread` for every state execution, finished worker threads are kept
+    alive for `idle_timeout` seconds and reused for the next state to be started. At most `max_idle_workers` threads
+    are kept idle. The number of concurrently running tasks is not limited, as a container state blocks its worker
+    while its children are running. Limiting it would allow deep hierarchies or wide concurrency states to dead-lock.
+
+    :ivar int max_idle_workers: the maximum number of idle threads kept for reuse; 0 disables the pool
+    :ivar float idle_timeout: time in seconds after which an idle worker terminates
+    """
+
+    def __init__(self, max_idle_workers=0, idle_timeout=10.):
+        self.lock = threading.Lock()
+        self.max_idle_workers = max_idle_workers
+        self.idle_timeout = idle_timeout
+        self._idle_workers = []
+        self.worker_numbers = itertools.count(1)
+
+    @property
+    def number_of_idle_workers(self):
+        return len(self._idle_workers)
+
+    def submit(self, target):
+        """Run the callable `target` in a pooled thread
+
+        :param target: the callable to be executed
+        :return: a handle to join the execution of the callable
+        :rtype: ExecutionTask
+        """
+        task = ExecutionTask(target)
+        with self.lock:
+            if self._idle_workers:
+                self._idle_workers.pop().assign(task)
+                return task
+        _Worker(self, task)
+        return task
+
+    def wait_for_next_task(self, worker):
+        """Called by a worker after it finished a task
+
+        :return: the next task for the worker or None if the worker has to terminate
+        """
+        with self.lock:
+            if len(self._idle_workers) >= self.max_idle_workers:
+                return None
+            self._idle_workers.append(worker)
+            task = worker.wait_for_task(self.idle_timeout)
+            if task is None and worker in self._idle_workers:
+                self._idle_workers.remove(worker)
+            return task
+
+    def shutdown(self):
+        """Let all idle workers terminate"""
+        with self.lock:
+            for worker in self._idle_workers:
+                worker.assign(None)
+            del self._idle_workers[:]
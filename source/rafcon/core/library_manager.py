@@ -19,13 +19,12 @@
 
 import os
 import shutil
-import copy
 import warnings
 from collections import OrderedDict
 from gtkmvc3.observable import Observable
 
 from rafcon.core import interface
-from rafcon.core.storage import storage
+from rafcon.core.storage import storage, packed_state_machine
 from rafcon.core.custom_exceptions import LibraryNotFoundException
 import rafcon.core.config as config
 
@@ -160,7 +159,8 @@ class LibraryManager(Observable):
         """Recursively load libraries within path
 
         Adds all libraries specified in a given path and stores them into the provided library dictionary. The library
-        entries in the dictionary consist only of the path to the library in the file system.
+        entries in the dictionary consist only of the path to the library in the file system. Packed state machine
+        files are added as library named like the file without extension.
 
         :param library_path: the path to add all libraries from
         :param target_dict: the target dictionary to store all loaded libraries to
@@ -176,6 +176,9 @@ class LibraryManager(Observable):
                     target_dict[library_name] = {}
                     self._load_nested_libraries(full_library_path, target_dict[library_name])
                     target_dict[library_name] = OrderedDict(sorted(target_dict[library_name].items()))
+            elif library_name.endswith(packed_state_machine.FILE_EXTENSION) and \
+                    packed_state_machine.is_packed_state_machine(full_library_path):
+                target_dict[library_name[:-len(packed_state_machine.FILE_EXTENSION)]] = full_library_path
 
     @Observable.observed
     def refresh_libraries(self):
@@ -358,6 +361,8 @@ class LibraryManager(Observable):
             library_root_path = self._library_root_paths[library_root_key]
             path_elements_without_library_root = path[len(library_root_path)+1:].split(os.sep)
             library_name = path_elements_without_library_root[-1]
+            if library_name.endswith(packed_state_machine.FILE_EXTENSION) and os.path.isfile(path):
+                library_name = library_name[:-len(packed_state_machine.FILE_EXTENSION)]
             sub_library_path = ''
             if len(path_elements_without_library_root[:-1]):
                 sub_library_path = os.sep + os.sep.join(path_elements_without_library_root[:-1])
@@ -372,36 +377,25 @@ class LibraryManager(Observable):
         else:
             logger.warning("Library manager will not create a library instance which is not in the mounted libraries.")
 
-    def get_library_state_copy_instance(self, lib_os_path):
-        """ A method to get a state copy of the library specified via the lib_os_path.
+    def get_library_template(self, lib_os_path):
+        """ A method to get the root state of the library specified via the lib_os_path, which is shared by all
+        instances of the library.
 
-        :param lib_os_path: the location of the library to get a copy for
-        :return:
-        """
+        The returned state must not be modified, a library state creates its own copy when needed.
 
-        # originally libraries were called like this; DO NOT DELETE; interesting for performance tests
-        # state_machine = storage.load_state_machine_from_path(lib_os_path)
-        # return state_machine.version, state_machine.root_state
-
-        # TODO observe changes on file system and update data
-        if lib_os_path in self._loaded_libraries:
-            # this list can also be taken to open library state machines TODO -> implement it -> because faster
-            state_machine = self._loaded_libraries[lib_os_path]
-            # logger.info("Take copy of {0}".format(lib_os_path))
-            # as long as the a library state root state is never edited so the state first has to be copied here
-            state_copy = copy.deepcopy(state_machine.root_state)
-            return state_machine.version, state_copy
-        else:
-            state_machine = storage.load_state_machine_from_path(lib_os_path)
-            self._loaded_libraries[lib_os_path] = state_machine
-            if config.global_config.get_config_value("NO_PROGRAMMATIC_CHANGE_OF_LIBRARY_STATES_PERFORMED", False):
-                return state_machine.version, state_machine.root_state
-            else:
-                state_copy = copy.deepcopy(state_machine.root_state)
-                return state_machine.version, state_copy
+        :param lib_os_path: the location of the library
+        :return: the version of the library and its root state
+        """
+        if lib_os_path not in self._loaded_libraries:
+            self._loaded_libraries[lib_os_path] = storage.load_state_machine_from_path(lib_os_path)
+        state_machine = self._loaded_libraries[lib_os_path]
+        return state_machine.version, state_machine.root_state
 
     def remove_library_from_file_system(self, library_path, library_name):
         """Remove library from hard disk."""
         library_file_system_path = self.get_os_path_to_library(library_path, library_name)[0]
-        shutil.rmtree(library_file_system_path)
+        if os.path.isfile(library_file_system_path):
+            os.remove(library_file_system_path)
+        else:
+            shutil.rmtree(library_file_system_path)
         self.refresh_libraries()
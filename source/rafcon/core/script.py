@@ -128,12 +128,24 @@ class Script(Observable, yaml.YAMLObject):
     def compile_module(self):
         """Builds a temporary module from the script file
 
+        If the compiled script cache is enabled (see config value `SCRIPT_COMPILATION_CACHE_SIZE`), the code is taken
+        from the cache and only the module is created anew.
+
         :raises exceptions.IOError: if the compilation of the script module failed
         """
+        compiled_script_cache = rafcon.core.singleton.compiled_script_cache
+        code = None
+        if compiled_script_cache.enabled:
+            try:
+                code = compiled_script_cache.get_code(self.script, self.filename)
+            except Exception:
+                self.compiled_module = None
+                raise
         try:
             imp.acquire_lock()
 
-            code = compile(self.script, '%s (%s)' % (self.filename, self._script_id), 'exec')
+            if code is None:
+                code = compile(self.script, '%s (%s)' % (self.filename, self._script_id), 'exec')
             # load module
             module_name = os.path.splitext(self.filename)[0] + str(self._script_id)
             tmp_module = imp.new_module(module_name)
@@ -20,9 +20,13 @@
 import argparse
 import threading
 
+from rafcon.core.compiled_script_cache import CompiledScriptCache
 from rafcon.core.global_variable_manager import GlobalVariableManager
 from rafcon.core.library_manager import LibraryManager
 from rafcon.core.execution.execution_engine import ExecutionEngine
+from rafcon.core.execution.execution_status_bus import ExecutionStatusBus
+from rafcon.core.execution.state_profiler import StateProfiler
+from rafcon.core.execution.thread_pool import ExecutionThreadPool
 from rafcon.core.state_machine_manager import StateMachineManager
 
 # thread id of the thread which created the core singletons
@@ -37,6 +41,18 @@ library_manager = LibraryManager()
 # This variable holds the global state machine manager object
 state_machine_manager = StateMachineManager()
 
+# This variable holds the pool of worker threads used to run states
+execution_thread_pool = ExecutionThreadPool()
+
+# This variable holds the cache of compiled scripts shared by all execution states
+compiled_script_cache = CompiledScriptCache()
+
+# This variable holds the bus delivering the execution status changes of states to their observers
+execution_status_bus = ExecutionStatusBus()
+
+# This variable holds the profiler recording the execution times of states, see `StateProfiler.enabled`
+state_profiler = StateProfiler()
+
 # This variable holds the execution engine singleton
 state_machine_execution_engine = ExecutionEngine(state_machine_manager)
 
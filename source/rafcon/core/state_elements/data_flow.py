@@ -17,6 +17,7 @@
 
 """
 
+from builtins import object
 from weakref import ref
 from future.utils import string_types
 from gtkmvc3.observable import Observable
@@ -137,6 +138,11 @@ class DataFlow(StateElement):
             'to_key': state_element.to_key
         }
 
+    def _invalidate_data_flow_index_of_parent(self):
+        """Signal the parent state that the origin or target of the data flow changed"""
+        if self.parent is not None:
+            self.parent.invalidate_data_flow_index()
+
 #########################################################################
 # Properties for all class field that must be observed by the gtkmvc3
 #########################################################################
@@ -165,6 +171,7 @@ class DataFlow(StateElement):
             self._from_state = old_from_state
             self._from_key = old_from_key
             raise ValueError("The data flow origin could not be changed: {0}".format(message))
+        self._invalidate_data_flow_index_of_parent()
 
     @property
     def from_state(self):
@@ -180,6 +187,7 @@ class DataFlow(StateElement):
             raise ValueError("from_state must be a string")
 
         self._change_property_with_validity_check('_from_state', from_state)
+        self._invalidate_data_flow_index_of_parent()
 
     @property
     def from_key(self):
@@ -195,6 +203,7 @@ class DataFlow(StateElement):
             raise ValueError("from_key must be of type int")
 
         self._change_property_with_validity_check('_from_key', from_key)
+        self._invalidate_data_flow_index_of_parent()
 
     @lock_state_machine
     @Observable.observed
@@ -220,6 +229,7 @@ class DataFlow(StateElement):
             self._to_state = old_to_state
             self._to_key = old_to_key
             raise ValueError("The data flow target could not be changed: {0}".format(message))
+        self._invalidate_data_flow_index_of_parent()
 
     @property
     def to_state(self):
@@ -235,6 +245,7 @@ class DataFlow(StateElement):
             raise ValueError("to_state must be a string")
 
         self._change_property_with_validity_check('_to_state', to_state)
+        self._invalidate_data_flow_index_of_parent()
 
     @property
     def to_key(self):
@@ -250,6 +261,7 @@ class DataFlow(StateElement):
             raise ValueError("to_key must be of type int")
 
         self._change_property_with_validity_check('_to_key', to_key)
+        self._invalidate_data_flow_index_of_parent()
 
     @property
     def data_flow_id(self):
@@ -257,3 +269,54 @@ class DataFlow(StateElement):
 
         """
         return self._data_flow_id
+
+
+class DataFlowIndex(object):
+    """Lookup tables of the data flows of a container state
+
+    The index maps the origin (from_state, from_key) and the target (to_state, to_key) of the data flows to the list
+    of connected data flows. This allows to collect the data flows of a port without iterating over all data flows of
+    the container state, which is done for every child state during execution. The lists keep the order of the data
+    flows dictionary.
+
+    :ivar dict DataFlowIndex.data_flows: the data flows dictionary the index was created for
+    """
+
+    __slots__ = ('data_flows', '_by_origin', '_by_target')
+
+    def __init__(self, data_flows):
+        self.data_flows = data_flows
+        self._by_origin = {}
+        self._by_target = {}
+        for data_flow in data_flows.values():
+            self.add(data_flow)
+
+    def add(self, data_flow):
+        self._by_origin.setdefault((data_flow.from_state, data_flow.from_key), []).append(data_flow)
+        self._by_target.setdefault((data_flow.to_state, data_flow.to_key), []).append(data_flow)
+
+    def remove(self, data_flow):
+        for table, key in ((self._by_origin, (data_flow.from_state, data_flow.from_key)),
+                           (self._by_target, (data_flow.to_state, data_flow.to_key))):
+            data_flows = table[key]
+            data_flows.remove(data_flow)
+            if not data_flows:
+                del table[key]
+
+    def get_data_flows_from(self, state_id, data_port_id):
+        """Returns all data flows starting at the given port
+
+        :param str state_id: the id of the origin state
+        :param int data_port_id: the id of the origin data port or scoped variable
+        :rtype: list[DataFlow]
+        """
+        return self._by_origin.get((state_id, data_port_id), [])
+
+    def get_data_flows_to(self, state_id, data_port_id):
+        """Returns all data flows ending at the given port
+
+        :param str state_id: the id of the target state
+        :param int data_port_id: the id of the target data port or scoped variable
+        :rtype: list[DataFlow]
+        """
+        return self._by_target.get((state_id, data_port_id), [])
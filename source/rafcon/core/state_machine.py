@@ -33,7 +33,8 @@ from gtkmvc3.observable import Observable
 from jsonconversion.jsonobject import JSONObject
 
 import rafcon
-from rafcon.core.execution.execution_history import ExecutionHistory, ExecutionHistoryStorage
+from rafcon.core.execution.execution_history import ExecutionHistory, ExecutionHistoryStorage, \
+    BinaryExecutionHistoryStorage
 from rafcon.core.id_generator import generate_state_machine_id, run_id_generator
 from rafcon.utils import log
 from rafcon.utils.hashable import Hashable
@@ -65,6 +66,12 @@ class StateMachine(Observable, JSONObject, Hashable):
     _root_state = None
     _marked_dirty = True
     _file_system_path = None
+    # the generation of the cached paths of the states, incremented whenever the path of one of the states changes
+    _path_generation = 0
+    # the states found by get_state_by_path, valid for one generation of the state paths and one root state
+    _state_path_index = None
+    # the execution context executing this state machine instead of the execution engine singleton, if one was created
+    execution_context = None
 
     def __init__(self, root_state=None, version=None, creation_time=None, last_update=None, state_machine_id=None):
         Observable.__init__(self)
@@ -135,11 +142,16 @@ class StateMachine(Observable, JSONObject, Hashable):
         }
         return dict_representation
 
-    def start(self):
+    def start(self, input_data=None):
         """Starts the execution of the root state.
+
+        :param dict input_data: values for the input data ports of the root state, replacing their default values
         """
         # load default input data for the state
-        self._root_state.input_data = self._root_state.get_default_input_values_for_state(self._root_state)
+        default_input_data = self._root_state.get_default_input_values_for_state(self._root_state)
+        if input_data:
+            default_input_data.update(input_data)
+        self._root_state.input_data = default_input_data
         self._root_state.output_data = self._root_state.create_output_dictionary_for_state(self._root_state)
         new_execution_history = self._add_new_execution_history()
         new_execution_history.push_state_machine_start_history_item(self, run_id_generator())
@@ -225,7 +237,8 @@ class StateMachine(Observable, JSONObject, Hashable):
 
     @Observable.observed
     def _add_new_execution_history(self):
-        new_execution_history = ExecutionHistory()
+        new_execution_history = ExecutionHistory(
+            max_items=global_config.get_config_value("EXECUTION_HISTORY_MAX_ITEMS", 0))
 
         if global_config.get_config_value("EXECUTION_LOG_ENABLE", False):
             base_dir = global_config.get_config_value("EXECUTION_LOG_PATH", "%RAFCON_TEMP_PATH_BASE/execution_logs")
@@ -233,12 +246,26 @@ class StateMachine(Observable, JSONObject, Hashable):
                 base_dir = base_dir.replace('%RAFCON_TEMP_PATH_BASE', RAFCON_TEMP_PATH_BASE)
             if not os.path.exists(base_dir):
                 os.makedirs(base_dir)
-            shelve_name = os.path.join(base_dir, '%s_rafcon_execution_log_%s.shelve' %
-                                       (time.strftime('%Y-%m-%d-%H:%M:%S', time.localtime()),
-                                        self.root_state.name.replace(' ', '-')))
-            execution_history_store = ExecutionHistoryStorage(shelve_name)
+            if global_config.get_config_value("EXECUTION_LOG_FORMAT", "shelve") == "binary":
+                file_extension, storage_class = "rlog", BinaryExecutionHistoryStorage
+            else:
+                file_extension, storage_class = "shelve", ExecutionHistoryStorage
+            log_name = os.path.join(base_dir, '%s_rafcon_execution_log_%s.%s' %
+                                    (time.strftime('%Y-%m-%d-%H:%M:%S', time.localtime()),
+                                     self.root_state.name.replace(' ', '-'), file_extension))
+            execution_history_store = storage_class(log_name)
+            writer_queue_size = global_config.get_config_value("EXECUTION_LOG_WRITER_QUEUE_SIZE", 0)
+            if writer_queue_size > 0:
+                from rafcon.core.execution.history_writer import ExecutionHistoryWriter, BLOCK
+                backpressure = global_config.get_config_value("EXECUTION_LOG_WRITER_BACKPRESSURE", BLOCK)
+                execution_history_store = ExecutionHistoryWriter(execution_history_store, writer_queue_size,
+                                                                 backpressure)
             new_execution_history.set_execution_history_storage(execution_history_store)
         self._execution_histories.append(new_execution_history)
+        # the histories of finished runs are dropped, not destroyed, as their items might still be referenced elsewhere
+        max_runs = global_config.get_config_value("EXECUTION_HISTORY_MAX_RUNS", 0)
+        if max_runs > 0 and len(self._execution_histories) > max_runs:
+            del self._execution_histories[:-max_runs]
         return new_execution_history
 
     @Observable.observed
@@ -271,9 +298,32 @@ class StateMachine(Observable, JSONObject, Hashable):
         self._marked_dirty = marked_dirty
 
     def get_state_by_path(self, path, as_check=False):
+        """Returns the state of the state machine with the given path
+
+        States that were found once are indexed by their path, until the path of any of its states changes.
+
+        :param str path: the path of the state, composed of state ids
+        :param bool as_check: if True, no warning is logged for invalid paths
+        :rtype: rafcon.core.states.state.State
+        :return: the state or None if no state with this path exists
+        """
         if not path:
             logger.debug("No start state specified!")
             return None
+        generation = self._path_generation
+        state_path_index = self._state_path_index
+        if state_path_index is None or state_path_index[0] != generation or \
+                state_path_index[1] is not self.root_state:
+            state_path_index = self._state_path_index = (generation, self.root_state, {})
+        state = state_path_index[2].get(path)
+        if state is not None:
+            return state
+        state = self._find_state_by_path(path, as_check)
+        if state is not None:
+            state_path_index[2][path] = state
+        return state
+
+    def _find_state_by_path(self, path, as_check):
         from rafcon.core.states.library_state import LibraryState
         from rafcon.core.states.execution_state import ExecutionState
         path_item_list = path.split('/')
@@ -111,10 +111,14 @@ class StateMachineManager(Observable):
         """Remove the state machine for a specified state machine id from the list of registered state machines.
 
         :param state_machine_id: the id of the state machine to be removed
+        :raises exceptions.AttributeError: if the state machine is executed by its execution context
         """
         import rafcon.core.singleton as core_singletons
         removed_state_machine = None
         if state_machine_id in self._state_machines:
+            if self._is_executed_by_execution_context(self._state_machines[state_machine_id]):
+                raise AttributeError("State machine can not be removed because it is executed by its execution "
+                                     "context.")
             logger.debug("Remove state machine with id {0}".format(state_machine_id))
             removed_state_machine = self._state_machines.pop(state_machine_id)
         else:
@@ -123,8 +127,16 @@ class StateMachineManager(Observable):
 
         # destroy execution history
         removed_state_machine.destroy_execution_histories()
+        if removed_state_machine.file_system_path is not None:
+            from rafcon.core.storage import storage
+            storage.forget_saved_files(removed_state_machine.file_system_path)
         return removed_state_machine
 
+    @staticmethod
+    def _is_executed_by_execution_context(state_machine):
+        execution_context = state_machine.execution_context
+        return execution_context is not None and not execution_context.finished_or_stopped()
+
     def get_active_state_machine(self):
         """Return a reference to the active state-machine
         """
@@ -168,5 +180,8 @@ class StateMachineManager(Observable):
         if not core_singletons.state_machine_execution_engine.finished_or_stopped() and \
                 state_machine_id != self._active_state_machine_id:
             raise AttributeError("Active state machine can not be changed because state machine execution is active.")
+        if state_machine_id is not None and \
+                self._is_executed_by_execution_context(self.state_machines[state_machine_id]):
+            raise AttributeError("State machine can not be activated because it is executed by its execution context.")
 
         self._active_state_machine_id = state_machine_id
@@ -27,7 +27,7 @@ from rafcon.core.custom_exceptions import RecoveryModeException
 from rafcon.core.state_elements.logical_port import Outcome
 from rafcon.core.decorators import lock_state_machine
 from rafcon.core.states.concurrency_state import ConcurrencyState
-from rafcon.core.states.state import StateExecutionStatus
+from rafcon.core.states.state import StateExecutionStatus, invalidate_cached_paths
 from rafcon.core.states.execution_state import ExecutionState
 from rafcon.core.states.container_state import ContainerState
 from rafcon.core.constants import UNIQUE_DECIDER_STATE_ID
@@ -70,6 +70,7 @@ class BarrierConcurrencyState(ConcurrencyState):
         if decider_state is not None:
             if isinstance(decider_state, DeciderState):
                 decider_state._state_id = UNIQUE_DECIDER_STATE_ID
+                invalidate_cached_paths(decider_state)
                 states[UNIQUE_DECIDER_STATE_ID] = decider_state
             else:
                 logger.warning("Argument decider_state has to be instance of DeciderState not {}".format(decider_state))
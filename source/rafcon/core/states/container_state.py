@@ -29,10 +29,11 @@ from gtkmvc3.observable import Observable
 
 from rafcon.core.custom_exceptions import RecoveryModeException
 from rafcon.core.decorators import lock_state_machine
+from rafcon.core.execution.data_passing import get_data_passing_mode, pass_value
 from rafcon.core.execution.execution_status import StateMachineExecutionStatus
+from rafcon.core.execution.state_profiler import measure_state_phase, INPUT, OUTPUT
 from rafcon.core.id_generator import *
-from rafcon.core.singleton import state_machine_execution_engine
-from rafcon.core.state_elements.data_flow import DataFlow
+from rafcon.core.state_elements.data_flow import DataFlow, DataFlowIndex
 from rafcon.core.state_elements.logical_port import Outcome
 from rafcon.core.state_elements.scope import ScopedData, ScopedVariable
 from rafcon.core.state_elements.data_port import InputDataPort, OutputDataPort
@@ -40,7 +41,7 @@ from rafcon.core.state_elements.state_element import StateElement
 from rafcon.core.state_elements.transition import Transition
 from rafcon.core.states.library_state import LibraryState
 from rafcon.core.states.state import State
-from rafcon.core.states.state import StateExecutionStatus
+from rafcon.core.states.state import StateExecutionStatus, invalidate_cached_paths
 from rafcon.core.config import global_config
 from rafcon.utils.type_helpers import type_inherits_of_type
 from rafcon.utils import log
@@ -71,6 +72,7 @@ class ContainerState(State):
         self._states = OrderedDict()
         self._transitions = {}
         self._data_flows = {}
+        self._data_flow_index = None
         self._scoped_variables = {}
         self._scoped_data = {}
         self._current_state = None
@@ -104,7 +106,9 @@ class ContainerState(State):
             scoped_variable._parent = ref(self)
         self._states = states if states is not None else {}
         for _, state in self._states.items():
+            invalidate_cached_paths(state)
             state._parent = ref(self)
+        invalidate_cached_paths(self)
         self._transitions = transitions if transitions is not None else {}
         for _, transition in self._transitions.items():
             transition._parent = ref(self)
@@ -306,7 +310,7 @@ class ContainerState(State):
                 return None
 
             # depending on the execution mode pause execution
-            execution_signal = state_machine_execution_engine.handle_execution_mode(self)
+            execution_signal = self.get_execution_engine().handle_execution_mode(self)
             if execution_signal is StateMachineExecutionStatus.STOPPED:
                 # this will be caught at the end of the run method
                 self.last_child.state_execution_status = StateExecutionStatus.INACTIVE
@@ -333,7 +337,7 @@ class ContainerState(State):
         start_state = self.get_start_state(set_final_outcome=True)
         while not start_state:
             # depending on the execution mode pause execution
-            execution_signal = state_machine_execution_engine.handle_execution_mode(self)
+            execution_signal = self.get_execution_engine().handle_execution_mode(self)
             if execution_signal is StateMachineExecutionStatus.STOPPED:
                 # this will be caught at the end of the run method
                 return None
@@ -1155,10 +1159,11 @@ class ContainerState(State):
         """
 
         # overwrite the start state in the case that a specific start state is specific e.g. by start_from_state
-        if self.get_path() in state_machine_execution_engine.start_state_paths:
+        start_state_paths = self.get_execution_engine().start_state_paths
+        if start_state_paths and self.get_path() in start_state_paths:
             for state_id, state in self.states.items():
-                if state.get_path() in state_machine_execution_engine.start_state_paths:
-                    state_machine_execution_engine.start_state_paths.remove(self.get_path())
+                if state.get_path() in start_state_paths:
+                    start_state_paths.remove(self.get_path())
                     self._start_state_modified = True
                     return state
 
@@ -1395,6 +1400,8 @@ class ContainerState(State):
 
         self.data_flows[data_flow_id] = DataFlow(from_state_id, from_data_port_id, to_state_id, to_data_port_id,
                                                  data_flow_id, self)
+        if self._data_flow_index is not None and self._data_flow_index.data_flows is self._data_flows:
+            self._data_flow_index.add(self._data_flows[data_flow_id])
         return data_flow_id
 
     @lock_state_machine
@@ -1409,7 +1416,10 @@ class ContainerState(State):
             raise AttributeError("The data_flow_id %s does not exist" % str(data_flow_id))
 
         self._data_flows[data_flow_id].parent = None
-        return self._data_flows.pop(data_flow_id)
+        data_flow = self._data_flows.pop(data_flow_id)
+        if self._data_flow_index is not None and self._data_flow_index.data_flows is self._data_flows:
+            self._data_flow_index.remove(data_flow)
+        return data_flow
 
     @lock_state_machine
     def remove_data_flows_with_data_port_id(self, data_port_id):
@@ -1442,6 +1452,23 @@ class ContainerState(State):
         for data_flow_id in data_flow_ids_to_remove:
             self.remove_data_flow(data_flow_id)
 
+    def get_data_flow_index(self):
+        """Returns the lookup index of the data flows of the container state
+
+        The index is created on first access and updated by :meth:`add_data_flow` and :meth:`remove_data_flow`. Other
+        modifications of data flows invalidate the index, which is then recreated on the next access.
+
+        :rtype: rafcon.core.state_elements.data_flow.DataFlowIndex
+        """
+        data_flow_index = self._data_flow_index
+        if data_flow_index is None or data_flow_index.data_flows is not self._data_flows:
+            data_flow_index = self._data_flow_index = DataFlowIndex(self._data_flows)
+        return data_flow_index
+
+    def invalidate_data_flow_index(self):
+        """Discards the lookup index of the data flows, e.g. after the origin or target of a data flow changed"""
+        self._data_flow_index = None
+
     # ---------------------------------------------------------------------------------------------
     # ---------------------------- scoped variables functions --------.----------------------------
     # ---------------------------------------------------------------------------------------------
@@ -1559,6 +1586,7 @@ class ContainerState(State):
     # ---------------------------------- input data handling --------------------------------------
     # ---------------------------------------------------------------------------------------------
 
+    @measure_state_phase(INPUT, state_argument=1)
     def get_inputs_for_state(self, state):
         """Retrieves all input data of a state. If several data flows are connected to an input port the
         most current data is used for the specific input port.
@@ -1571,20 +1599,19 @@ class ContainerState(State):
         tmp_dict = self.get_default_input_values_for_state(state)
         result_dict.update(tmp_dict)
 
+        data_passing_mode = get_data_passing_mode()
+        data_flow_index = self.get_data_flow_index()
         for input_port_key, value in state.input_data_ports.items():
             # for all input keys fetch the correct data_flow connection and read data into the result_dict
             actual_value = None
             actual_value_time = 0
-            for data_flow_key, data_flow in self.data_flows.items():
-
-                if data_flow.to_key == input_port_key:
-                    if data_flow.to_state == state.state_id:
-                        # fetch data from the scoped_data list: the key is the data_port_key + the state_id
-                        key = str(data_flow.from_key) + data_flow.from_state
-                        if key in self.scoped_data:
-                            if actual_value is None or actual_value_time < self.scoped_data[key].timestamp:
-                                actual_value = deepcopy(self.scoped_data[key].value)
-                                actual_value_time = self.scoped_data[key].timestamp
+            for data_flow in data_flow_index.get_data_flows_to(state.state_id, input_port_key):
+                # fetch data from the scoped_data list: the key is the data_port_key + the state_id
+                key = str(data_flow.from_key) + data_flow.from_state
+                if key in self.scoped_data:
+                    if actual_value is None or actual_value_time < self.scoped_data[key].timestamp:
+                        actual_value = pass_value(self.scoped_data[key].value, data_passing_mode)
+                        actual_value_time = self.scoped_data[key].timestamp
 
             if actual_value is not None:
                 result_dict[value.name] = actual_value
@@ -1605,20 +1632,22 @@ class ContainerState(State):
         :param dictionary: The dictionary that is added to the scoped data
         :param state: The state to which the input_data was passed (should be self in most cases)
         """
+        input_data_port_keys = {data_port.name: key for key, data_port in self.input_data_ports.items()}
+        data_flow_index = self.get_data_flow_index()
         for dict_key, value in dictionary.items():
-            for input_data_port_key, data_port in list(self.input_data_ports.items()):
-                if dict_key == data_port.name:
-                    self.scoped_data[str(input_data_port_key) + self.state_id] = \
-                        ScopedData(data_port.name, value, type(value), self.state_id, ScopedVariable, parent=self)
-                    # forward the data to scoped variables
-                    for data_flow_key, data_flow in self.data_flows.items():
-                        if data_flow.from_key == input_data_port_key and data_flow.from_state == self.state_id:
-                            if data_flow.to_state == self.state_id and data_flow.to_key in self.scoped_variables:
-                                current_scoped_variable = self.scoped_variables[data_flow.to_key]
-                                self.scoped_data[str(data_flow.to_key) + self.state_id] = \
-                                    ScopedData(current_scoped_variable.name, value, type(value), self.state_id,
-                                               ScopedVariable, parent=self)
-
+            if dict_key in input_data_port_keys:
+                input_data_port_key = input_data_port_keys[dict_key]
+                self.scoped_data[str(input_data_port_key) + self.state_id] = \
+                    ScopedData(dict_key, value, type(value), self.state_id, ScopedVariable, parent=self)
+                # forward the data to scoped variables
+                for data_flow in data_flow_index.get_data_flows_from(self.state_id, input_data_port_key):
+                    if data_flow.to_state == self.state_id and data_flow.to_key in self.scoped_variables:
+                        current_scoped_variable = self.scoped_variables[data_flow.to_key]
+                        self.scoped_data[str(data_flow.to_key) + self.state_id] = \
+                            ScopedData(current_scoped_variable.name, value, type(value), self.state_id,
+                                       ScopedVariable, parent=self)
+
+    @measure_state_phase(OUTPUT, state_argument=2)
     @lock_state_machine
     def add_state_execution_output_to_scoped_data(self, dictionary, state):
         """Add a state execution output to the scoped data
@@ -1626,17 +1655,19 @@ class ContainerState(State):
         :param dictionary: The dictionary that is added to the scoped data
         :param state: The state that finished execution and provide the dictionary
         """
+        output_data_port_keys = {data_port.name: key for key, data_port in state.output_data_ports.items()}
         for output_name, value in dictionary.items():
-            for output_data_port_key, data_port in list(state.output_data_ports.items()):
-                if output_name == data_port.name:
-                    if not isinstance(value, data_port.data_type):
-                        if (not ((type(value) is float or type(value) is int) and
-                                     (data_port.data_type is float or data_port.data_type is int)) and
-                                not (isinstance(value, type(None)))):
-                            logger.error("The data type of output port {0} should be of type {1}, but is of type {2}".
-                                         format(output_name, data_port.data_type, type(value)))
-                    self.scoped_data[str(output_data_port_key) + state.state_id] = \
-                        ScopedData(data_port.name, value, type(value), state.state_id, OutputDataPort, parent=self)
+            if output_name in output_data_port_keys:
+                output_data_port_key = output_data_port_keys[output_name]
+                data_port = state.output_data_ports[output_data_port_key]
+                if not isinstance(value, data_port.data_type):
+                    if (not ((type(value) is float or type(value) is int) and
+                                 (data_port.data_type is float or data_port.data_type is int)) and
+                            not (isinstance(value, type(None)))):
+                        logger.error("The data type of output port {0} should be of type {1}, but is of type {2}".
+                                     format(output_name, data_port.data_type, type(value)))
+                self.scoped_data[str(output_data_port_key) + state.state_id] = \
+                    ScopedData(data_port.name, value, type(value), state.state_id, OutputDataPort, parent=self)
 
     @lock_state_machine
     def add_default_values_of_scoped_variables_to_scoped_data(self):
@@ -1648,6 +1679,7 @@ class ContainerState(State):
                 ScopedData(scoped_var.name, scoped_var.default_value, scoped_var.data_type, self.state_id,
                            ScopedVariable, parent=self)
 
+    @measure_state_phase(OUTPUT, state_argument=2)
     @lock_state_machine
     def update_scoped_variables_with_output_dictionary(self, dictionary, state):
         """Update the values of the scoped variables with the output dictionary of a specific state.
@@ -1655,25 +1687,23 @@ class ContainerState(State):
         :param: the dictionary to update the scoped variables with
         :param: the state the output dictionary belongs to
         """
+        output_data_port_keys = {o_port.name: o_key for o_key, o_port in state.output_data_ports.items()}
+        data_flow_index = self.get_data_flow_index()
         for key, value in dictionary.items():
-            output_data_port_key = None
             # search for the correct output data port key of the source state
-            for o_key, o_port in state.output_data_ports.items():
-                if o_port.name == key:
-                    output_data_port_key = o_key
-                    break
+            output_data_port_key = output_data_port_keys.get(key)
             if output_data_port_key is None:
                 if not key == "error":
                     logger.warning("Output variable %s was written during state execution, "
                                    "that has no data port connected to it.", str(key))
-            for data_flow_key, data_flow in self.data_flows.items():
-                if data_flow.from_key == output_data_port_key and data_flow.from_state == state.state_id:
-                    if data_flow.to_state == self.state_id:  # is target of data flow own state id?
-                        if data_flow.to_key in self.scoped_variables.keys():  # is target data port scoped?
-                            current_scoped_variable = self.scoped_variables[data_flow.to_key]
-                            self.scoped_data[str(data_flow.to_key) + self.state_id] = \
-                                ScopedData(current_scoped_variable.name, value, type(value), state.state_id,
-                                           ScopedVariable, parent=self)
+                continue
+            for data_flow in data_flow_index.get_data_flows_from(state.state_id, output_data_port_key):
+                if data_flow.to_state == self.state_id:  # is target of data flow own state id?
+                    if data_flow.to_key in self.scoped_variables:  # is target data port scoped?
+                        current_scoped_variable = self.scoped_variables[data_flow.to_key]
+                        self.scoped_data[str(data_flow.to_key) + self.state_id] = \
+                            ScopedData(current_scoped_variable.name, value, type(value), state.state_id,
+                                       ScopedVariable, parent=self)
 
     # ---------------------------------------------------------------------------------------------
     # ------------------------ functions to modify the scoped data end ----------------------------
@@ -1703,6 +1733,7 @@ class ContainerState(State):
                 data_flow._from_state = self.state_id
             if data_flow.to_state == old_state_id:
                 data_flow._to_state = self.state_id
+        self.invalidate_data_flow_index()
 
     def get_state_for_transition(self, transition):
         """Calculate the target state of a transition
@@ -1730,30 +1761,30 @@ class ContainerState(State):
         else:
             output_dict = self.output_data
 
+        data_passing_mode = get_data_passing_mode()
+        data_flow_index = self.get_data_flow_index()
         for output_name, value in self.output_data.items():
             output_port_id = self.get_io_data_port_id_from_name_and_type(output_name, OutputDataPort)
             actual_value = None
             actual_value_was_written = False
             actual_value_time = 0
-            for data_flow_id, data_flow in self.data_flows.items():
-                if data_flow.to_state == self.state_id:
-                    if data_flow.to_key == output_port_id:
-                        scoped_data_key = str(data_flow.from_key) + data_flow.from_state
-                        if scoped_data_key in self.scoped_data:
-                            # if self.scoped_data[scoped_data_key].timestamp > actual_value_time is True
-                            # the data of a previous execution of the same state is overwritten
-                            if actual_value is None or self.scoped_data[scoped_data_key].timestamp > actual_value_time:
-                                actual_value = deepcopy(self.scoped_data[scoped_data_key].value)
-                                actual_value_time = self.scoped_data[scoped_data_key].timestamp
-                                actual_value_was_written = True
-                        else:
-                            if not self.backward_execution:
-                                logger.debug(
-                                    "Output data with name {0} of state {1} was not found in the scoped data "
-                                    "of state {2}. Thus the state did not write onto this output. "
-                                    "This can mean a state machine design error.".format(
-                                        str(output_name), str(self.states[data_flow.from_state].get_path()),
-                                        self.get_path()))
+            for data_flow in data_flow_index.get_data_flows_to(self.state_id, output_port_id):
+                scoped_data_key = str(data_flow.from_key) + data_flow.from_state
+                if scoped_data_key in self.scoped_data:
+                    # if self.scoped_data[scoped_data_key].timestamp > actual_value_time is True
+                    # the data of a previous execution of the same state is overwritten
+                    if actual_value is None or self.scoped_data[scoped_data_key].timestamp > actual_value_time:
+                        actual_value = pass_value(self.scoped_data[scoped_data_key].value, data_passing_mode)
+                        actual_value_time = self.scoped_data[scoped_data_key].timestamp
+                        actual_value_was_written = True
+                else:
+                    if not self.backward_execution:
+                        logger.debug(
+                            "Output data with name {0} of state {1} was not found in the scoped data "
+                            "of state {2}. Thus the state did not write onto this output. "
+                            "This can mean a state machine design error.".format(
+                                str(output_name), str(self.states[data_flow.from_state].get_path()),
+                                self.get_path()))
             if actual_value_was_written:
                 output_dict[output_name] = actual_value
 
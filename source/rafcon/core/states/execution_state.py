@@ -32,6 +32,7 @@ from rafcon.core.state_elements.logical_port import Outcome
 from rafcon.core.script import Script
 from rafcon.core.states.state import StateExecutionStatus
 from rafcon.core.execution.execution_history import CallType
+from rafcon.core.execution.state_profiler import measure_state_phase, SCRIPT
 from rafcon.core.config import global_config
 
 from rafcon.utils import log
@@ -107,6 +108,7 @@ class ExecutionState(State):
             logger.warning("Erroneous description for state '{1}': {0}".format(formatted_lines[-1], dictionary['name']))
         return state
 
+    @measure_state_phase(SCRIPT)
     def _execute(self, execute_inputs, execute_outputs, backward_execution=False):
         """Calls the custom execute function of the script.py of the state
 
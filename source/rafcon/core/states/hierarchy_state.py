@@ -23,7 +23,6 @@ import copy
 from rafcon.utils import log
 from rafcon.core.states.container_state import ContainerState
 from rafcon.core.state_elements.logical_port import Outcome
-import rafcon.core.singleton as singleton
 from rafcon.core.execution.execution_history import CallItem, ReturnItem
 from rafcon.core.execution.execution_status import StateMachineExecutionStatus
 from rafcon.core.states.state import StateExecutionStatus
@@ -96,7 +95,7 @@ class HierarchyState(ContainerState):
             while self.child_state is not self:
                 # print("hs1", self.name)
                 self.handling_execution_mode = True
-                execution_mode = singleton.state_machine_execution_engine.handle_execution_mode(self, self.child_state)
+                execution_mode = self.get_execution_engine().handle_execution_mode(self, self.child_state)
 
                 # in the case of starting the sm from a specific state not the transitions define the logic flow
                 # but the the execution_engine.run_to_states; thus, do not alter the next state in this case
@@ -117,6 +116,11 @@ class HierarchyState(ContainerState):
                     else:
                         break
                 elif execution_mode == StateMachineExecutionStatus.BACKWARD:
+                    if not self.execution_history.is_backward_step_possible():
+                        # wait for the next execution command
+                        logger.warning("{0} cannot step further backward, as the older items of the bounded "
+                                       "execution history were evicted".format(self))
+                        continue
                     break_loop = self._handle_backward_execution_before_child_execution()
                     if break_loop:
                         break
@@ -238,12 +242,17 @@ class HierarchyState(ContainerState):
         :return: a flag to indicate if normal child state execution should abort
         """
         self.child_state.state_execution_status = StateExecutionStatus.WAIT_FOR_NEXT_STATE
+        # the items before the call item of the child_state may have been evicted from a bounded history, then the
+        # backward stepping stops at the child_state
+        at_history_boundary = self.execution_history.is_last_item_preceded_by_evicted_items()
         # the item popped now from the history will be a CallItem and will contain the scoped data,
         # that was valid before executing the child_state
         last_history_item = self.execution_history.pop_last_item()
         assert isinstance(last_history_item, CallItem)
         # copy the scoped_data of the history from the point before the child_state was executed
         self.scoped_data = last_history_item.scoped_data
+        if at_history_boundary:
+            return False
 
         # this is a look-ahead step to directly leave this hierarchy-state if the last child_state
         # was executed; this leads to the backward and forward execution of a hierarchy child_state
@@ -282,7 +291,7 @@ class HierarchyState(ContainerState):
             self.final_outcome = self.outcomes[transition.to_outcome]
 
         if self.child_state is self:
-            singleton.state_machine_execution_engine._modify_run_to_states(self)
+            self.get_execution_engine()._modify_run_to_states(self)
         return False
 
     def _finalize_hierarchy(self):
@@ -21,11 +21,12 @@ from future.utils import string_types
 from builtins import str
 from weakref import ref
 from copy import copy, deepcopy
+from threading import Lock
 
 from gtkmvc3.observable import Observable
 from rafcon.core.states.state import StateExecutionStatus
 from rafcon.core.singleton import library_manager
-from rafcon.core.states.state import State, PATH_SEPARATOR
+from rafcon.core.states.state import State, PATH_SEPARATOR, invalidate_cached_paths
 from rafcon.core.decorators import lock_state_machine
 from rafcon.core.config import global_config
 from rafcon.utils import log
@@ -34,6 +35,8 @@ from rafcon.utils.hashable import Hashable
 
 logger = log.get_logger(__name__)
 
+_state_copy_creation_lock = Lock()
+
 
 class LibraryState(State):
     """A class to represent a library state for the state machine
@@ -56,6 +59,11 @@ class LibraryState(State):
     :ivar dict allow_user_interaction: flag to indicate if the user can support in localizing moved libraries
     :ivar skip_runtime_data_initialization: flag to indicate if the runtime-data data structures have to be initialized,
                                             this is not needed e.g. in the case of a copy
+
+    All instances of a library share the root state of the library loaded by the library manager as template. The
+    state copy of an instance is only created from the template when it is accessed the first time, e.g. when the
+    library state is executed or its content is shown in the GUI. Until then, the library state only holds copies of
+    the outcomes and data ports of the template.
     """
 
     yaml_tag = u'!LibraryState'
@@ -64,6 +72,7 @@ class LibraryState(State):
     _library_name = None
     _version = None
     _state_copy = None
+    _library_template = None
 
     _input_data_port_runtime_values = {}
     _use_runtime_value_input_data_ports = {}
@@ -100,10 +109,10 @@ class LibraryState(State):
             logger.info("New library name '{0}' is located at {1}".format(new_library_name, new_library_path))
 
         # key = load_library_root_state_timer.start()
-        lib_version, state_copy = library_manager.get_library_state_copy_instance(self.lib_os_path)
+        lib_version, library_template = library_manager.get_library_template(self.lib_os_path)
         if not str(lib_version) == version and not str(lib_version) == "None":
             raise AttributeError("Library does not have the correct version!")
-        self.state_copy = state_copy
+        self._library_template = library_template
 
         if safe_init:
             LibraryState._safe_init(self, name)
@@ -123,30 +132,56 @@ class LibraryState(State):
         self.initialized = True
 
     def _safe_init(self, name):
-        self.state_copy.parent = self
+        template = self._library_template
         if name is None:
-            self.name = self.state_copy.name
-        # copy all ports and outcomes of self.state_copy to let the library state appear like the container state
+            self.name = template.name
+        # copy all ports and outcomes of the library template to let the library state appear like the container state
         # this will also set the parent of all outcomes and data ports to self
-        self.outcomes = self.state_copy.outcomes
-        self.input_data_ports = self.state_copy.input_data_ports
-        self.output_data_ports = self.state_copy.output_data_ports
+        self.outcomes = {outcome_id: copy(outcome) for outcome_id, outcome in template.outcomes.items()}
+        self.input_data_ports = {port_id: copy(port) for port_id, port in template.input_data_ports.items()}
+        self.output_data_ports = {port_id: copy(port) for port_id, port in template.output_data_ports.items()}
 
     def _unsafe_init(self, name):
-        self.state_copy._parent = ref(self)
+        template = self._library_template
         if name is None:
-            self._name = self.state_copy.name
-        self._outcomes = self.state_copy.outcomes
+            self._name = template.name
+        self._outcomes = {outcome_id: copy(outcome) for outcome_id, outcome in template.outcomes.items()}
         # add parents manually
         for outcome_id, outcome in self._outcomes.items():
             outcome._parent = ref(self)
-        self._input_data_ports = self.state_copy.input_data_ports
+        self._input_data_ports = {port_id: copy(port) for port_id, port in template.input_data_ports.items()}
         for port_id, port in self._input_data_ports.items():
             port._parent = ref(self)
-        self._output_data_ports = self.state_copy.output_data_ports
+        self._output_data_ports = {port_id: copy(port) for port_id, port in template.output_data_ports.items()}
         for port_id, port in self._output_data_ports.items():
             port._parent = ref(self)
 
+    def _create_state_copy(self):
+        """Create the state copy from the library template
+
+        The library state and its state copy share the outcomes and data ports.
+        """
+        with _state_copy_creation_lock:
+            if self._state_copy is not None:
+                return
+            state_copy = deepcopy(self._library_template)
+            state_copy._outcomes = self._outcomes
+            state_copy._input_data_ports = self._input_data_ports
+            state_copy._output_data_ports = self._output_data_ports
+            invalidate_cached_paths(state_copy)
+            state_copy._parent = ref(self)
+            invalidate_cached_paths(state_copy)
+            self._state_copy = state_copy
+
+    @property
+    def state_copy_created(self):
+        """Whether the state copy was already created from the library template"""
+        return self._state_copy is not None
+
+    def _get_state_copy_or_template(self):
+        """Returns the state copy if already created and the library template otherwise, for read-only access"""
+        return self._state_copy if self._state_copy is not None else self._library_template
+
     def _handle_runtime_values(self, input_data_port_runtime_values, use_runtime_value_input_data_ports,
                                output_data_port_runtime_values, use_runtime_value_output_data_ports):
         # handle input runtime values
@@ -212,7 +247,13 @@ class LibraryState(State):
     def __eq__(self, other):
         if not isinstance(other, self.__class__):
             return False
-        return str(self) == str(other) and self._state_copy == other.state_copy
+        if str(self) != str(other):
+            return False
+        if self._state_copy is None and other._state_copy is None:
+            # both contents are still unmodified copies of their templates
+            return self._library_template is other._library_template or \
+                self._library_template == other._library_template
+        return self.state_copy == other.state_copy
 
     def __copy__(self):
         income = self._income
@@ -234,11 +275,12 @@ class LibraryState(State):
     def destroy(self, recursive=True):
         super(LibraryState, self).destroy(recursive)
         if recursive:
-            if self.state_copy:
-                self.state_copy.destroy(recursive)
-            else:
+            if self._state_copy:
+                self._state_copy.destroy(recursive)
+            elif self._library_template is None:
                 logger.verbose("Multiple calls of destroy {0}".format(self))
             self._state_copy = None
+            self._library_template = None
 
     def run(self):
         """ This defines the sequence of actions that are taken when the library state is executed
@@ -263,19 +305,22 @@ class LibraryState(State):
         """Preempt the state and all of it child states.
         """
         super(LibraryState, self).recursively_preempt_states()
-        self.state_copy.recursively_preempt_states()
+        if self.state_copy_created:
+            self.state_copy.recursively_preempt_states()
 
     def recursively_pause_states(self):
         """Pause the state and all of it child states.
         """
         super(LibraryState, self).recursively_pause_states()
-        self.state_copy.recursively_pause_states()
+        if self.state_copy_created:
+            self.state_copy.recursively_pause_states()
 
     def recursively_resume_states(self):
         """Resume the state and all of it child states.
         """
         super(LibraryState, self).recursively_resume_states()
-        self.state_copy.recursively_resume_states()
+        if self.state_copy_created:
+            self.state_copy.recursively_resume_states()
 
     @lock_state_machine
     def add_outcome(self, name, outcome_id=None):
@@ -355,7 +400,7 @@ class LibraryState(State):
     @lock_state_machine
     @Observable.observed
     def set_input_runtime_value(self, input_data_port_id, value):
-        checked_value = self.state_copy.input_data_ports[input_data_port_id].check_default_value(value)
+        checked_value = self.input_data_ports[input_data_port_id].check_default_value(value)
         self._input_data_port_runtime_values[input_data_port_id] = checked_value
 
     @lock_state_machine
@@ -366,7 +411,7 @@ class LibraryState(State):
     @lock_state_machine
     @Observable.observed
     def set_output_runtime_value(self, output_data_port_id, value):
-        checked_value = self.state_copy.output_data_ports[output_data_port_id].check_default_value(value)
+        checked_value = self.output_data_ports[output_data_port_id].check_default_value(value)
         self._output_data_port_runtime_values[output_data_port_id] = checked_value
 
     @lock_state_machine
@@ -409,7 +454,7 @@ class LibraryState(State):
 
     def update_hash(self, obj_hash):
         super(LibraryState, self).update_hash(obj_hash)
-        self.state_copy.update_hash(obj_hash)
+        self._get_state_copy_or_template().update_hash(obj_hash)
 
     @staticmethod
     def state_to_dict(state):
@@ -432,14 +477,14 @@ class LibraryState(State):
         Returns the numer of child states. As per default states do not have child states return 1.
         :return:
         """
-        return self.state_copy.get_states_statistics(hierarchy_level)
+        return self._get_state_copy_or_template().get_states_statistics(hierarchy_level)
 
     def get_number_of_transitions(self):
         """
         Return the number of transitions for a state. Per default states do not have transitions.
         :return:
         """
-        return self.state_copy.get_number_of_transitions()
+        return self._get_state_copy_or_template().get_number_of_transitions()
 
     #########################################################################
     # Properties for all class fields that must be observed by gtkmvc3
@@ -497,7 +542,10 @@ class LibraryState(State):
     def state_copy(self):
         """Property for the _state_copy field
 
+        The state copy is created from the library template on first access.
         """
+        if self._state_copy is None and self._library_template is not None:
+            self._create_state_copy()
         return self._state_copy
 
     @state_copy.setter
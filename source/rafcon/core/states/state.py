@@ -56,6 +56,51 @@ logger = log.get_logger(__name__)
 PATH_SEPARATOR = '/'
 
 
+
+def get_path_generation_owner(state):
+    """Returns the object holding the generation of the cached paths of the given state
+
+    The cached paths of all states of a state machine share the generation of the state machine. The generation of
+    states not belonging to a state machine is held by the topmost state of their tree.
+
+    :param State state: the state
+    :rtype: rafcon.core.state_machine.StateMachine | State
+    :return: the state machine or the topmost state
+    """
+    while True:
+        parent = state.parent
+        if parent is None:
+            return state
+        if not isinstance(parent, State):
+            return parent
+        state = parent
+
+
+def invalidate_cached_paths(state):
+    """Invalidates the cached paths of all states of the state machine (or the state tree) the state belongs to
+
+    Must be called whenever the parent, the id or the name of a state is changed without the respective setter. If
+    the parent is changed, it must be called before and after the change, to invalidate the paths in the old and in
+    the new tree.
+
+    :param State state: the state whose path might have changed
+    """
+    get_path_generation_owner(state)._path_generation += 1
+
+
+def _get_cached_value(cache, *key):
+    """Returns the value of a cache entry created by :func:`_create_cache_entry`, if the entry is still valid"""
+    if cache is not None:
+        owner = cache[0]()
+        if owner is not None and owner._path_generation == cache[1] and cache[2] == key:
+            return cache[3]
+    return None
+
+
+def _create_cache_entry(owner, generation, value, *key):
+    return ref(owner), generation, key, value
+
+
 class State(Observable, YAMLObject, JSONObject, Hashable):
 
     """A class for representing a state in the state machine
@@ -74,6 +119,8 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
     """
 
     _parent = None
+    # the generation of the cached paths of the state tree, if the state is its topmost state
+    _path_generation = 0
     _state_element_attrs = ['income', 'outcomes', 'input_data_ports', 'output_data_ports']
 
     def __init__(self, name=None, state_id=None, input_data_ports=None, output_data_ports=None,
@@ -110,6 +157,11 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         # tracks how often a state was executed
         self._execution_counter = 0
 
+        # the cached results of get_path and get_storage_path, valid for one generation of the paths of the state tree
+        self._cached_path = None
+        self._cached_storage_path = None
+        self._cached_state_machine = None
+
         # before storing a state the file_system_path cannot return the file system path
         # therefore this variable is None till the state was stored
         self._file_system_path = None
@@ -281,14 +333,24 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
     def start(self, execution_history, backward_execution=False, generate_run_id=True):
         """ Starts the execution of the state in a new thread.
 
+        If the execution thread pool is enabled (see config value `EXECUTION_THREAD_POOL_SIZE`), an idle worker thread
+        of the pool is reused instead of creating a new thread.
+
         :return:
         """
+        from rafcon.core.singleton import execution_thread_pool, state_profiler
         self.execution_history = execution_history
         if generate_run_id:
             self._run_id = run_id_generator()
         self.backward_execution = copy.copy(backward_execution)
-        self.thread = threading.Thread(target=self.run)
-        self.thread.start()
+        run = self.run
+        if state_profiler.enabled:
+            run = state_profiler.profile_run(self, run)
+        if execution_thread_pool.max_idle_workers > 0:
+            self.thread = execution_thread_pool.submit(run)
+        else:
+            self.thread = threading.Thread(target=run)
+            self.thread.start()
 
     def generate_run_id(self):
         self._run_id = run_id_generator()
@@ -350,9 +412,11 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
     def get_previously_executed_state(self):
         """Calculates the state that was executed before this state
 
-        :return: The last state in the execution history
+        :return: The last state in the execution history or None, if its history item was evicted from a bounded
+            execution history
         """
-        return self.execution_history.get_last_history_item().prev.state_reference
+        previous_history_item = self.execution_history.get_last_history_item().prev
+        return previous_history_item.state_reference if previous_history_item is not None else None
 
     # ---------------------------------------------------------------------------------------------
     # ------------------------------- input/output data handling ----------------------------------
@@ -571,11 +635,19 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         :rtype: str
         :return: the full path to the root state
         """
-        if by_name:
-            state_identifier = self.name
-        else:
-            state_identifier = self.state_id
-
+        if not by_name:
+            if appendix is not None:
+                return self.get_path() + PATH_SEPARATOR + appendix
+            path = _get_cached_value(self._cached_path)
+            if path is not None:
+                return path
+            owner = get_path_generation_owner(self)
+            generation = owner._path_generation
+            path = self.state_id if self.is_root_state else self.parent.get_path() + PATH_SEPARATOR + self.state_id
+            self._cached_path = _create_cache_entry(owner, generation, path)
+            return path
+
+        state_identifier = self.name
         if not self.is_root_state:
             if appendix is None:
                 return self.parent.get_path(state_identifier, by_name)
@@ -597,18 +669,25 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         :rtype: str
         :return: the full path to the root state
         """
+        if appendix is not None:
+            return self.get_storage_path() + PATH_SEPARATOR + appendix
+        # the storage id depends on the configuration, which is thus part of the cache key
+        key = (global_config.get_config_value('STORAGE_PATH_WITH_STATE_NAME'),
+               global_config.get_config_value('MAX_LENGTH_FOR_STATE_NAME_IN_STORAGE_PATH'))
+        storage_path = _get_cached_value(self._cached_storage_path, *key)
+        if storage_path is not None:
+            return storage_path
+
+        owner = get_path_generation_owner(self)
+        generation = owner._path_generation
         state_identifier = storage.get_storage_id_for_state(self)
-
-        if not self.is_root_state:
-            if appendix is None:
-                return self.parent.get_storage_path(state_identifier)
-            else:
-                return self.parent.get_storage_path(state_identifier + PATH_SEPARATOR + appendix)
+        if self.is_root_state:
+            storage_path = state_identifier
         else:
-            if appendix is None:
-                return state_identifier
-            else:
-                return state_identifier + PATH_SEPARATOR + appendix
+            # the parent is asked with an appendix, as library states map the paths of their children
+            storage_path = self.parent.get_storage_path(state_identifier)
+        self._cached_storage_path = _create_cache_entry(owner, generation, storage_path, *key)
+        return storage_path
 
     def get_state_machine(self):
         """Get a reference of the state_machine the state belongs to
@@ -616,13 +695,28 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         :rtype rafcon.core.state_machine.StateMachine
         :return: respective state machine
         """
-        if self.parent:
-            if self.is_root_state:
-                return self.parent
-            else:
-                return self.parent.get_state_machine()
+        # the state machine owns the generation of the cached paths, thus it is only cached as weak reference
+        if _get_cached_value(self._cached_state_machine):
+            state_machine = self._cached_state_machine[0]()
+            if state_machine is not None:
+                return state_machine
+        owner = get_path_generation_owner(self)
+        if isinstance(owner, State):
+            return None
+        self._cached_state_machine = _create_cache_entry(owner, owner._path_generation, True)
+        return owner
 
-        return None
+    def get_execution_engine(self):
+        """Get the execution engine executing the state machine the state belongs to
+
+        :rtype: rafcon.core.execution.execution_engine.ExecutionEngine
+        :return: the execution context of the state machine, if one was created, else the execution engine singleton
+        """
+        state_machine = self.get_state_machine()
+        if state_machine is not None and state_machine.execution_context is not None:
+            return state_machine.execution_context
+        from rafcon.core import singleton
+        return singleton.state_machine_execution_engine
 
     @property
     def file_system_path(self):
@@ -925,6 +1019,7 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
                 state_id = state_id_generator(used_state_ids=used_ids)
 
         self._state_id = state_id
+        invalidate_cached_paths(self)
 
     def get_states_statistics(self, hierarchy_level):
         """Get states statistic tuple
@@ -1040,6 +1135,8 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
                 raise ValueError("Name must have at least one character")
 
         self._name = name
+        # the name is part of the storage path
+        invalidate_cached_paths(self)
 
     @property
     def parent(self):
@@ -1057,6 +1154,7 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
     @lock_state_machine
     @Observable.observed
     def parent(self, parent):
+        invalidate_cached_paths(self)
         if parent is None:
             self._parent = None
         else:
@@ -1065,6 +1163,7 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
                 raise TypeError("parent must be of type State or StateMachine or None")
 
             self._parent = ref(parent)
+        invalidate_cached_paths(self)
 
     @property
     def input_data_ports(self):
@@ -1261,6 +1360,12 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
             if old_outcome not in iter(list(self._outcomes.values())) and old_outcome.parent is self:
                 old_outcome.parent = None
 
+    # The runtime fields input_data, output_data, preempted, started, paused, concurrency_queue, final_outcome and
+    # state_execution_status are only changed during the execution and do not belong to the structure of the state
+    # machine. Thus, their setters do not acquire the modification lock of the state machine, which would otherwise be
+    # contended by all concurrently running states. Setting an attribute and setting or clearing an event is
+    # thread-safe on its own.
+
     @property
     def input_data(self):
         """Property for the _input_data field
@@ -1269,7 +1374,6 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self._input_data
 
     @input_data.setter
-    @lock_state_machine
     #@Observable.observed
     def input_data(self, input_data):
         if not isinstance(input_data, dict):
@@ -1284,7 +1388,6 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self._output_data
 
     @output_data.setter
-    @lock_state_machine
     #@Observable.observed
     def output_data(self, output_data):
         if not isinstance(output_data, dict):
@@ -1298,7 +1401,6 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self._preempted.is_set()
 
     @preempted.setter
-    @lock_state_machine
     def preempted(self, preempted):
         if not isinstance(preempted, bool):
             raise TypeError("preempted must be of type bool")
@@ -1314,7 +1416,6 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self._started.is_set()
 
     @started.setter
-    @lock_state_machine
     def started(self, started):
         if not isinstance(started, bool):
             raise TypeError("started must be of type bool")
@@ -1330,7 +1431,6 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self._paused.is_set()
 
     @paused.setter
-    @lock_state_machine
     def paused(self, paused):
         if not isinstance(paused, bool):
             raise TypeError("paused must be of type bool")
@@ -1365,7 +1465,6 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self._concurrency_queue
 
     @concurrency_queue.setter
-    @lock_state_machine
     #@Observable.observed
     def concurrency_queue(self, concurrency_queue):
         if not isinstance(concurrency_queue, queue.Queue):
@@ -1384,7 +1483,6 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self._final_outcome
 
     @final_outcome.setter
-    @lock_state_machine
     #@Observable.observed
     def final_outcome(self, final_outcome):
         if not isinstance(final_outcome, Outcome):
@@ -1429,13 +1527,26 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self._state_execution_status
 
     @state_execution_status.setter
-    @lock_state_machine
-    @Observable.observed
     def state_execution_status(self, state_execution_status):
+        """Setter for the _state_execution_status field
+
+        The observers are notified like for a setter decorated with `Observable.observed`. If the execution status
+        bus is enabled (see config value `EXECUTION_STATUS_NOTIFICATION_INTERVAL`), the notifications are delivered
+        later on by the bus.
+        """
+        # a runtime field, which is set without acquiring the modification lock of the state machine (see input_data)
         if not isinstance(state_execution_status, StateExecutionStatus):
             raise TypeError("state_execution_status must be of type StateExecutionStatus")
 
+        from rafcon.core.singleton import execution_status_bus
+        if execution_status_bus.enabled:
+            self._state_execution_status = state_execution_status
+            execution_status_bus.publish(self, state_execution_status)
+            return
+        args = (self, state_execution_status)
+        self._notify_method_before(self, 'state_execution_status', args, {})
         self._state_execution_status = state_execution_status
+        self._notify_method_after(self, 'state_execution_status', None, args, {})
 
     @property
     def is_root_state(self):
@@ -0,0 +1,118 @@
+# Copyright (C) 2019 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+
+"""
+.. module:: file_prefetcher
+   :synopsis: A module to read all files of a state machine in parallel before the state machine is assembled
+
+"""
+from builtins import object
+import os
+from multiprocessing.pool import ThreadPool
+
+
+def _normalize(path):
+    return os.path.normpath(os.path.abspath(path))
+
+
+class StateMachineFilePrefetcher(object):
+    """Reads the directory structure and the files of a state machine using a pool of threads
+
+    The file system is accessed by several threads in parallel. Afterwards, the states can be created from the cached
+    content without accessing the file system again. Paths not being prefetched are read from the file system.
+
+    :param str root_state_path: the path of the root state of the state machine
+    :param file_names: the names of the files to be read within each state directory
+    :param int number_of_threads: the number of threads reading from the file system
+    """
+
+    def __init__(self, root_state_path, file_names, number_of_threads=4):
+        self._directories = {}
+        self._files = {}
+        pool = ThreadPool(number_of_threads)
+        try:
+            paths = [_normalize(root_state_path)]
+            while paths:
+                listings = pool.map(self._list_directory, paths)
+                paths = []
+                for path, entries in listings:
+                    self._directories[path] = dict(entries)
+                    paths.extend(os.path.join(path, name) for name, is_directory in entries if is_directory)
+            file_paths = [os.path.join(path, name)
+                          for path, entries in self._directories.items()
+                          for name, is_directory in entries.items() if not is_directory and name in file_names]
+            self._files = dict(pool.map(self._read_file, file_paths))
+        finally:
+            pool.close()
+            pool.join()
+
+    @staticmethod
+    def _list_directory(path):
+        entries = []
+        for name in os.listdir(path):
+            entries.append((name, os.path.isdir(os.path.join(path, name))))
+        return path, entries
+
+    @staticmethod
+    def _read_file(path):
+        with open(path, 'r') as file_pointer:
+            return path, file_pointer.read()
+
+    @property
+    def number_of_files(self):
+        return len(self._files)
+
+    def listdir(self, path):
+        """Returns the names of the entries of a directory, see :func:`os.listdir`"""
+        path = _normalize(path)
+        if path in self._directories:
+            return list(self._directories[path].keys())
+        return os.listdir(path)
+
+    def _get_entry(self, path):
+        """Returns whether the path is a directory or None if the path does not exist
+
+        :raises KeyError: if the parent directory of the path was not prefetched
+        """
+        parent_path, name = os.path.split(path)
+        return self._directories[parent_path].get(name)
+
+    def isdir(self, path):
+        path = _normalize(path)
+        if path in self._directories:
+            return True
+        try:
+            entry = self._get_entry(path)
+        except KeyError:
+            return os.path.isdir(path)
+        return entry is True
+
+    def exists(self, path):
+        path = _normalize(path)
+        if path in self._files or path in self._directories:
+            return True
+        try:
+            return self._get_entry(path) is not None
+        except KeyError:
+            return os.path.exists(path)
+
+    def read_file(self, file_path, filename=None):
+        """Returns the content of a file or None if the file does not exist, see
+        :func:`rafcon.utils.filesystem.read_file`
+        """
+        from rafcon.utils.filesystem import read_file
+        if filename:
+            file_path = os.path.join(file_path, filename)
+        file_path = _normalize(file_path)
+        if file_path in self._files:
+            return self._files[file_path]
+        try:
+            if self._get_entry(file_path) is None:
+                return None
+        except KeyError:
+            pass
+        return read_file(file_path)
@@ -0,0 +1,99 @@
+# Copyright (C) 2019 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+
+"""
+.. module:: load_progress
+   :synopsis: A module to report the progress of loading a state machine and to cancel the loading
+
+"""
+from builtins import object
+import threading
+from timeit import default_timer as timer
+
+from rafcon.core.custom_exceptions import LoadingCancelledException
+
+# the counters of the loaded elements
+STATES = 'states'
+LIBRARIES = 'libraries'
+META_FILES = 'meta_files'
+COUNTERS = (STATES, LIBRARIES, META_FILES)
+
+
+class LoadProgress(object):
+    """The progress of loading a state machine, which can be followed and cancelled from other threads
+
+    The loading thread counts the loaded states, the resolved library states and the read meta data files. Each
+    count checks for a cancellation, which is raised as
+    :class:`rafcon.core.custom_exceptions.LoadingCancelledException` in the loading thread.
+
+    The callback is called in the loading thread with the current phase and a copy of the counters, whenever a new
+    phase starts and at most every `report_interval` seconds in between.
+
+    :param callback: an optional function getting the phase name and the counters
+    :param float report_interval: the minimal time in seconds between two reports within a phase
+    :ivar dict timings: the durations in seconds of the finished load phases
+    """
+
+    def __init__(self, callback=None, report_interval=0.1):
+        self.callback = callback
+        self.report_interval = report_interval
+        self.phase = None
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.timings = {}
+        self._cancelled = threading.Event()
+        self._last_report_time = timer()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Request the cancellation of the loading, which can be called from any thread"""
+        self._cancelled.set()
+
+    def check_cancelled(self):
+        """Raises an exception in the loading thread if the loading was cancelled
+
+        :raises rafcon.core.custom_exceptions.LoadingCancelledException: if the loading was cancelled
+        """
+        if self._cancelled.is_set():
+            raise LoadingCancelledException("Loading of the state machine was cancelled")
+
+    def start_phase(self, phase):
+        """Reports the start of a new load phase
+
+        :param str phase: the name of the phase
+        """
+        self.check_cancelled()
+        self.phase = phase
+        self._report()
+
+    def add(self, counter, number=1):
+        """Increases a counter of loaded elements
+
+        :param str counter: the counter, one of :data:`COUNTERS`
+        :param int number: the number of new elements
+        """
+        self.counters[counter] += number
+        self.check_cancelled()
+        if timer() - self._last_report_time >= self.report_interval:
+            self._report()
+
+    def state_loaded(self, state):
+        """Counts a loaded state and, for a library state, also the resolved library
+
+        :param rafcon.core.states.state.State state: the loaded state
+        """
+        from rafcon.core.states.library_state import LibraryState
+        if isinstance(state, LibraryState):
+            self.counters[LIBRARIES] += 1
+        self.add(STATES)
+
+    def _report(self):
+        self._last_report_time = timer()
+        if self.callback is not None:
+            self.callback(self.phase, dict(self.counters))
@@ -0,0 +1,253 @@
+# Copyright (C) 2019 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+
+"""
+.. module:: packed_state_machine
+   :synopsis: A single file format holding all files of a state machine folder
+
+A packed state machine starts with :data:`MAGIC`, followed by the length of the index (unsigned 64 bit, little endian)
+and the index itself. The index is a JSON object mapping the path of each file relative to the state machine folder
+(using `/` as separator) to the offset of its section, the length of the section and the size of the file. The
+offsets are relative to the end of the index. Each section holds the zlib compressed content of one file. The file is
+memory-mapped when reading, thus only the index and the sections of the requested files are read from the disk.
+
+"""
+from builtins import object
+import json
+import mmap
+import os
+import struct
+import zlib
+
+MAGIC = b'RAFCONSM\x01'
+FILE_EXTENSION = '.rsm'
+
+_INDEX_HEADER = struct.Struct('<Q')
+
+
+def is_packed_state_machine(path):
+    """Checks whether the given path is a packed state machine file
+
+    :param str path: the path to be checked
+    :rtype: bool
+    """
+    if not os.path.isfile(path):
+        return False
+    with open(path, 'rb') as packed_file:
+        return packed_file.read(len(MAGIC)) == MAGIC
+
+
+def get_packed_state_machine_path(path):
+    """Returns the path of the packed state machine file containing the given path
+
+    :param str path: a path pointing into a packed state machine, e.g. the file system path of a state
+    :return: the path of the packed state machine file or None, if the path is not within a packed state machine
+    :rtype: str
+    """
+    while path and not os.path.exists(path):
+        parent_path = os.path.dirname(path)
+        if parent_path == path:
+            return None
+        path = parent_path
+    if path and is_packed_state_machine(path):
+        return path
+    return None
+
+
+def write_packed_state_machine(files, packed_path, compression_level=6, kept_file_names=()):
+    """Writes files into a packed state machine
+
+    :param dict files: the content (bytes) of the files, by their path relative to the state machine folder
+    :param str packed_path: the path of the packed state machine file
+    :param int compression_level: the zlib compression level of the sections
+    :param kept_file_names: the names of files, which are kept from an existing packed state machine at the path, if
+        they are not contained in `files` and their folder still exists, as it would be the case for a folder
+    """
+    sections = {}
+    for relative_path, content in files.items():
+        sections[relative_path.replace(os.sep, '/')] = (zlib.compress(content, compression_level), len(content))
+    if kept_file_names and is_packed_state_machine(packed_path):
+        folders = set(relative_path.rpartition('/')[0] for relative_path in sections)
+        with PackedStateMachine(packed_path) as packed_state_machine:
+            for relative_path in packed_state_machine.file_paths:
+                folder, _, file_name = relative_path.rpartition('/')
+                if file_name in kept_file_names and folder in folders and relative_path not in sections:
+                    sections[relative_path] = packed_state_machine.read_section(relative_path)
+    _write_sections(sections, packed_path)
+
+
+def add_files_to_packed_state_machine(files, packed_path, compression_level=6):
+    """Adds files to an existing packed state machine or replaces them
+
+    The compressed sections of the other files are copied without decompressing them.
+
+    :param dict files: the content (bytes) of the files, by their path relative to the state machine folder
+    :param str packed_path: the path of the packed state machine file
+    :param int compression_level: the zlib compression level of the new sections
+    """
+    with PackedStateMachine(packed_path) as packed_state_machine:
+        sections = {relative_path: packed_state_machine.read_section(relative_path)
+                    for relative_path in packed_state_machine.file_paths}
+    for relative_path, content in files.items():
+        sections[relative_path.replace(os.sep, '/')] = (zlib.compress(content, compression_level), len(content))
+    _write_sections(sections, packed_path)
+
+
+def _write_sections(sections, packed_path):
+    """Writes a packed state machine from compressed sections given as tuples of the section and the file size"""
+    index = {}
+    offset = 0
+    for relative_path in sorted(sections):
+        section, size = sections[relative_path]
+        index[relative_path] = [offset, len(section), size]
+        offset += len(section)
+    index = json.dumps(index, sort_keys=True).encode('utf-8')
+    temporary_path = packed_path + '.tmp'
+    with open(temporary_path, 'wb') as packed_file:
+        packed_file.write(MAGIC)
+        packed_file.write(_INDEX_HEADER.pack(len(index)))
+        packed_file.write(index)
+        for relative_path in sorted(sections):
+            packed_file.write(sections[relative_path][0])
+    # replace the old file only after the new one was written completely
+    os.rename(temporary_path, packed_path)
+
+
+def pack_state_machine(folder_path, packed_path, compression_level=6):
+    """Packs all files of a state machine folder into a single file
+
+    :param str folder_path: the path of the state machine folder
+    :param str packed_path: the path of the packed state machine file
+    :param int compression_level: the zlib compression level of the sections
+    """
+    files = {}
+    for directory_path, _, file_names in os.walk(folder_path):
+        for file_name in file_names:
+            file_path = os.path.join(directory_path, file_name)
+            with open(file_path, 'rb') as f:
+                files[os.path.relpath(file_path, folder_path)] = f.read()
+    write_packed_state_machine(files, packed_path, compression_level)
+
+
+def unpack_state_machine(packed_path, folder_path):
+    """Restores the state machine folder of a packed state machine
+
+    :param str packed_path: the path of the packed state machine file
+    :param str folder_path: the path of the state machine folder to be created
+    """
+    with PackedStateMachine(packed_path) as packed_state_machine:
+        for relative_path in packed_state_machine.file_paths:
+            file_path = os.path.join(folder_path, *relative_path.split('/'))
+            if not os.path.isdir(os.path.dirname(file_path)):
+                os.makedirs(os.path.dirname(file_path))
+            with open(file_path, 'wb') as f:
+                f.write(packed_state_machine.read_bytes(relative_path))
+
+
+class PackedStateMachine(object):
+    """Read access to a packed state machine
+
+    The files of the state machine are addressed by the path they would have if the packed file were the state machine
+    folder, e.g. `<packed_path>/<root state storage id>/core_data.json`. The class provides the same interface as
+    :class:`rafcon.core.storage.file_prefetcher.StateMachineFilePrefetcher`, so it can be passed to
+    :func:`rafcon.core.storage.storage.load_state_recursively`.
+
+    :param str packed_path: the path of the packed state machine file
+    """
+
+    def __init__(self, packed_path):
+        self.packed_path = packed_path
+        self._base_path = os.path.normpath(os.path.abspath(packed_path))
+        self._file = open(packed_path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._mmap[:len(MAGIC)] != MAGIC:
+                raise ValueError("{0} is not a packed state machine".format(packed_path))
+            index_start = len(MAGIC) + _INDEX_HEADER.size
+            index_length = _INDEX_HEADER.unpack(self._mmap[len(MAGIC):index_start])[0]
+            self._index = json.loads(self._mmap[index_start:index_start + index_length].decode('utf-8'))
+            self._data_offset = index_start + index_length
+        except Exception:
+            self.close()
+            raise
+        self._directories = {'': set()}
+        for relative_path in self._index:
+            elements = relative_path.split('/')
+            for i in range(len(elements)):
+                self._directories.setdefault('/'.join(elements[:i]), set()).add(elements[i])
+
+    @property
+    def file_paths(self):
+        """The paths of all files relative to the state machine folder"""
+        return sorted(self._index.keys())
+
+    def _relative_path(self, path):
+        """Returns the path relative to the packed file or None if the path does not point into the packed file"""
+        path = os.path.normpath(os.path.abspath(path))
+        if path == self._base_path:
+            return ''
+        if not path.startswith(self._base_path + os.sep):
+            return None
+        return path[len(self._base_path) + 1:].replace(os.sep, '/')
+
+    def read_section(self, relative_path):
+        """Reads the compressed section of a single file
+
+        :param str relative_path: the path of the file relative to the state machine folder
+        :return: the compressed section and the size of the file
+        :rtype: tuple(bytes, int)
+        :raises KeyError: if the file is not contained
+        """
+        offset, length, size = self._index[relative_path]
+        offset += self._data_offset
+        return self._mmap[offset:offset + length], size
+
+    def read_bytes(self, relative_path):
+        """Reads and decompresses the section of a single file
+
+        :param str relative_path: the path of the file relative to the state machine folder
+        :return: the content of the file
+        :rtype: bytes
+        :raises KeyError: if the file is not contained
+        """
+        return zlib.decompress(self.read_section(relative_path)[0])
+
+    def listdir(self, path):
+        relative_path = self._relative_path(path)
+        if relative_path not in self._directories:
+            raise OSError("No such directory in {0}: {1}".format(self.packed_path, path))
+        return sorted(self._directories[relative_path])
+
+    def isdir(self, path):
+        return self._relative_path(path) in self._directories
+
+    def exists(self, path):
+        relative_path = self._relative_path(path)
+        return relative_path in self._directories or relative_path in self._index
+
+    def read_file(self, file_path, filename=None):
+        """Returns the content of a file as text or None if the file does not exist, see
+        :func:`rafcon.utils.filesystem.read_file`
+        """
+        if filename:
+            file_path = os.path.join(file_path, filename)
+        relative_path = self._relative_path(file_path)
+        if relative_path not in self._index:
+            return None
+        return self.read_bytes(relative_path).decode('utf-8')
+
+    def close(self):
+        if getattr(self, '_mmap', None) is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -25,9 +25,11 @@ import math
 import shutil
 import glob
 import copy
+import hashlib
 import yaml
 import warnings
 from distutils.version import StrictVersion
+from timeit import default_timer as timer
 
 import rafcon
 
@@ -40,6 +42,7 @@ from rafcon.core.custom_exceptions import LibraryNotFoundException
 from rafcon.core.constants import DEFAULT_SCRIPT_PATH
 from rafcon.core.config import global_config
 from rafcon.core.state_machine import StateMachine
+from rafcon.core.storage import packed_state_machine
 
 logger = log.get_logger(__name__)
 
@@ -59,6 +62,9 @@ ID_NAME_DELIMITER = "_"
 REPLACED_CHARACTERS_FOR_NO_OS_LIMITATION = {'/': '', r'\0': '', '<': '', '>': '', ':': '_',
                                             '\\': '', '|': '_', '?': '', '*': '_'}
 
+#: Records of the files and folders written when saving state machines, by the path of the state machine folder
+_saved_state_machine_files = {}
+
 # clean the DEFAULT_SCRIPT_PATH folder at each program start
 if os.path.exists(DEFAULT_SCRIPT_PATH):
     files = glob.glob(os.path.join(DEFAULT_SCRIPT_PATH, "*"))
@@ -66,32 +72,110 @@ if os.path.exists(DEFAULT_SCRIPT_PATH):
         shutil.rmtree(f)
 
 
-def remove_obsolete_folders(states, path):
+class SavedFiles(object):
+    """The records of the files and folders written into one state machine folder
+
+    :ivar dict files: the hash of the content and the modification time and size of the written files by file path
+    :ivar dict folders: the storage ids of the state folders within a folder by folder path
+    """
+
+    __slots__ = ('files', 'folders')
+
+    def __init__(self):
+        self.files = {}
+        self.folders = {}
+
+
+def get_saved_files(base_path):
+    """Returns the records of the files and folders written into a state machine folder
+
+    The records are dropped by :func:`forget_saved_files`, e.g. when the state machine is removed.
+
+    :param str base_path: the path of the state machine folder
+    :rtype: SavedFiles
+    """
+    base_path = os.path.normpath(base_path)
+    saved_files = _saved_state_machine_files.get(base_path)
+    if saved_files is None:
+        saved_files = _saved_state_machine_files[base_path] = SavedFiles()
+    return saved_files
+
+
+def write_file_if_changed(file_path, content, saved_files=None):
+    """Writes a file, unless it already has the given content
+
+    If records are given, the hash of the content and the modification time and size of the file are remembered for
+    each written file. If the file was not modified since, it is not read again to compare the content.
+
+    :param str file_path: the path of the file
+    :param str content: the content of the file
+    :param SavedFiles saved_files: the optional records of the state machine folder of the file
+    :return: True, if the file was written
+    :rtype: bool
+    """
+    records = saved_files.files if saved_files is not None else {}
+    content_hash = hashlib.sha1(content if isinstance(content, bytes) else content.encode('utf-8')).hexdigest()
+    try:
+        file_stat = os.stat(file_path)
+    except OSError:
+        file_stat = None
+    if file_stat is not None:
+        saved_file = records.get(file_path)
+        if saved_file == (content_hash, file_stat.st_mtime, file_stat.st_size):
+            return False
+        if saved_file is None and read_file(file_path) == content:
+            records[file_path] = (content_hash, file_stat.st_mtime, file_stat.st_size)
+            return False
+    write_file(file_path, content)
+    file_stat = os.stat(file_path)
+    records[file_path] = (content_hash, file_stat.st_mtime, file_stat.st_size)
+    return True
+
+
+def forget_saved_files(path):
+    """Removes the records of :func:`write_file_if_changed` and :func:`remove_obsolete_folders` of the state machine
+    folders at or within the given path
+
+    :param str path: the path of a state machine folder
+    """
+    path = os.path.normpath(path)
+    path_prefix = os.path.join(path, '')
+    for base_path in list(_saved_state_machine_files.keys()):
+        if base_path == path or base_path.startswith(path_prefix):
+            del _saved_state_machine_files[base_path]
+
+
+def remove_obsolete_folders(states, path, saved_files=None):
     """Removes obsolete state machine folders
 
     This function removes all folders in the file system folder `path` that do not belong to the states given by
-    `states`.
+    `states`. The folder is not checked, if it was saved with the same states before.
     
     :param list states: the states that should reside in this very folder
     :param str path: the file system path to be checked for valid folders
+    :param SavedFiles saved_files: the optional records of the state machine folder
     """
-    elements_in_folder = os.listdir(path)
-    # find all state folder elements in system path
-    state_folders_in_file_system = []
-    for folder_name in elements_in_folder:
-        if os.path.exists(os.path.join(path, folder_name, FILE_NAME_CORE_DATA)) or \
-                os.path.exists(os.path.join(path, folder_name, FILE_NAME_CORE_DATA_OLD)):
-            state_folders_in_file_system.append(folder_name)
+    remove_obsolete_state_folders(set(get_storage_id_for_state(state) for state in states), path, saved_files)
 
-    # remove elements used by existing states and storage format
-    for state in states:
-        storage_folder_for_state = get_storage_id_for_state(state)
-        if storage_folder_for_state in state_folders_in_file_system:
-            state_folders_in_file_system.remove(storage_folder_for_state)
 
-    # remove the remaining state folders
-    for folder_name in state_folders_in_file_system:
-        shutil.rmtree(os.path.join(path, folder_name))
+def remove_obsolete_state_folders(storage_ids, path, saved_files=None):
+    """Removes all state folders in the file system folder `path` whose name is not within `storage_ids`
+
+    :param set storage_ids: the storage ids of the states that should reside in this very folder
+    :param str path: the file system path to be checked for valid folders
+    :param SavedFiles saved_files: the optional records of the state machine folder
+    """
+    if saved_files is not None:
+        if saved_files.folders.get(path) == storage_ids and os.path.isdir(path):
+            return
+        saved_files.folders[path] = storage_ids
+
+    for folder_name in os.listdir(path):
+        if folder_name in storage_ids:
+            continue
+        if os.path.exists(os.path.join(path, folder_name, FILE_NAME_CORE_DATA)) or \
+                os.path.exists(os.path.join(path, folder_name, FILE_NAME_CORE_DATA_OLD)):
+            shutil.rmtree(os.path.join(path, folder_name))
 
 
 def clean_path_from_deprecated_naming(base_path):
@@ -152,31 +236,41 @@ def save_state_machine_to_path(state_machine, base_path, delete_old_state_machin
     The `as_copy` flag determines whether the state machine is saved as copy. If so (`as_copy=True`), some state
     machine attributes will be left untouched, such as the `file_system_path` or the `dirty_flag`.
 
+    If the `base_path` ends with :data:`rafcon.core.storage.packed_state_machine.FILE_EXTENSION`, the state machine is
+    saved as a single packed file instead of a folder.
+
     :param rafcon.core.state_machine.StateMachine state_machine: the state_machine to be saved
     :param str base_path: base_path to which all further relative paths refers to
     :param bool delete_old_state_machine: Whether to delete any state machine existing at the given path
     :param bool as_copy: Whether to use a copy storage for the state machine
+    :return: the number of files written, as files whose content did not change are not written again
+    :rtype: int
     """
     # warns the user in the logger when using deprecated names
     clean_path_from_deprecated_naming(base_path)
 
+    packed = base_path.endswith(packed_state_machine.FILE_EXTENSION)
+
     state_machine.acquire_modification_lock()
     try:
         root_state = state_machine.root_state
 
         # clean old path first
         if delete_old_state_machine:
-            if os.path.exists(base_path):
+            forget_saved_files(base_path)
+            if os.path.isdir(base_path):
                 shutil.rmtree(base_path)
+            elif os.path.isfile(base_path):
+                os.remove(base_path)
 
         # Ensure that path is existing
-        if not os.path.exists(base_path):
-            os.makedirs(base_path)
+        folder_path = os.path.dirname(base_path) if packed else base_path
+        if folder_path and not os.path.exists(folder_path):
+            os.makedirs(folder_path)
 
         old_update_time = state_machine.last_update
         state_machine.last_update = storage_utils.get_current_time_string()
         state_machine_dict = state_machine.to_dict()
-        storage_utils.write_dict_to_json(state_machine_dict, os.path.join(base_path, STATEMACHINE_FILE))
 
         # set the file_system_path of the state machine
         if not as_copy:
@@ -184,20 +278,71 @@ def save_state_machine_to_path(state_machine, base_path, delete_old_state_machin
         else:
             state_machine.last_update = old_update_time
 
-        # add root state recursively
-        remove_obsolete_folders([root_state], base_path)
-        save_state_recursively(root_state, base_path, "", as_copy)
+        if packed:
+            save_packed_state_machine(state_machine_dict, root_state, base_path, as_copy)
+            number_of_written_files = 1
+        else:
+            saved_files = get_saved_files(base_path)
+            number_of_written_files = int(write_file_if_changed(
+                os.path.join(base_path, STATEMACHINE_FILE), storage_utils.dump_dict_to_json_string(state_machine_dict),
+                saved_files))
+            # add root state recursively
+            remove_obsolete_folders([root_state], base_path, saved_files)
+            number_of_written_files += save_state_recursively(root_state, base_path, "", as_copy, saved_files)
 
         if state_machine.marked_dirty and not as_copy:
             state_machine.marked_dirty = False
-        logger.debug("State machine with id {0} was saved at {1}".format(state_machine.state_machine_id, base_path))
+        logger.debug("State machine with id {0} was saved at {1} ({2} files written)".format(
+            state_machine.state_machine_id, base_path, number_of_written_files))
+        return number_of_written_files
     except Exception:
         raise
     finally:
         state_machine.release_modification_lock()
 
 
-def save_script_file_for_state_and_source_path(state, state_path_full, as_copy=False):
+def save_packed_state_machine(state_machine_dict, root_state, packed_path, as_copy=False):
+    """Saves a state machine as single packed file
+
+    The files of the state machine are serialized in memory, as for a :class:`StateMachineSnapshot`, and written into
+    the packed file directly. Thus, the packed file contains exactly the files of the folder layout. As in a folder,
+    the meta data files of remaining states are kept if the packed file is overwritten.
+
+    :param dict state_machine_dict: the dictionary representation of the state machine
+    :param root_state: the root state of the state machine
+    :param str packed_path: the path of the packed state machine file
+    :param bool as_copy: Temporary storage flag to signal that the given path is not the new file_system_path
+    """
+    snapshot = StateMachineSnapshot()
+    snapshot.add_file(STATEMACHINE_FILE, storage_utils.dump_dict_to_json_string(state_machine_dict))
+    add_state_to_snapshot(snapshot, root_state, "")
+    packed_state_machine.write_packed_state_machine(
+        {file_path: content if isinstance(content, bytes) else content.encode('utf-8')
+         for file_path, content in snapshot.files.items()}, packed_path,
+        kept_file_names=(FILE_NAME_META_DATA, FILE_NAME_META_DATA_OLD))
+    if not as_copy:
+        set_file_system_path_recursively(root_state, packed_path, "")
+
+
+def set_file_system_path_recursively(state, base_path, parent_path):
+    """Sets the file system paths of a state and its children, as :func:`save_state_recursively` does
+
+    The paths of the scripts are not changed, as scripts cannot be read from within a packed state machine.
+
+    :param state: the state to be updated
+    :param base_path: Path to the state machine
+    :param parent_path: Path to the parent state
+    """
+    from rafcon.core.states.container_state import ContainerState
+
+    state_path = os.path.join(parent_path, get_storage_id_for_state(state))
+    state.file_system_path = os.path.join(base_path, state_path)
+    if isinstance(state, ContainerState):
+        for child_state in state.states.values():
+            set_file_system_path_recursively(child_state, base_path, state_path)
+
+
+def save_script_file_for_state_and_source_path(state, state_path_full, as_copy=False, saved_files=None):
     """Saves the script file for a state to the directory of the state.
 
     The script name will be set to the SCRIPT_FILE constant.
@@ -205,6 +350,9 @@ def save_script_file_for_state_and_source_path(state, state_path_full, as_copy=F
     :param state: The state of which the script file should be saved
     :param str state_path_full: The path to the file system storage location of the state
     :param bool as_copy: Temporary storage flag to signal that the given path is not the new file_system_path
+    :param SavedFiles saved_files: the optional records of the state machine folder
+    :return: the number of files written
+    :rtype: int
     """
     from rafcon.core.states.execution_state import ExecutionState
     if isinstance(state, ExecutionState):
@@ -212,7 +360,7 @@ def save_script_file_for_state_and_source_path(state, state_path_full, as_copy=F
         destination_script_file = os.path.join(state_path_full, SCRIPT_FILE)
 
         try:
-            write_file(destination_script_file, state.script_text)
+            written = write_file_if_changed(destination_script_file, state.script_text, saved_files)
         except Exception:
             logger.exception("Storing of script file failed: {0} -> {1}".format(state.get_path(),
                                                                                 destination_script_file))
@@ -221,27 +369,34 @@ def save_script_file_for_state_and_source_path(state, state_path_full, as_copy=F
         if not source_script_file == destination_script_file and not as_copy:
             state.script.filename = SCRIPT_FILE
             state.script.path = state_path_full
+        return int(written)
+    return 0
 
 
-def save_semantic_data_for_state(state, state_path_full):
+def save_semantic_data_for_state(state, state_path_full, saved_files=None):
     """Saves the semantic data in a separate json file.
 
     :param state: The state of which the script file should be saved
     :param str state_path_full: The path to the file system storage location of the state
+    :param SavedFiles saved_files: the optional records of the state machine folder
+    :return: the number of files written
+    :rtype: int
     """
 
     destination_script_file = os.path.join(state_path_full, SEMANTIC_DATA_FILE)
 
     if state.semantic_data:
         try:
-            storage_utils.write_dict_to_json(state.semantic_data, destination_script_file)
+            return int(write_file_if_changed(destination_script_file,
+                                             storage_utils.dump_dict_to_json_string(state.semantic_data), saved_files))
         except IOError:
             logger.exception("Storing of semantic data for state {0} failed! Destination path: {1}".
                              format(state.get_path(), destination_script_file))
             raise
+    return 0
 
 
-def save_state_recursively(state, base_path, parent_path, as_copy=False):
+def save_state_recursively(state, base_path, parent_path, as_copy=False, saved_files=None):
     """Recursively saves a state to a json file
 
     It calls this method on all its substates.
@@ -250,7 +405,9 @@ def save_state_recursively(state, base_path, parent_path, as_copy=False):
     :param base_path: Path to the state machine
     :param parent_path: Path to the parent state
     :param bool as_copy: Temporary storage flag to signal that the given path is not the new file_system_path
-    :return:
+    :param SavedFiles saved_files: the optional records of the state machine folder, see :func:`get_saved_files`
+    :return: the number of files written, as files whose content did not change are not written again
+    :rtype: int
     """
     from rafcon.core.states.execution_state import ExecutionState
     from rafcon.core.states.container_state import ContainerState
@@ -260,48 +417,184 @@ def save_state_recursively(state, base_path, parent_path, as_copy=False):
     if not os.path.exists(state_path_full):
         os.makedirs(state_path_full)
 
-    storage_utils.write_dict_to_json(state, os.path.join(state_path_full, FILE_NAME_CORE_DATA))
+    number_of_written_files = int(write_file_if_changed(os.path.join(state_path_full, FILE_NAME_CORE_DATA),
+                                                        storage_utils.dump_dict_to_json_string(state), saved_files))
     if not as_copy:
         state.file_system_path = state_path_full
 
     if isinstance(state, ExecutionState):
-        save_script_file_for_state_and_source_path(state, state_path_full, as_copy)
+        number_of_written_files += save_script_file_for_state_and_source_path(state, state_path_full, as_copy,
+                                                                              saved_files)
 
-    save_semantic_data_for_state(state, state_path_full)
+    number_of_written_files += save_semantic_data_for_state(state, state_path_full, saved_files)
 
     # create yaml files for all children
     if isinstance(state, ContainerState):
-        remove_obsolete_folders(state.states.values(), os.path.join(base_path, state_path))
+        remove_obsolete_folders(state.states.values(), os.path.join(base_path, state_path), saved_files)
         for state in state.states.values():
-            save_state_recursively(state, base_path, state_path, as_copy)
+            number_of_written_files += save_state_recursively(state, base_path, state_path, as_copy, saved_files)
+    return number_of_written_files
+
+
+class StateMachineSnapshot(object):
+    """The serialized files of a state machine, as they are saved by :func:`save_state_machine_to_path`
+
+    A snapshot is created quickly in memory by :func:`create_state_machine_snapshot` and does not reference the state
+    machine. Thus, it can be written by :func:`write_state_machine_snapshot` without holding any lock, e.g. in a
+    background thread.
+
+    :ivar dict files: the content of the files by their path relative to the state machine folder
+    :ivar dict folders: the storage ids of the child states by the path of the folder relative to the state machine
+        folder
+    """
+
+    __slots__ = ('files', 'folders')
+
+    def __init__(self):
+        self.files = {}
+        self.folders = {}
+
+    def add_file(self, relative_path, content):
+        self.files[relative_path] = content
+
+
+def add_state_to_snapshot(snapshot, state, parent_path):
+    """Recursively adds the files of a state and its children to a :class:`StateMachineSnapshot`
+
+    :param StateMachineSnapshot snapshot: the snapshot the files are added to
+    :param state: the state to be serialized
+    :param str parent_path: the path of the parent state relative to the state machine folder
+    """
+    from rafcon.core.states.execution_state import ExecutionState
+    from rafcon.core.states.container_state import ContainerState
+
+    state_path = os.path.join(parent_path, get_storage_id_for_state(state))
+    snapshot.add_file(os.path.join(state_path, FILE_NAME_CORE_DATA), storage_utils.dump_dict_to_json_string(state))
+    if isinstance(state, ExecutionState):
+        snapshot.add_file(os.path.join(state_path, SCRIPT_FILE), state.script_text)
+    if state.semantic_data:
+        snapshot.add_file(os.path.join(state_path, SEMANTIC_DATA_FILE),
+                          storage_utils.dump_dict_to_json_string(state.semantic_data))
+    if isinstance(state, ContainerState):
+        snapshot.folders[state_path] = set(get_storage_id_for_state(child_state)
+                                           for child_state in state.states.values())
+        for child_state in state.states.values():
+            add_state_to_snapshot(snapshot, child_state, state_path)
+
+
+def create_state_machine_snapshot(state_machine):
+    """Serializes a state machine into a :class:`StateMachineSnapshot`
+
+    The state machine is not modified, the snapshot corresponds to a storage with `as_copy=True`.
+
+    :param rafcon.core.state_machine.StateMachine state_machine: the state machine to be serialized
+    :return: the snapshot of the state machine
+    :rtype: StateMachineSnapshot
+    """
+    snapshot = StateMachineSnapshot()
+    with state_machine.modification_lock():
+        state_machine_dict = state_machine.to_dict()
+        state_machine_dict['last_update'] = storage_utils.get_current_time_string()
+        snapshot.add_file(STATEMACHINE_FILE, storage_utils.dump_dict_to_json_string(state_machine_dict))
+        snapshot.folders[""] = {get_storage_id_for_state(state_machine.root_state)}
+        add_state_to_snapshot(snapshot, state_machine.root_state, "")
+    return snapshot
+
+
+def write_state_machine_snapshot(snapshot, base_path, delete_old_state_machine=False):
+    """Writes a :class:`StateMachineSnapshot` into a state machine folder
+
+    Only files whose content changed are written. State folders and files that were written into the folder before
+    but are not part of the snapshot are removed.
+
+    :param StateMachineSnapshot snapshot: the snapshot to be written
+    :param str base_path: the path of the state machine folder
+    :param bool delete_old_state_machine: Whether to delete any state machine existing at the given path
+    :return: the number of written files and the number of written bytes
+    :rtype: tuple(int, int)
+    """
+    if delete_old_state_machine:
+        forget_saved_files(base_path)
+        if os.path.isdir(base_path):
+            shutil.rmtree(base_path)
+    saved_files = get_saved_files(base_path)
+
+    # remove the folders of removed states first, the files in these folders need not to be written
+    for folder_path in sorted(snapshot.folders):
+        full_folder_path = os.path.join(base_path, folder_path)
+        if os.path.isdir(full_folder_path):
+            remove_obsolete_state_folders(snapshot.folders[folder_path], full_folder_path, saved_files)
+
+    number_of_written_files = number_of_written_bytes = 0
+    for file_path, content in snapshot.files.items():
+        full_file_path = os.path.join(base_path, file_path)
+        folder_path = os.path.dirname(full_file_path)
+        if not os.path.isdir(folder_path):
+            os.makedirs(folder_path)
+        if write_file_if_changed(full_file_path, content, saved_files):
+            number_of_written_files += 1
+            number_of_written_bytes += len(content if isinstance(content, bytes) else content.encode('utf-8'))
+
+    # remove files of previous snapshots, e.g. the semantic data file of a state without semantic data
+    written_file_paths = set(os.path.join(base_path, file_path) for file_path in snapshot.files)
+    for recorded_path in list(saved_files.files.keys()):
+        if recorded_path not in written_file_paths:
+            del saved_files.files[recorded_path]
+            if os.path.isfile(recorded_path):
+                os.remove(recorded_path)
+    return number_of_written_files, number_of_written_bytes
 
 
 @measure_time
-def load_state_machine_from_path(base_path, state_machine_id=None):
+def load_state_machine_from_path(base_path, state_machine_id=None, load_timings=None, load_progress=None):
     """Loads a state machine from the given path
 
+    If the config value LOAD_SM_PREFETCH_THREADS is larger than 0, all directories and files of the state machine are
+    read in parallel by that many threads, before the states are created. The `base_path` can also be the path of a
+    packed state machine file, see :mod:`rafcon.core.storage.packed_state_machine`.
+
     :param base_path: An optional base path for the state machine.
+    :param dict load_timings: An optional dictionary, which is filled with the durations in seconds of the load phases
+        ('prefetch', 'states', 'statistics' and 'total')
+    :param rafcon.core.storage.load_progress.LoadProgress load_progress: An optional progress, which counts the loaded
+        states and libraries and allows to cancel the loading from another thread. If no `load_timings` are given, the
+        durations are stored in its timings.
     :return: a tuple of the loaded container state, the version of the state and the creation time
     :raises ValueError: if the provided path does not contain a valid state machine
+    :raises rafcon.core.custom_exceptions.LoadingCancelledException: if the loading was cancelled
     """
     logger.debug("Loading state machine from path {0}...".format(base_path))
+    if load_timings is None:
+        load_timings = {} if load_progress is None else load_progress.timings
+    start_time = timer()
+    if load_progress is not None:
+        load_progress.start_phase('prefetch')
+
+    packed_file = None
+    if packed_state_machine.is_packed_state_machine(base_path):
+        packed_file = packed_state_machine.PackedStateMachine(base_path)
+        state_machine_json = packed_file.read_file(base_path, STATEMACHINE_FILE)
+        if state_machine_json is None:
+            packed_file.close()
+            raise ValueError("Provided path doesn't contain a valid state machine: {0}".format(base_path))
+        state_machine_dict = storage_utils.load_objects_from_json_string(state_machine_json)
+    else:
+        state_machine_file_path = os.path.join(base_path, STATEMACHINE_FILE)
+        state_machine_file_path_old = os.path.join(base_path, STATEMACHINE_FILE_OLD)
 
-    state_machine_file_path = os.path.join(base_path, STATEMACHINE_FILE)
-    state_machine_file_path_old = os.path.join(base_path, STATEMACHINE_FILE_OLD)
+        # was the root state specified as state machine base_path to load from?
+        if not os.path.exists(state_machine_file_path) and not os.path.exists(state_machine_file_path_old):
 
-    # was the root state specified as state machine base_path to load from?
-    if not os.path.exists(state_machine_file_path) and not os.path.exists(state_machine_file_path_old):
+            # catch the case that a state machine root file is handed
+            if os.path.exists(base_path) and os.path.isfile(base_path):
+                base_path = os.path.dirname(base_path)
+                state_machine_file_path = os.path.join(base_path, STATEMACHINE_FILE)
+                state_machine_file_path_old = os.path.join(base_path, STATEMACHINE_FILE_OLD)
 
-        # catch the case that a state machine root file is handed
-        if os.path.exists(base_path) and os.path.isfile(base_path):
-            base_path = os.path.dirname(base_path)
-            state_machine_file_path = os.path.join(base_path, STATEMACHINE_FILE)
-            state_machine_file_path_old = os.path.join(base_path, STATEMACHINE_FILE_OLD)
+            if not os.path.exists(state_machine_file_path) and not os.path.exists(state_machine_file_path_old):
+                raise ValueError("Provided path doesn't contain a valid state machine: {0}".format(base_path))
 
-        if not os.path.exists(state_machine_file_path) and not os.path.exists(state_machine_file_path_old):
-            raise ValueError("Provided path doesn't contain a valid state machine: {0}".format(base_path))
-
-    state_machine_dict = storage_utils.load_objects_from_json(state_machine_file_path)
+        state_machine_dict = storage_utils.load_objects_from_json(state_machine_file_path)
     if 'used_rafcon_version' in state_machine_dict:
         previously_used_rafcon_version = StrictVersion(state_machine_dict['used_rafcon_version']).version
         active_rafcon_version = StrictVersion(rafcon.__version__).version
@@ -347,9 +640,29 @@ def load_state_machine_from_path(base_path, state_machine_id=None):
 
     root_state_path = os.path.join(base_path, root_state_storage_id)
     state_machine.file_system_path = base_path
+
+    phase_start_time = timer()
+    file_prefetcher = packed_file
+    number_of_prefetch_threads = global_config.get_config_value("LOAD_SM_PREFETCH_THREADS", 0)
+    if packed_file is None and number_of_prefetch_threads > 0 and os.path.isdir(root_state_path):
+        from rafcon.core.storage.file_prefetcher import StateMachineFilePrefetcher
+        file_prefetcher = StateMachineFilePrefetcher(root_state_path, [FILE_NAME_CORE_DATA, FILE_NAME_CORE_DATA_OLD,
+                                                                       SCRIPT_FILE, SEMANTIC_DATA_FILE],
+                                                     number_of_prefetch_threads)
+    load_timings['prefetch'] = timer() - phase_start_time
+
+    phase_start_time = timer()
     dirty_states = []
-    state_machine.root_state = load_state_recursively(parent=state_machine, state_path=root_state_path,
-                                                      dirty_states=dirty_states)
+    try:
+        if load_progress is not None:
+            load_progress.start_phase('states')
+        state_machine.root_state = load_state_recursively(parent=state_machine, state_path=root_state_path,
+                                                          dirty_states=dirty_states, file_prefetcher=file_prefetcher,
+                                                          load_progress=load_progress)
+    finally:
+        if packed_file is not None:
+            packed_file.close()
+    load_timings['states'] = timer() - phase_start_time
     if state_machine.root_state is None:
         return  # a corresponding exception has been handled with a proper error log in load_state_recursively
     if len(dirty_states) > 0:
@@ -357,12 +670,18 @@ def load_state_machine_from_path(base_path, state_machine_id=None):
     else:
         state_machine.marked_dirty = False
 
+    phase_start_time = timer()
     hierarchy_level = 0
     number_of_states, hierarchy_level = state_machine.root_state.get_states_statistics(hierarchy_level)
     logger.debug("Loaded state machine ({1}) has {0} states. (Max hierarchy level {2})".format(
         number_of_states, base_path, hierarchy_level))
     logger.debug("Loaded state machine ({1}) has {0} transitions.".format(
         state_machine.root_state.get_number_of_transitions(), base_path))
+    load_timings['statistics'] = timer() - phase_start_time
+    load_timings['total'] = timer() - start_time
+    logger.debug("Load phases of state machine ({0}): {1}".format(
+        base_path, ", ".join("{0} {1:.3f}s".format(phase, load_timings[phase])
+                             for phase in ['prefetch', 'states', 'statistics', 'total'])))
 
     return state_machine
 
@@ -370,13 +689,17 @@ def load_state_machine_from_path(base_path, state_machine_id=None):
 def load_state_from_path(state_path):
     """Loads a state from a given path
 
-    :param state_path: The path of the state on the file system.
+    :param state_path: The path of the state on the file system, which may also point into a packed state machine.
     :return: the loaded state
     """
+    packed_path = packed_state_machine.get_packed_state_machine_path(state_path)
+    if packed_path is not None:
+        with packed_state_machine.PackedStateMachine(packed_path) as packed_file:
+            return load_state_recursively(parent=None, state_path=state_path, file_prefetcher=packed_file)
     return load_state_recursively(parent=None, state_path=state_path)
 
 
-def load_state_recursively(parent, state_path=None, dirty_states=[]):
+def load_state_recursively(parent, state_path=None, dirty_states=[], file_prefetcher=None, load_progress=None):
     """Recursively loads the state
 
     It calls this method on each sub-state of a container state.
@@ -384,6 +707,10 @@ def load_state_recursively(parent, state_path=None, dirty_states=[]):
     :param parent:  the root state of the last load call to which the loaded state will be added
     :param state_path: the path on the filesystem where to find the meta file for the state
     :param dirty_states: a dict of states which changed during loading
+    :param file_prefetcher: an optional object providing the directories and files of the state machine instead of
+        the file system, i.e. a :class:`rafcon.core.storage.file_prefetcher.StateMachineFilePrefetcher` or a
+        :class:`rafcon.core.storage.packed_state_machine.PackedStateMachine`
+    :param rafcon.core.storage.load_progress.LoadProgress load_progress: an optional progress counting the loaded states
     :return:
     """
     from rafcon.core.states.execution_state import ExecutionState
@@ -394,19 +721,25 @@ def load_state_recursively(parent, state_path=None, dirty_states=[]):
 
     logger.debug("Load state recursively: {0}".format(str(state_path)))
 
+    file_system = os.path if file_prefetcher is None else file_prefetcher
+
     # TODO: Should be removed with next minor release
-    if not os.path.exists(path_core_data):
+    if not file_system.exists(path_core_data):
         path_core_data = os.path.join(state_path, FILE_NAME_CORE_DATA_OLD)
 
     try:
-        state_info = load_data_file(path_core_data)
+        state_info = load_data_file(path_core_data, file_prefetcher)
     except ValueError as e:
         logger.exception("Error while loading state data: {0}".format(e))
         return
     except LibraryNotFoundException as e:
         logger.error("Library could not be loaded: {0}\n"
                      "Skipping library and continuing loading the state machine".format(e))
-        state_info = storage_utils.load_objects_from_json(path_core_data, as_dict=True)
+        if file_prefetcher is None:
+            state_info = storage_utils.load_objects_from_json(path_core_data, as_dict=True)
+        else:
+            state_info = storage_utils.load_objects_from_json_string(file_prefetcher.read_file(path_core_data),
+                                                                     as_dict=True)
         state_id = state_info["state_id"]
         dummy_state = HierarchyState(LIBRARY_NOT_FOUND_DUMMY_STATE_NAME, state_id=state_id)
         # set parent of dummy state
@@ -432,14 +765,20 @@ def load_state_recursively(parent, state_path=None, dirty_states=[]):
     else:
         state.parent = parent
 
+    if load_progress is not None:
+        load_progress.state_loaded(state)
+
     # read script file if state is an ExecutionState
     if isinstance(state, ExecutionState):
-        script_text = read_file(state_path, state.script.filename)
+        if file_prefetcher is None:
+            script_text = read_file(state_path, state.script.filename)
+        else:
+            script_text = file_prefetcher.read_file(state_path, state.script.filename)
         state.script.set_script_without_compilation(script_text)
 
     # load semantic data
     try:
-        semantic_data = load_data_file(os.path.join(state_path, SEMANTIC_DATA_FILE))
+        semantic_data = load_data_file(os.path.join(state_path, SEMANTIC_DATA_FILE), file_prefetcher)
         state.semantic_data = semantic_data
     except Exception as e:
         # semantic data file does not have to be there
@@ -448,14 +787,15 @@ def load_state_recursively(parent, state_path=None, dirty_states=[]):
     one_of_my_child_states_not_found = False
 
     # load child states
-    for p in os.listdir(state_path):
+    for p in (os.listdir(state_path) if file_prefetcher is None else file_prefetcher.listdir(state_path)):
         child_state_path = os.path.join(state_path, p)
-        if os.path.isdir(child_state_path):
-            if not os.path.exists(os.path.join(child_state_path, FILE_NAME_CORE_DATA)):
+        if file_system.isdir(child_state_path):
+            if not file_system.exists(os.path.join(child_state_path, FILE_NAME_CORE_DATA)):
                 # this means that child_state_path is a folder, not containing a valid state
                 # this also happens when pip creates __pycache__ folders for the script.py files upon installing rafcon
                 continue
-            child_state = load_state_recursively(state, child_state_path, dirty_states)
+            child_state = load_state_recursively(state, child_state_path, dirty_states, file_prefetcher,
+                                                 load_progress)
             if not child_state:
                 return None
             if child_state.name is LIBRARY_NOT_FOUND_DUMMY_STATE_NAME:
@@ -485,15 +825,27 @@ def load_state_recursively(parent, state_path=None, dirty_states=[]):
     return state
 
 
-def load_data_file(path_of_file):
+def load_data_file(path_of_file, file_prefetcher=None):
     """ Loads the content of a file by using json.load.
 
+    The path may also point into a packed state machine.
+
     :param path_of_file: the path of the file to load
+    :param file_prefetcher: an optional prefetcher holding the content of the file
     :return: the file content as a string
     :raises exceptions.ValueError: if the file was not found
     """
-    if os.path.exists(path_of_file):
+    if file_prefetcher is not None:
+        file_content = file_prefetcher.read_file(path_of_file)
+        if file_content is not None:
+            return storage_utils.load_objects_from_json_string(file_content)
+    elif os.path.exists(path_of_file):
         return storage_utils.load_objects_from_json(path_of_file)
+    else:
+        packed_path = packed_state_machine.get_packed_state_machine_path(path_of_file)
+        if packed_path is not None:
+            with packed_state_machine.PackedStateMachine(packed_path) as packed_file:
+                return load_data_file(path_of_file, packed_file)
     raise ValueError("Data file not found: {0}".format(path_of_file))
 
 
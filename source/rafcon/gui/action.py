@@ -91,6 +91,8 @@ def create_state_image(state_m):
 
     child_state_images = {}
     if isinstance(state, ContainerState):
+        # the image covers the meta data of all child elements, thus their models have to exist
+        state_m.load_child_models()
         for child_state_id, child_state_m in state_m.states.items():
             child_state_images[child_state_id] = create_state_image(child_state_m)
 
@@ -104,6 +106,35 @@ def create_state_image(state_m):
     return stage_image
 
 
+def create_shallow_state_image(state_m, children=None):
+    """ Generates a state image that only holds the meta data of a state, its elements and its direct child states
+
+    Actions adding or removing a single element store the element itself and such an image instead of a full state
+    image, so that their costs scale with the size of the change and not with the size of the state.
+
+    :param rafcon.gui.models.abstract_state.AbstractStateModel state_m: The model of the state that should be stored
+    :param dict children: full images of child states, e.g. of an added or removed state
+    :return: state image with meta data, state path and the given child images
+    :rtype: StateImage
+    """
+    if isinstance(state_m, ContainerStateModel):
+        state_m.load_child_models()
+    return StateImage(meta_data=get_state_element_meta(state_m, level=1), state_path=state_m.state.get_path(),
+                      children={} if children is None else children)
+
+
+def copy_state_element(state_element):
+    """ Copies a state element without its parent, the default value of a data port is deep copied
+
+    :param rafcon.core.state_elements.state_element.StateElement state_element: the element to be copied
+    :return: the copy of the element
+    """
+    state_element_copy = copy.copy(state_element)
+    if isinstance(state_element, DataPort):
+        state_element_copy._default_value = copy.deepcopy(state_element.default_value)
+    return state_element_copy
+
+
 def create_state_from_image(state_image):
     # Transitions and data flows are not added, as also states are not added
     # We have to wait until the child states are loaded, before adding transitions and data flows, as otherwise the
@@ -176,6 +207,10 @@ def meta_dump_or_deepcopy(meta):
 
 
 def get_state_element_meta(state_model, with_parent_linkage=True, with_verbose=False, level=None):
+    """Collects the meta data of a state, its elements and its child states
+
+    :param level: number of child state levels to collect, None for all levels
+    """
     meta_dict = {'state': copy.deepcopy(state_model.meta), 'is_start': False, 'data_flows': {}, 'transitions': {},
                  'outcomes': {}, 'input_data_ports': {}, 'output_data_ports': {}, 'scoped_variables': {}, 'states': {},
                  'related_parent_transitions': {}, 'related_parent_data_flows': {}}
@@ -216,11 +251,15 @@ def get_state_element_meta(state_model, with_parent_linkage=True, with_verbose=F
 
     meta_dict['state'] = meta_dump_or_deepcopy(state_model.meta)
     if isinstance(state_model, ContainerStateModel):
-        for child_state_id, child_state_m in state_model.states.items():
-            meta_dict['states'][child_state_m.state.state_id] = get_state_element_meta(child_state_m, with_parent_linkage)
-            if with_verbose:
-                logger.verbose("FINISHED STORE META for STATE: id {0} other ids {1} parent state-id {2}"
-                               "".format(child_state_id, meta_dict['states'].keys(), state_model.state.state_id))
+        if level is None or level > 0:
+            child_level = None if level is None else level - 1
+            for child_state_id, child_state_m in state_model.states.items():
+                meta_dict['states'][child_state_m.state.state_id] = get_state_element_meta(child_state_m,
+                                                                                           with_parent_linkage,
+                                                                                           level=child_level)
+                if with_verbose:
+                    logger.verbose("FINISHED STORE META for STATE: id {0} other ids {1} parent state-id {2}"
+                                   "".format(child_state_id, meta_dict['states'].keys(), state_model.state.state_id))
         for elem in state_model.transitions:
             meta_dict['transitions'][elem.transition.transition_id] = meta_dump_or_deepcopy(elem.meta)
             if with_verbose:
@@ -268,6 +307,11 @@ def insert_state_meta_data(meta_dict, state_model, with_verbose=False, level=Non
                                                               meta_dict[dict_key],
                                                               dict_key[:-1].replace('_', '-')))
 
+    if isinstance(state_model, ContainerStateModel) and (level is None or level > 0) and \
+            any(meta_dict.get(key) for key in ['states', 'transitions', 'data_flows']):
+        # the meta data of child elements is inserted into their models, which are created on demand
+        state_model.load_child_models()
+
     state_model.meta = meta_dump_or_deepcopy(meta_dict['state'])
     if with_verbose:
         logger.verbose("INSERT META for STATE: {0} {1}".format(state_model.state.state_id, state_model.state.name))
@@ -297,21 +341,21 @@ def insert_state_meta_data(meta_dict, state_model, with_verbose=False, level=Non
                                       [op_m.data_port.data_port_id for op_m in state_model.output_data_ports])
 
     if isinstance(state_model, ContainerStateModel):
-        for state_id, state_m in state_model.states.items():
-            # TODO check if decider miss the meta or it has to be like that UNDO, REDO?
-            if state_m.state.state_id in meta_dict['states']:
-                if level is None:
-                    insert_state_meta_data(meta_dict['states'][state_m.state.state_id], state_m, with_verbose)
-                elif level > 0:
-                    insert_state_meta_data(meta_dict['states'][state_m.state.state_id], state_m, with_verbose, level - 1)
+        # the meta data of child states is not inserted (and possibly not stored) below the given level
+        if level is None or level > 0:
+            for state_id, state_m in state_model.states.items():
+                # TODO check if decider miss the meta or it has to be like that UNDO, REDO?
+                if state_m.state.state_id in meta_dict['states']:
+                    if level is None:
+                        insert_state_meta_data(meta_dict['states'][state_m.state.state_id], state_m, with_verbose)
+                    else:
+                        insert_state_meta_data(meta_dict['states'][state_m.state.state_id], state_m, with_verbose, level - 1)
                 else:
-                    pass
-            else:
-                if not UNIQUE_DECIDER_STATE_ID == state_m.state.state_id:
-                    logger.warning("no meta data for STATE: '{0}' in storage".format(state_m.state.state_id))
+                    if not UNIQUE_DECIDER_STATE_ID == state_m.state.state_id:
+                        logger.warning("no meta data for STATE: '{0}' in storage".format(state_m.state.state_id))
 
-            if with_verbose:
-                logger.verbose("FINISHED META for STATE: ", state_m.state.state_id)
+                if with_verbose:
+                    logger.verbose("FINISHED META for STATE: ", state_m.state.state_id)
         for elem in state_model.transitions:
             if elem.transition.transition_id in meta_dict['transitions']:
                 elem.meta = meta_dump_or_deepcopy(meta_dict['transitions'][elem.transition.transition_id])
@@ -806,6 +850,9 @@ class StateMachineAction(Action, ModelMT):
 class AddObjectAction(Action):
     """ The class handles all adding object action of 7 valid kinds
     (of In-OutputDataPort, ScopedVariable, DataFlow, Outcome, Transition and State)
+
+    Instead of full state images, the action stores a copy of the added element (or an image of the added state) and
+    the meta data of the parent state down to its direct child states.
     """
     possible_method_names = ['add_state', 'add_outcome', 'add_input_data_port', 'add_output_data_port',
                              'add_transition', 'add_data_flow', 'add_scoped_variable']
@@ -818,87 +865,86 @@ class AddObjectAction(Action):
         self.parent_identifier = ''
         self.added_object_identifier = ''
         self.added_object_args = ''
+        self.added_object = None
 
         self.parent_identifier = self.parent_path
 
+    def get_state_image(self):
+        parent_state_m = self.state_machine_model.get_state_model_by_path(self.parent_path)
+        children = {}
+        if self.action_type == 'add_state' and self.added_object_identifier and \
+                self.added_object_identifier._id in parent_state_m.states:
+            added_state_id = self.added_object_identifier._id
+            children[added_state_id] = create_state_image(parent_state_m.states[added_state_id])
+        return create_shallow_state_image(parent_state_m, children)
+
     def set_after(self, overview):
-        Action.set_after(self, overview)
         # get new object from respective list and create identifier
         list_name = overview.get_cause().replace('add_', '') + 's'
         new_object = getattr(overview.get_method_args()[0], list_name)[overview.get_result()]
         self.added_object_identifier = CoreObjectIdentifier(new_object)
+        if not isinstance(new_object, State):
+            self.added_object = copy_state_element(new_object)
+        Action.set_after(self, overview)
+
+    def get_added_object(self):
+        if self.action_type == 'add_state':
+            return create_state_from_image(self.after_state_image.children[self.added_object_identifier._id])
+        return self.added_object
+
+    def get_state_of_added_object(self):
+        if self.action_type == 'add_state':
+            return self.get_state_changed()
+        return self.state_machine.get_state_by_path(self.added_object_identifier._path)
 
     def redo(self):
         """
-        :return: Redo of adding object action is simply done by adding the object again from the after_state_image of the
-                 parent state.
+        :return: Redo of adding object action is simply done by adding the stored object again.
         """
         state = self.get_state_changed()
-        state_image = self.after_state_image
-
-        assert state.get_path() == state_image.state_path
         path_of_state = state.get_path()
-        state_image_of_state = create_state_from_image(state_image)
+        assert path_of_state == self.after_state_image.state_path
 
         previous_model = self.state_machine_model.get_state_model_by_path(path_of_state)
         self.emit_undo_redo_signal(action_parent_m=previous_model, affected_models=[previous_model, ], after=False)
 
-        if self.added_object_identifier._type in ['InputDataPort', 'OutputDataPort', 'Outcome']:
-            [state, state_image_of_state] = self.correct_reference_state(state,
-                                                                             state_image_of_state,
-                                                                             storage_path=state_image.state_path)
-        list_name = self.action_type.replace('add_', '') + 's'
-        core_obj = getattr(state_image_of_state, list_name)[self.added_object_identifier._id]
-        self.add_core_object_to_state(state, core_obj)
+        self.add_core_object_to_state(self.get_state_of_added_object(), self.get_added_object())
 
         actual_state_model = self.state_machine_model.get_state_model_by_path(path_of_state)
         self.compare_models(previous_model, actual_state_model)
-        insert_state_meta_data(meta_dict=state_image.meta_data,
-                               state_model=actual_state_model, level=None if self.action_type == 'add_state' else 1)
+        insert_state_meta_data(meta_dict=self.after_state_image.meta_data, state_model=actual_state_model, level=1)
+        if self.action_type == 'add_state':
+            added_state_id = self.added_object_identifier._id
+            insert_state_meta_data(meta_dict=self.after_state_image.children[added_state_id].meta_data,
+                                   state_model=actual_state_model.states[added_state_id])
         self.emit_undo_redo_signal(action_parent_m=previous_model, affected_models=[previous_model, ], after=True)
 
     def undo(self):
-
-        # find object
         state = self.get_state_changed()
-        state_image = self.after_state_image
-
-        assert state.get_path() == state_image.state_path
         path_of_state = state.get_path()
-        state_image_of_state = create_state_from_image(state_image)
+        assert path_of_state == self.after_state_image.state_path
 
         previous_model = self.state_machine_model.get_state_model_by_path(path_of_state)
         self.emit_undo_redo_signal(action_parent_m=previous_model, affected_models=[previous_model, ], after=False)
 
-        if self.added_object_identifier._type in ['InputDataPort', 'OutputDataPort', 'Outcome']:
-            [state, state_image_of_state] = self.correct_reference_state(state,
-                                                                             state_image_of_state,
-                                                                             storage_path=state_image.state_path)
-
-        list_name = self.action_type.replace('add_', '') + 's'
-        core_obj = getattr(state_image_of_state, list_name)[self.added_object_identifier._id]
-        # undo
-        self.remove_core_object_from_state(state, core_obj)
+        state_of_added_object = self.get_state_of_added_object()
+        if self.action_type == 'add_state':
+            state_of_added_object.remove_state(self.added_object_identifier._id, force=True)
+        else:
+            self.remove_core_object_from_state(state_of_added_object, self.added_object)
 
         actual_state_model = self.state_machine_model.get_state_model_by_path(path_of_state)
         self.compare_models(previous_model, actual_state_model)
-        insert_state_meta_data(meta_dict=state_image.meta_data,
-                               state_model=actual_state_model, level=1)
+        insert_state_meta_data(meta_dict=self.before_state_image.meta_data, state_model=actual_state_model, level=1)
         self.emit_undo_redo_signal(action_parent_m=previous_model, affected_models=[previous_model, ], after=True)
 
-    def correct_reference_state(self, state, state_image_of_state, storage_path):
-
-        partial_path = self.added_object_identifier._path.split('/')
-        for path_element in storage_path.split('/'):
-            partial_path.pop(0)
-        for path_element in partial_path:
-            state_image_of_state = state_image_of_state.states[path_element]
-            state = state.states[path_element]
-
-        return state, state_image_of_state
-
 
 class RemoveObjectAction(Action):
+    """ The class handles all removing object actions
+
+    Instead of full state images, the action stores a copy of the removed element (or an image of the removed state),
+    the connections of the affected state and the meta data of the parent state down to its direct child states.
+    """
     possible_method_names = ['remove_state', 'remove_outcome', 'remove_input_data_port', 'remove_output_data_port',
                              'remove_transition', 'remove_data_flow', 'remove_scoped_variable']
 
@@ -914,12 +960,16 @@ class RemoveObjectAction(Action):
         self.parent_identifier = ''
         self.removed_object_identifier = ''
         self.removed_object_args = ''
+        self.removed_object = None
 
         if "outcome" in overview.get_cause() or "data_port" in overview.get_cause():
             pass
         else:
             self.parent_identifier = self.parent_path
         self.get_object_identifier()
+        # the image of a removed state can only be created, once the removed state is identified
+        if self.action_type == 'remove_state':
+            self.before_state_image = self.get_state_image()
         self.before_linkage = {'internal': {'transitions': [], 'data_flows': []},
                                'external': {'transitions': [], 'data_flows': []}}
         self.after_linkage = {'internal': {'transitions': [], 'data_flows': []},
@@ -938,6 +988,15 @@ class RemoveObjectAction(Action):
                   "added_linkage": self.added_linkage})
         return d
 
+    def get_state_image(self):
+        parent_state_m = self.state_machine_model.get_state_model_by_path(self.parent_path)
+        children = {}
+        if self.action_type == 'remove_state' and self.removed_object_identifier and \
+                self.removed_object_identifier._id in parent_state_m.states:
+            removed_state_id = self.removed_object_identifier._id
+            children[removed_state_id] = create_state_image(parent_state_m.states[removed_state_id])
+        return create_shallow_state_image(parent_state_m, children)
+
     def set_after(self, overview):
         Action.set_after(self, overview)
         self.store_related_elements(self.after_linkage)
@@ -957,34 +1016,33 @@ class RemoveObjectAction(Action):
                 object_id = overview.get_method_args()[1]
         new_object = getattr(overview.get_method_args()[0], list_name)[object_id]
         self.removed_object_identifier = CoreObjectIdentifier(new_object)
+        if not isinstance(new_object, State):
+            self.removed_object = copy_state_element(new_object)
 
     def undo(self):
         state = self.get_state_changed()
-        state_image = self.before_state_image
-
-        assert state.get_path() == state_image.state_path
         path_of_state = state.get_path()
-        state_image_of_state = create_state_from_image(state_image)
+        assert path_of_state == self.before_state_image.state_path
 
         previous_model = self.state_machine_model.get_state_model_by_path(path_of_state)
         self.emit_undo_redo_signal(action_parent_m=previous_model, affected_models=[previous_model, ], after=False)
 
-        if self.removed_object_identifier._type in ['InputDataPort', 'OutputDataPort', 'Outcome']:
-            [state, state_image_of_state] = self.correct_reference_state(state,
-                                                                             state_image_of_state,
-                                                                             storage_path=state_image.state_path)
-        list_name = self.action_type.replace('remove_', '') + 's'
-        core_obj = getattr(state_image_of_state, list_name)[self.removed_object_identifier._id]
-
-        if self.action_type not in ['remove_transition', 'remove_data_flow']:
-            self.add_core_object_to_state(state, core_obj)
+        removed_state_id = self.removed_object_identifier._id
+        if self.action_type == 'remove_state':
+            state.add_state(create_state_from_image(self.before_state_image.children[removed_state_id]))
+        elif self.action_type not in ['remove_transition', 'remove_data_flow']:
+            # transitions and data flows are restored with the linkage
+            state_of_removed_object = self.state_machine.get_state_by_path(self.removed_object_identifier._path)
+            self.add_core_object_to_state(state_of_removed_object, self.removed_object)
 
         self.adjust_linkage()
 
         actual_state_model = self.state_machine_model.get_state_model_by_path(path_of_state)
         self.compare_models(previous_model, actual_state_model)
-        insert_state_meta_data(meta_dict=state_image.meta_data,
-                               state_model=actual_state_model, level=None if self.action_type == 'remove_state' else 1)
+        insert_state_meta_data(meta_dict=self.before_state_image.meta_data, state_model=actual_state_model, level=1)
+        if self.action_type == 'remove_state':
+            insert_state_meta_data(meta_dict=self.before_state_image.children[removed_state_id].meta_data,
+                                   state_model=actual_state_model.states[removed_state_id])
 
         self.emit_undo_redo_signal(action_parent_m=previous_model, affected_models=[previous_model, ], after=True)
 
@@ -1018,18 +1076,6 @@ class RemoveObjectAction(Action):
         # signal that undo/redo action was performed -> run graphical editor update
         self.emit_undo_redo_signal(action_parent_m=previous_model, affected_models=[previous_model, ], after=True)
 
-    def correct_reference_state(self, state, state_image_of_state, storage_path):
-
-        partial_path = self.removed_object_identifier._path.split('/')
-        for path_element in storage_path.split('/'):
-            logger.debug("pop: " + partial_path.pop(0))
-        for path_element in partial_path:
-            state_image_of_state = state_image_of_state.states[path_element]
-            state = state.states[path_element]
-            logger.debug("state is now: {0} {1}".format(state.state_id, state_image_of_state.state_id))
-
-        return state, state_image_of_state
-
     def store_related_elements(self, linkage_dict):
 
         state = self.state_machine.get_state_by_path(self.instance_path)
@@ -1355,6 +1401,13 @@ class StateAction(Action):
         d.update({"before_arguments": self.before_arguments, "after_arguments": self.after_arguments})
         return d
 
+    def get_state_image(self):
+        # property changes are undone and redone with the stored arguments, thus no state image is required
+        cause = self.before_overview.get_cause()
+        if cause in self.possible_args or 'semantic_data' in cause:
+            return None
+        return Action.get_state_image(self)
+
     @staticmethod
     def get_set_of_arguments(s):
         if isinstance(s, ContainerState):
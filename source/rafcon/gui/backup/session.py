@@ -36,6 +36,7 @@ def store_session():
         if sm_m.auto_backup:
             if sm_m.state_machine.marked_dirty:
                 sm_m.auto_backup.perform_temp_storage()
+                sm_m.auto_backup.join_snapshot_writer()
         else:
             # generate a backup
             sm_m.auto_backup = AutoBackupModel(sm_m)
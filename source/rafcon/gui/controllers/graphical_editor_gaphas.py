@@ -263,6 +263,9 @@ class GraphicalEditorController(ExtendedController):
         :param view:
         :param StateView | ConnectionView | PortView focused_item: The focused item
         """
+        if isinstance(focused_item, StateView) and isinstance(focused_item.model, ContainerStateModel):
+            # show the content of the focused state
+            focused_item.model.load_child_models()
         self.view.editor.handler_block(self.drag_motion_handler_id)
         self.move_item_into_viewport(focused_item)
         self.view.editor.handler_unblock(self.drag_motion_handler_id)
@@ -344,14 +347,28 @@ class GraphicalEditorController(ExtendedController):
         model = notification.model
         view = self.canvas.get_view_for_model(model)
 
-        if meta_signal_message.change == 'show_content':
+        if meta_signal_message.change == 'show_content' and isinstance(model, ContainerStateModel):
+            # the child models of the container state were created or are about to be released
+            if view is None:
+                return
+            if model.child_models_loaded:
+                self.add_content_views_for_model(model, view, view.hierarchy_level)
+            else:
+                content_views = self.canvas.get_children(view)
+                for connection_v in [v for v in content_views if isinstance(v, (TransitionView, DataFlowView))]:
+                    connection_v.remove()
+                for child_state_v in [v for v in content_views if isinstance(v, StateView)]:
+                    child_state_v.remove()
+        elif meta_signal_message.change == 'show_content':
             library_state_m = model
             library_state_v = view
             if library_state_m.meta['gui']['show_content'] is not library_state_m.show_content():
                 logger.warning("The content of the LibraryState won't be shown, because "
                                "MAX_VISIBLE_LIBRARY_HIERARCHY is 1.")
             if library_state_m.show_content():
-                if not library_state_m.state_copy_initialized:
+                if library_state_m.lazy_state_copy_model:
+                    library_state_m.load_state_copy_model()
+                elif not library_state_m.state_copy_initialized:
                     logger.warning("Show library content without initialized state copy does not work {0}"
                                    "".format(library_state_m))
                 logger.debug("Show content of {}".format(library_state_m.state))
@@ -363,6 +380,7 @@ class GraphicalEditorController(ExtendedController):
                 state_copy_v = self.canvas.get_view_for_model(library_state_m.state_copy)
                 if state_copy_v:
                     state_copy_v.remove()
+                library_state_m.release_state_copy_model()
         else:
             if isinstance(view, StateView):
                 view.apply_meta_data(recursive=meta_signal_message.affects_children)
@@ -423,6 +441,8 @@ class GraphicalEditorController(ExtendedController):
                 if state_v:  # Children of LibraryStates are not modeled, yet
                     self.canvas.request_update(state_v, matrix=False)
             elif method_name == 'add_state':
+                if not model.child_models_loaded:  # The content of the state is not modeled, yet
+                    return
                 new_state = arguments[1]
                 new_state_m = model.states[new_state.state_id]
                 self.add_state_view_with_meta_data_for_model(new_state_m, model)
@@ -809,31 +829,44 @@ class GraphicalEditorController(ExtendedController):
             # Keep state within parent
             pass
 
-        if isinstance(state_m, LibraryStateModel) and state_m.show_content() and state_m.state_copy_initialized:
+        if isinstance(state_m, LibraryStateModel) and state_m.show_content() and \
+                (state_m.state_copy_initialized or state_m.lazy_state_copy_model):
+            state_m.load_state_copy_model()
             gui_helper_meta_data.scale_library_content(state_m)
             self.add_state_view_for_model(state_m.state_copy, state_v, hierarchy_level=hierarchy_level + 1)
 
         elif isinstance(state_m, ContainerStateModel):
-            num_child_state = 0
-
             for scoped_variable_m in state_m.scoped_variables:
                 state_v.add_scoped_variable(scoped_variable_m)
 
-            for child_state_m in state_m.states.values():
-                # generate optional meta data for child state - not used if valid meta data already in child state model
-                child_rel_pos, child_size = gui_helper_meta_data.generate_default_state_meta_data(state_m, self.canvas,
-                                                                                                  num_child_state)
-                num_child_state += 1
+            if state_m.child_models_loaded:
+                self.add_content_views_for_model(state_m, state_v, hierarchy_level)
+
+        return state_v
+
+    @lock_state_machine
+    def add_content_views_for_model(self, state_m, state_v, hierarchy_level):
+        """Creates the views of the child states, transitions and data flows of a container state
 
-                self.add_state_view_for_model(child_state_m, state_v, child_rel_pos, child_size, hierarchy_level + 1)
+        :param rafcon.gui.models.container_state.ContainerStateModel state_m: The container state
+        :param rafcon.gui.mygaphas.items.state.StateView state_v: The view of the container state
+        :param float hierarchy_level: The hierarchy level of the container state
+        """
+        num_child_state = 0
 
-            for transition_m in state_m.transitions:
-                self.add_transition_view_for_model(transition_m, state_m)
+        for child_state_m in state_m.states.values():
+            # generate optional meta data for child state - not used if valid meta data already in child state model
+            child_rel_pos, child_size = gui_helper_meta_data.generate_default_state_meta_data(state_m, self.canvas,
+                                                                                              num_child_state)
+            num_child_state += 1
 
-            for data_flow_m in state_m.data_flows:
-                self.add_data_flow_view_for_model(data_flow_m, state_m)
+            self.add_state_view_for_model(child_state_m, state_v, child_rel_pos, child_size, hierarchy_level + 1)
 
-        return state_v
+        for transition_m in state_m.transitions:
+            self.add_transition_view_for_model(transition_m, state_m)
+
+        for data_flow_m in state_m.data_flows:
+            self.add_data_flow_view_for_model(data_flow_m, state_m)
 
     @lock_state_machine
     def add_transition_view_for_model(self, transition_m, parent_state_m):
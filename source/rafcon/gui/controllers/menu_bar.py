@@ -414,6 +414,9 @@ class MenuBarController(ExtendedController):
 
     @staticmethod
     def on_open_activate(widget=None, data=None, path=None):
+        if global_gui_config.get_config_value('OPEN_STATE_MACHINES_IN_BACKGROUND', False):
+            return gui_helper_state_machine.open_state_machine_with_progress_dialog(path=path,
+                                                                                     recent_opened_notification=True)
         return gui_helper_state_machine.open_state_machine(path=path, recent_opened_notification=True)
 
     @staticmethod
@@ -84,6 +84,7 @@ class StateMachineTreeController(TreeViewController):
         """Called when the view was registered"""
         super(StateMachineTreeController, self).register_view(view)
         self.view.connect('button_press_event', self.mouse_click)
+        self.view.connect('row-collapsed', self.on_row_collapsed)
         self.view_is_registered = True
         self.update(with_expand=True)
 
@@ -283,7 +284,7 @@ class StateMachineTreeController(TreeViewController):
                                 self._selected_sm_model.state_machine.get_state_by_path(state_path, as_check=True):
                             state = self._selected_sm_model.state_machine.get_state_by_path(state_path)
                             if isinstance(state, LibraryState) or state.is_root_state_of_library or \
-                                    state.get_next_upper_library_root_state():
+                                    state.get_next_upper_library_root_state() or self._is_in_collapsed_state(state):
                                 continue
                             logger.error("State not in StateMachineTree but in StateMachine, {0}.".format(state_path))
 
@@ -291,6 +292,17 @@ class StateMachineTreeController(TreeViewController):
                 logger.error("Expansion state of state machine {0} could not be restored"
                              "".format(self.__my_selected_sm_id))
 
+    def _is_in_collapsed_state(self, state):
+        """Checks whether the state is within a container state without child models, which has no child rows"""
+        parent = state.parent
+        while isinstance(parent, State):
+            if parent.get_path() in self.state_row_iter_dict_by_state_path:
+                state_row_iter = self.state_row_iter_dict_by_state_path[parent.get_path()]
+                parent_m = self.tree_store.get_value(state_row_iter, self.MODEL_STORAGE_ID)
+                return isinstance(parent_m, ContainerStateModel) and not parent_m.child_models_loaded
+            parent = parent.parent
+        return False
+
     def update(self, changed_state_model=None, with_expand=False):
         """Checks if all states are in tree and if tree has states which were deleted
 
@@ -332,8 +344,8 @@ class StateMachineTreeController(TreeViewController):
     def get_row_iter_for_state_model(self, state_model):
         if state_model.state.get_path() not in self.state_row_iter_dict_by_state_path:
             if isinstance(state_model, LibraryStateModel) and \
-                    state_model.state_copy.state.get_path() in self.state_row_iter_dict_by_state_path:
-                return self.state_row_iter_dict_by_state_path[state_model.state_copy.state.get_path()]
+                    state_model.state.state_copy.get_path() in self.state_row_iter_dict_by_state_path:
+                return self.state_row_iter_dict_by_state_path[state_model.state.state_copy.get_path()]
             else:
                 logger.error("For state model {0} no row iter could be found to be updated.".format(state_model))
                 return
@@ -394,9 +406,11 @@ class StateMachineTreeController(TreeViewController):
         # 4.1 - in as library without show content -> nothing to do
 
         # if state model is LibraryStateModel with enabled show content state_model becomes the library root state model
-        if isinstance(state_model, LibraryStateModel) and self.show_content(state_model) and state_model.state_copy_initialized:
+        if isinstance(state_model, LibraryStateModel) and self.show_content(state_model) and \
+                (state_model.state_copy_initialized or
+                 state_model.lazy_state_copy_model and state_model.show_content()):
             _state_model = state_model
-            state_model = state_model.state_copy
+            state_model = state_model.load_state_copy_model()
         else:
             _state_model = state_model
 
@@ -451,6 +465,12 @@ class StateMachineTreeController(TreeViewController):
         # if state_model.state.get_library_root_state() is not None or isinstance(state_model, LibraryStateModel):
         for n in reversed(range(self.tree_store.iter_n_children(state_row_iter))):
             child_iter = self.tree_store.iter_nth_child(state_row_iter, n)
+            # the child models of the state were released, looking them up would create them again
+            if isinstance(state_model, ContainerStateModel) and not state_model.child_models_loaded:
+                self.remove_tree_children(child_iter)
+                del self.state_row_iter_dict_by_state_path[self.tree_store.get_value(child_iter, self.STATE_PATH_STORAGE_ID)]
+                self.tree_store.remove(child_iter)
+                continue
             child_state_path = self.tree_store.get_value(child_iter, self.STATE_PATH_STORAGE_ID)
             child_model = None
             if self._selected_sm_model.state_machine.get_state_by_path(child_state_path, as_check=True):
@@ -500,6 +520,12 @@ class StateMachineTreeController(TreeViewController):
         if event.type == Gdk.EventType._2BUTTON_PRESS:
             return self._handle_double_click(event)
 
+    def on_row_collapsed(self, tree_view, tree_iter, path):
+        """Releases the child models of a collapsed container state, if they are created on demand"""
+        state_model = self.tree_store.get_value(tree_iter, self.MODEL_STORAGE_ID)
+        if isinstance(state_model, ContainerStateModel):
+            state_model.release_child_models()
+
     def _handle_double_click(self, event):
         """ Double click with left mouse button focuses the state and toggles the collapse status"""
         if event.get_button()[1] == 1:  # Left mouse button
@@ -519,6 +545,9 @@ class StateMachineTreeController(TreeViewController):
                 else:
                     if isinstance(state_model, ContainerStateModel) or \
                                     isinstance(state_model, LibraryStateModel) and self.show_content(state_model):
+                        if isinstance(state_model, ContainerStateModel):
+                            # the rows of the child states are added when their models are created
+                            state_model.load_child_models()
                         self.view.expand_to_path(path)
 
     @TreeViewController.observe("sm_selection_changed_signal", signal=True)
@@ -98,7 +98,8 @@ def update_models_recursively(state_m, expected=True):
     assert isinstance(state_m, AbstractStateModel)
 
     if isinstance(state_m, LibraryStateModel):
-        if not state_m.state_copy_initialized:
+        # lazily created state copy models are generated when the content of the library state is shown
+        if not state_m.state_copy_initialized and not state_m.lazy_state_copy_model:
             if not expected:
                 logger.warning("State {0} generates unexpected missing state copy models.".format(state_m))
             state_m.recursive_generate_models(load_meta_data=False)
@@ -485,7 +486,7 @@ def insert_state_as(target_state_m, state, as_template):
     else:
         assert isinstance(state, LibraryState)
         old_lib_state_m = state_m
-        state_m = state_m.state_copy
+        state_m = state_m.load_state_copy_model()
 
         previous_state_size = state_m.get_meta_data_editor()['size']
         gui_helper_meta_data.put_default_meta_on_state_m(state_m, target_state_m)
@@ -622,7 +623,7 @@ def substitute_state_as(target_state_m, state, as_template, keep_name=False):
     # If inserted as template, we have to extract the state_copy and model otherwise keep original name
     if as_template:
         assert isinstance(state_m, LibraryStateModel)
-        state_m = state_m.state_copy
+        state_m = state_m.load_state_copy_model()
         state_m.state.parent = None
 
     if keep_name:
@@ -20,6 +20,8 @@ from builtins import str
 import copy
 import time
 import os
+import threading
+from gi.repository import GLib
 from gi.repository import Gtk
 
 import rafcon.gui.helpers.state as gui_helper_state
@@ -27,12 +29,14 @@ import rafcon.gui.singleton
 
 from rafcon.core import interface, id_generator
 from rafcon.core.singleton import state_machine_manager, state_machine_execution_engine, library_manager
+from rafcon.core.custom_exceptions import LoadingCancelledException
 from rafcon.core.state_machine import StateMachine
 from rafcon.core.states.container_state import ContainerState
 from rafcon.core.states.hierarchy_state import HierarchyState
 from rafcon.core.states.library_state import LibraryState
 from rafcon.core.states.state import State, StateType
 from rafcon.core.storage import storage
+from rafcon.core.storage.load_progress import LoadProgress, STATES, LIBRARIES, META_FILES
 import rafcon.core.config
 
 from rafcon.gui.helpers.text_formatting import format_default_folder_name
@@ -42,6 +46,7 @@ from rafcon.gui.runtime_config import global_runtime_config
 from rafcon.gui.controllers.state_substitute import StateSubstituteChooseLibraryDialog
 from rafcon.gui.models import AbstractStateModel, StateModel, ContainerStateModel, LibraryStateModel, TransitionModel, \
     DataFlowModel, DataPortModel, ScopedVariableModel, OutcomeModel, StateMachineModel
+from rafcon.gui.models.abstract_state import read_meta_data_files, prefetched_meta_data
 from rafcon.gui.singleton import library_manager_model
 from rafcon.gui.utils.dialog import RAFCONButtonDialog, RAFCONCheckBoxTableDialog
 from rafcon.utils.filesystem import make_tarfile, copy_file_or_folder, create_path, make_file_executable
@@ -122,6 +127,144 @@ def open_state_machine(path=None, recent_opened_notification=False):
     return state_machine
 
 
+def open_state_machine_in_background(path, recent_opened_notification=False, progress_callback=None,
+                                     finished_callback=None):
+    """ Open a state machine from respective file system path without blocking the GUI
+
+    The state machine is loaded and its meta data files are read in a background thread, which reports its progress
+    and can be cancelled. Only the models and views are created in the GTK main loop, as the models must be created
+    in the thread of their observers.
+
+    The durations of the phases are stored in the timings of the returned progress: the phases of
+    :func:`rafcon.core.storage.storage.load_state_machine_from_path`, 'meta_data' for reading the meta data files,
+    'models' for creating the models and views and 'open' for the whole opening.
+
+    :param str path: file system path to the state machine
+    :param bool recent_opened_notification: flags that indicates that this call also should update recently open
+    :param progress_callback: an optional function called in the main loop with the current phase and the numbers of
+        loaded states, resolved libraries and read meta data files
+    :param finished_callback: an optional function called in the main loop with the opened state machine or None, if
+        the opening failed or was cancelled
+    :rtype: rafcon.core.storage.load_progress.LoadProgress
+    :return: the progress of the opening, which can be cancelled while the state machine is loaded
+    """
+    start_time = time.time()
+
+    def report_progress(phase, counters):
+        if progress_callback is not None:
+            GLib.idle_add(progress_callback, phase, counters)
+
+    load_progress = LoadProgress(report_progress)
+
+    def finish(state_machine):
+        if finished_callback is not None:
+            finished_callback(state_machine)
+        return False
+
+    def add_state_machine(state_machine, meta_data_by_path):
+        if load_progress.cancelled:
+            logger.info("Opening of state machine {0} was cancelled".format(path))
+            state_machine.root_state.destroy(recursive=True)
+            return finish(None)
+        if state_machine_manager.is_state_machine_open(path):
+            logger.info("State machine already open. Select state machine instance from path {0}.".format(path))
+            state_machine.root_state.destroy(recursive=True)
+            state_machine = state_machine_manager.get_open_state_machine_of_file_system_path(path)
+            gui_helper_state.gui_singletons.state_machine_manager_model.selected_state_machine_id = \
+                state_machine.state_machine_id
+            return finish(state_machine)
+
+        load_progress.phase = 'models'
+        if progress_callback is not None:
+            progress_callback(load_progress.phase, dict(load_progress.counters))
+        phase_start_time = time.time()
+        try:
+            with prefetched_meta_data(meta_data_by_path):
+                state_machine_manager.add_state_machine(state_machine)
+        except Exception:
+            logger.exception('Error while trying to open state machine')
+            return finish(None)
+        load_progress.timings['models'] = time.time() - phase_start_time
+        if recent_opened_notification:
+            global_runtime_config.update_recently_opened_state_machines_with(state_machine)
+        load_progress.timings['open'] = time.time() - start_time
+        stat = state_machine.root_state.get_states_statistics(0)
+        logger.info("It took {0:.2}s to open {1} states with {2} hierarchy levels ({3}).".format(
+            load_progress.timings['open'], stat[0], stat[1], ", ".join(
+                "{0} {1:.3f}s".format(phase, load_progress.timings[phase])
+                for phase in ['prefetch', 'states', 'meta_data', 'models'])))
+        return finish(state_machine)
+
+    def load_state_machine():
+        try:
+            state_machine = storage.load_state_machine_from_path(path, load_progress=load_progress)
+            if not state_machine:
+                GLib.idle_add(finish, None)
+                return  # a corresponding exception has been handled with a proper error log
+            load_progress.start_phase('meta_data')
+            phase_start_time = time.time()
+            # the eager library state models need the state copies up to the visible library hierarchy
+            state_copy_hierarchy_depth = 0
+            if not global_gui_config.get_config_value("LAZY_LIBRARY_STATE_MODELS", False):
+                state_copy_hierarchy_depth = max(global_gui_config.get_config_value("MAX_VISIBLE_LIBRARY_HIERARCHY"), 2)
+            meta_data_by_path = read_meta_data_files(state_machine, load_progress, state_copy_hierarchy_depth)
+            load_progress.timings['meta_data'] = time.time() - phase_start_time
+        except LoadingCancelledException:
+            logger.info("Opening of state machine {0} was cancelled".format(path))
+            GLib.idle_add(finish, None)
+            return
+        except Exception:
+            logger.exception('Error while trying to open state machine')
+            GLib.idle_add(finish, None)
+            return
+        GLib.idle_add(add_state_machine, state_machine, meta_data_by_path)
+
+    loader_thread = threading.Thread(target=load_state_machine, name="StateMachineLoader")
+    loader_thread.daemon = True
+    loader_thread.start()
+    return load_progress
+
+
+def open_state_machine_with_progress_dialog(path=None, recent_opened_notification=False):
+    """ Open a state machine in the background, while a dialog shows the progress and allows to cancel the opening
+
+    See :func:`open_state_machine_in_background`.
+
+    :param str path: file system path to the state machine
+    :param bool recent_opened_notification: flags that indicates that this call also should update recently open
+    :rtype: rafcon.core.storage.load_progress.LoadProgress
+    :return: the progress of the opening or None, if no state machine is opened in the background
+    """
+    if path is None:
+        if interface.open_folder_func is None:
+            logger.error("No function defined for opening a folder")
+            return
+        path = interface.open_folder_func("Please choose the folder of the state machine")
+        if path is None:
+            return
+
+    if state_machine_manager.is_state_machine_open(path):
+        open_state_machine(path)
+        return
+
+    dialog = RAFCONButtonDialog("Opening state machine {0}".format(path), ["Cancel"],
+                                message_type=Gtk.MessageType.INFO, flags=Gtk.DialogFlags.DESTROY_WITH_PARENT,
+                                parent=True)
+
+    def on_progress(phase, counters):
+        dialog.format_secondary_text("{0}: {1} states, {2} libraries, {3} meta data files".format(
+            phase, counters[STATES], counters[LIBRARIES], counters[META_FILES]))
+        return False
+
+    def on_finished(state_machine):
+        dialog.destroy()
+
+    load_progress = open_state_machine_in_background(path, recent_opened_notification, on_progress, on_finished)
+    dialog.add_callback(lambda widget, response_id: load_progress.cancel())
+    dialog.show()
+    return load_progress
+
+
 def open_library_state_separately():
     state_machine_manager_model = rafcon.gui.singleton.state_machine_manager_model
     state_models = state_machine_manager_model.get_selected_state_machine_model().selection.states
@@ -12,7 +12,9 @@
 
 from builtins import str
 import os.path
+from contextlib import contextmanager
 from copy import copy, deepcopy
+from operator import attrgetter
 from weakref import ref
 from gtkmvc3.model_mt import ModelMT
 from gtkmvc3.observable import Signal
@@ -24,7 +26,7 @@ from rafcon.gui.models.meta import MetaModel
 from rafcon.core.states.container_state import ContainerState
 from rafcon.core.states.library_state import LibraryState
 from rafcon.core.states.state import State
-from rafcon.core.storage import storage
+from rafcon.core.storage import storage, packed_state_machine
 
 from rafcon.utils import storage_utils, constants
 from rafcon.utils.hashable import Hashable
@@ -34,6 +36,16 @@ from rafcon.utils import log
 
 logger = log.get_logger(__name__)
 
+get_data_port_id = attrgetter('data_port.data_port_id')
+get_outcome_id = attrgetter('outcome.outcome_id')
+
+#: Content of meta data files read in advance by :func:`read_meta_data_files`, by the path of the file
+_prefetched_meta_data = {}
+
+#: Meta data handed to the models of states on their creation, by the id of the core state, see
+#: :func:`provided_meta_data`
+_provided_meta_data = {}
+
 
 def mirror_y_axis_in_vividict_element(vividict, key):
     from rafcon.gui.helpers.meta_data import contains_geometric_info
@@ -45,6 +57,180 @@ def mirror_y_axis_in_vividict_element(vividict, key):
     return vividict
 
 
+def read_meta_data_files(state_machine, load_progress=None, state_copy_hierarchy_depth=0):
+    """Reads the meta data files of a loaded state machine without creating any model
+
+    This can be done in a background thread. The meta data files of the state machine, of all states and of the state
+    copies of library states are read. The result is used by the models created within :func:`prefetched_meta_data`.
+    The meta data of states within container states whose child models are created on demand is not read, see
+    :func:`rafcon.gui.models.container_state.lazy_child_models`.
+
+    :param rafcon.core.state_machine.StateMachine state_machine: the loaded state machine
+    :param rafcon.core.storage.load_progress.LoadProgress load_progress: an optional progress counting the read files
+    :param int state_copy_hierarchy_depth: the missing state copies of library states up to this library hierarchy
+        depth are created, of all other library states only the meta data of existing state copies is read
+    :return: the content of the meta data files by file path
+    :rtype: dict
+    """
+    from rafcon.core.storage.load_progress import META_FILES
+    from rafcon.gui.models.container_state import lazy_child_models
+    meta_data_by_path = {}
+    packed_file = None
+    # the packed file is opened only once for all meta data files
+    if state_machine.file_system_path and \
+            packed_state_machine.is_packed_state_machine(state_machine.file_system_path):
+        packed_file = packed_state_machine.PackedStateMachine(state_machine.file_system_path)
+
+    def read_meta_data_file(path):
+        if path is None:
+            return
+        path_meta_data = os.path.join(path, storage.FILE_NAME_META_DATA)
+        try:
+            if packed_file is not None and packed_file.exists(path_meta_data):
+                meta_data_by_path[path_meta_data] = storage.load_data_file(path_meta_data, packed_file)
+            else:
+                meta_data_by_path[path_meta_data] = storage.load_data_file(path_meta_data)
+        except ValueError:
+            return
+        if load_progress is not None:
+            load_progress.add(META_FILES)
+
+    try:
+        read_meta_data_file(state_machine.file_system_path)
+        states = [state_machine.root_state]
+        while states:
+            state = states.pop()
+            read_meta_data_file(state.file_system_path)
+            if isinstance(state, LibraryState):
+                if state.state_copy_created or state.library_hierarchy_depth <= state_copy_hierarchy_depth:
+                    states.append(state.state_copy)
+            elif isinstance(state, ContainerState):
+                if state.is_root_state or not lazy_child_models(state):
+                    states.extend(state.states.values())
+    finally:
+        if packed_file is not None:
+            packed_file.close()
+    return meta_data_by_path
+
+
+@contextmanager
+def prefetched_meta_data(meta_data_by_path):
+    """Context manager letting the models created within use the given meta data instead of reading their files
+
+    Each prefetched file is used only once, later loads of the meta data read the file again.
+
+    :param dict meta_data_by_path: the content of meta data files by file path, see :func:`read_meta_data_files`
+    """
+    _prefetched_meta_data.update(meta_data_by_path)
+    try:
+        yield
+    finally:
+        _prefetched_meta_data.clear()
+
+
+def pop_prefetched_meta_data(path_meta_data):
+    """Returns the prefetched content of a meta data file or None if the file was not prefetched
+
+    :param str path_meta_data: the path of the meta data file
+    """
+    return _prefetched_meta_data.pop(path_meta_data, None)
+
+
+@contextmanager
+def provided_meta_data(meta_data_by_state):
+    """Context manager letting the models of the given states use the given meta data instead of reading their files
+
+    In contrast to :func:`prefetched_meta_data`, the meta data is assigned to the core states and not to file paths.
+    This is used for meta data which is kept in memory, e.g. by container state models without child models.
+
+    :param list meta_data_by_state: tuples of core states and the content of their meta data file
+    """
+    state_ids = []
+    for state, meta_data in meta_data_by_state:
+        state_ids.append(id(state))
+        _provided_meta_data[id(state)] = meta_data
+    try:
+        yield
+    finally:
+        for state_id in state_ids:
+            _provided_meta_data.pop(state_id, None)
+
+
+def pop_provided_meta_data(state):
+    """Returns the meta data provided for a state by :func:`provided_meta_data` or None if there is none
+
+    :param rafcon.core.states.state.State state: the state
+    """
+    return _provided_meta_data.pop(id(state), None)
+
+
+def read_meta_data_of_state(state):
+    """Returns the content of the meta data file of a state
+
+    Meta data provided by :func:`provided_meta_data` or prefetched by :func:`prefetched_meta_data` is used instead
+    of reading the file.
+
+    :param rafcon.core.states.state.State state: the state whose meta data is read
+    :return: the content of the meta data file or None if there is none
+    :rtype: dict
+    """
+    meta_data = pop_provided_meta_data(state)
+    if meta_data is not None or state.file_system_path is None:
+        return meta_data
+    return read_meta_data_file(state.file_system_path)
+
+
+def read_meta_data_file(file_system_path):
+    """Returns the content of the meta data file in the folder of a state
+
+    Prefetched meta data, see :func:`prefetched_meta_data`, is used instead of reading the file.
+
+    :param str file_system_path: the path of the folder of the state
+    :return: the content of the meta data file or None if there is none
+    :rtype: dict
+    """
+    path_meta_data = os.path.join(file_system_path, storage.FILE_NAME_META_DATA)
+    meta_data = pop_prefetched_meta_data(path_meta_data)
+    if meta_data is None:
+        if not os.path.exists(path_meta_data) and \
+                packed_state_machine.get_packed_state_machine_path(path_meta_data) is None:
+            path_meta_data = os.path.join(file_system_path, storage.FILE_NAME_META_DATA_OLD)
+        try:
+            meta_data = storage.load_data_file(path_meta_data)
+        except ValueError:
+            return None
+    return meta_data
+
+
+def get_meta_data_file_path(state, copy_path=None):
+    """Returns the path of the meta data file of a state
+
+    :param rafcon.core.states.state.State state: the state
+    :param str copy_path: Optional copy path if meta data is not stored to the file system path of state machine
+    :return: the path of the meta data file or None if the state was not yet stored
+    :rtype: str
+    """
+    if copy_path:
+        return os.path.join(copy_path, state.get_storage_path(), storage.FILE_NAME_META_DATA)
+    if state.file_system_path is None:
+        return None
+    return os.path.join(state.file_system_path, storage.FILE_NAME_META_DATA)
+
+
+def write_meta_data_file(meta_data, file_path, meta_data_files=None):
+    """Writes the meta data of a state into its meta data file or collects it
+
+    :param dict meta_data: the meta data to be written
+    :param str file_path: the path of the meta data file
+    :param dict meta_data_files: Optional, if given, the meta data is not written but added to this dict with the path
+        of the file as key
+    """
+    if meta_data_files is None:
+        storage_utils.write_dict_to_json(meta_data, file_path)
+    else:
+        meta_data_files[file_path] = meta_data
+
+
 def get_state_model_class_for_state(state):
     """Determines the model required for the given state class
 
@@ -111,6 +297,8 @@ class AbstractStateModel(MetaModel, Hashable):
 
         self.register_observer(self)
 
+        # dictionaries of the state element models by their ids, created on demand
+        self._model_indices = {}
         self.input_data_ports = []
         self.output_data_ports = []
         self.outcomes = []
@@ -226,6 +414,7 @@ class AbstractStateModel(MetaModel, Hashable):
         del self.input_data_ports[:]
         del self.output_data_ports[:]
         del self.outcomes[:]
+        self._invalidate_model_indices()
         self.state = None
         self.input_data_ports = None
         self.output_data_ports = None
@@ -302,10 +491,7 @@ class AbstractStateModel(MetaModel, Hashable):
         :param data_port_id: The data port id to search for
         :return: The model of the data port with the given id
         """
-        for data_port_m in self.input_data_ports:
-            if data_port_m.data_port.data_port_id == data_port_id:
-                return data_port_m
-        return None
+        return self._get_model_index("input_data_ports", get_data_port_id).get(data_port_id)
 
     def get_output_data_port_m(self, data_port_id):
         """Returns the output data port model for the given data port id
@@ -313,10 +499,7 @@ class AbstractStateModel(MetaModel, Hashable):
         :param data_port_id: The data port id to search for
         :return: The model of the data port with the given id
         """
-        for data_port_m in self.output_data_ports:
-            if data_port_m.data_port.data_port_id == data_port_id:
-                return data_port_m
-        return None
+        return self._get_model_index("output_data_ports", get_data_port_id).get(data_port_id)
 
     def get_data_port_m(self, data_port_id):
         """Searches and returns the model of a data port of a given state
@@ -327,12 +510,10 @@ class AbstractStateModel(MetaModel, Hashable):
         :param data_port_id: The data port id to be searched
         :return: The model of the data port or None if it is not found
         """
-        from itertools import chain
-        data_ports_m = chain(self.input_data_ports, self.output_data_ports)
-        for data_port_m in data_ports_m:
-            if data_port_m.data_port.data_port_id == data_port_id:
-                return data_port_m
-        return None
+        data_port_m = self.get_input_data_port_m(data_port_id)
+        if data_port_m is None:
+            data_port_m = self.get_output_data_port_m(data_port_id)
+        return data_port_m
 
     def get_outcome_m(self, outcome_id):
         """Returns the outcome model for the given outcome id
@@ -340,16 +521,37 @@ class AbstractStateModel(MetaModel, Hashable):
         :param outcome_id: The outcome id to search for
         :return: The model of the outcome with the given id
         """
-        for outcome_m in self.outcomes:
-            if outcome_m.outcome.outcome_id == outcome_id:
-                return outcome_m
-        return False
+        return self._get_model_index("outcomes", get_outcome_id).get(outcome_id, False)
+
+    def _get_model_index(self, model_list_name, get_id):
+        """Returns a dictionary of the models of a list of state element models by their ids
+
+        The dictionary is created on first use, after the model lists were changed. If several models have the same
+        id, the first one is used, as with a search in the list.
+
+        :param str model_list_name: The name of the model list, e.g. "outcomes"
+        :param get_id: A function returning the id of a model of the list
+        :return: The models by their id
+        :rtype: dict
+        """
+        model_index = self._model_indices.get(model_list_name)
+        if model_index is None:
+            model_index = {}
+            for model in getattr(self, model_list_name):
+                model_index.setdefault(get_id(model), model)
+            self._model_indices[model_list_name] = model_index
+        return model_index
+
+    def _invalidate_model_indices(self):
+        """Discards the dictionaries of :meth:`_get_model_index`, has to be called whenever a model list changes"""
+        self._model_indices.clear()
 
     def _load_port_models(self):
         self._load_income_model()
         self._load_outcome_models()
         self._load_input_data_port_models()
         self._load_output_data_port_models()
+        self._invalidate_model_indices()
 
     def _load_input_data_port_models(self):
         raise NotImplementedError
@@ -472,16 +674,23 @@ class AbstractStateModel(MetaModel, Hashable):
         """
         # TODO: for an Execution state this method is called for each hierarchy level again and again, still?? check it!
         # print("1AbstractState_load_meta_data: ", path, not path)
+        tmp_meta = None
         if not path:
+            # meta data kept in memory, e.g. by a parent state model which created its child models on demand
+            tmp_meta = _provided_meta_data.pop(id(self.state), None)
             path = self.state.file_system_path
         # print("2AbstractState_load_meta_data: ", path)
-        if path is None:
+        if tmp_meta is None and path is None:
             self.meta = Vividict({})
             return False
-        path_meta_data = os.path.join(path, storage.FILE_NAME_META_DATA)
+        if tmp_meta is None:
+            path_meta_data = os.path.join(path, storage.FILE_NAME_META_DATA)
+            tmp_meta = pop_prefetched_meta_data(path_meta_data)
 
         # TODO: Should be removed with next minor release
-        if not os.path.exists(path_meta_data):
+        # packed state machines never contain meta data files of the old format
+        if tmp_meta is None and not os.path.exists(path_meta_data) and \
+                packed_state_machine.get_packed_state_machine_path(path_meta_data) is None:
             logger.debug("Because meta data was not found in {0} use backup option {1}"
                          "".format(path_meta_data, os.path.join(path, storage.FILE_NAME_META_DATA_OLD)))
             path_meta_data = os.path.join(path, storage.FILE_NAME_META_DATA_OLD)
@@ -489,16 +698,18 @@ class AbstractStateModel(MetaModel, Hashable):
             # if not os.path.exists(path_meta_data):
             #     logger.info("path not found {0}".format(path_meta_data))
 
-        try:
-            # print("try to load meta data from {0} for state {1}".format(path_meta_data, self.state))
-            tmp_meta = storage.load_data_file(path_meta_data)
-        except ValueError as e:
-            # if no element which is newly generated log a warning
-            # if os.path.exists(os.path.dirname(path)):
-            #     logger.debug("Because '{1}' meta data of {0} was not loaded properly.".format(self, e))
-            if not path.startswith(constants.RAFCON_TEMP_PATH_STORAGE) and not os.path.exists(os.path.dirname(path)):
-                logger.debug("Because '{1}' meta data of {0} was not loaded properly.".format(self, e))
-            tmp_meta = {}
+        if tmp_meta is None:
+            try:
+                # print("try to load meta data from {0} for state {1}".format(path_meta_data, self.state))
+                tmp_meta = storage.load_data_file(path_meta_data)
+            except ValueError as e:
+                # if no element which is newly generated log a warning
+                # if os.path.exists(os.path.dirname(path)):
+                #     logger.debug("Because '{1}' meta data of {0} was not loaded properly.".format(self, e))
+                if not path.startswith(constants.RAFCON_TEMP_PATH_STORAGE) and \
+                        not os.path.exists(os.path.dirname(path)):
+                    logger.debug("Because '{1}' meta data of {0} was not loaded properly.".format(self, e))
+                tmp_meta = {}
 
         # JSON returns a dict, which must be converted to a Vividict
         tmp_meta = Vividict(tmp_meta)
@@ -513,7 +724,7 @@ class AbstractStateModel(MetaModel, Hashable):
             # print("nothing to parse", tmp_meta)
             return False
 
-    def store_meta_data(self, copy_path=None):
+    def store_meta_data(self, copy_path=None, meta_data_files=None):
         """Save meta data of state model to the file system
 
         This method generates a dictionary of the meta data of the state together with the meta data of all state
@@ -526,18 +737,25 @@ class AbstractStateModel(MetaModel, Hashable):
         Dues the core elements of the state machine has to be stored first.
 
         :param str copy_path: Optional copy path if meta data is not stored to the file system path of state machine
+        :param dict meta_data_files: Optional dict collecting the meta data by file path instead of writing it, see
+            :func:`write_meta_data_file`
+        """
+        meta_file_path_json = get_meta_data_file_path(self.state, copy_path)
+        if meta_file_path_json is None:
+            logger.error("Meta data of {0} can be stored temporary arbitrary but by default first after the "
+                         "respective state was stored and a file system path is set.".format(self))
+            return
+        write_meta_data_file(self.get_meta_data_for_storage(), meta_file_path_json, meta_data_files)
+
+    def get_meta_data_for_storage(self):
+        """Returns the meta data of the state together with the meta data of all state elements
+
+        :return: a copy of the meta data, as stored in the meta data file of the state
+        :rtype: Vividict
         """
-        if copy_path:
-            meta_file_path_json = os.path.join(copy_path, self.state.get_storage_path(), storage.FILE_NAME_META_DATA)
-        else:
-            if self.state.file_system_path is None:
-                logger.error("Meta data of {0} can be stored temporary arbitrary but by default first after the "
-                             "respective state was stored and a file system path is set.".format(self))
-                return
-            meta_file_path_json = os.path.join(self.state.file_system_path, storage.FILE_NAME_META_DATA)
         meta_data = deepcopy(self.meta)
         self._generate_element_meta_data(meta_data)
-        storage_utils.write_dict_to_json(meta_data, meta_file_path_json)
+        return meta_data
 
     def copy_meta_data_from_state_m(self, source_state_m):
         """Dismiss current meta data and copy meta data from given state model
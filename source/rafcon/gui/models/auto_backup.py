@@ -17,6 +17,7 @@ from builtins import str
 import os
 import time
 import threading
+from copy import deepcopy
 
 from gi.repository import Gtk
 from gtkmvc3.model_mt import ModelMT
@@ -25,13 +26,14 @@ from rafcon.core.storage import storage
 import rafcon.core.singleton as core_singletons
 
 from rafcon.gui.config import global_gui_config
+from rafcon.gui.models.container_state import ContainerStateModel
 from rafcon.gui.models.state_machine import StateMachineModel
 from rafcon.gui.utils.dialog import RAFCONCheckBoxTableDialog
 
 from rafcon.gui.utils.constants import RAFCON_INSTANCE_LOCK_FILE_PATH
 from rafcon.utils.vividict import Vividict
 from rafcon.utils.constants import RAFCON_TEMP_PATH_BASE
-from rafcon.utils import log
+from rafcon.utils import log, storage_utils
 from rafcon.utils.storage_utils import get_time_string_for_float
 logger = log.get_logger(__name__)
 
@@ -50,6 +52,27 @@ except (OSError, ImportError):
     process_id_list = []
 
 
+def add_meta_data_to_snapshot(state_machine_m, snapshot):
+    """Adds the meta data files of a state machine model to a snapshot of its state machine
+
+    :param rafcon.gui.models.state_machine.StateMachineModel state_machine_m: the state machine model
+    :param rafcon.core.storage.storage.StateMachineSnapshot snapshot: the snapshot of the state machine
+    """
+    def add_state_meta_data_recursively(state_m):
+        snapshot.add_file(os.path.join(state_m.state.get_storage_path(), storage.FILE_NAME_META_DATA),
+                          storage_utils.dump_dict_to_json_string(state_m.get_meta_data_for_storage()))
+        if isinstance(state_m, ContainerStateModel):
+            # the meta data of states whose models are not created yet
+            for state, meta_data in state_m.get_meta_data_of_unmodelled_states():
+                snapshot.add_file(os.path.join(state.get_storage_path(), storage.FILE_NAME_META_DATA),
+                                  storage_utils.dump_dict_to_json_string(meta_data))
+            for child_state_m in state_m.states.values():
+                add_state_meta_data_recursively(child_state_m)
+
+    snapshot.add_file(storage.FILE_NAME_META_DATA, storage_utils.dump_dict_to_json_string(state_machine_m.meta))
+    add_state_meta_data_recursively(state_machine_m.root_state)
+
+
 def generate_rafcon_instance_lock_file():
     logger.debug(_("Generate lock file for RAFCON instance {0}".format(os.getpid())))
     file_handler = open(RAFCON_INSTANCE_LOCK_FILE_PATH, 'a+')
@@ -310,6 +333,10 @@ class AutoBackupModel(ModelMT):
         self._timer_request_time = None
         self.timer_request_lock = threading.Lock()
         self.tmp_timed_storage_thread = None
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_writer_thread = None
+        self._pending_backup = None
+        self._written_tmp_storage_path = None
         self.meta = Vividict()
         if state_machine_model.state_machine.file_system_path is not None:
             # logger.info("store meta data of {0} to {1}".format(self, meta_data_path))
@@ -335,6 +362,8 @@ class AutoBackupModel(ModelMT):
 
     def destroy(self):
         self.cancel_timed_thread()
+        self.join_snapshot_writer()
+        self.forget_written_backup_files()
         if not core_singletons.shut_down_signal:
             self.clean_lock_file(True)
 
@@ -348,6 +377,15 @@ class AutoBackupModel(ModelMT):
         except KeyError:  # Might happen if the observer was already unregistered
             pass
         self.cancel_timed_thread()
+        self.join_snapshot_writer()
+        self.forget_written_backup_files()
+
+    def forget_written_backup_files(self):
+        """Drops the records of the files written into the backup folder, which are only needed while backups are
+        written"""
+        if self._written_tmp_storage_path is not None:
+            storage.forget_saved_files(self._written_tmp_storage_path)
+            self._written_tmp_storage_path = None
 
     def cancel_timed_thread(self):
         if self.tmp_timed_storage_thread is not None:
@@ -462,6 +500,12 @@ class AutoBackupModel(ModelMT):
         self.tmp_timed_storage_thread.start()
 
     def perform_temp_storage(self):
+        """Performs an auto backup of the state machine
+
+        The locks of the state machine are only held while taking an in-memory snapshot of the state machine and its
+        meta data. The snapshot is written to the backup folder by a background thread afterwards. Only files that
+        changed since the last backup are written.
+        """
         if self.__perform_storage:
             # logger.debug("Do not perform storage, one is running!")
             return
@@ -469,20 +513,74 @@ class AutoBackupModel(ModelMT):
         with self.state_machine_model.storage_lock, self.state_machine_model.state_machine.get_modification_lock():
             with self.timer_request_lock:
                 self.__perform_storage = True
+            start_time = time.time()
             sm = self.state_machine_model.state_machine
-            logger.debug('Performing auto backup of state machine {} to temp folder'.format(sm.state_machine_id))
             self.update_tmp_storage_path()
-            storage.save_state_machine_to_path(sm, self._tmp_storage_path, delete_old_state_machine=True, as_copy=True)
-            self.update_last_backup_meta_data()
-            self.write_backup_meta_data()
-            self.state_machine_model.store_meta_data(copy_path=self._tmp_storage_path)
+            snapshot = storage.create_state_machine_snapshot(sm)
+            add_meta_data_to_snapshot(self.state_machine_model, snapshot)
             self.last_backup_time = time.time()  # used as 'last-backup' time
+            self.update_last_backup_meta_data()
+            backup_meta = deepcopy(self.meta)
             with self.timer_request_lock:
                 self._timer_request_time = None
             self.tmp_timed_storage_thread = None
             self.__perform_storage = False
             self.marked_dirty = False
-            self.check_lock_file()
+        self._queue_snapshot((self._tmp_storage_path, snapshot, backup_meta, start_time, time.time() - start_time))
+
+    def _queue_snapshot(self, backup):
+        """Hands a backup over to the background thread writing the backups
+
+        Backups are written in the order they are taken. A pending backup, which is not yet written, is replaced by
+        a newer one.
+        """
+        with self._snapshot_lock:
+            self._pending_backup = backup
+            if self._snapshot_writer_thread is not None:
+                return
+            self._snapshot_writer_thread = threading.Thread(target=self._write_pending_snapshots,
+                                                            name="AutoBackupWriter")
+            self._snapshot_writer_thread.daemon = True
+            self._snapshot_writer_thread.start()
+
+    def _write_pending_snapshots(self):
+        while True:
+            with self._snapshot_lock:
+                backup = self._pending_backup
+                self._pending_backup = None
+                if backup is None:
+                    self._snapshot_writer_thread = None
+                    return
+            try:
+                self._write_snapshot(*backup)
+            except Exception:
+                logger.exception("Writing the auto backup of state machine {0} to {1} failed".format(
+                    self.state_machine_model.state_machine.state_machine_id, backup[0]))
+
+    def _write_snapshot(self, tmp_storage_path, snapshot, backup_meta, start_time, snapshot_duration):
+        sm_id = self.state_machine_model.state_machine.state_machine_id
+        # the backup folder is cleaned, when it is used for the first time
+        delete_old_backup = tmp_storage_path != self._written_tmp_storage_path
+        if delete_old_backup and self._written_tmp_storage_path is not None:
+            storage.forget_saved_files(self._written_tmp_storage_path)
+        number_of_written_files, number_of_written_bytes = storage.write_state_machine_snapshot(
+            snapshot, tmp_storage_path, delete_old_state_machine=delete_old_backup)
+        self._written_tmp_storage_path = tmp_storage_path
+        storage_utils.write_dict_to_json(backup_meta, os.path.join(tmp_storage_path, FILE_NAME_AUTO_BACKUP))
+        self.check_lock_file()
+        logger.debug("Auto backup of state machine {0} written to {1} in {2:.3f} s (snapshot {3:.3f} s): {4} of {5} "
+                     "files with {6} bytes written".format(sm_id, tmp_storage_path, time.time() - start_time,
+                                                           snapshot_duration, number_of_written_files,
+                                                           len(snapshot.files), number_of_written_bytes))
+
+    def join_snapshot_writer(self, timeout=None):
+        """Waits until all taken backups are written
+
+        :param float timeout: the maximal time to wait in seconds
+        """
+        writer_thread = self._snapshot_writer_thread
+        if writer_thread is not None:
+            writer_thread.join(timeout)
 
     def check_for_auto_backup(self, force=False):
         """ The method implements the checks for possible auto backup of the state-machine according duration till
@@ -14,22 +14,62 @@
 
 from future.utils import string_types
 
+import os
+from contextlib import contextmanager
 from copy import deepcopy
+from operator import attrgetter
 
 from gtkmvc3.model_mt import ModelMT
 
 from rafcon.core.states.container_state import ContainerState
+from rafcon.core.states.state import PATH_SEPARATOR
+from rafcon.core.storage import storage
+from rafcon.gui.config import global_gui_config
 from rafcon.gui.models.abstract_state import AbstractStateModel
-from rafcon.gui.models.abstract_state import get_state_model_class_for_state
+from rafcon.gui.models.abstract_state import get_state_model_class_for_state, get_meta_data_file_path, \
+    provided_meta_data, pop_provided_meta_data, read_meta_data_file, write_meta_data_file
 from rafcon.gui.models.data_flow import DataFlowModel, StateElementModel
 from rafcon.gui.models.scoped_variable import ScopedVariableModel
+from rafcon.gui.models.signals import MetaSignalMsg
 from rafcon.gui.models.state import StateModel
 from rafcon.gui.models.transition import TransitionModel
 
 from rafcon.gui.utils.notification_overview import NotificationOverview
-from rafcon.utils import log
+from rafcon.utils import log, storage_utils
 logger = log.get_logger(__name__)
 
+get_scoped_variable_id = attrgetter('scoped_variable.data_port_id')
+get_transition_id = attrgetter('transition.transition_id')
+get_data_flow_id = attrgetter('data_flow.data_flow_id')
+
+
+def lazy_child_models(container_state):
+    """Checks whether the child models of the child container states of a state are created on demand
+
+    This is the case with the GUI config option LAZY_CONTAINER_STATE_MODELS for all states except for library
+    states and the states within them, whose models are handled by the library state models.
+
+    :param rafcon.core.states.container_state.ContainerState container_state: The container state to check
+    :rtype: bool
+    """
+    return global_gui_config.get_config_value("LAZY_CONTAINER_STATE_MODELS", False) and \
+        container_state.get_next_upper_library_root_state() is None
+
+
+@contextmanager
+def unchanged_dirty_flag(state):
+    """Keeps the dirty flag of the state machine of a state, for model changes not modifying the state machine
+
+    :param rafcon.core.states.state.State state: A state of the state machine
+    """
+    state_machine = state.get_state_machine()
+    marked_dirty = state_machine.marked_dirty if state_machine is not None else False
+    try:
+        yield
+    finally:
+        if state_machine is not None and state_machine.marked_dirty != marked_dirty:
+            state_machine.marked_dirty = marked_dirty
+
 
 class ContainerStateModel(StateModel):
     """This model class manages a ContainerState
@@ -50,12 +90,26 @@ class ContainerStateModel(StateModel):
         """Constructor
         """
         assert isinstance(container_state, ContainerState)
+        # child container states created while loading the content of a state do not yet create their child models
+        self.child_models_loaded = not (isinstance(parent, ContainerStateModel) and parent._collapse_child_containers)
+        self._collapse_child_containers = load_meta_data and lazy_child_models(container_state)
+        # the meta data of the states within the state kept in memory, as long as their models do not exist
+        self._content_meta_data = {}
+        # the folders of the other states within the state, whose meta data files are read on demand
+        self._content_meta_data_folders = {}
         super(ContainerStateModel, self).__init__(container_state, parent, meta, load_meta_data, expected_future_models)
 
-        self._load_child_state_models(load_meta_data)
-
-        self._load_transition_models()
-        self._load_data_flow_models()
+        if self.child_models_loaded:
+            self._load_child_state_models(load_meta_data)
+            self._load_transition_models()
+            self._load_data_flow_models()
+        else:
+            self.states = {}
+            self.transitions = []
+            self.data_flows = []
+            if load_meta_data:
+                self._collect_content_meta_data()
+        self._collapse_child_containers = False
 
         self.update_child_is_start()
 
@@ -90,18 +144,167 @@ class ContainerStateModel(StateModel):
         self.scoped_variables = []
         for scoped_variable in self.state.scoped_variables.values():
             self._add_model(self.scoped_variables, scoped_variable, ScopedVariableModel)
+        self._invalidate_model_indices()
 
     def _load_data_flow_models(self):
         """ Adds models for each data flow of the state """
         self.data_flows = []
         for data_flow in self.state.data_flows.values():
             self._add_model(self.data_flows, data_flow, DataFlowModel)
+        self._invalidate_model_indices()
 
     def _load_transition_models(self):
         """ Adds models for each transition of the state """
         self.transitions = []
         for transition in self.state.transitions.values():
             self._add_model(self.transitions, transition, TransitionModel)
+        self._invalidate_model_indices()
+
+    def load_child_models(self):
+        """Creates the models of the child states, transitions and data flows, if they do not exist yet
+
+        With the GUI config option LAZY_CONTAINER_STATE_MODELS, these models are created on demand, e.g. when the
+        content of the state is shown or when a child state model is retrieved by
+        :meth:`rafcon.gui.models.state_machine.StateMachineModel.get_state_model_by_path`. The meta data of the
+        states within was kept and is handed to the new models. The models of child container states again do not
+        create their child models.
+        """
+        if self.child_models_loaded:
+            return
+        with unchanged_dirty_flag(self.state):
+            # the meta data kept in memory is handed to the new models, the others read their meta data files
+            with provided_meta_data(self._get_unmodelled_states(self._content_meta_data)):
+                self._collapse_child_containers = lazy_child_models(self.state)
+                try:
+                    self._load_child_state_models(load_meta_data=True)
+                finally:
+                    self._collapse_child_containers = False
+            self._load_transition_models()
+            self._load_data_flow_models()
+            # the meta data of the transitions and data flows was kept in the meta data of the state
+            self._parse_for_connection_meta_data(self.meta)
+            self._content_meta_data = {}
+            self._content_meta_data_folders = {}
+            self.child_models_loaded = True
+            self.update_child_is_start()
+            self.meta_signal.emit(MetaSignalMsg("load_child_models", "show_content", False))
+
+    def release_child_models(self):
+        """Destroys the models of the child states, transitions and data flows, if they are created on demand
+
+        The models are only released with the GUI config option LAZY_CONTAINER_STATE_MODELS and never for the root
+        state. Their meta data is kept, they are created again by :meth:`load_child_models`. Released models are
+        removed from the selection.
+        """
+        if not self.child_models_loaded or self.state.is_root_state or not lazy_child_models(self.state):
+            return
+        content_meta_data = self.get_content_meta_data()
+        self._generate_connection_meta_data(self.meta)
+        self._remove_content_from_selection()
+        with unchanged_dirty_flag(self.state):
+            # the views remove the views of the content before its models are destroyed
+            self.child_models_loaded = False
+            self.meta_signal.emit(MetaSignalMsg("release_child_models", "show_content", False))
+        for connection_m in self.transitions[:] + self.data_flows[:]:
+            connection_m.prepare_destruction()
+        for state_m in self.states.values():
+            state_m.prepare_destruction(recursive=True)
+        del self.transitions[:]
+        del self.data_flows[:]
+        self.states.clear()
+        self._invalidate_model_indices()
+        self._content_meta_data = content_meta_data
+        self._content_meta_data_folders = {}
+
+    def _remove_content_from_selection(self):
+        """Removes the models of the states and connections within the state from the selection"""
+        state_machine_m = self.get_state_machine_m()
+        if state_machine_m is None:
+            return
+        content_path_prefix = self.state.get_path() + PATH_SEPARATOR
+
+        def is_content(model):
+            if isinstance(model, AbstractStateModel):
+                return model.state.get_path().startswith(content_path_prefix)
+            if model.parent is self:
+                return isinstance(model, (TransitionModel, DataFlowModel))
+            return model.parent is not None and model.parent.state.get_path().startswith(content_path_prefix)
+
+        selection = state_machine_m.selection
+        content_models = [model for model in selection if is_content(model)]
+        if selection.focus is not None and is_content(selection.focus):
+            del selection.focus
+        if content_models:
+            selection.remove(content_models)
+
+    def _collect_content_meta_data(self):
+        """Collects the sources of the meta data of all states within the state without reading any file
+
+        Meta data provided in memory, e.g. by a parent state model whose child models were released, is kept. For the
+        other states, the folders are remembered, as their file system paths change when the state machine is saved
+        to another path. The meta data files are only read if a child model is created or the meta data is stored.
+        """
+        states = list(self.state.states.items())
+        while states:
+            relative_path, state = states.pop()
+            meta_data = pop_provided_meta_data(state)
+            if meta_data is not None:
+                self._content_meta_data[relative_path] = meta_data
+            elif state.file_system_path is not None:
+                self._content_meta_data_folders[relative_path] = state.file_system_path
+            if isinstance(state, ContainerState):
+                states.extend((relative_path + PATH_SEPARATOR + state_id, child_state)
+                              for state_id, child_state in state.states.items())
+
+    def _get_unmodelled_states(self, values_by_relative_path):
+        """Returns tuples of the states within the state and the values given by their relative paths"""
+        values_by_state = []
+        for relative_path, value in values_by_relative_path.items():
+            state = self._get_content_state(relative_path)
+            if state is not None:
+                values_by_state.append((state, value))
+        return values_by_state
+
+    def _get_content_state(self, relative_path):
+        """Returns the state within the state with the given path relative to this state or None if not existing"""
+        state = self.state
+        for state_id in relative_path.split(PATH_SEPARATOR):
+            if not isinstance(state, ContainerState) or state_id not in state.states:
+                return None
+            state = state.states[state_id]
+        return state
+
+    def get_content_meta_data(self):
+        """Returns the meta data of all states within the state
+
+        :return: the meta data, as stored in the meta data files, by the path of the state relative to this state
+        :rtype: dict
+        """
+        if not self.child_models_loaded:
+            content_meta_data = deepcopy(self._content_meta_data)
+            for relative_path, folder_path in self._content_meta_data_folders.items():
+                if relative_path not in content_meta_data:
+                    meta_data = read_meta_data_file(folder_path)
+                    if meta_data is not None:
+                        content_meta_data[relative_path] = meta_data
+            return content_meta_data
+        content_meta_data = {}
+        for state_id, state_m in self.states.items():
+            content_meta_data[state_id] = state_m.get_meta_data_for_storage()
+            if isinstance(state_m, ContainerStateModel):
+                for relative_path, meta_data in state_m.get_content_meta_data().items():
+                    content_meta_data[state_id + PATH_SEPARATOR + relative_path] = meta_data
+        return content_meta_data
+
+    def get_meta_data_of_unmodelled_states(self):
+        """Returns the meta data of the states within the state, if the child models were not created
+
+        :return: tuples of the core states and their meta data, as stored in the meta data files
+        :rtype: list
+        """
+        if self.child_models_loaded:
+            return []
+        return self._get_unmodelled_states(self.get_content_meta_data())
 
     def __contains__(self, item):
         """Checks whether `item` is an element of the container state model
@@ -137,6 +340,7 @@ class ContainerStateModel(StateModel):
         del self.transitions[:]
         del self.data_flows[:]
         self.states.clear()
+        self._invalidate_model_indices()
         self.scoped_variables = None
         self.transitions = None
         self.data_flows = None
@@ -187,13 +391,15 @@ class ContainerStateModel(StateModel):
                 # if there is and exception set is_about_to_be_destroyed_recursively flag to False again
                 if info.method_name in ["remove_state"] and isinstance(info.result, Exception):
                     state_id = info.kwargs['state_id'] if 'state_id' in info.kwargs else info.args[1]
-                    self.states[state_id].is_about_to_be_destroyed_recursively = False
+                    if state_id in self.states:
+                        self.states[state_id].is_about_to_be_destroyed_recursively = False
             elif overview.operation_started():
                 # while before notification mark all states which get destroyed recursively
                 if info.method_name in ["remove_state"] and \
                         info.kwargs.get('destroy', True) and info.kwargs.get('recursive', True):
                     state_id = info.kwargs['state_id'] if 'state_id' in info.kwargs else info.args[1]
-                    self.states[state_id].is_about_to_be_destroyed_recursively = True
+                    if state_id in self.states:
+                        self.states[state_id].is_about_to_be_destroyed_recursively = True
 
         # Finally call the method of the base class, to forward changes in ports and outcomes
         super(ContainerStateModel, self).model_changed(model, prop_name, info)
@@ -288,6 +494,10 @@ class ContainerStateModel(StateModel):
         else:
             return
 
+        # without child models, only the models of the scoped variables are kept up to date
+        if not self.child_models_loaded and model_name != "scoped_variable":
+            return
+
         if isinstance(info.result, Exception):
             # Do nothing if the observed function raised an exception
             pass
@@ -369,10 +579,7 @@ class ContainerStateModel(StateModel):
         :param data_port_id: The data port id to search for
         :return: The model of the scoped variable with the given id
         """
-        for scoped_variable_m in self.scoped_variables:
-            if scoped_variable_m.scoped_variable.data_port_id == data_port_id:
-                return scoped_variable_m
-        return None
+        return self._get_model_index("scoped_variables", get_scoped_variable_id).get(data_port_id)
 
     def get_data_port_m(self, data_port_id):
         """Searches and returns the model of a data port of a given state
@@ -383,11 +590,9 @@ class ContainerStateModel(StateModel):
         :param data_port_id: The data port id to be searched
         :return: The model of the data port or None if it is not found
         """
-
-        for scoped_var_m in self.scoped_variables:
-            if scoped_var_m.scoped_variable.data_port_id == data_port_id:
-                return scoped_var_m
-
+        scoped_variable_m = self.get_scoped_variable_m(data_port_id)
+        if scoped_variable_m is not None:
+            return scoped_variable_m
         return StateModel.get_data_port_m(self, data_port_id)
 
     def get_transition_m(self, transition_id):
@@ -396,10 +601,7 @@ class ContainerStateModel(StateModel):
         :param transition_id: The transition id to be searched
         :return: The model of the transition or None if it is not found
         """
-        for transition_m in self.transitions:
-            if transition_m.transition.transition_id == transition_id:
-                return transition_m
-        return None
+        return self._get_model_index("transitions", get_transition_id).get(transition_id)
 
     def get_data_flow_m(self, data_flow_id):
         """Searches and return the data flow model with the given in the given container state model
@@ -407,24 +609,36 @@ class ContainerStateModel(StateModel):
         :param data_flow_id: The data flow id to be searched
         :return: The model of the data flow or None if it is not found
         """
-        for data_flow_m in self.data_flows:
-            if data_flow_m.data_flow.data_flow_id == data_flow_id:
-                return data_flow_m
-        return None
+        return self._get_model_index("data_flows", get_data_flow_id).get(data_flow_id)
 
     # ---------------------------------------- meta data methods ---------------------------------------------
 
-    def store_meta_data(self, copy_path=None):
+    def store_meta_data(self, copy_path=None, meta_data_files=None):
         """Store meta data of container states to the filesystem
 
         Recursively stores meta data of child states. For further insides read the description of also called respective
         super class method.
 
         :param str copy_path: Optional copy path if meta data is not stored to the file system path of state machine
+        :param dict meta_data_files: Optional dict collecting the meta data by file path instead of writing it
         """
-        super(ContainerStateModel, self).store_meta_data(copy_path)
+        super(ContainerStateModel, self).store_meta_data(copy_path, meta_data_files)
+        if not self.child_models_loaded:
+            for state, meta_data in self._get_unmodelled_states(self._content_meta_data):
+                meta_file_path_json = get_meta_data_file_path(state, copy_path)
+                if meta_file_path_json is not None:
+                    write_meta_data_file(meta_data, meta_file_path_json, meta_data_files)
+            for state, folder_path in self._get_unmodelled_states(self._content_meta_data_folders):
+                meta_file_path_json = get_meta_data_file_path(state, copy_path)
+                # meta data files which were not read need not to be written to the same place again
+                if meta_file_path_json is None or \
+                        meta_file_path_json == os.path.join(folder_path, storage.FILE_NAME_META_DATA):
+                    continue
+                meta_data = read_meta_data_file(folder_path)
+                if meta_data is not None:
+                    write_meta_data_file(meta_data, meta_file_path_json, meta_data_files)
         for state_key, state in self.states.items():
-            state.store_meta_data(copy_path)
+            state.store_meta_data(copy_path, meta_data_files)
 
     def copy_meta_data_from_state_m(self, source_state_m):
         """Dismiss current meta data and copy meta data from given state model
@@ -434,6 +648,8 @@ class ContainerStateModel(StateModel):
 
         :param source_state_m: State model to load the meta data from
         """
+        self.load_child_models()
+        source_state_m.load_child_models()
         for scoped_variable_m in self.scoped_variables:
             source_scoped_variable_m = source_state_m.get_scoped_variable_m(
                 scoped_variable_m.scoped_variable.data_port_id)
@@ -460,15 +676,24 @@ class ContainerStateModel(StateModel):
         :param meta_data: Dictionary of loaded meta data
         """
         super(ContainerStateModel, self)._parse_for_element_meta_data(meta_data)
+        self._parse_for_connection_meta_data(meta_data)
+        for scoped_variable_m in self.scoped_variables:
+            self._copy_element_meta_data_from_meta_file_data(meta_data, scoped_variable_m, "scoped_variable",
+                                         scoped_variable_m.scoped_variable.data_port_id)
+
+    def _parse_for_connection_meta_data(self, meta_data):
+        """Load meta data for transitions and data flows
+
+        Without child models, the meta data of the transitions and data flows is kept in the given dictionary.
+
+        :param meta_data: Dictionary of loaded meta data
+        """
         for transition_m in self.transitions:
             self._copy_element_meta_data_from_meta_file_data(meta_data, transition_m, "transition",
                                                              transition_m.transition.transition_id)
         for data_flow_m in self.data_flows:
             self._copy_element_meta_data_from_meta_file_data(meta_data, data_flow_m, "data_flow",
                                                              data_flow_m.data_flow.data_flow_id)
-        for scoped_variable_m in self.scoped_variables:
-            self._copy_element_meta_data_from_meta_file_data(meta_data, scoped_variable_m, "scoped_variable",
-                                         scoped_variable_m.scoped_variable.data_port_id)
 
     def _generate_element_meta_data(self, meta_data):
         """Generate meta data for state elements and add it to the given dictionary
@@ -479,12 +704,19 @@ class ContainerStateModel(StateModel):
         :param meta_data: Dictionary of meta data
         """
         super(ContainerStateModel, self)._generate_element_meta_data(meta_data)
+        self._generate_connection_meta_data(meta_data)
+        for scoped_variable_m in self.scoped_variables:
+            self._copy_element_meta_data_to_meta_file_data(meta_data, scoped_variable_m, "scoped_variable",
+                                                           scoped_variable_m.scoped_variable.data_port_id)
+
+    def _generate_connection_meta_data(self, meta_data):
+        """Add the meta data of the transitions and data flows to the given dictionary
+
+        :param meta_data: Dictionary of meta data
+        """
         for transition_m in self.transitions:
             self._copy_element_meta_data_to_meta_file_data(meta_data, transition_m, "transition",
                                                            transition_m.transition.transition_id)
         for data_flow_m in self.data_flows:
             self._copy_element_meta_data_to_meta_file_data(meta_data, data_flow_m, "data_flow",
                                                            data_flow_m.data_flow.data_flow_id)
-        for scoped_variable_m in self.scoped_variables:
-            self._copy_element_meta_data_to_meta_file_data(meta_data, scoped_variable_m, "scoped_variable",
-                                                           scoped_variable_m.scoped_variable.data_port_id)
@@ -21,6 +21,8 @@ from rafcon.core.states.library_state import LibraryState
 
 from rafcon.gui.models.abstract_state import AbstractStateModel
 from rafcon.gui.models.abstract_state import get_state_model_class_for_state
+from rafcon.gui.models.data_port import DataPortModel
+from rafcon.gui.models.logical_port import IncomeModel, OutcomeModel
 
 from rafcon.gui.utils.notification_overview import NotificationOverview
 from rafcon.gui.config import global_gui_config
@@ -43,6 +45,9 @@ class LibraryStateModel(AbstractStateModel):
 
         self.state_copy_initialized = False
         self.meta_data_was_scaled = False
+        # with lazy models, the port models are created from the library state and the state copy model on demand
+        self.lazy_state_copy_model = global_gui_config.get_config_value("LAZY_LIBRARY_STATE_MODELS", False)
+        self._keep_state_copy_model = False
         super(LibraryStateModel, self).__init__(state, parent, meta)
 
         self.recursive_generate_models(load_meta_data)
@@ -61,7 +66,16 @@ class LibraryStateModel(AbstractStateModel):
             max_hierarchy_depth = min_temp_depth
         no_fully_rec_lib_model = global_gui_config.get_config_value("NO_FULLY_RECURSIVE_LIBRARY_MODEL", False)
         recursive_model_generation = not (current_hierarchy_depth > max_hierarchy_depth) or not no_fully_rec_lib_model
-        if recursive_model_generation:
+        if self.lazy_state_copy_model:
+            # the port models were already created from the library state, the state copy model is only needed now
+            # to derive the meta data of the ports, if the library state has no meta data yet
+            if load_meta_data and self.load_meta_data():
+                self.meta_data_was_scaled = True
+                return
+            if not recursive_model_generation:
+                return
+            self.initiate_library_root_state_model()
+        elif recursive_model_generation:
             # logger.debug("initialize state copy {0}".format(self))
             self.initiate_library_root_state_model()
         else:
@@ -87,10 +101,43 @@ class LibraryStateModel(AbstractStateModel):
             logger.error("Unknown state type '{type:s}'. Cannot create model.".format(type=type(self.state)))
 
     def enforce_generation_of_state_copy_model(self):
-        """This enforce a load of state copy model without considering meta data"""
+        """This enforce a load of state copy model without considering meta data
+
+        With lazy library state models, the state copy model is kept from then on, as e.g. the controllers of the state
+        editor observe it.
+        """
+        if self.lazy_state_copy_model:
+            self._keep_state_copy_model = True
+            self.load_state_copy_model()
+            return
         self.initiate_library_root_state_model()
         self._load_port_models()
 
+    def load_state_copy_model(self):
+        """Creates the model of the state copy, if not yet existing
+
+        With lazy library state models, the existing port models of the library state are kept, as they represent the
+        same core ports as the ports of the state copy.
+
+        :return: the model of the state copy
+        """
+        if not self.state_copy_initialized:
+            self.initiate_library_root_state_model()
+        return self.state_copy
+
+    def release_state_copy_model(self):
+        """Destroys the model of the state copy, if the models of library states are created lazily
+
+        The model is created again by :meth:`load_state_copy_model`, e.g. when the content of the library state is
+        shown again.
+        """
+        if not self.lazy_state_copy_model or not self.state_copy_initialized or self._keep_state_copy_model:
+            return
+        state_copy_m = self.state_copy
+        self.state_copy = None
+        self.state_copy_initialized = False
+        state_copy_m.prepare_destruction(recursive=True)
+
     def prepare_destruction(self, recursive=True):
         """Prepares the model for destruction
 
@@ -119,6 +166,7 @@ class LibraryStateModel(AbstractStateModel):
         del self.input_data_ports[:]
         del self.output_data_ports[:]
         del self.outcomes[:]
+        self._invalidate_model_indices()
         self.state = None
 
     def __eq__(self, other):
@@ -133,7 +181,8 @@ class LibraryStateModel(AbstractStateModel):
 
     def __copy__(self):
         state_m = AbstractStateModel.__copy__(self)
-        state_m.state_copy.copy_meta_data_from_state_m(self.state_copy)
+        if self.state_copy_initialized:
+            state_m.load_state_copy_model().copy_meta_data_from_state_m(self.state_copy)
         return state_m
 
     def __deepcopy__(self, memo=None, _nil=[]):
@@ -141,11 +190,14 @@ class LibraryStateModel(AbstractStateModel):
 
     def update_hash(self, obj_hash):
         super(LibraryStateModel, self).update_hash(obj_hash)
-        self.update_hash_from_dict(obj_hash, self.state_copy)
+        if self.state_copy_initialized:
+            self.update_hash_from_dict(obj_hash, self.state_copy)
 
     def _load_input_data_port_models(self):
         """Reloads the input data port models directly from the the state"""
         if not self.state_copy_initialized:
+            if self.lazy_state_copy_model:
+                self.input_data_ports = [DataPortModel(data_port, self) for data_port in self.state.input_data_ports.values()]
             return
         self.input_data_ports = []
         for input_data_port_m in self.state_copy.input_data_ports:
@@ -157,6 +209,8 @@ class LibraryStateModel(AbstractStateModel):
     def _load_output_data_port_models(self):
         """Reloads the output data port models directly from the the state"""
         if not self.state_copy_initialized:
+            if self.lazy_state_copy_model:
+                self.output_data_ports = [DataPortModel(data_port, self) for data_port in self.state.output_data_ports.values()]
             return
         self.output_data_ports = []
         for output_data_port_m in self.state_copy.output_data_ports:
@@ -168,6 +222,8 @@ class LibraryStateModel(AbstractStateModel):
     def _load_income_model(self):
         """Reloads the income model directly from the state"""
         if not self.state_copy_initialized:
+            if self.lazy_state_copy_model:
+                self.income = IncomeModel(self.state.income, self)
             return
         self.income = None
         income_m = deepcopy(self.state_copy.income)
@@ -178,6 +234,8 @@ class LibraryStateModel(AbstractStateModel):
     def _load_outcome_models(self):
         """Reloads the outcome models directly from the state"""
         if not self.state_copy_initialized:
+            if self.lazy_state_copy_model:
+                self.outcomes = [OutcomeModel(outcome, self) for outcome in self.state.outcomes.values()]
             return
         self.outcomes = []
         for outcome_m in self.state_copy.outcomes:
@@ -225,7 +283,7 @@ class LibraryStateModel(AbstractStateModel):
             self.state_copy.is_about_to_be_destroyed_recursively = value
             
     def _parse_for_element_meta_data(self, meta_data):
-        if not self.state_copy_initialized:
+        if not self.state_copy_initialized and not self.lazy_state_copy_model:
             return 
         super(LibraryStateModel, self)._parse_for_element_meta_data(meta_data)
 
@@ -235,8 +293,8 @@ class LibraryStateModel(AbstractStateModel):
         if overview.operation_finished() and self.child_model_changed(overview):
             # The only operations allowed are setting the parent of the state_copy and
             # changing the state_execution_status
-            if not (info["instance"] == self.state_copy.state and info["method_name"] == "parent" or
-                    info["method_name"] == "state_execution_status"):
+            if not (self.state_copy is not None and info["instance"] == self.state_copy.state and
+                    info["method_name"] == "parent" or info["method_name"] == "state_execution_status"):
                 if not self.is_about_to_be_destroyed_recursively:
                     logger.warning("You have modified core property of an inner state of a library state.")
         super(LibraryStateModel, self).model_changed(model, prop_name, info)
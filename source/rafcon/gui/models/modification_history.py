@@ -367,6 +367,10 @@ class ModificationsHistoryModel(ModelMT):
             return
         if overview.get_signal_message().origin == 'load_meta_data':
             return
+        if overview.get_signal_message().origin in ['load_child_models', 'release_child_models']:
+            # models created or released on demand do not change the state machine, only the stored meta data
+            self.update_internal_tmp_storage()
+            return
 
         if self.active_action is None or overview.get_signal_message().change in ['append_initial_change']:
             # update last actions after_state_image -> meta-data
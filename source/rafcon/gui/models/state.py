@@ -239,6 +239,7 @@ class StateModel(AbstractStateModel):
         else:
             model_list_or_dict[model_key] = found_model if found_model else model_class(core_element, self,
                                                                                         load_meta_data=load_meta_data)
+        self._invalidate_model_indices()
 
     def add_missing_model(self, model_list_or_dict, core_elements_dict, model_name, model_class, model_key):
         """Adds one missing model
@@ -289,6 +290,7 @@ class StateModel(AbstractStateModel):
                 model_list_or_dict.append(new_model)
             else:
                 model_list_or_dict[getattr(core_element, model_key)] = new_model
+            self._invalidate_model_indices()
             return True
         return False
 
@@ -306,6 +308,7 @@ class StateModel(AbstractStateModel):
                     if destroy:
                         model.prepare_destruction()
                     model_list.remove(model)
+                    self._invalidate_model_indices()
                     return
         else:
             model_dict = model_list_or_dict
@@ -314,6 +317,7 @@ class StateModel(AbstractStateModel):
                     if destroy:
                         model.prepare_destruction(recursive)
                     del model_dict[model_id]
+                    self._invalidate_model_indices()
                     return
 
     def remove_additional_model(self, model_list_or_dict, core_objects_dict, model_name, model_key, destroy=True):
@@ -345,6 +349,7 @@ class StateModel(AbstractStateModel):
                     if destroy:
                         model.prepare_destruction()
                     model_list.remove(model)
+                    self._invalidate_model_indices()
                     return
         else:
             model_dict = model_list_or_dict
@@ -356,6 +361,7 @@ class StateModel(AbstractStateModel):
                     if destroy:
                         model.prepare_destruction()
                     del model_dict[model_id]
+                    self._invalidate_model_indices()
                     return
 
     def _get_future_expected_model(self, core_element):
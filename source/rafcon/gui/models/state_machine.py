@@ -25,10 +25,11 @@ from gtkmvc3.observer import Observer
 from rafcon.core.state_machine import StateMachine
 from rafcon.core.states.container_state import ContainerState
 from rafcon.core.states.library_state import LibraryState
-from rafcon.core.storage import storage
+from rafcon.core.storage import storage, packed_state_machine
 from rafcon.gui.config import global_gui_config
 from rafcon.gui.models.meta import MetaModel
 from rafcon.gui.models import ContainerStateModel, AbstractStateModel, StateModel, LibraryStateModel
+from rafcon.gui.models.abstract_state import pop_prefetched_meta_data
 from rafcon.gui.models.selection import Selection
 from rafcon.gui.models.signals import MetaSignalMsg
 from rafcon.gui.utils.notification_overview import NotificationOverview
@@ -283,18 +284,19 @@ class StateMachineModel(MetaModel, Hashable):
         current_state_model = self.root_state
         for state_id in path_elements:
             if isinstance(current_state_model, ContainerStateModel):
+                current_state_model.load_child_models()
                 if state_id in current_state_model.states:
                     current_state_model = current_state_model.states[state_id]
                 else:
                     raise ValueError("Invalid path: State with id '{}' not found in state with id {}".format(
                         state_id, current_state_model.state.state_id))
             elif isinstance(current_state_model, LibraryStateModel):
-                if state_id == current_state_model.state_copy.state.state_id:
-                    current_state_model = current_state_model.state_copy
+                if state_id == current_state_model.state.state_copy.state_id:
+                    current_state_model = current_state_model.load_state_copy_model()
                 else:
                     raise ValueError("Invalid path: state id '{}' does not coincide with state id '{}' of state_copy "
                                      "of library state with id '{}'".format(
-                                        state_id, current_state_model.state_copy.state.state_id,
+                                        state_id, current_state_model.state.state_copy.state_id,
                                         current_state_model.state.state_id))
             else:
                 raise ValueError("Invalid path: State with id '{}' has no children".format(
@@ -362,10 +364,12 @@ class StateMachineModel(MetaModel, Hashable):
         if meta_data_path:
             path_meta_data = os.path.join(meta_data_path, storage.FILE_NAME_META_DATA)
 
-            try:
-                tmp_meta = storage.load_data_file(path_meta_data)
-            except ValueError:
-                tmp_meta = {}
+            tmp_meta = pop_prefetched_meta_data(path_meta_data)
+            if tmp_meta is None:
+                try:
+                    tmp_meta = storage.load_data_file(path_meta_data)
+                except ValueError:
+                    tmp_meta = {}
         else:
             tmp_meta = {}
 
@@ -386,14 +390,22 @@ class StateMachineModel(MetaModel, Hashable):
 
         This method generates a dictionary of the meta data of the state machine and stores it on the filesystem.
 
+        If the state machine was saved as packed state machine, the meta data files are added to the packed file.
+
         :param str copy_path: Optional, if the path is specified, it will be used instead of the file system path
         """
-        if copy_path:
-            meta_file_json = os.path.join(copy_path, storage.FILE_NAME_META_DATA)
-        else:
-            meta_file_json = os.path.join(self.state_machine.file_system_path, storage.FILE_NAME_META_DATA)
+        base_path = copy_path if copy_path else self.state_machine.file_system_path
+        if packed_state_machine.is_packed_state_machine(base_path):
+            meta_data_files = {os.path.join(base_path, storage.FILE_NAME_META_DATA): self.meta}
+            self.root_state.store_meta_data(copy_path, meta_data_files)
+            files = {}
+            for file_path, meta_data in meta_data_files.items():
+                files[os.path.relpath(file_path, base_path)] = \
+                    storage_utils.dump_dict_to_json_string(meta_data).encode('utf-8')
+            packed_state_machine.add_files_to_packed_state_machine(files, base_path)
+            return
 
-        storage_utils.write_dict_to_json(self.meta, meta_file_json)
+        storage_utils.write_dict_to_json(self.meta, os.path.join(base_path, storage.FILE_NAME_META_DATA))
 
         self.root_state.store_meta_data(copy_path)
 
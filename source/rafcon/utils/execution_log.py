@@ -22,6 +22,18 @@ from rafcon.utils import log
 logger = log.get_logger(__name__)
 
 
+def open_execution_log(filename):
+    """Opens an execution log for reading
+
+    :param str filename: the path of the execution log, either a shelve or a binary log file
+    :return: the opened log, which can be passed to the other functions of this module
+    """
+    from rafcon.utils.execution_log_file import ExecutionLogReader, FILE_EXTENSION
+    if filename.endswith('.' + FILE_EXTENSION):
+        return ExecutionLogReader(filename)
+    return shelve.open(filename, flag='r')
+
+
 def log_to_raw_structure(execution_history_items):
     """
     :param dict execution_history_items: history items, in the simplest case
@@ -76,6 +88,84 @@ def log_to_raw_structure(execution_history_items):
     return start_item, previous, next_, concurrent, grouped_by_run_id
 
 
+def _unpickle_data(data_dict, throw_on_pickle_error=True, include_erroneous_data_ports=False, columns=None):
+    """Unpickle the data of a history item, e.g. the input data or the scoped data
+
+    :param dict data_dict: the pickled data
+    :param bool throw_on_pickle_error: flag if an error is thrown if an object cannot be un-pickled
+    :param bool include_erroneous_data_ports: flag if to include erroneous data ports
+    :param columns: names of the data to be un-pickled, all data if None
+    :return: the un-pickled data
+    :rtype: dict
+    """
+    r = dict()
+    # support backward compatibility
+    if isinstance(data_dict, string_types):  # formerly data dict was a json string
+        r = json.loads(data_dict)
+        if columns is not None:
+            r = {k: v for k, v in r.items() if k in columns}
+    else:
+        for k, v in data_dict.items():
+            if not k.startswith('!'):  # ! indicates storage error
+                if columns is not None and k not in columns:
+                    continue
+                try:
+                    r[k] = pickle.loads(v)
+                except Exception as e:
+                    if throw_on_pickle_error:
+                        raise
+                    elif include_erroneous_data_ports:
+                        r['!' + k] = (str(e), v)
+                    else:
+                        pass  # ignore
+            elif include_erroneous_data_ports and (columns is None or k[1:] in columns):
+                r[k] = v
+
+    return r
+
+
+def _collapse_execution(call_item, return_item, throw_on_pickle_error=True, include_erroneous_data_ports=False,
+                        data_in_columns=None, data_out_columns=None, scoped_in_columns=None, scoped_out_columns=None,
+                        semantic_data_columns=None):
+    """Merge the call and the return item of a state execution into one execution item
+
+    The `*_columns` parameters restrict the data to be un-pickled, all data is un-pickled if they are None.
+    """
+    execution_item = {}
+    # add base properties will throw if not existing
+    for l in ['description', 'path_by_name', 'state_name', 'run_id', 'state_type', 'path']:
+        execution_item[l] = call_item[l]
+
+    # add extended properties (added in later rafcon versions),
+    # will add default value if not existing instead
+    for l, default in [('semantic_data', {}),
+                         ('is_library', None),
+                         ('library_state_name', None),
+                         ('library_name', None),
+                         ('library_path', None)]:
+        execution_item[l] = return_item.get(l, default)
+
+    for l in ['outcome_name', 'outcome_id']:
+        execution_item[l] = return_item[l]
+    for l in ['timestamp']:
+        execution_item[l+'_call'] = call_item[l]
+        execution_item[l+'_return'] = return_item[l]
+
+    def unpickle_data(data_dict, columns):
+        return _unpickle_data(data_dict, throw_on_pickle_error, include_erroneous_data_ports, columns)
+
+    execution_item['data_ins'] = unpickle_data(call_item['input_output_data'], data_in_columns)
+    execution_item['data_outs'] = unpickle_data(return_item['input_output_data'], data_out_columns)
+    execution_item['scoped_data_ins'] = unpickle_data(call_item['scoped_data'], scoped_in_columns)
+    execution_item['scoped_data_outs'] = unpickle_data(return_item['scoped_data'], scoped_out_columns)
+    # backward compatibility
+    if isinstance(execution_item['semantic_data'], Vividict):
+        execution_item['semantic_data'] = execution_item['semantic_data']
+    else:
+        execution_item['semantic_data'] = unpickle_data(execution_item['semantic_data'], semantic_data_columns)
+    return execution_item
+
+
 def log_to_collapsed_structure(execution_history_items, throw_on_pickle_error=True,
                                include_erroneous_data_ports=False, full_next=False):
     """
@@ -249,59 +339,8 @@ def log_to_collapsed_structure(execution_history_items, throw_on_pickle_error=Tr
                     else:
                         collapsed_concurrent[prev_rid] = [rid]
 
-            # assemble grouped item
-            execution_item = {}
-            # add base properties will throw if not existing
-            for l in ['description', 'path_by_name', 'state_name', 'run_id', 'state_type', 'path']:
-                execution_item[l] = call_item[l]
-
-            # add extended properties (added in later rafcon versions),
-            # will add default value if not existing instead
-            for l, default in [('semantic_data', {}),
-                                 ('is_library', None),
-                                 ('library_state_name', None),
-                                 ('library_name', None),
-                                 ('library_path', None)]:
-                execution_item[l] = return_item.get(l, default)
-
-            for l in ['outcome_name', 'outcome_id']:
-                execution_item[l] = return_item[l]
-            for l in ['timestamp']:
-                execution_item[l+'_call'] = call_item[l]
-                execution_item[l+'_return'] = return_item[l]
-
-            def unpickle_data(data_dict):
-                r = dict()
-                # support backward compatibility
-                if isinstance(data_dict, string_types):  # formerly data dict was a json string
-                    r = json.loads(data_dict)
-                else:
-                    for k, v in data_dict.items():
-                        if not k.startswith('!'):  # ! indicates storage error
-                            try:
-                                r[k] = pickle.loads(v)
-                            except Exception as e:
-                                if throw_on_pickle_error:
-                                    raise
-                                elif include_erroneous_data_ports:
-                                    r['!' + k] = (str(e), v)
-                                else:
-                                    pass  # ignore
-                        elif include_erroneous_data_ports:
-                            r[k] = v
-
-                return r
-
-            execution_item['data_ins'] = unpickle_data(call_item['input_output_data'])
-            execution_item['data_outs'] = unpickle_data(return_item['input_output_data'])
-            execution_item['scoped_data_ins'] = unpickle_data(call_item['scoped_data'])
-            execution_item['scoped_data_outs'] = unpickle_data(return_item['scoped_data'])
-            # backward compatibility
-            if isinstance(execution_item['semantic_data'], Vividict):
-                execution_item['semantic_data'] = execution_item['semantic_data']
-            else:
-                execution_item['semantic_data'] = unpickle_data(execution_item['semantic_data'])
-
+            execution_item = _collapse_execution(call_item, return_item, throw_on_pickle_error,
+                                                 include_erroneous_data_ports)
             collapsed_items[rid] = execution_item
 
     return start_item, collapsed_next, collapsed_concurrent, collapsed_hierarchy, collapsed_items
@@ -375,6 +414,139 @@ def log_to_DataFrame(execution_history_items, data_in_columns=[], data_out_colum
     return df_timed
 
 
+def iter_log_items(execution_history_items):
+    """Yields the history items of an execution log in the order of their creation
+
+    Only one history item is held in memory at a time. For binary logs, the items are read in the order they were
+    written. For shelve logs, the keys are first sorted by the timestamps of the items.
+
+    :param execution_history_items: the opened execution log, see :func:`open_execution_log`
+    :return: generator of history items
+    """
+    from rafcon.utils.execution_log_file import ExecutionLogReader
+    if isinstance(execution_history_items, ExecutionLogReader):
+        for _, item in execution_history_items.iter_items():
+            yield item
+        return
+    ordered_keys = sorted((execution_history_items[k]['timestamp'], k) for k in execution_history_items.keys())
+    for _, k in ordered_keys:
+        yield execution_history_items[k]
+
+
+def _matches_path(item, path_prefix):
+    return item['path'].startswith(path_prefix) or item['path_by_name'].startswith(path_prefix)
+
+
+def iter_collapsed_items(execution_history_items, run_ids=None, path_prefix=None, data_in_columns=None,
+                         data_out_columns=None, scoped_in_columns=None, scoped_out_columns=None,
+                         semantic_data_columns=None, throw_on_pickle_error=True, include_erroneous_data_ports=False):
+    """Yields the collapsed items of an execution log (see :func:`log_to_collapsed_structure`) while walking the log
+
+    In contrast to :func:`log_to_collapsed_structure`, the log is not loaded into memory: only the call items of the
+    states currently being executed are kept. A collapsed item is yielded as soon as the return item of the state
+    execution is read, thus the items are ordered by the end of the state execution. The relations between the items
+    (next, concurrent, hierarchy) are not computed.
+
+    :param execution_history_items: the opened execution log, see :func:`open_execution_log`
+    :param run_ids: if given, only the executions with these run ids are yielded
+    :param str path_prefix: if given, only the executions of states whose path (by id or by name) starts with this
+        prefix are yielded
+    :param data_in_columns: names of the input data to be un-pickled, all if None
+    :param data_out_columns: names of the output data to be un-pickled, all if None
+    :param scoped_in_columns: names of the scoped data at the call to be un-pickled, all if None
+    :param scoped_out_columns: names of the scoped data at the return to be un-pickled, all if None
+    :param semantic_data_columns: keys of the semantic data to be un-pickled, all if None
+    :param bool throw_on_pickle_error: flag if an error is thrown if an object cannot be un-pickled
+    :param bool include_erroneous_data_ports: flag if to include erroneous data ports
+    :return: generator of collapsed items
+    """
+    if run_ids is not None:
+        run_ids = set(run_ids)
+    # run_id --> {(item_type, call_type): item} of the state executions not finished yet
+    open_executions = {}
+    for item in iter_log_items(execution_history_items):
+        if item['item_type'] not in ('CallItem', 'ReturnItem'):
+            continue
+        rid = item['run_id']
+        if run_ids is not None and rid not in run_ids:
+            continue
+        if path_prefix is not None and not _matches_path(item, path_prefix):
+            continue
+        items = open_executions.setdefault(rid, {})
+        items[(item['item_type'], item['call_type'])] = item
+        # the call and return item of the parent state (EXECUTE) enclose those of the state itself (CONTAINER),
+        # only the root state has no EXECUTE items
+        if ('CallItem', 'EXECUTE') in items and ('ReturnItem', 'EXECUTE') in items:
+            call_item, return_item = items[('CallItem', 'EXECUTE')], items[('ReturnItem', 'EXECUTE')]
+        elif '/' not in item['path'] and ('CallItem', 'CONTAINER') in items and ('ReturnItem', 'CONTAINER') in items:
+            call_item, return_item = items[('CallItem', 'CONTAINER')], items[('ReturnItem', 'CONTAINER')]
+        else:
+            continue
+        del open_executions[rid]
+        yield _collapse_execution(call_item, return_item, throw_on_pickle_error, include_erroneous_data_ports,
+                                  data_in_columns, data_out_columns, scoped_in_columns, scoped_out_columns,
+                                  semantic_data_columns)
+    for rid in open_executions:
+        logger.warning('Could not find a ReturnItem in run_id group %s' % str(rid))
+
+
+def log_to_DataFrame_chunks(execution_history_items, chunk_size=10000, data_in_columns=[], data_out_columns=[],
+                            scoped_in_columns=[], scoped_out_columns=[], semantic_data_columns=[], run_ids=None,
+                            path_prefix=None, throw_on_pickle_error=True):
+    """Yields the collapsed items of an execution log as pandas.DataFrames with at most `chunk_size` rows each
+
+    The columns of the DataFrames are the same as those of :func:`log_to_DataFrame`, but the rows are ordered by
+    the end of the state executions. Only the selected data ports are un-pickled. As the log is processed item by
+    item, logs larger than the available memory can be processed, if the chunks are consumed one after the other,
+    e.g. by aggregating them or by appending them to a file.
+
+    :param execution_history_items: the opened execution log, see :func:`open_execution_log`
+    :param int chunk_size: the maximum number of rows per DataFrame
+    :param run_ids: if given, only the executions with these run ids are included
+    :param str path_prefix: if given, only the executions of states with this path prefix are included
+    :return: generator of pandas.DataFrames
+    """
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError("The Python package 'pandas' is required for log_to_DataFrame_chunks.")
+
+    selected_columns = [('data_ins', data_in_columns),
+                        ('data_outs', data_out_columns),
+                        ('scoped_data_ins', scoped_in_columns),
+                        ('scoped_data_outs', scoped_out_columns),
+                        ('semantic_data', semantic_data_columns)]
+    df_keys = None
+
+    def to_data_frame(rows):
+        df = pd.DataFrame(rows, columns=df_keys)
+        # convert epoch to datetime
+        df.timestamp_call = pd.to_datetime(df.timestamp_call, unit='s')
+        df.timestamp_return = pd.to_datetime(df.timestamp_return, unit='s')
+        # use call timestamp as index
+        return df.set_index(df.timestamp_call)
+
+    df_items = []
+    for item in iter_collapsed_items(execution_history_items, run_ids, path_prefix, data_in_columns, data_out_columns,
+                                     scoped_in_columns, scoped_out_columns, semantic_data_columns,
+                                     throw_on_pickle_error):
+        if df_keys is None:
+            df_keys = sorted(k for k in item.keys() if k not in dict(selected_columns))
+            item_keys = list(df_keys)
+            for key, columns in selected_columns:
+                df_keys.extend([key + '__' + s for s in columns])
+        row_data = [item[k] for k in item_keys]
+        for key, columns in selected_columns:
+            for column_key in columns:
+                row_data.append(item[key].get(column_key, None))
+        df_items.append(row_data)
+        if len(df_items) == chunk_size:
+            yield to_data_frame(df_items)
+            df_items = []
+    if df_items:
+        yield to_data_frame(df_items)
+
+
 def log_to_ganttplot(execution_history_items):
     """
     Example how to use the DataFrame representation
@@ -0,0 +1,225 @@
+# Copyright (C) 2019 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+
+"""
+.. module:: execution_log_file
+   :synopsis: An append-only binary file format for execution logs
+
+The log consists of two files. The data file starts with :data:`MAGIC` followed by the records. Each record is the
+length of the payload (unsigned 32 bit, little endian) followed by the payload, which is a pickled tuple of the
+history item id and the history item dictionary. The sidecar index file (data file name + :data:`INDEX_SUFFIX`)
+holds one entry per record: the length of the key (unsigned 16 bit), the offset of the record in the data file
+(unsigned 64 bit) and the key itself. As the index can always be rebuilt from the data file, records which are not
+(yet) contained in the index are recovered by the reader.
+
+"""
+from future.utils import native_str
+from builtins import object
+import os
+import pickle
+import shelve
+import struct
+import time
+
+from rafcon.utils import log
+logger = log.get_logger(__name__)
+
+MAGIC = b'RAFCONLOG\x01'
+INDEX_SUFFIX = '.idx'
+FILE_EXTENSION = 'rlog'
+
+_RECORD_HEADER = struct.Struct('<I')
+_INDEX_HEADER = struct.Struct('<HQ')
+
+
+def _to_bytes(key):
+    return native_str(key).encode('utf-8')
+
+
+class ExecutionLogWriter(object):
+    """Appends history items to a binary execution log
+
+    The items are written to the file buffer on every call of :meth:`append`. The buffers are flushed to the disk
+    (`fsync`) at most every `sync_interval` seconds, in :meth:`flush` and in :meth:`close`.
+
+    :param str filename: the path of the data file
+    :param float sync_interval: the minimum time in seconds between two `fsync` calls
+    """
+
+    def __init__(self, filename, sync_interval=1.):
+        self.filename = filename
+        self.sync_interval = sync_interval
+        self._last_sync = time.time()
+        new_file = not os.path.exists(filename) or os.path.getsize(filename) == 0
+        self._data_file = open(filename, 'ab')
+        self._index_file = open(filename + INDEX_SUFFIX, 'ab')
+        if new_file:
+            self._data_file.write(MAGIC)
+        self._offset = self._data_file.tell()
+
+    def append(self, key, value):
+        """Append a single history item
+
+        :param key: the history item id
+        :param dict value: the dictionary representation of the history item
+        """
+        payload = pickle.dumps((native_str(key), value), protocol=2)
+        offset = self._offset
+        self._data_file.write(_RECORD_HEADER.pack(len(payload)))
+        self._data_file.write(payload)
+        self._offset += _RECORD_HEADER.size + len(payload)
+        key = _to_bytes(key)
+        self._index_file.write(_INDEX_HEADER.pack(len(key), offset))
+        self._index_file.write(key)
+        if time.time() - self._last_sync >= self.sync_interval:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered records to the disk"""
+        # the data has to be on the disk before the index entries pointing to it
+        for f in (self._data_file, self._index_file):
+            f.flush()
+            os.fsync(f.fileno())
+        self._last_sync = time.time()
+
+    def close(self):
+        if self._data_file.closed:
+            return
+        self.flush()
+        self._data_file.close()
+        self._index_file.close()
+
+
+class ExecutionLogReader(object):
+    """Read-only dictionary-like access to a binary execution log
+
+    The reader provides the subset of the `shelve` interface used by :mod:`rafcon.utils.execution_log`, thus it can
+    be passed to e.g. :func:`rafcon.utils.execution_log.log_to_raw_structure` instead of an opened shelve file.
+    Values are read from the disk on each access.
+
+    :param str filename: the path of the data file
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._data_file = open(filename, 'rb')
+        if self._data_file.read(len(MAGIC)) != MAGIC:
+            self._data_file.close()
+            raise ValueError("{0} is not an execution log file".format(filename))
+        self._offsets = {}
+        end_of_index = self._read_index()
+        self._recover_records(end_of_index)
+
+    def _read_index(self):
+        """Read the offsets from the index file
+
+        :return: the offset in the data file following the last indexed record
+        """
+        end_of_index = len(MAGIC)
+        if not os.path.exists(self.filename + INDEX_SUFFIX):
+            return end_of_index
+        data_size = os.path.getsize(self.filename)
+        with open(self.filename + INDEX_SUFFIX, 'rb') as index_file:
+            index = index_file.read()
+        position = 0
+        while position + _INDEX_HEADER.size <= len(index):
+            key_length, offset = _INDEX_HEADER.unpack_from(index, position)
+            position += _INDEX_HEADER.size
+            if position + key_length > len(index) or offset >= data_size:
+                break
+            self._offsets[index[position:position + key_length].decode('utf-8')] = offset
+            position += key_length
+            end_of_index = max(end_of_index, offset)
+        if self._offsets:
+            self._data_file.seek(end_of_index)
+            header = self._data_file.read(_RECORD_HEADER.size)
+            if len(header) == _RECORD_HEADER.size:
+                end_of_index += _RECORD_HEADER.size + _RECORD_HEADER.unpack(header)[0]
+        return end_of_index
+
+    def _recover_records(self, offset):
+        """Add records not contained in the index, e.g. after a crash of the writing process"""
+        self._data_file.seek(offset)
+        while True:
+            header = self._data_file.read(_RECORD_HEADER.size)
+            if len(header) < _RECORD_HEADER.size:
+                break
+            payload = self._data_file.read(_RECORD_HEADER.unpack(header)[0])
+            try:
+                key, _ = pickle.loads(payload)
+            except Exception:
+                logger.warning("Truncated record at the end of execution log {0}".format(self.filename))
+                break
+            self._offsets[key] = offset
+            offset += _RECORD_HEADER.size + len(payload)
+
+    def _read_record(self, offset):
+        self._data_file.seek(offset)
+        length = _RECORD_HEADER.unpack(self._data_file.read(_RECORD_HEADER.size))[0]
+        return pickle.loads(self._data_file.read(length))
+
+    def __getitem__(self, key):
+        return self._read_record(self._offsets[native_str(key)])[1]
+
+    def __contains__(self, key):
+        return native_str(key) in self._offsets
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def keys(self):
+        return list(self._offsets.keys())
+
+    def values(self):
+        return [value for _, value in self.items()]
+
+    def items(self):
+        """Returns all items in the order they were written"""
+        return list(self.iter_items())
+
+    def iter_items(self):
+        """Yields all items in the order they were written, reading only one item at a time"""
+        for offset in sorted(self._offsets.values()):
+            yield self._read_record(offset)
+
+    def close(self):
+        self._data_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def convert_shelve_log(shelve_filename, filename=None):
+    """Convert an execution log stored as shelve into the binary execution log format
+
+    :param str shelve_filename: the path of the shelve file
+    :param str filename: the path of the new log file, by default the path of the shelve with a new file extension
+    :return: the path of the new log file
+    :rtype: str
+    """
+    if filename is None:
+        filename = os.path.splitext(shelve_filename)[0] + '.' + FILE_EXTENSION
+    store = shelve.open(shelve_filename, flag='r')
+    writer = ExecutionLogWriter(filename)
+    try:
+        for key, value in store.items():
+            writer.append(key, value)
+    finally:
+        writer.close()
+        store.close()
+    return filename
@@ -99,6 +99,18 @@ def load_dict_from_yaml(path):
     return dictionary
 
 
+def dump_dict_to_json_string(dictionary, **kwargs):
+    """
+    Convert a dictionary to a json string, as written by :func:`write_dict_to_json`.
+    :param dictionary: The dictionary to be converted
+    :param kwargs: optional additional parameters for dumper
+    :return: the json string
+    """
+    return json.dumps(dictionary, cls=JSONObjectEncoder,
+                      indent=4, separators=(', ', ': '), builtins_str="__builtin__", sort_keys=True,
+                      check_circular=False, **kwargs)
+
+
 def write_dict_to_json(dictionary, path, **kwargs):
     """
     Write a dictionary to a json file.
@@ -106,14 +118,23 @@ def write_dict_to_json(dictionary, path, **kwargs):
     :param dictionary: The dictionary to get saved
     :param kwargs: optional additional parameters for dumper
     """
-    result_string = json.dumps(dictionary, cls=JSONObjectEncoder,
-                               indent=4, separators=(', ', ': '), builtins_str="__builtin__", sort_keys=True,
-                               check_circular=False, **kwargs)
+    result_string = dump_dict_to_json_string(dictionary, **kwargs)
     with open(path, 'w') as f:
         # We cannot write directly to the file, as otherwise the 'encode' method wouldn't be called
         f.write(result_string)
 
 
+def load_objects_from_json_string(json_string, as_dict=False):
+    """Loads a dictionary from a json string.
+
+    :param json_string: The json string, e.g. the content of a json file.
+    :return: The dictionary specified in the json string
+    """
+    if as_dict:
+        return json.loads(json_string)
+    return json.loads(json_string, cls=JSONObjectDecoder, substitute_modules=substitute_modules)
+
+
 def load_objects_from_json(path, as_dict=False):
     """Loads a dictionary from a json file.
 
@@ -0,0 +1,88 @@
+import csv
+import json
+import os
+
+from rafcon.core.batch_runner import BatchRunner, create_result_sink, read_inputs
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.state_machine import StateMachine
+from rafcon.core.storage import storage
+import rafcon.core.singleton
+
+from tests import utils as testing_utils
+
+DOUBLE_SCRIPT = """
+def execute(self, inputs, outputs, gvm):
+    outputs["y"] = inputs["x"] * 2
+    return 0
+"""
+
+
+def create_state_machine_path():
+    root_state = HierarchyState("root")
+    x = root_state.add_input_data_port("x", "int", 1)
+    y = root_state.add_output_data_port("y", "int")
+    state = ExecutionState("double")
+    state.script_text = DOUBLE_SCRIPT
+    root_state.add_state(state)
+    root_state.set_start_state(state)
+    state_x = state.add_input_data_port("x", "int")
+    state_y = state.add_output_data_port("y", "int")
+    root_state.add_data_flow(root_state.state_id, x, state.state_id, state_x)
+    root_state.add_data_flow(state.state_id, state_y, root_state.state_id, y)
+    root_state.add_transition(state.state_id, 0, root_state.state_id, 0)
+    path = testing_utils.get_unique_temp_path()
+    storage.save_state_machine_to_path(StateMachine(root_state), path)
+    return path
+
+
+def remove_state_machine(path):
+    state_machine_manager = rafcon.core.singleton.state_machine_manager
+    state_machine = state_machine_manager.get_open_state_machine_of_file_system_path(path)
+    if state_machine is not None:
+        state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+
+
+def test_sequential_batch(caplog):
+    path = create_state_machine_path()
+    results_path = os.path.join(testing_utils.get_unique_temp_path(), "results.jsonl")
+    inputs_path = results_path.replace("results", "inputs")
+    with open(inputs_path, 'w') as inputs_file:
+        for x in range(3):
+            inputs_file.write(json.dumps({"x": x}) + "\n")
+
+    sink = create_result_sink(results_path)
+    try:
+        report = BatchRunner(path).run(read_inputs(inputs_path), sink)
+    finally:
+        sink.close()
+        remove_state_machine(path)
+
+    assert report.number_of_runs == 3 and report.number_of_errors == 0
+    assert report.outcomes == {"success": 3}
+    assert report.runs_per_second > 0
+    with open(results_path) as results_file:
+        results = [json.loads(line) for line in results_file]
+    assert [result["output_data"]["y"] for result in results] == [0, 2, 4]
+    assert all(result["final_outcome_id"] == 0 and result["error"] is None for result in results)
+    testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
+def test_batch_in_worker_processes(caplog):
+    path = create_state_machine_path()
+    results_path = os.path.join(testing_utils.get_unique_temp_path(), "results.csv")
+
+    sink = create_result_sink(results_path)
+    try:
+        report = BatchRunner(path, number_of_workers=2).run([{"x": x} for x in range(6)] + [None], sink)
+    finally:
+        sink.close()
+        remove_state_machine(path)
+
+    assert report.number_of_runs == 7 and report.outcomes == {"success": 7}
+    with open(results_path) as results_file:
+        rows = list(csv.DictReader(results_file))
+    # the results are written in order of completion
+    y_by_run = {int(row["run"]): json.loads(row["output_data"])["y"] for row in rows}
+    assert y_by_run == {0: 0, 1: 2, 2: 4, 3: 6, 4: 8, 5: 10, 6: 2}
+    testing_utils.assert_logger_warnings_and_errors(caplog)
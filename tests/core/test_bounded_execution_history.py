@@ -0,0 +1,203 @@
+import threading
+
+from rafcon.core.config import global_config
+from rafcon.core.execution.execution_context import ExecutionContext
+from rafcon.core.execution.execution_history import ExecutionHistory, CallType
+from rafcon.core.execution.history_writer import ExecutionHistoryWriter
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.state_machine import StateMachine
+from rafcon.utils import log
+
+from tests import utils as testing_utils
+from tests.utils import wait_for_execution_engine_sync_counter
+
+logger = log.get_logger(__name__)
+
+EMPTY_SCRIPT = """
+def execute(self, inputs, outputs, gvm):
+    return 0
+"""
+
+
+def test_eviction_of_oldest_items():
+    state = ExecutionState("state")
+    execution_history = ExecutionHistory(max_items=8)
+    pushed_items = [execution_history.push_call_history_item(state, CallType.EXECUTE, None) for _ in range(30)]
+
+    assert 8 <= len(execution_history) < 8 + 2
+    assert execution_history.number_of_evicted_items + len(execution_history) == 30
+    retained_items = list(execution_history)
+    assert retained_items == pushed_items[-len(retained_items):]
+    assert retained_items[0].prev is None
+    assert all(item.next is next_item for item, next_item in zip(retained_items, retained_items[1:]))
+    evicted_item = pushed_items[execution_history.number_of_evicted_items - 1]
+    assert evicted_item.next is None
+
+    # backward stepping works within the retained items
+    assert execution_history.pop_last_item() is pushed_items[-1]
+
+
+class SlowStorage(object):
+    """A storage, which does not store any item until it is released"""
+
+    filename = "slow_storage"
+
+    def __init__(self):
+        self.items = {}
+        self.released = threading.Event()
+
+    def store_item(self, key, value):
+        self.released.wait()
+        self.items[key] = value
+
+    def flush(self):
+        pass
+
+    def close(self, make_read_and_writable_for_all=False):
+        pass
+
+
+def test_eviction_with_history_writer():
+    hierarchy_state = HierarchyState("hierarchy")
+    state = ExecutionState("state")
+    hierarchy_state.add_state(state)
+    storage = SlowStorage()
+    execution_history = ExecutionHistory(max_items=4)
+    execution_history.set_execution_history_storage(ExecutionHistoryWriter(storage, max_queue_size=100))
+    pushed_items = [execution_history.push_call_history_item(state, CallType.EXECUTE, hierarchy_state, {})
+                    for _ in range(20)]
+    assert execution_history.number_of_evicted_items > 0
+    pushed_item_ids = [item.history_item_id for item in pushed_items]
+
+    storage.released.set()
+    execution_history.execution_history_storage.close()
+    assert len(storage.items) == 20
+    assert storage.items[pushed_item_ids[0]]['prev_history_item_id'] is None
+    for prev_item_id, item_id in zip(pushed_item_ids, pushed_item_ids[1:]):
+        assert storage.items[item_id]['prev_history_item_id'] == prev_item_id
+    # the oldest retained item is only unlinked from the object of its predecessor
+    oldest_retained_item = execution_history[0]
+    assert oldest_retained_item.prev is None
+    assert oldest_retained_item.to_dict()['prev_history_item_id'] == \
+        pushed_item_ids[execution_history.number_of_evicted_items - 1]
+
+
+def create_state_machine_with_chain(number_of_states):
+    root_state = HierarchyState("root", state_id="ROOT")
+    last_state = None
+    for i in range(number_of_states):
+        state = ExecutionState("state{0}".format(i), state_id="STATE{0}".format(i))
+        state.script_text = EMPTY_SCRIPT
+        root_state.add_state(state)
+        if last_state is None:
+            root_state.set_start_state(state)
+        else:
+            root_state.add_transition(last_state.state_id, 0, state.state_id, None)
+        last_state = state
+    root_state.add_transition(last_state.state_id, 0, root_state.state_id, 0)
+    return StateMachine(root_state)
+
+
+def test_bounded_histories_of_executions(caplog):
+    state_machine = create_state_machine_with_chain(20)
+    root_state = state_machine.root_state
+
+    global_config.set_config_value("EXECUTION_HISTORY_MAX_ITEMS", 10)
+    global_config.set_config_value("EXECUTION_HISTORY_MAX_RUNS", 1)
+    context = ExecutionContext(state_machine)
+    try:
+        for _ in range(2):
+            context.start()
+            assert context.join(10)
+            assert root_state.final_outcome.outcome_id == 0
+    finally:
+        context.close()
+        global_config.set_config_value("EXECUTION_HISTORY_MAX_ITEMS", 0)
+        global_config.set_config_value("EXECUTION_HISTORY_MAX_RUNS", 0)
+
+    assert len(state_machine.execution_histories) == 1
+    execution_history = state_machine.execution_histories[0]
+    assert len(execution_history) < 10 + 10 // 4
+    assert execution_history.number_of_evicted_items > 0
+    testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
+def test_scoped_data_of_history_items():
+    hierarchy_state = HierarchyState("hierarchy")
+    state = ExecutionState("state")
+    hierarchy_state.add_state(state)
+    hierarchy_state.add_input_data_port("list", "list", [])
+    hierarchy_state.add_input_data_to_scoped_data({"list": [1, 2]})
+    execution_history = ExecutionHistory()
+    call_item = execution_history.push_call_history_item(state, CallType.EXECUTE, hierarchy_state, {"x": 1})
+    # in the default copy mode, the history item is not affected by changes of the values
+    list(hierarchy_state.scoped_data.values())[0].value.append(3)
+
+    scoped_data = call_item.scoped_data
+    assert set(scoped_data.keys()) == set(hierarchy_state.scoped_data.keys())
+    for key, scoped_data_entry in scoped_data.items():
+        assert scoped_data_entry.name == "list"
+        assert scoped_data_entry.value == [1, 2]
+        assert scoped_data_entry.timestamp == hierarchy_state.scoped_data[key].timestamp
+    # each access creates new entries, which can be used to restore the scoped data of a state
+    assert call_item.scoped_data is not scoped_data
+    hierarchy_state.scoped_data = call_item.scoped_data
+    assert list(hierarchy_state.scoped_data.values())[0].value == [1, 2]
+    assert call_item.to_dict()["call_type"] == "EXECUTE"
+
+
+def test_running_containers_are_kept():
+    root_state = HierarchyState("root")
+    child_state = HierarchyState("child")
+    root_state.add_state(child_state)
+    state = ExecutionState("state")
+    child_state.add_state(state)
+    execution_history = ExecutionHistory(max_items=4)
+    root_call_item = execution_history.push_call_history_item(root_state, CallType.CONTAINER, root_state, {})
+    child_call_items = [execution_history.push_call_history_item(child_state, CallType.EXECUTE, root_state, {}),
+                        execution_history.push_call_history_item(child_state, CallType.CONTAINER, child_state, {})]
+    for _ in range(10):
+        execution_history.push_call_history_item(state, CallType.EXECUTE, child_state, {})
+        execution_history.push_return_history_item(state, CallType.EXECUTE, child_state, {})
+
+    assert execution_history.number_of_evicted_items > 0
+    assert list(execution_history)[:3] == [root_call_item] + child_call_items
+    # the last executed state can be stepped backward, but the container state cannot be left, as its first child
+    # states were evicted
+    assert execution_history.is_backward_step_possible()
+    while len(execution_history) > 3:
+        execution_history.pop_last_item()
+    assert not execution_history.is_backward_step_possible()
+
+
+def test_backward_stepping_beyond_bounded_history(caplog):
+    testing_utils.initialize_environment_core(core_config={"EXECUTION_HISTORY_MAX_ITEMS": 4})
+    import rafcon.core.singleton
+    from rafcon.core.singleton import state_machine_execution_engine, state_machine_manager
+
+    state_machine = create_state_machine_with_chain(6)
+    state_machine_manager.add_state_machine(state_machine)
+    try:
+        with state_machine_execution_engine._status.execution_condition_variable:
+            state_machine_execution_engine.synchronization_counter = 0
+        state_machine_execution_engine.step_mode(state_machine.state_machine_id)
+        wait_for_execution_engine_sync_counter(1, logger)
+        for _ in range(5):
+            state_machine_execution_engine.step_into()
+            wait_for_execution_engine_sync_counter(1, logger)
+        execution_history = state_machine.execution_histories[-1]
+        assert execution_history.number_of_evicted_items > 0
+
+        # stepping backward stops at the oldest retained state, further steps are refused
+        for _ in range(4):
+            state_machine_execution_engine.backward_step()
+            wait_for_execution_engine_sync_counter(1, logger)
+        assert state_machine.root_state.child_state is not None
+
+        # the execution can be continued
+        state_machine_execution_engine.start()
+        state_machine_execution_engine.join()
+        assert state_machine.root_state.final_outcome.outcome_id == 0
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog, expected_warnings=2)
@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+import rafcon.core.singleton
+from rafcon.core.compiled_script_cache import CompiledScriptCache
+from rafcon.core.states.execution_state import ExecutionState
+
+from tests import utils as testing_utils
+
+SCRIPT = """
+counter = 0
+
+def execute(self, inputs, outputs, gvm):
+    global counter
+    counter += 1
+    return 0
+"""
+
+
+@pytest.fixture
+def compiled_script_cache():
+    cache = rafcon.core.singleton.compiled_script_cache
+    cache.clear()
+    cache.max_size = 10
+    yield cache
+    cache.max_size = 0
+    cache.clear()
+
+
+def test_lru_eviction():
+    cache = CompiledScriptCache(max_size=2)
+    code = cache.get_code(SCRIPT, "script.py")
+    assert cache.get_code(SCRIPT, "script.py") is code
+    assert cache.get_code(SCRIPT, "other_script.py") is not code
+    assert (cache.hits, cache.misses) == (1, 2)
+    cache.get_code(SCRIPT, "script.py")
+    cache.get_code(SCRIPT + "\n", "script.py")
+    assert len(cache) == 2
+    # other_script.py was used least recently
+    cache.get_code(SCRIPT, "script.py")
+    assert cache.misses == 3
+    cache.get_code(SCRIPT, "other_script.py")
+    assert cache.misses == 4
+
+    with pytest.raises(SyntaxError):
+        cache.get_code("def broken(", "script.py")
+
+
+def test_persisted_bytecode():
+    path = testing_utils.get_unique_temp_path()
+    code = CompiledScriptCache(max_size=2, path=path).get_code(SCRIPT, "script.py")
+    assert len(os.listdir(path)) == 1
+
+    cache = CompiledScriptCache(max_size=2, path=path)
+    persisted_code = cache.get_code(SCRIPT, "script.py")
+    assert persisted_code is not code
+    assert persisted_code.co_code == code.co_code and persisted_code.co_filename == code.co_filename
+
+
+def test_states_share_compiled_scripts(caplog, compiled_script_cache):
+    state1 = ExecutionState("state1")
+    state2 = ExecutionState("state2")
+    # setting the script text compiles the script
+    state1.script_text = SCRIPT
+    misses = compiled_script_cache.misses
+    state2.script_text = SCRIPT
+    state2.script.compile_module()
+    assert compiled_script_cache.misses == misses
+
+    # each compilation still creates a new module with its own globals
+    module = state1.script.compiled_module
+    module.execute(state1, {}, {}, None)
+    state1.script.compile_module()
+    assert state1.script.compiled_module is not module
+    assert module.counter == 1 and state1.script.compiled_module.counter == 0
+    assert state2.script.compiled_module.counter == 0
+    assert compiled_script_cache.misses == misses
+    testing_utils.assert_logger_warnings_and_errors(caplog)
@@ -0,0 +1,88 @@
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.state_elements.data_port import InputDataPort, OutputDataPort
+
+
+def create_container_state():
+    container = HierarchyState("container")
+    container.add_input_data_port("in", "int", 1)
+    container.add_output_data_port("out", "int")
+    container.add_scoped_variable("scoped", "int", 0)
+    state1 = ExecutionState("state1")
+    state1.add_input_data_port("in", "int")
+    state1.add_output_data_port("out", "int")
+    state2 = ExecutionState("state2")
+    state2.add_input_data_port("in", "int")
+    state2.add_output_data_port("out", "int")
+    container.add_state(state1)
+    container.add_state(state2)
+    return container, state1, state2
+
+
+def assert_index_is_consistent(container):
+    index = container.get_data_flow_index()
+    for data_flow in container.data_flows.values():
+        assert data_flow in index.get_data_flows_from(data_flow.from_state, data_flow.from_key)
+        assert data_flow in index.get_data_flows_to(data_flow.to_state, data_flow.to_key)
+    number_of_indexed_data_flows = sum(len(index.get_data_flows_to(df.to_state, df.to_key))
+                                       for df in {(df.to_state, df.to_key): df
+                                                  for df in container.data_flows.values()}.values())
+    assert number_of_indexed_data_flows == len(container.data_flows)
+
+
+def test_data_flow_index_updates():
+    container, state1, state2 = create_container_state()
+    container_in = container.get_io_data_port_id_from_name_and_type("in", InputDataPort)
+    state1_in = state1.get_io_data_port_id_from_name_and_type("in", InputDataPort)
+    state1_out = state1.get_io_data_port_id_from_name_and_type("out", OutputDataPort)
+    state2_in = state2.get_io_data_port_id_from_name_and_type("in", InputDataPort)
+    state2_out = state2.get_io_data_port_id_from_name_and_type("out", OutputDataPort)
+
+    df1_id = container.add_data_flow(container.state_id, container_in, state1.state_id, state1_in)
+    df2_id = container.add_data_flow(state1.state_id, state1_out, state2.state_id, state2_in)
+    assert_index_is_consistent(container)
+    assert container.get_data_flow_index().get_data_flows_to(state2.state_id, state2_in) == \
+        [container.data_flows[df2_id]]
+
+    # modification of a data flow invalidates the index
+    container.data_flows[df2_id].modify_origin(container.state_id, container_in)
+    assert_index_is_consistent(container)
+    assert not container.get_data_flow_index().get_data_flows_from(state1.state_id, state1_out)
+    assert len(container.get_data_flow_index().get_data_flows_from(container.state_id, container_in)) == 2
+
+    container.remove_data_flow(df1_id)
+    assert_index_is_consistent(container)
+    assert not container.get_data_flow_index().get_data_flows_to(state1.state_id, state1_in)
+
+    # removing a state removes its data flows
+    scoped_variable_id = list(container.scoped_variables.keys())[0]
+    container.add_data_flow(state2.state_id, state2_out, container.state_id, scoped_variable_id)
+    container.remove_state(state2.state_id)
+    assert_index_is_consistent(container)
+    assert not container.get_data_flow_index().get_data_flows_from(state2.state_id, state2_out)
+
+    # the id change of the container state changes the data flows
+    old_state_id = container.state_id
+    df3_id = container.add_data_flow(container.state_id, container_in, state1.state_id, state1_in)
+    container.change_state_id()
+    assert_index_is_consistent(container)
+    assert not container.get_data_flow_index().get_data_flows_from(old_state_id, container_in)
+    assert container.get_data_flow_index().get_data_flows_from(container.state_id, container_in) == \
+        [container.data_flows[df3_id]]
+
+
+def test_inputs_for_state():
+    container, state1, state2 = create_container_state()
+    container_in = container.get_io_data_port_id_from_name_and_type("in", InputDataPort)
+    state1_in = state1.get_io_data_port_id_from_name_and_type("in", InputDataPort)
+    state1_out = state1.get_io_data_port_id_from_name_and_type("out", OutputDataPort)
+    state2_in = state2.get_io_data_port_id_from_name_and_type("in", InputDataPort)
+    container.add_data_flow(container.state_id, container_in, state1.state_id, state1_in)
+    container.add_data_flow(state1.state_id, state1_out, state2.state_id, state2_in)
+
+    container.add_input_data_to_scoped_data({"in": 5})
+    assert container.get_inputs_for_state(state1) == {"in": 5}
+    assert container.get_inputs_for_state(state2) == {"in": None}
+
+    container.add_state_execution_output_to_scoped_data({"out": 7}, state1)
+    assert container.get_inputs_for_state(state2) == {"in": 7}
@@ -0,0 +1,78 @@
+import pytest
+numpy = pytest.importorskip("numpy")
+
+from rafcon.core.config import global_config
+from rafcon.core.execution import data_passing
+from rafcon.core.execution.data_passing import pass_value, pass_dict, COPY, IMMUTABLE, REFERENCE
+from rafcon.core.execution.execution_history import CallItem, CallType
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.state_elements.data_port import InputDataPort, OutputDataPort
+
+
+@pytest.fixture
+def data_passing_mode():
+    old_mode = global_config.get_config_value("DATA_PASSING_MODE")
+
+    def set_mode(mode):
+        global_config.set_config_value("DATA_PASSING_MODE", mode)
+    yield set_mode
+    global_config.set_config_value("DATA_PASSING_MODE", old_mode)
+
+
+def test_pass_value():
+    array = numpy.zeros(10)
+    values = [array, [1, 2], (1, "a"), "text", 4.2, None]
+
+    copied = [pass_value(value, COPY) for value in values]
+    assert copied[0] is not array and copied[0].flags.writeable
+    assert copied[1] is not values[1]
+
+    shared = [pass_value(value, IMMUTABLE) for value in values]
+    assert numpy.shares_memory(shared[0], array)
+    assert not shared[0].flags.writeable
+    with pytest.raises(ValueError):
+        shared[0][0] = 1.
+    assert array.flags.writeable
+    assert shared[1] is not values[1] and shared[1] == values[1]
+    for value, shared_value in zip(values[2:], shared[2:]):
+        assert shared_value is value
+
+    referenced = [pass_value(value, REFERENCE) for value in values]
+    for value, referenced_value in zip(values, referenced):
+        assert referenced_value is value
+
+    assert pass_dict({"a": [1]}, IMMUTABLE) == {"a": [1]}
+    assert data_passing.get_data_passing_mode() in data_passing.DATA_PASSING_MODES
+
+
+def create_container_state():
+    container = HierarchyState("container")
+    container.add_input_data_port("in", "numpy.ndarray")
+    state = ExecutionState("state")
+    state.add_input_data_port("in", "numpy.ndarray")
+    state.add_output_data_port("out", "numpy.ndarray")
+    container.add_state(state)
+    container.add_data_flow(container.state_id, container.get_io_data_port_id_from_name_and_type("in", InputDataPort),
+                            state.state_id, state.get_io_data_port_id_from_name_and_type("in", InputDataPort))
+    return container, state
+
+
+@pytest.mark.parametrize("mode", [COPY, IMMUTABLE, REFERENCE])
+def test_inputs_and_history_for_data_passing_mode(data_passing_mode, mode):
+    data_passing_mode(mode)
+    container, state = create_container_state()
+    array = numpy.arange(5)
+    container.add_input_data_to_scoped_data({"in": array})
+
+    input_data = container.get_inputs_for_state(state)
+    assert numpy.array_equal(input_data["in"], array)
+    assert numpy.shares_memory(input_data["in"], array) is (mode != COPY)
+    if mode == IMMUTABLE:
+        assert not input_data["in"].flags.writeable
+
+    history_item = CallItem(state, None, CallType.EXECUTE, container, input_data, "run_id")
+    scoped_data = list(history_item.scoped_data.values())[0]
+    assert numpy.shares_memory(scoped_data.value, array) is (mode != COPY)
+    assert numpy.shares_memory(history_item.child_state_input_output_data["in"], array) is (mode != COPY)
+    assert scoped_data.timestamp == list(container.scoped_data.values())[0].timestamp
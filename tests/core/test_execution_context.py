@@ -0,0 +1,138 @@
+import pytest
+
+import rafcon.core.singleton
+from rafcon.core.execution.execution_context import ExecutionContext
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.state_machine import StateMachine
+
+from tests import utils as testing_utils
+
+WAIT_SCRIPT = """
+def execute(self, inputs, outputs, gvm):
+    self.preemptive_wait(inputs["duration"])
+    outputs["duration"] = inputs["duration"]
+    return 0
+"""
+
+
+def create_state_machine(duration):
+    root_state = HierarchyState("root")
+    root_input = root_state.add_input_data_port("duration", "float", duration)
+    root_output = root_state.add_output_data_port("duration", "float")
+    state = ExecutionState("wait")
+    state.script_text = WAIT_SCRIPT
+    state_input = state.add_input_data_port("duration", "float")
+    state_output = state.add_output_data_port("duration", "float")
+    root_state.add_state(state)
+    root_state.set_start_state(state)
+    root_state.add_data_flow(root_state.state_id, root_input, state.state_id, state_input)
+    root_state.add_data_flow(state.state_id, state_output, root_state.state_id, root_output)
+    root_state.add_transition(state.state_id, 0, root_state.state_id, 0)
+    return StateMachine(root_state)
+
+
+def test_concurrent_state_machines(caplog):
+    state_machines = [create_state_machine(0.2), create_state_machine(0.2)]
+    contexts = [ExecutionContext(state_machine) for state_machine in state_machines]
+    assert list(state_machines[0].root_state.states.values())[0].get_execution_engine() is contexts[0]
+    with pytest.raises(ValueError):
+        ExecutionContext(state_machines[0])
+
+    for i, context in enumerate(contexts):
+        context.start(input_data={"duration": 0.1 * (i + 1)})
+    for context in contexts:
+        assert context.join(10)
+
+    singleton_engine = rafcon.core.singleton.state_machine_execution_engine
+    assert singleton_engine.finished_or_stopped()
+    for i, (context, state_machine) in enumerate(zip(contexts, state_machines)):
+        assert context.finished_or_stopped()
+        assert state_machine.root_state.final_outcome.outcome_id == 0
+        assert state_machine.root_state.output_data["duration"] == 0.1 * (i + 1)
+        context.close()
+        assert state_machine.execution_context is None
+    testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
+def test_stop_single_context(caplog):
+    stopped_state_machine = create_state_machine(10.)
+    state_machine = create_state_machine(1.)
+    stopped_context = ExecutionContext(stopped_state_machine)
+    context = ExecutionContext(state_machine)
+    try:
+        stopped_context.start()
+        context.start()
+        with pytest.raises(RuntimeError):
+            stopped_context.close()
+        stopped_context.stop()
+        assert stopped_context.join(10)
+        # the other state machine is still executed
+        assert not context.finished_or_stopped()
+        assert context.join(10)
+        assert stopped_state_machine.root_state.final_outcome.outcome_id == -2
+        assert state_machine.root_state.final_outcome.outcome_id == 0
+    finally:
+        stopped_context.close()
+        context.close()
+    testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
+def test_execute_state_machine_of_context(caplog):
+    state_machine = create_state_machine(0.1)
+    context = ExecutionContext(state_machine)
+    singleton_engine = rafcon.core.singleton.state_machine_execution_engine
+    try:
+        with pytest.raises(ValueError):
+            context.execute_state_machine_from_path(create_state_machine(0.1))
+        assert context.execute_state_machine_from_path() is state_machine
+        assert state_machine.root_state.final_outcome.outcome_id == 0
+        assert context.finished_or_stopped() and singleton_engine.finished_or_stopped()
+    finally:
+        context.close()
+    testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
+def test_context_keeps_shared_execution_settings(caplog):
+    from rafcon.core.config import global_config
+    from rafcon.core.execution import execution_engine
+    thread_pool = rafcon.core.singleton.execution_thread_pool
+    previous_max_idle_workers = thread_pool.max_idle_workers
+    previous_thread_pool_size = global_config.get_config_value("EXECUTION_THREAD_POOL_SIZE", 0)
+    previous_settings_applied = execution_engine._shared_execution_settings_applied
+    execution_engine._shared_execution_settings_applied = True
+    global_config.set_config_value("EXECUTION_THREAD_POOL_SIZE", previous_max_idle_workers + 3)
+    context = ExecutionContext(create_state_machine(0.1))
+    try:
+        context.start()
+        assert context.join(10)
+        # the settings applied by the execution engine singleton are not changed by the context
+        assert thread_pool.max_idle_workers == previous_max_idle_workers
+    finally:
+        context.close()
+        global_config.set_config_value("EXECUTION_THREAD_POOL_SIZE", previous_thread_pool_size)
+        execution_engine._shared_execution_settings_applied = previous_settings_applied
+    testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
+def test_running_state_machine_is_not_removed(caplog):
+    from rafcon.core.state_machine_manager import StateMachineManager
+    state_machine_manager = StateMachineManager()
+    state_machine = create_state_machine(10.)
+    other_state_machine = create_state_machine(0.1)
+    state_machine_manager.add_state_machine(other_state_machine)
+    state_machine_manager.add_state_machine(state_machine)
+    context = ExecutionContext(state_machine)
+    try:
+        context.start()
+        with pytest.raises(AttributeError):
+            state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+        with pytest.raises(AttributeError):
+            state_machine_manager.active_state_machine_id = state_machine.state_machine_id
+        assert state_machine.state_machine_id in state_machine_manager.state_machines
+        context.stop()
+        assert context.join(10)
+        assert state_machine_manager.remove_state_machine(state_machine.state_machine_id) is state_machine
+    finally:
+        context.close()
+    testing_utils.assert_logger_warnings_and_errors(caplog)
@@ -2,6 +2,10 @@
 import rafcon.core.singleton
 from rafcon.core.storage import storage as global_storage
 import rafcon.utils.execution_log as log_helper
+from rafcon.utils import execution_log_file
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.state_machine import StateMachine
 
 # test environment elements
 import pytest
@@ -62,6 +66,136 @@ def test_execution_log(caplog):
     finally:
         testing_utils.shutdown_environment_only_core(caplog=caplog, expected_warnings=0, expected_errors=0)
 
+def create_state_machine():
+    root_state = HierarchyState("root")
+    last_state = None
+    for i in range(3):
+        state = ExecutionState("state" + str(i), path=testing_utils.TEST_SCRIPT_PATH, filename="script_small_wait.py")
+        root_state.add_state(state)
+        if last_state is None:
+            root_state.set_start_state(state.state_id)
+        else:
+            root_state.add_transition(last_state.state_id, 0, state.state_id, None)
+        last_state = state
+    root_state.add_transition(last_state.state_id, 0, root_state.state_id, 0)
+    return StateMachine(root_state)
+
+
+@pytest.mark.parametrize("execution_log_format", ["shelve", "binary"])
+def test_streaming_execution_log(caplog, execution_log_format):
+    try:
+        testing_utils.initialize_environment_core(
+            core_config={'EXECUTION_LOG_ENABLE': True,
+                         'EXECUTION_LOG_FORMAT': execution_log_format,
+                         'EXECUTION_LOG_PATH': testing_utils.get_unique_temp_path()+'/test_streaming_execution_log'})
+
+        state_machine = global_storage.load_state_machine_from_path(
+            testing_utils.get_test_sm_path(os.path.join("unit_test_state_machines",
+                                                        "execution_file_log_test")))
+
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        rafcon.core.singleton.state_machine_execution_engine.start(state_machine.state_machine_id)
+        rafcon.core.singleton.state_machine_execution_engine.join()
+
+        log = log_helper.open_execution_log(state_machine.get_last_execution_log_filename())
+        items = list(log_helper.iter_log_items(log))
+        assert len(items) == 36
+        assert [item['timestamp'] for item in items] == sorted(item['timestamp'] for item in items)
+
+        start, next, concurrent, hierarchy, collapsed_items = log_helper.log_to_collapsed_structure(log)
+        streamed_items = {item['run_id']: item for item in log_helper.iter_collapsed_items(log)}
+        collapsed_items.pop(start['run_id'])
+        assert set(streamed_items.keys()) == set(collapsed_items.keys())
+        for run_id, item in collapsed_items.items():
+            assert set(streamed_items[run_id].keys()) == set(item.keys())
+            for key in ['path', 'outcome_name', 'timestamp_call', 'timestamp_return']:
+                assert streamed_items[run_id][key] == item[key]
+            for key in ['data_ins', 'data_outs', 'scoped_data_ins', 'scoped_data_outs', 'semantic_data']:
+                assert set(streamed_items[run_id][key].keys()) == set(item[key].keys())
+
+        # projection of the data ports
+        prod2 = [item for item in log_helper.iter_collapsed_items(log, data_in_columns=[], data_out_columns=[],
+                                                                  scoped_out_columns=['product'])
+                 if item['state_name'] == 'MakeProd2'][0]
+        assert prod2['data_ins'] == {} and prod2['data_outs'] == {}
+        assert prod2['scoped_data_outs'] == {'product': 1}
+
+        # filters
+        prod2_items = list(log_helper.iter_collapsed_items(log, path_prefix=prod2['path']))
+        assert prod2['run_id'] in [item['run_id'] for item in prod2_items]
+        assert all(item['path'].startswith(prod2['path']) for item in prod2_items)
+        assert [item['run_id'] for item in log_helper.iter_collapsed_items(log, run_ids=[prod2['run_id']])] == \
+            [prod2['run_id']]
+
+        try:
+            chunks = list(log_helper.log_to_DataFrame_chunks(log, chunk_size=4, data_out_columns=['output_1']))
+        except ImportError:  # if pandas is not installed
+            pass
+        else:
+            df = log_helper.log_to_DataFrame(log, data_out_columns=['output_1'])
+            assert all(len(chunk) <= 4 for chunk in chunks)
+            assert sum(len(chunk) for chunk in chunks) == len(df)
+            assert list(chunks[0].columns) == list(df.columns)
+
+        log.close()
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog, expected_warnings=0, expected_errors=0)
+
+
+@pytest.mark.parametrize("writer_queue_size", [0, 2])
+def test_binary_execution_log(caplog, writer_queue_size):
+    try:
+        testing_utils.initialize_environment_core(
+            core_config={'EXECUTION_LOG_ENABLE': True,
+                         'EXECUTION_LOG_FORMAT': 'binary',
+                         'EXECUTION_LOG_WRITER_QUEUE_SIZE': writer_queue_size,
+                         'EXECUTION_LOG_PATH': testing_utils.get_unique_temp_path()+'/test_binary_execution_log'})
+
+        state_machine = create_state_machine()
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        rafcon.core.singleton.state_machine_execution_engine.start(state_machine.state_machine_id)
+        rafcon.core.singleton.state_machine_execution_engine.join()
+
+        log_filename = state_machine.get_last_execution_log_filename()
+        assert log_filename.endswith('.rlog')
+        with log_helper.open_execution_log(log_filename) as log:
+            # start item + call and return item of the root state and its three children
+            assert len(log) == 9
+            start_item, previous, next_, concurrent, grouped = log_helper.log_to_raw_structure(log)
+            assert start_item['item_type'] == 'StateMachineStartItem'
+            assert len(next_) == 8
+            assert len(grouped) == 5
+            items = dict(log.items())
+
+        # an incomplete index, e.g. after a crash, is restored from the data file
+        with open(log_filename + execution_log_file.INDEX_SUFFIX, 'rb+') as index_file:
+            index_file.truncate(100)
+        with execution_log_file.ExecutionLogReader(log_filename) as log:
+            assert dict(log.items()) == items
+
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog, expected_warnings=0, expected_errors=0)
+
+
+def test_convert_shelve_log():
+    import shelve
+    shelve_filename = os.path.join(testing_utils.get_unique_temp_path(), 'log.shelve')
+    store = shelve.open(shelve_filename, flag='c', protocol=2)
+    store['a'] = {'item_type': 'StateMachineStartItem', 'run_id': 'r0'}
+    store['b'] = {'item_type': 'CallItem', 'run_id': 'r1', 'prev_history_item_id': 'a'}
+    store.close()
+
+    filename = execution_log_file.convert_shelve_log(shelve_filename)
+    with execution_log_file.ExecutionLogReader(filename) as log:
+        assert sorted(log.keys()) == ['a', 'b']
+        assert log['b']['prev_history_item_id'] == 'a'
+        start_item, previous, next_, concurrent, grouped = log_helper.log_to_raw_structure(log)
+        assert start_item['run_id'] == 'r0'
+        assert next_ == {'a': 'b'}
+
+
 if __name__ == '__main__':
     test_execution_log(None)
     # pytest.main([__file__])
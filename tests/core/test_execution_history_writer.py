@@ -0,0 +1,130 @@
+import threading
+
+import pytest
+
+from rafcon.core.execution.history_writer import ExecutionHistoryWriter, BLOCK, DROP_VERBOSE, SPILL
+
+from tests import utils as testing_utils
+
+
+class BlockingStorage(object):
+    """A storage, which does not store any item until it is released"""
+
+    filename = "blocking_storage"
+
+    def __init__(self):
+        self.items = {}
+        self.released = threading.Event()
+        self.closed = False
+
+    def store_item(self, key, value):
+        self.released.wait()
+        self.items[key] = value
+
+    def flush(self):
+        pass
+
+    def close(self, make_read_and_writable_for_all=False):
+        self.closed = True
+
+
+class DummyHistoryItem(object):
+
+    def __init__(self, history_item_id):
+        self.history_item_id = history_item_id
+
+    def to_record(self):
+        return {'history_item_id': self.history_item_id}
+
+
+class PicklingThreadRecorder(object):
+    """A data value remembering the threads it was pickled in"""
+
+    threads = []
+
+    def __getstate__(self):
+        PicklingThreadRecorder.threads.append(threading.current_thread().name)
+        return {}
+
+
+def store_items(writer, number_of_items):
+    for i in range(number_of_items):
+        writer.store_history_item(DummyHistoryItem(str(i)))
+
+
+def test_block():
+    storage = BlockingStorage()
+    writer = ExecutionHistoryWriter(storage, max_queue_size=2, backpressure=BLOCK)
+    producer = threading.Thread(target=store_items, args=(writer, 10))
+    producer.start()
+    producer.join(0.3)
+    # the producer is blocked by the full queue
+    assert producer.is_alive()
+    assert writer.queue_depth == 2
+    storage.released.set()
+    producer.join()
+    writer.close()
+    assert storage.closed
+    assert len(storage.items) == 10
+    assert writer.get_metrics()['items_written'] == 10
+    assert writer.get_metrics()['queue_depth'] == 0
+
+
+def test_drop_verbose(caplog):
+    storage = BlockingStorage()
+    writer = ExecutionHistoryWriter(storage, max_queue_size=2, backpressure=DROP_VERBOSE)
+    store_items(writer, 10)
+    storage.released.set()
+    writer.close()
+    metrics = writer.get_metrics()
+    # one item is taken by the writer thread, two items fit into the queue
+    assert metrics['items_dropped'] in (7, 8)
+    assert metrics['items_written'] + metrics['items_dropped'] == 10
+    assert len(storage.items) == metrics['items_written']
+    testing_utils.assert_logger_warnings_and_errors(caplog, expected_warnings=2)
+
+
+def test_spill():
+    storage = BlockingStorage()
+    writer = ExecutionHistoryWriter(storage, max_queue_size=2, backpressure=SPILL)
+    store_items(writer, 10)
+    assert writer.get_metrics()['items_spilled'] >= 7
+    storage.released.set()
+    writer.flush()
+    assert writer.queue_depth == 0
+    assert sorted(storage.items.keys()) == sorted(str(i) for i in range(10))
+    writer.close()
+
+
+def test_items_are_serialized_when_stored():
+    storage = BlockingStorage()
+    writer = ExecutionHistoryWriter(storage, max_queue_size=10, backpressure=BLOCK)
+    history_item = DummyHistoryItem("0")
+    history_item.name = "stored"
+    history_item.to_record = lambda: {'name': history_item.name, 'thread': threading.current_thread().name}
+    writer.store_history_item(history_item)
+    # changes after storing the item are not written
+    history_item.name = "changed"
+    storage.released.set()
+    writer.close()
+    assert storage.items["0"] == {'name': "stored", 'thread': threading.current_thread().name}
+
+
+def test_data_is_pickled_by_the_writer():
+    storage = BlockingStorage()
+    writer = ExecutionHistoryWriter(storage, max_queue_size=10, backpressure=BLOCK)
+    history_item = DummyHistoryItem("0")
+    history_item.to_record = lambda: {'input_output_data': {'value': PicklingThreadRecorder()},
+                                      'scoped_data': [('value', object)], 'semantic_data': {}}
+    del PicklingThreadRecorder.threads[:]
+    writer.store_history_item(history_item)
+    storage.released.set()
+    writer.close()
+    assert PicklingThreadRecorder.threads == ["ExecutionHistoryWriter"]
+    assert set(storage.items["0"]['input_output_data'].keys()) == {'value'}
+    assert set(storage.items["0"]['scoped_data'].keys()) == {'value'}
+
+
+def test_unknown_backpressure_policy():
+    with pytest.raises(ValueError):
+        ExecutionHistoryWriter(BlockingStorage(), backpressure="unknown")
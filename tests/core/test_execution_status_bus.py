@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pytest
+
+import rafcon.core.singleton
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.state import StateExecutionStatus
+
+
+class NotificationRecorder(object):
+    """Records the after notifications of a state"""
+
+    def __init__(self, state):
+        self.notifications = []
+        self.threads = set()
+        state._notify_method_after = self
+
+    def __call__(self, instance, method_name, result, args, kwargs):
+        self.notifications.append((method_name, args[1]))
+        self.threads.add(threading.current_thread())
+
+
+@pytest.fixture
+def execution_status_bus():
+    bus = rafcon.core.singleton.execution_status_bus
+    yield bus
+    bus.interval = 0
+    bus.shutdown()
+
+
+def test_synchronous_notification():
+    state = ExecutionState("state")
+    recorder = NotificationRecorder(state)
+    state.state_execution_status = StateExecutionStatus.ACTIVE
+    state.state_execution_status = StateExecutionStatus.INACTIVE
+    assert recorder.notifications == [("state_execution_status", StateExecutionStatus.ACTIVE),
+                                      ("state_execution_status", StateExecutionStatus.INACTIVE)]
+
+
+def test_coalesced_notification(execution_status_bus):
+    state1 = ExecutionState("state1")
+    state2 = ExecutionState("state2")
+    recorder1 = NotificationRecorder(state1)
+    recorder2 = NotificationRecorder(state2)
+    execution_status_bus.interval = 10.
+    published_changes = execution_status_bus.number_of_published_changes
+
+    state1.state_execution_status = StateExecutionStatus.ACTIVE
+    state2.state_execution_status = StateExecutionStatus.ACTIVE
+    state1.state_execution_status = StateExecutionStatus.WAIT_FOR_NEXT_STATE
+    state1.state_execution_status = StateExecutionStatus.INACTIVE
+    # the status is changed immediately, but not yet notified
+    assert state1.state_execution_status is StateExecutionStatus.INACTIVE
+    assert not recorder1.notifications and not recorder2.notifications
+    assert execution_status_bus.number_of_published_changes - published_changes == 4
+
+    execution_status_bus.flush()
+    assert recorder1.notifications == [("state_execution_status", StateExecutionStatus.INACTIVE)]
+    assert recorder2.notifications == [("state_execution_status", StateExecutionStatus.ACTIVE)]
+
+
+def test_background_delivery(execution_status_bus):
+    state = ExecutionState("state")
+    recorder = NotificationRecorder(state)
+    execution_status_bus.interval = 0.01
+    state.state_execution_status = StateExecutionStatus.ACTIVE
+    for _ in range(100):
+        if recorder.notifications:
+            break
+        time.sleep(0.01)
+    assert recorder.notifications == [("state_execution_status", StateExecutionStatus.ACTIVE)]
+    assert threading.current_thread() not in recorder.threads
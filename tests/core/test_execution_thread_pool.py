@@ -0,0 +1,95 @@
+import threading
+
+# core elements
+import rafcon.core.singleton
+from rafcon.core.execution.thread_pool import ExecutionThreadPool
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.states.barrier_concurrency_state import BarrierConcurrencyState
+from rafcon.core.state_machine import StateMachine
+from rafcon.core.constants import UNIQUE_DECIDER_STATE_ID
+
+# test environment elements
+from tests import utils as testing_utils
+
+
+def test_thread_reuse():
+    pool = ExecutionThreadPool(max_idle_workers=2, idle_timeout=5.)
+    used_threads = []
+    finished = threading.Event()
+
+    def task():
+        used_threads.append(threading.current_thread())
+        finished.set()
+
+    for _ in range(5):
+        finished.clear()
+        handle = pool.submit(task)
+        assert handle.join(5.)
+        assert not handle.is_alive()
+        # wait until the worker went back to idle before the next task is submitted
+        while pool.number_of_idle_workers == 0:
+            finished.wait(0.01)
+
+    assert len(set(used_threads)) == 1
+    pool.shutdown()
+    assert pool.number_of_idle_workers == 0
+
+
+def test_nested_tasks_do_not_block():
+    pool = ExecutionThreadPool(max_idle_workers=1, idle_timeout=5.)
+    results = []
+
+    def inner(i):
+        results.append(i)
+
+    def outer():
+        handles = [pool.submit(lambda i=i: inner(i)) for i in range(10)]
+        for handle in handles:
+            handle.join()
+
+    assert pool.submit(outer).join(5.)
+    assert sorted(results) == list(range(10))
+    pool.shutdown()
+
+
+def create_state_machine():
+    root_state = HierarchyState("root")
+    barrier_state = BarrierConcurrencyState("barrier")
+    root_state.add_state(barrier_state)
+    root_state.set_start_state(barrier_state.state_id)
+    root_state.add_transition(barrier_state.state_id, 0, root_state.state_id, 0)
+
+    for i in range(3):
+        hierarchy_state = HierarchyState("hierarchy" + str(i))
+        last_state = None
+        for j in range(5):
+            state = ExecutionState("state" + str(j), path=testing_utils.TEST_SCRIPT_PATH,
+                                   filename="script_small_wait.py")
+            hierarchy_state.add_state(state)
+            if last_state is None:
+                hierarchy_state.set_start_state(state.state_id)
+            else:
+                hierarchy_state.add_transition(last_state.state_id, 0, state.state_id, None)
+            last_state = state
+        hierarchy_state.add_transition(last_state.state_id, 0, hierarchy_state.state_id, 0)
+        barrier_state.add_state(hierarchy_state)
+    barrier_state.add_transition(barrier_state.states[UNIQUE_DECIDER_STATE_ID].state_id, 0,
+                                 barrier_state.state_id, 0)
+    return StateMachine(root_state)
+
+
+def test_state_machine_execution_with_thread_pool(caplog):
+    testing_utils.initialize_environment_core(core_config={"EXECUTION_THREAD_POOL_SIZE": 4})
+    try:
+        for _ in range(2):
+            state_machine = create_state_machine()
+            rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+            rafcon.core.singleton.state_machine_execution_engine.start(state_machine.state_machine_id)
+            rafcon.core.singleton.state_machine_execution_engine.join()
+            rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+            assert state_machine.root_state.final_outcome.outcome_id == 0
+            assert rafcon.core.singleton.execution_thread_pool.number_of_idle_workers > 0
+    finally:
+        rafcon.core.singleton.execution_thread_pool.shutdown()
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
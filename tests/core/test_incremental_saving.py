@@ -0,0 +1,112 @@
+import os
+
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.state_machine import StateMachine
+from rafcon.core.storage import storage
+
+from tests import utils as testing_utils
+
+
+def create_state_machine():
+    root_state = HierarchyState("root")
+    for i in range(3):
+        state = ExecutionState("state_{0}".format(i), path=testing_utils.TEST_SCRIPT_PATH,
+                               filename="script_small_wait.py")
+        state.semantic_data = {"index": i}
+        root_state.add_state(state)
+    return StateMachine(root_state)
+
+
+def test_incremental_saving(caplog):
+    path = testing_utils.get_unique_temp_path()
+    state_machine = create_state_machine()
+    states = list(state_machine.root_state.states.values())
+
+    # statemachine.json, four core data files, three scripts and three semantic data files
+    assert storage.save_state_machine_to_path(state_machine, path) == 11
+    # only the update time in statemachine.json might have changed
+    assert storage.save_state_machine_to_path(state_machine, path) <= 1
+
+    states[0].script_text += "\n# modified\n"
+    assert storage.save_state_machine_to_path(state_machine, path) in (1, 2)
+    with open(os.path.join(states[0].file_system_path, storage.SCRIPT_FILE)) as script_file:
+        assert script_file.read() == states[0].script_text
+
+    # files modified by others are written again
+    core_data_path = os.path.join(states[1].file_system_path, storage.FILE_NAME_CORE_DATA)
+    with open(core_data_path, 'a') as core_data_file:
+        core_data_file.write("\n")
+    assert storage.save_state_machine_to_path(state_machine, path) in (1, 2)
+    assert storage.load_state_from_path(states[1].file_system_path) == states[1]
+
+    # renaming a state creates a new folder and removes the old one
+    old_state_path = states[2].file_system_path
+    states[2].name = "renamed"
+    assert storage.save_state_machine_to_path(state_machine, path) in (3, 4)
+    assert not os.path.exists(old_state_path)
+    assert os.path.exists(os.path.join(states[2].file_system_path, storage.FILE_NAME_CORE_DATA))
+
+    # unchanged files are not written after loading the state machine in a new process
+    storage.forget_saved_files(path)
+    loaded_state_machine = storage.load_state_machine_from_path(path)
+    assert storage.save_state_machine_to_path(loaded_state_machine, path) <= 1
+    assert storage.load_state_machine_from_path(path).root_state == state_machine.root_state
+    testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
+def test_state_machine_snapshot(caplog):
+    path = testing_utils.get_unique_temp_path()
+    state_machine = create_state_machine()
+    states = list(state_machine.root_state.states.values())
+
+    snapshot = storage.create_state_machine_snapshot(state_machine)
+    assert storage.write_state_machine_snapshot(snapshot, path)[0] == 11
+    # the snapshot is saved as copy
+    assert state_machine.file_system_path is None and states[0].file_system_path is None
+    assert storage.load_state_machine_from_path(path).root_state == state_machine.root_state
+
+    # modifications after taking the snapshot are not part of it
+    snapshot = storage.create_state_machine_snapshot(state_machine)
+    states[0].script_text += "\n# modified\n"
+    number_of_written_files, number_of_written_bytes = storage.write_state_machine_snapshot(snapshot, path)
+    assert number_of_written_files <= 1
+    number_of_written_files, number_of_written_bytes = storage.write_state_machine_snapshot(
+        storage.create_state_machine_snapshot(state_machine), path)
+    assert number_of_written_files in (1, 2)
+    assert number_of_written_bytes >= len(states[0].script_text)
+
+    # removed states and removed semantic data are removed from the folder
+    state_path = os.path.join(path, states[1].get_storage_path())
+    state_machine.root_state.remove_state(states[1].state_id)
+    states[2].semantic_data = {}
+    storage.write_state_machine_snapshot(storage.create_state_machine_snapshot(state_machine), path)
+    assert not os.path.exists(state_path)
+    assert not os.path.exists(os.path.join(path, states[2].get_storage_path(), storage.SEMANTIC_DATA_FILE))
+    assert storage.load_state_machine_from_path(path).root_state == state_machine.root_state
+    testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
+def test_saved_files_are_forgotten(caplog):
+    import rafcon.core.singleton
+    path = testing_utils.get_unique_temp_path()
+    snapshot_path = testing_utils.get_unique_temp_path()
+    state_machine = create_state_machine()
+    storage.save_state_machine_to_path(state_machine, path)
+    storage.write_state_machine_snapshot(storage.create_state_machine_snapshot(state_machine), snapshot_path)
+
+    # the records are kept per state machine folder
+    saved_files = storage.get_saved_files(path)
+    assert len(saved_files.files) == 11
+    assert all(file_path.startswith(path) for file_path in saved_files.files)
+    assert len(storage.get_saved_files(snapshot_path).files) == 11
+
+    state_machine_manager = rafcon.core.singleton.state_machine_manager
+    state_machine_manager.add_state_machine(state_machine)
+    state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+    assert storage.get_saved_files(path).files == {}
+    storage.forget_saved_files(snapshot_path)
+    assert storage.get_saved_files(snapshot_path).files == {}
+    storage.forget_saved_files(path)
+    storage.forget_saved_files(snapshot_path)
+    testing_utils.assert_logger_warnings_and_errors(caplog)
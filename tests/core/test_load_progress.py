@@ -0,0 +1,56 @@
+import pytest
+
+from rafcon.core.custom_exceptions import LoadingCancelledException
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.state_machine import StateMachine
+from rafcon.core.storage import storage
+from rafcon.core.storage.load_progress import LoadProgress, STATES, LIBRARIES
+
+from tests import utils as testing_utils
+
+
+def create_state_machine(path):
+    root_state = HierarchyState("root")
+    for i in range(3):
+        container_state = HierarchyState("container_{0}".format(i))
+        root_state.add_state(container_state)
+        for j in range(3):
+            container_state.add_state(ExecutionState("state_{0}_{1}".format(i, j)))
+    storage.save_state_machine_to_path(StateMachine(root_state), path)
+
+
+def test_load_progress(caplog):
+    path = testing_utils.get_unique_temp_path()
+    create_state_machine(path)
+
+    reports = []
+    load_progress = LoadProgress(lambda phase, counters: reports.append((phase, counters)), report_interval=0.)
+    state_machine = storage.load_state_machine_from_path(path, load_progress=load_progress)
+
+    assert state_machine.root_state.get_states_statistics(0)[0] == load_progress.counters[STATES] == 13
+    assert load_progress.counters[LIBRARIES] == 0
+    assert [phase for phase, _ in reports[:2]] == ['prefetch', 'states']
+    assert [counters[STATES] for _, counters in reports[2:]] == list(range(1, 14))
+    # the reported counters are copies
+    assert reports[-1][1] is not load_progress.counters
+    assert set(load_progress.timings.keys()) == {'prefetch', 'states', 'statistics', 'total'}
+    testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
+def test_cancel_loading(caplog):
+    path = testing_utils.get_unique_temp_path()
+    create_state_machine(path)
+
+    def cancel_after_five_states(phase, counters):
+        if counters[STATES] == 5:
+            load_progress.cancel()
+
+    load_progress = LoadProgress(cancel_after_five_states, report_interval=0.)
+    with pytest.raises(LoadingCancelledException):
+        storage.load_state_machine_from_path(path, load_progress=load_progress)
+    assert load_progress.cancelled and load_progress.counters[STATES] == 6
+
+    with pytest.raises(LoadingCancelledException):
+        storage.load_state_machine_from_path(path, load_progress=load_progress)
+    testing_utils.assert_logger_warnings_and_errors(caplog)
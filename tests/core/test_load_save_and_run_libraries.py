@@ -1,5 +1,6 @@
 import os
 from os.path import join
+from copy import copy
 
 # core elements
 import rafcon.core.singleton
@@ -150,6 +151,54 @@ def test_hierarchy_state_library(caplog):
         testing_utils.assert_logger_warnings_and_errors(caplog)
 
 
+def test_library_state_copy_created_lazily(caplog):
+    with testing_utils.test_multithreading_lock:
+        rafcon.core.singleton.library_manager.initialize()
+        lib_state1 = LibraryState("temporary_libraries", "hierarchy_library", "0.1", "lib_state1")
+        lib_state2 = LibraryState("temporary_libraries", "hierarchy_library", "0.1", "lib_state2")
+        lib_os_path = lib_state1.lib_os_path
+        _, template = rafcon.core.singleton.library_manager.get_library_template(lib_os_path)
+
+        assert not lib_state1.state_copy_created and not lib_state2.state_copy_created
+        assert lib_state1.get_number_of_transitions() == template.get_number_of_transitions()
+        input_port_id = lib_state1.get_io_data_port_id_from_name_and_type("data_input_port1", InputDataPort)
+        assert lib_state1.input_data_ports[input_port_id] is not template.input_data_ports[input_port_id]
+        assert lib_state1.input_data_ports[input_port_id].parent is lib_state1
+        lib_state1.set_input_runtime_value(input_port_id, 3.0)
+        assert not lib_state1.state_copy_created
+
+        state_copy = lib_state1.state_copy
+        assert lib_state1.state_copy_created and not lib_state2.state_copy_created
+        assert state_copy is not template and state_copy.parent is lib_state1
+        assert state_copy.input_data_ports is lib_state1.input_data_ports
+        assert set(state_copy.states.keys()) == set(template.states.keys())
+
+        # the state copy can be modified without affecting the template or other instances
+        state_copy.name = "modified"
+        assert template.name == "library_hierarchy_state1"
+        assert lib_state2.state_copy.name == "library_hierarchy_state1"
+        testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
+def test_library_state_equality_without_state_copy(caplog):
+    with testing_utils.test_multithreading_lock:
+        rafcon.core.singleton.library_manager.initialize()
+        lib_state = LibraryState("temporary_libraries", "hierarchy_library", "0.1", "lib_state")
+        lib_state_copy = copy(lib_state)
+        assert not lib_state.state_copy_created and not lib_state_copy.state_copy_created
+        assert lib_state == lib_state_copy
+        assert not lib_state.state_copy_created and not lib_state_copy.state_copy_created
+
+        root_state = HierarchyState("root")
+        root_state.add_state(lib_state)
+        assert root_state == copy(root_state)
+
+        # a modified state copy makes the library states unequal
+        lib_state_copy.state_copy.name = "modified"
+        assert lib_state != lib_state_copy
+        testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
 def test_save_nested_library_state(caplog):
     library_with_nested_library_sm = create_hierarchy_state_library_state_machine()
 
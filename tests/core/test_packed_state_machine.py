@@ -0,0 +1,145 @@
+import os
+import filecmp
+
+import rafcon.core.singleton
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.states.library_state import LibraryState
+from rafcon.core.state_machine import StateMachine
+from rafcon.core.storage import storage
+from rafcon.core.storage.packed_state_machine import PackedStateMachine, pack_state_machine, \
+    unpack_state_machine, is_packed_state_machine, add_files_to_packed_state_machine, FILE_EXTENSION
+
+from tests import utils as testing_utils
+
+
+def create_state_machine():
+    root_state = HierarchyState("root")
+    for i in range(3):
+        state = ExecutionState("state_{0}".format(i), path=testing_utils.TEST_SCRIPT_PATH,
+                               filename="script_small_wait.py")
+        state.add_input_data_port("input", "int", i)
+        state.semantic_data = {"index": i}
+        root_state.add_state(state)
+    return StateMachine(root_state)
+
+
+def assert_folders_equal(folder_path, other_folder_path):
+    comparison = filecmp.dircmp(folder_path, other_folder_path)
+    assert not comparison.left_only and not comparison.right_only
+    _, mismatch, errors = filecmp.cmpfiles(folder_path, other_folder_path, comparison.common_files, shallow=False)
+    assert not mismatch and not errors
+    for sub_folder in comparison.common_dirs:
+        assert_folders_equal(os.path.join(folder_path, sub_folder), os.path.join(other_folder_path, sub_folder))
+
+
+def test_pack_and_unpack(caplog):
+    path = testing_utils.get_unique_temp_path()
+    folder_path = os.path.join(path, "folder")
+    packed_path = os.path.join(path, "packed" + FILE_EXTENSION)
+    state_machine = create_state_machine()
+    storage.save_state_machine_to_path(state_machine, folder_path)
+
+    pack_state_machine(folder_path, packed_path)
+    assert is_packed_state_machine(packed_path)
+    assert not is_packed_state_machine(folder_path)
+    unpack_state_machine(packed_path, os.path.join(path, "unpacked"))
+    assert_folders_equal(folder_path, os.path.join(path, "unpacked"))
+
+    root_state_path = os.path.join(packed_path, state_machine.root_state.get_storage_path())
+    with PackedStateMachine(packed_path) as packed_file:
+        assert sorted(packed_file.listdir(packed_path)) == sorted(os.listdir(folder_path))
+        assert packed_file.isdir(root_state_path)
+        assert packed_file.exists(os.path.join(root_state_path, storage.FILE_NAME_CORE_DATA))
+        assert not packed_file.isdir(os.path.join(root_state_path, storage.FILE_NAME_CORE_DATA))
+        assert packed_file.read_file(root_state_path, "missing") is None
+    testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
+def test_save_and_load_packed_state_machine(caplog):
+    path = testing_utils.get_unique_temp_path()
+    packed_path = os.path.join(path, "state_machine" + FILE_EXTENSION)
+    state_machine = create_state_machine()
+    storage.save_state_machine_to_path(state_machine, packed_path)
+    assert os.path.isfile(packed_path)
+    assert state_machine.file_system_path == packed_path
+
+    loaded_state_machine = storage.load_state_machine_from_path(packed_path)
+    assert loaded_state_machine.root_state == state_machine.root_state
+    assert loaded_state_machine.file_system_path == packed_path
+    for state_id, state in state_machine.root_state.states.items():
+        loaded_state = loaded_state_machine.root_state.states[state_id]
+        assert loaded_state.script_text == state.script_text
+        assert loaded_state.semantic_data == state.semantic_data
+        assert loaded_state.file_system_path == state.file_system_path
+        assert loaded_state.file_system_path.startswith(packed_path)
+
+    # a single state is loaded from the packed file
+    state = list(state_machine.root_state.states.values())[0]
+    loaded_state = storage.load_state_from_path(state.file_system_path)
+    assert loaded_state.state_id == state.state_id
+    assert loaded_state.script_text == state.script_text
+    testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
+def test_packed_state_machine_equals_packed_folder(caplog):
+    path = testing_utils.get_unique_temp_path()
+    folder_path = os.path.join(path, "folder")
+    state_machine = create_state_machine()
+    storage.save_state_machine_to_path(state_machine, folder_path, as_copy=True)
+    pack_state_machine(folder_path, os.path.join(path, "folder" + FILE_EXTENSION))
+    storage.save_state_machine_to_path(state_machine, os.path.join(path, "saved" + FILE_EXTENSION), as_copy=True)
+    with PackedStateMachine(os.path.join(path, "folder" + FILE_EXTENSION)) as packed_folder, \
+            PackedStateMachine(os.path.join(path, "saved" + FILE_EXTENSION)) as saved_file:
+        assert packed_folder.file_paths == saved_file.file_paths
+        for file_path in packed_folder.file_paths:
+            if file_path != storage.STATEMACHINE_FILE:  # contains the time of the last update
+                assert packed_folder.read_bytes(file_path) == saved_file.read_bytes(file_path)
+    testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
+def test_add_files_to_packed_state_machine(caplog):
+    path = testing_utils.get_unique_temp_path()
+    packed_path = os.path.join(path, "state_machine" + FILE_EXTENSION)
+    state_machine = create_state_machine()
+    storage.save_state_machine_to_path(state_machine, packed_path)
+    with PackedStateMachine(packed_path) as packed_file:
+        file_paths = packed_file.file_paths
+        core_data = packed_file.read_bytes(file_paths[0])
+
+    meta_data_path = os.path.join(state_machine.root_state.file_system_path, storage.FILE_NAME_META_DATA)
+    add_files_to_packed_state_machine({os.path.relpath(meta_data_path, packed_path): b'{"gui": {}}'}, packed_path)
+    with PackedStateMachine(packed_path) as packed_file:
+        assert len(packed_file.file_paths) == len(file_paths) + 1
+        assert packed_file.read_bytes(file_paths[0]) == core_data
+    assert storage.load_data_file(meta_data_path) == {"gui": {}}
+
+    # as in a folder, the meta data files are kept when the state machine is saved again
+    state_machine.root_state.name = "renamed_root"
+    storage.save_state_machine_to_path(state_machine, packed_path)
+    with PackedStateMachine(packed_path) as packed_file:
+        assert len(packed_file.file_paths) == len(file_paths)
+    state_machine.root_state.name = "root"
+    storage.save_state_machine_to_path(state_machine, packed_path)
+    add_files_to_packed_state_machine({os.path.relpath(meta_data_path, packed_path): b'{"gui": {}}'}, packed_path)
+    storage.save_state_machine_to_path(state_machine, packed_path)
+    assert storage.load_data_file(meta_data_path) == {"gui": {}}
+    testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
+def test_packed_library(caplog):
+    library_path = testing_utils.get_unique_temp_path()
+    state_machine = create_state_machine()
+    storage.save_state_machine_to_path(state_machine, os.path.join(library_path, "packed_library" + FILE_EXTENSION))
+
+    with testing_utils.test_multithreading_lock:
+        testing_utils.rewind_and_set_libraries({"packed_libraries": library_path})
+        library_manager = rafcon.core.singleton.library_manager
+        library_manager.initialize()
+        assert "packed_library" in library_manager.libraries["packed_libraries"]
+        library_state = LibraryState("packed_libraries", "packed_library", "0.1", "library_state")
+        assert library_state.state_copy == state_machine.root_state
+        assert library_manager.get_library_path_and_name_for_os_path(library_state.lib_os_path) == \
+            ("packed_libraries", "packed_library")
+        testing_utils.rewind_and_set_libraries()
+    testing_utils.assert_logger_warnings_and_errors(caplog)
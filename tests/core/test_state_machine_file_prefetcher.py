@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from rafcon.core.config import global_config
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.state_machine import StateMachine
+from rafcon.core.storage import storage
+from rafcon.core.storage.file_prefetcher import StateMachineFilePrefetcher
+
+from tests import utils as testing_utils
+
+
+@pytest.fixture
+def prefetch_threads():
+    old_value = global_config.get_config_value("LOAD_SM_PREFETCH_THREADS")
+
+    def set_prefetch_threads(number_of_threads):
+        global_config.set_config_value("LOAD_SM_PREFETCH_THREADS", number_of_threads)
+    yield set_prefetch_threads
+    global_config.set_config_value("LOAD_SM_PREFETCH_THREADS", old_value)
+
+
+def create_state_machine(path):
+    root_state = HierarchyState("root")
+    for i in range(3):
+        container_state = HierarchyState("container_{0}".format(i))
+        root_state.add_state(container_state)
+        for j in range(3):
+            state = ExecutionState("state_{0}_{1}".format(i, j), path=testing_utils.TEST_SCRIPT_PATH,
+                                   filename="script_small_wait.py")
+            state.add_input_data_port("input_{0}".format(j), "int", j)
+            container_state.add_state(state)
+    state_machine = StateMachine(root_state)
+    storage.save_state_machine_to_path(state_machine, path)
+    return state_machine
+
+
+def test_prefetcher(caplog):
+    path = testing_utils.get_unique_temp_path()
+    state_machine = create_state_machine(path)
+    root_state_path = os.path.join(path, state_machine.root_state.get_storage_path())
+
+    prefetcher = StateMachineFilePrefetcher(root_state_path, [storage.FILE_NAME_CORE_DATA])
+    # core data of 13 states
+    assert prefetcher.number_of_files == 13
+    assert sorted(prefetcher.listdir(root_state_path)) == sorted(os.listdir(root_state_path))
+    assert prefetcher.isdir(root_state_path)
+    assert prefetcher.exists(os.path.join(root_state_path, storage.FILE_NAME_CORE_DATA))
+    assert not prefetcher.exists(os.path.join(root_state_path, "missing"))
+    assert prefetcher.read_file(root_state_path, "missing") is None
+    # files not being prefetched are read from the file system
+    state = list(list(state_machine.root_state.states.values())[0].states.values())[0]
+    script_path = os.path.join(path, state.get_storage_path())
+    assert prefetcher.read_file(script_path, storage.SCRIPT_FILE) == state.script_text
+    testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
+def test_load_with_prefetching(caplog, prefetch_threads):
+    path = testing_utils.get_unique_temp_path()
+    create_state_machine(path)
+
+    prefetch_threads(0)
+    state_machine = storage.load_state_machine_from_path(path)
+    prefetch_threads(4)
+    load_timings = {}
+    prefetched_state_machine = storage.load_state_machine_from_path(path, load_timings=load_timings)
+
+    assert prefetched_state_machine.root_state == state_machine.root_state
+    for state_id, state in state_machine.root_state.states.items():
+        for child_state_id, child_state in state.states.items():
+            prefetched_state = prefetched_state_machine.root_state.states[state_id].states[child_state_id]
+            assert prefetched_state.script_text == child_state.script_text
+    assert set(load_timings.keys()) == {'prefetch', 'states', 'statistics', 'total'}
+    assert load_timings['total'] >= load_timings['prefetch'] + load_timings['states']
+    testing_utils.assert_logger_warnings_and_errors(caplog)
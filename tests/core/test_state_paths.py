@@ -0,0 +1,83 @@
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.state_machine import StateMachine
+from rafcon.core.storage import storage
+
+from tests import utils as testing_utils
+
+
+def create_state_machine():
+    root_state = HierarchyState("root", state_id="ROOT")
+    hierarchy_state = HierarchyState("hierarchy", state_id="HIER")
+    root_state.add_state(hierarchy_state)
+    hierarchy_state.add_state(ExecutionState("child", state_id="CHILD"))
+    return StateMachine(root_state)
+
+
+def test_cached_paths_are_invalidated(caplog):
+    state_machine = create_state_machine()
+    root_state = state_machine.root_state
+    hierarchy_state = root_state.states["HIER"]
+    child_state = hierarchy_state.states["CHILD"]
+    assert child_state.get_path() == "ROOT/HIER/CHILD"
+    assert child_state.get_path("APPENDIX") == "ROOT/HIER/CHILD/APPENDIX"
+    assert child_state.get_path(by_name=True) == "root/hierarchy/child"
+    assert child_state.get_path() is child_state.get_path()
+
+    hierarchy_state.change_state_id("NEWHIER")
+    assert child_state.get_path() == "ROOT/NEWHIER/CHILD"
+
+    hierarchy_state.remove_state("CHILD", recursive=False, destroy=False)
+    root_state.add_state(child_state)
+    assert child_state.get_path() == "ROOT/CHILD"
+
+    storage_path = child_state.get_storage_path()
+    assert storage_path.endswith(storage.get_storage_id_for_state(child_state))
+    child_state.name = "renamed"
+    assert child_state.get_storage_path() != storage_path
+    assert child_state.get_storage_path().endswith(storage.get_storage_id_for_state(child_state))
+    testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
+def test_get_state_by_path(caplog):
+    state_machine = create_state_machine()
+    root_state = state_machine.root_state
+    hierarchy_state = root_state.states["HIER"]
+    child_state = hierarchy_state.states["CHILD"]
+    assert state_machine.get_state_by_path("ROOT/HIER/CHILD") is child_state
+    assert state_machine.get_state_by_path("ROOT/HIER/CHILD") is child_state
+
+    # moved states cannot be found under their old path anymore
+    hierarchy_state.remove_state("CHILD", recursive=False, destroy=False)
+    root_state.add_state(child_state)
+    assert state_machine.get_state_by_path("ROOT/HIER/CHILD", as_check=True) is None
+    assert state_machine.get_state_by_path(child_state.get_path()) is child_state
+
+    state_machine.root_state = HierarchyState("new_root", state_id="ROOT")
+    assert state_machine.get_state_by_path("ROOT/CHILD", as_check=True) is None
+    assert state_machine.get_state_by_path("ROOT") is state_machine.root_state
+    testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
+def test_cached_paths_are_invalidated_per_state_machine(caplog):
+    state_machine = create_state_machine()
+    other_state_machine = create_state_machine()
+    child_state = state_machine.root_state.states["HIER"].states["CHILD"]
+    other_child_state = other_state_machine.root_state.states["HIER"].states["CHILD"]
+    path = child_state.get_path()
+    other_path = other_child_state.get_path()
+    assert child_state.get_state_machine() is state_machine
+
+    # only the paths of the modified state machine are recomputed
+    other_state_machine.root_state.states["HIER"].change_state_id("NEWHIER")
+    assert child_state.get_path() is path
+    assert other_child_state.get_path() == "ROOT/NEWHIER/CHILD" != other_path
+
+    # moving a state to another state machine invalidates the paths of both state machines
+    state_machine.root_state.states["HIER"].remove_state("CHILD", recursive=False, destroy=False)
+    assert child_state.get_state_machine() is None
+    assert child_state.get_path() == "CHILD"
+    other_state_machine.root_state.add_state(child_state)
+    assert child_state.get_state_machine() is other_state_machine
+    assert child_state.get_path() == "ROOT/CHILD"
+    testing_utils.assert_logger_warnings_and_errors(caplog)
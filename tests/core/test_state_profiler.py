@@ -0,0 +1,111 @@
+import os
+
+import pytest
+
+from rafcon.core.execution.execution_context import ExecutionContext
+from rafcon.core.execution.state_profiler import StateProfiler
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.state_machine import StateMachine
+import rafcon.core.singleton
+
+from tests import utils as testing_utils
+
+SLEEP_SCRIPT = """
+import time
+
+def execute(self, inputs, outputs, gvm):
+    time.sleep(0.02)
+    outputs["y"] = inputs["x"]
+    return 0
+"""
+
+
+def create_state_machine():
+    root_state = HierarchyState("root", state_id="ROOT")
+    x = root_state.add_input_data_port("x", "int", 1)
+    last_state = None
+    for i in range(2):
+        state = ExecutionState("sleep{0}".format(i), state_id="SLEEP{0}".format(i))
+        state.script_text = SLEEP_SCRIPT
+        root_state.add_state(state)
+        state_x = state.add_input_data_port("x", "int")
+        state.add_output_data_port("y", "int")
+        root_state.add_data_flow(root_state.state_id, x, state.state_id, state_x)
+        if last_state is None:
+            root_state.set_start_state(state)
+        else:
+            root_state.add_transition(last_state.state_id, 0, state.state_id, None)
+        last_state = state
+    root_state.add_transition(last_state.state_id, 0, root_state.state_id, 0)
+    return StateMachine(root_state)
+
+
+@pytest.fixture
+def state_profiler():
+    profiler = rafcon.core.singleton.state_profiler
+    profiler.reset()
+    profiler.enabled = True
+    yield profiler
+    profiler.enabled = False
+    profiler.reset()
+
+
+def execute(state_machine, number_of_runs):
+    context = ExecutionContext(state_machine)
+    try:
+        for _ in range(number_of_runs):
+            context.start()
+            assert context.join(10)
+    finally:
+        context.close()
+
+
+def test_state_statistics(state_profiler, caplog):
+    execute(create_state_machine(), 2)
+    statistics = state_profiler.get_statistics()
+
+    assert set(statistics.keys()) == {"ROOT", "ROOT/SLEEP0", "ROOT/SLEEP1"}
+    root_statistics = statistics["ROOT"]
+    sleep_statistics = statistics["ROOT/SLEEP0"]
+    assert root_statistics.invocations == 2 and sleep_statistics.invocations == 2
+    assert sleep_statistics.path_by_name == "root/sleep0"
+    assert sleep_statistics.wall_time["script"] >= 2 * 0.02
+    assert sleep_statistics.wall_time["run"] >= sleep_statistics.wall_time["script"]
+    assert sleep_statistics.wall_time["input"] > 0 and sleep_statistics.wall_time["output"] > 0
+    # sleeping does not use the CPU
+    assert sleep_statistics.cpu_time["script"] < sleep_statistics.wall_time["script"]
+    assert root_statistics.wall_time["run"] >= 4 * 0.02
+    assert root_statistics.wall_time["wait"] > 0
+    testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
+def test_flame_graph_dump(state_profiler, caplog):
+    execute(create_state_machine(), 1)
+    path = os.path.join(testing_utils.get_unique_temp_path(), "profile.folded")
+    state_profiler.dump_flame_graph(path)
+
+    with open(path) as stacks_file:
+        stacks = dict(line.rstrip("\n").rsplit(" ", 1) for line in stacks_file)
+    assert int(stacks["root;sleep0;[script]"]) >= 20000
+    assert "root;sleep1;[input]" in stacks and "root;[wait]" in stacks
+    total = sum(int(microseconds) for microseconds in stacks.values())
+    run_time = state_profiler.get_statistics()["ROOT"].wall_time["run"]
+    assert abs(total - run_time * 1e6) < 0.1 * run_time * 1e6
+    testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
+def test_disabled_profiler(caplog):
+    profiler = rafcon.core.singleton.state_profiler
+    assert not profiler.enabled
+    profiler.reset()
+    execute(create_state_machine(), 1)
+    assert profiler.get_statistics() == {}
+
+    profiler.enabled = True
+    try:
+        with pytest.raises(ValueError):
+            StateProfiler().enabled = True
+    finally:
+        profiler.enabled = False
+    testing_utils.assert_logger_warnings_and_errors(caplog)
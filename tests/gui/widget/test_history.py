@@ -453,6 +453,72 @@ def test_state_property_modifications_history(caplog):
     testing_utils.shutdown_environment(caplog=caplog, unpatch_threading=False)
 
 
+def perform_undo_redo_round_trip(state_machine_m, operation, *args):
+    """Perform an operation and check that undo and redo restore the state machine and its meta data
+
+    :param state_machine_m: The model of the state machine the operation is performed on
+    :param operation: The operation to be called
+    :param args: The arguments for the operation
+    :return: the result of the operation
+    """
+    def state_machine_hashes():
+        return state_machine_m.state_machine.mutable_hash().hexdigest(), state_machine_m.mutable_hash().hexdigest()
+
+    before_operation_hashes = state_machine_hashes()
+    operation_result = operation(*args)
+    after_operation_hashes = state_machine_hashes()
+    assert before_operation_hashes != after_operation_hashes
+
+    state_machine_m.history.undo()
+    assert state_machine_hashes() == before_operation_hashes
+    state_machine_m.history.redo()
+    assert state_machine_hashes() == after_operation_hashes
+    return operation_result
+
+
+def test_delta_actions(caplog):
+    testing_utils.dummy_gui(None)
+
+    testing_utils.initialize_environment(gui_config={'AUTO_BACKUP_ENABLED': False,
+                                                     'HISTORY_ENABLED': True}, gui_already_started=False)
+    sm_model, state_dict = create_state_machine_m()
+    sm_history = sm_model.history
+
+    # property changes only store the changed arguments
+    _, container = perform_history_action(state_dict['Container'].__setattr__, "name", "renamed")
+    action = sm_history.modifications.current_history_element.action
+    assert action.before_state_image is None and action.after_state_image is None
+    assert action.after_arguments['name'] == "renamed"
+
+    # adding an element stores a copy of it and the meta data of the state down to its direct child states
+    outcome_id, container = perform_history_action(container.add_outcome, "delta")
+    action = sm_history.modifications.current_history_element.action
+    assert action.added_object.outcome_id == outcome_id and action.added_object.name == "delta"
+    assert action.after_state_image.children == {}
+    assert all(child_meta['states'] == {} for child_meta in action.after_state_image.meta_data['states'].values())
+
+    # removing a state stores the image of the removed state only
+    state3 = sm_model.state_machine.get_state_by_path(state_dict['State3'].get_path())
+    _, state3 = perform_history_action(state3.remove_state, "NESTED")
+    action = sm_history.modifications.current_history_element.action
+    assert list(action.before_state_image.children.keys()) == ["NESTED"]
+
+    # the delta actions restore the state machine and its meta data on undo and redo
+    container = sm_model.state_machine.get_state_by_path(state_dict['Container'].get_path())
+    perform_undo_redo_round_trip(sm_model, container.add_outcome, "round_trip")
+
+    state3 = sm_model.state_machine.get_state_by_path(state_dict['State3'].get_path())
+    assert any(t.from_state == "NESTED2" or t.to_state == "NESTED2" for t in state3.transitions.values())
+    perform_undo_redo_round_trip(sm_model, state3.remove_state, "NESTED2")
+
+    state3 = sm_model.state_machine.get_state_by_path(state_dict['State3'].get_path())
+    perform_undo_redo_round_trip(sm_model, state3.add_state, ExecutionState('State4', state_id='STATE4'))
+    assert "STATE4" in sm_model.state_machine.get_state_by_path(state3.get_path()).states
+    assert "STATE4" in sm_model.get_state_model_by_path(state3.get_path()).states
+
+    testing_utils.shutdown_environment(caplog=caplog, unpatch_threading=False)
+
+
 def test_outcome_property_modifications_history(caplog):
     ##################
     # outcome properties
@@ -0,0 +1,98 @@
+from tests import utils as testing_utils
+
+
+def create_state_machine():
+    from rafcon.core.states.execution_state import ExecutionState
+    from rafcon.core.states.hierarchy_state import HierarchyState
+    from rafcon.core.state_machine import StateMachine
+
+    root_state = HierarchyState("root", state_id="ROOT")
+    parent_state = root_state
+    for i in range(3):
+        container_state = HierarchyState("container_{0}".format(i), state_id="CONTAINER{0}".format(i))
+        parent_state.add_state(container_state)
+        execution_state = ExecutionState("execution_{0}".format(i), state_id="EXECUTION{0}".format(i))
+        container_state.add_state(execution_state)
+        container_state.set_start_state(execution_state)
+        container_state.add_transition("EXECUTION{0}".format(i), 0, "CONTAINER{0}".format(i), 0)
+        parent_state = container_state
+    root_state.set_start_state("CONTAINER0")
+    return StateMachine(root_state)
+
+
+def get_state_models(state_m):
+    state_models = [state_m]
+    for child_state_m in state_m.states.values() if hasattr(state_m, "states") else []:
+        state_models.extend(get_state_models(child_state_m))
+    return state_models
+
+
+def get_meta_data_by_path(state_m):
+    meta_data_by_path = {state_m.state.get_path(): state_m.get_meta_data_for_storage()}
+    for child_state_m in state_m.states.values() if hasattr(state_m, "states") else []:
+        meta_data_by_path.update(get_meta_data_by_path(child_state_m))
+    return meta_data_by_path
+
+
+def test_lazy_container_state_models(caplog):
+    testing_utils.dummy_gui(None)
+    testing_utils.initialize_environment(gui_config={'HISTORY_ENABLED': False, 'AUTO_BACKUP_ENABLED': False},
+                                         gui_already_started=False)
+
+    from rafcon.core.storage import storage
+    from rafcon.gui.config import global_gui_config
+    from rafcon.gui.models.state_machine import StateMachineModel
+
+    path = testing_utils.get_unique_temp_path()
+    sm_m = StateMachineModel(create_state_machine())
+    for i, state_m in enumerate(get_state_models(sm_m.root_state)):
+        state_m.set_meta_data_editor('rel_pos', (10. + i, 20.))
+        state_m.set_meta_data_editor('size', (100. - i, 50.))
+    storage.save_state_machine_to_path(sm_m.state_machine, path)
+    sm_m.store_meta_data()
+    sm_m.destroy()
+    sm_m = StateMachineModel(storage.load_state_machine_from_path(path))
+    eager_meta_data = get_meta_data_by_path(sm_m.root_state)
+    sm_m.destroy()
+
+    global_gui_config.set_config_value('LAZY_CONTAINER_STATE_MODELS', True)
+    try:
+        sm_m = StateMachineModel(storage.load_state_machine_from_path(path))
+        container_0_m = sm_m.root_state.states["CONTAINER0"]
+        # the child models of child container states are not created
+        assert sm_m.root_state.child_models_loaded
+        assert not container_0_m.child_models_loaded and not container_0_m.states and not container_0_m.transitions
+        assert container_0_m.get_meta_data_for_storage() == eager_meta_data[container_0_m.state.get_path()]
+        # the meta data of the states within is only read when needed
+        assert not container_0_m._content_meta_data
+        assert len(container_0_m.get_content_meta_data()) == 5
+
+        # but on access
+        container_1_path = "ROOT/CONTAINER0/CONTAINER1"
+        container_1_m = sm_m.get_state_model_by_path(container_1_path)
+        assert container_0_m.child_models_loaded and container_1_m is container_0_m.states["CONTAINER1"]
+        assert len(container_0_m.transitions) == len(container_0_m.state.transitions)
+        assert not container_1_m.child_models_loaded
+        for state_path, meta_data in get_meta_data_by_path(container_0_m).items():
+            assert meta_data == eager_meta_data[state_path]
+        sm_m.get_state_model_by_path(container_1_path + "/CONTAINER2/EXECUTION2")
+        assert get_meta_data_by_path(sm_m.root_state) == eager_meta_data
+
+        # and released again, keeping their meta data
+        container_0_m.release_child_models()
+        assert not container_0_m.child_models_loaded and not container_0_m.states
+        assert container_0_m.get_meta_data_for_storage() == eager_meta_data[container_0_m.state.get_path()]
+        assert len(container_0_m.get_content_meta_data()) == 5
+
+        # the meta data of states without models is stored
+        copy_path = testing_utils.get_unique_temp_path()
+        storage.save_state_machine_to_path(sm_m.state_machine, copy_path)
+        sm_m.store_meta_data()
+        sm_m.destroy()
+        global_gui_config.set_config_value('LAZY_CONTAINER_STATE_MODELS', False)
+        sm_m = StateMachineModel(storage.load_state_machine_from_path(copy_path))
+        assert get_meta_data_by_path(sm_m.root_state) == eager_meta_data
+        sm_m.destroy()
+    finally:
+        global_gui_config.set_config_value('LAZY_CONTAINER_STATE_MODELS', False)
+        testing_utils.shutdown_environment(caplog=caplog, unpatch_threading=False)
@@ -0,0 +1,65 @@
+import os
+
+from tests import utils as testing_utils
+
+
+def create_state_machine():
+    from rafcon.core.states.hierarchy_state import HierarchyState
+    from rafcon.core.states.library_state import LibraryState
+    from rafcon.core.state_machine import StateMachine
+
+    root_state = HierarchyState("root", state_id="ROOT")
+    for i in range(3):
+        library_state = LibraryState(os.path.join("generic", "dialog"), "Dialog [3 options]", "0.1",
+                                     "dialog_{0}".format(i), state_id="DIALOG{0}".format(i))
+        root_state.add_state(library_state)
+    return StateMachine(root_state)
+
+
+def test_lazy_library_state_models(caplog):
+    testing_utils.dummy_gui(None)
+    testing_utils.initialize_environment(gui_config={'HISTORY_ENABLED': False, 'AUTO_BACKUP_ENABLED': False},
+                                         gui_already_started=False)
+
+    from rafcon.core.storage import storage
+    from rafcon.gui.config import global_gui_config
+    from rafcon.gui.models.state_machine import StateMachineModel
+
+    path = testing_utils.get_unique_temp_path()
+    sm_m = StateMachineModel(create_state_machine())
+    storage.save_state_machine_to_path(sm_m.state_machine, path)
+    sm_m.store_meta_data()
+    eager_library_state_m = sm_m.root_state.states["DIALOG0"]
+    sm_m.destroy()
+
+    global_gui_config.set_config_value('LAZY_LIBRARY_STATE_MODELS', True)
+    try:
+        sm_m = StateMachineModel(storage.load_state_machine_from_path(path))
+        library_state_m = sm_m.root_state.states["DIALOG0"]
+        # the port models are created without the state copy model
+        assert library_state_m.lazy_state_copy_model and not library_state_m.state_copy_initialized
+        assert len(library_state_m.outcomes) == len(library_state_m.state.outcomes)
+        assert all(outcome_m.outcome is library_state_m.state.outcomes[outcome_m.outcome.outcome_id]
+                   for outcome_m in library_state_m.outcomes)
+        outcome_id = library_state_m.outcomes[0].outcome.outcome_id
+        assert library_state_m.get_outcome_m(outcome_id).meta == eager_library_state_m.get_outcome_m(outcome_id).meta
+
+        # the state copy model is created on access
+        state_copy_path = library_state_m.state.state_copy.get_path()
+        state_copy_m = sm_m.get_state_model_by_path(state_copy_path)
+        assert library_state_m.state_copy_initialized and state_copy_m is library_state_m.state_copy
+        assert state_copy_m.state is library_state_m.state.state_copy
+        assert not sm_m.root_state.states["DIALOG1"].state_copy_initialized
+
+        # and released again
+        library_state_m.release_state_copy_model()
+        assert not library_state_m.state_copy_initialized and library_state_m.state_copy is None
+        assert sm_m.get_state_model_by_path(state_copy_path) is library_state_m.state_copy
+
+        # state copy models needed by state editors are kept
+        library_state_m.enforce_generation_of_state_copy_model()
+        library_state_m.release_state_copy_model()
+        assert library_state_m.state_copy_initialized
+        sm_m.destroy()
+    finally:
+        testing_utils.shutdown_environment(caplog=caplog, unpatch_threading=False)
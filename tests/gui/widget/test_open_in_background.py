@@ -0,0 +1,58 @@
+import threading
+from os.path import join
+
+from tests import utils as testing_utils
+
+
+def open_in_background(gui, path, cancel=False):
+    import rafcon.gui.helpers.state_machine as gui_helper_state_machine
+    reports = []
+    opened_state_machines = []
+    finished = threading.Event()
+
+    def on_finished(state_machine):
+        opened_state_machines.append(state_machine)
+        finished.set()
+
+    def open_state_machine():
+        load_progress = gui_helper_state_machine.open_state_machine_in_background(
+            path, progress_callback=lambda phase, counters: reports.append((phase, counters)),
+            finished_callback=on_finished)
+        if cancel:
+            load_progress.cancel()
+        return load_progress
+
+    load_progress = gui(open_state_machine)
+    assert finished.wait(30)
+    return load_progress, reports, opened_state_machines[0]
+
+
+def test_open_state_machine_in_background(gui):
+    from rafcon.core.singleton import state_machine_manager
+    from rafcon.core.storage.load_progress import STATES, META_FILES
+    path = join(testing_utils.TUTORIAL_PATH, "basic_turtle_demo_sm")
+
+    number_of_state_machines = len(state_machine_manager.state_machines)
+    load_progress, reports, state_machine = open_in_background(gui, path, cancel=True)
+    assert load_progress.cancelled and state_machine is None
+    assert len(state_machine_manager.state_machines) == number_of_state_machines
+
+    load_progress, reports, state_machine = open_in_background(gui, path)
+    assert state_machine is state_machine_manager.get_open_state_machine_of_file_system_path(path)
+    assert state_machine.root_state.get_states_statistics(0)[0] == load_progress.counters[STATES]
+    assert load_progress.counters[META_FILES] > 0
+    phases = []
+    for phase, _ in reports:
+        if phase not in phases:
+            phases.append(phase)
+    assert phases == ['prefetch', 'states', 'meta_data', 'models']
+    assert {'prefetch', 'states', 'meta_data', 'models', 'open'} <= set(load_progress.timings.keys())
+
+    # the meta data of the models is the one read in the background
+    from rafcon.gui.singleton import state_machine_manager_model
+    sm_m = state_machine_manager_model.state_machines[state_machine.state_machine_id]
+    assert sm_m.root_state.meta['gui']['editor_gaphas']['size']
+
+    # an opened state machine is only selected
+    _, _, selected_state_machine = open_in_background(gui, path)
+    assert selected_state_machine is state_machine
@@ -1,6 +1,8 @@
 # core elements
 from builtins import range
 from builtins import str
+import threading
+import tracemalloc
 import rafcon.core.singleton
 from rafcon.core.states.execution_state import ExecutionState
 from rafcon.core.states.hierarchy_state import HierarchyState
@@ -10,13 +12,32 @@ from rafcon.core.constants import UNIQUE_DECIDER_STATE_ID
 from rafcon.core.state_elements.data_port import InputDataPort, OutputDataPort
 from rafcon.core.state_machine import StateMachine
 
+from rafcon.core.config import global_config
+from rafcon.utils import log
 from rafcon.utils.timer import measure_time
+from timeit import default_timer as timer
 
 from tests import utils as testing_utils
 
+logger = log.get_logger(__name__)
+
+#: Bytes per history item before the history items were stored compactly
+PREVIOUS_BYTES_PER_HISTORY_ITEM = 3752
+
+TRIVIAL_SCRIPT = """
+def execute(self, inputs, outputs, gvm):
+    outputs["output1"] = inputs["input1"]
+    return 0
+"""
+
+EMPTY_SCRIPT = """
+def execute(self, inputs, outputs, gvm):
+    return 0
+"""
+
 
 @measure_time
-def create_hierarchy_state(number_child_states=10, sleep=False):
+def create_hierarchy_state(number_child_states=10, sleep=False, trivial=False):
     hierarchy = HierarchyState("hierarchy1")
     hierarchy.add_outcome("hierarchy_outcome", 1)
     hierarchy.add_input_data_port("hierarchy_input_port1", "float", 42.0)
@@ -29,6 +50,8 @@ def create_hierarchy_state(number_child_states=10, sleep=False):
                                    filename="hello_world_sleep.py")
         else:
             state = ExecutionState("state" + str(i))
+            if trivial:
+                state.script_text = TRIVIAL_SCRIPT
         hierarchy.add_state(state)
         state.add_input_data_port("input1", "float")
         state.add_output_data_port("output1", "float")
@@ -62,6 +85,28 @@ def create_hierarchy_state(number_child_states=10, sleep=False):
     return hierarchy
 
 
+def create_deep_hierarchy_state(depth=20, number_child_states=5):
+    """Creates nested hierarchy states, each level executes trivial child states and then the next level"""
+    hierarchy = HierarchyState("level" + str(depth))
+    states = []
+    for i in range(number_child_states):
+        state = ExecutionState("state" + str(i))
+        state.script_text = EMPTY_SCRIPT
+        states.append(state)
+    if depth > 1:
+        states.append(create_deep_hierarchy_state(depth - 1, number_child_states))
+    last_state = None
+    for state in states:
+        hierarchy.add_state(state)
+        if last_state is None:
+            hierarchy.set_start_state(state.state_id)
+        else:
+            hierarchy.add_transition(last_state.state_id, 0, state.state_id, None)
+        last_state = state
+    hierarchy.add_transition(last_state.state_id, 0, hierarchy.state_id, 0)
+    return hierarchy
+
+
 @measure_time
 def create_barrier_concurrency_state(number_child_states=10, number_childs_per_child=10):
     barrier_state = BarrierConcurrencyState("barrier_concurrency")
@@ -113,6 +158,137 @@ def test_preemption_concurrency_state_execution(number_child_states=10, number_c
     execute_state(preemption_state)
 
 
+def measure_states_per_second(number_child_states=500, thread_pool_size=0):
+    global_config.set_config_value("EXECUTION_THREAD_POOL_SIZE", thread_pool_size)
+    hierarchy_state = create_hierarchy_state(number_child_states, trivial=True)
+    start = timer()
+    execute_state(hierarchy_state)
+    return number_child_states / (timer() - start)
+
+
+@measure_time
+def test_execution_thread_pool(number_child_states=500, thread_pool_size=8):
+    previous_thread_pool_size = global_config.get_config_value("EXECUTION_THREAD_POOL_SIZE", 0)
+    try:
+        without_pool = measure_states_per_second(number_child_states, 0)
+        with_pool = measure_states_per_second(number_child_states, thread_pool_size)
+    finally:
+        global_config.set_config_value("EXECUTION_THREAD_POOL_SIZE", previous_thread_pool_size)
+        rafcon.core.singleton.execution_thread_pool.shutdown()
+    logger.info("States per second without thread pool: {0:.1f}; with thread pool of size {1}: {2:.1f}".format(
+        without_pool, thread_pool_size, with_pool))
+    # reusing idle worker threads must not be slower than starting new threads
+    assert with_pool > 0.8 * without_pool
+
+
+def measure_deep_hierarchy_states_per_second(depth=20, number_child_states=5, state_counter=True):
+    global_config.set_config_value("EXECUTION_STATE_COUNTER", state_counter)
+    hierarchy_state = create_deep_hierarchy_state(depth, number_child_states)
+    start = timer()
+    execute_state(hierarchy_state)
+    return depth * (number_child_states + 1) / (timer() - start)
+
+
+@measure_time
+def test_deep_hierarchy_execution(depth=20, number_child_states=5):
+    previous_state_counter = global_config.get_config_value("EXECUTION_STATE_COUNTER", True)
+    try:
+        with_counter = measure_deep_hierarchy_states_per_second(depth, number_child_states, True)
+        without_counter = measure_deep_hierarchy_states_per_second(depth, number_child_states, False)
+    finally:
+        global_config.set_config_value("EXECUTION_STATE_COUNTER", previous_state_counter)
+    logger.info("States per second in a hierarchy of depth {0}: {1:.1f} with state counter; {2:.1f} without".format(
+        depth, with_counter, without_counter))
+    assert without_counter > 0.8 * with_counter
+
+
+@measure_time
+def test_state_profiler_overhead(depth=20, number_child_states=5, max_overhead=0.5):
+    from rafcon.core.singleton import state_profiler
+    disabled = measure_deep_hierarchy_states_per_second(depth, number_child_states)
+    state_profiler.reset()
+    state_profiler.enabled = True
+    try:
+        enabled = measure_deep_hierarchy_states_per_second(depth, number_child_states)
+    finally:
+        state_profiler.enabled = False
+        state_profiler.reset()
+    logger.info("States per second in a hierarchy of depth {0}: {1:.1f} without profiler; {2:.1f} with profiler"
+                "".format(depth, disabled, enabled))
+    assert enabled > (1. - max_overhead) * disabled
+
+
+def measure_history_item_memory(number_of_steps=1000000, number_of_scoped_data=5):
+    """Pushes call and return items of a child state into an execution history and returns the bytes per item"""
+    from rafcon.core.execution.execution_history import ExecutionHistory, CallType
+    hierarchy_state = HierarchyState("hierarchy")
+    state = ExecutionState("state")
+    hierarchy_state.add_state(state)
+    for i in range(number_of_scoped_data):
+        hierarchy_state.add_input_data_port("input" + str(i), "int", i)
+        hierarchy_state.add_input_data_to_scoped_data({"input" + str(i): i})
+    execution_history = ExecutionHistory()
+    tracemalloc.start()
+    start_memory = tracemalloc.get_traced_memory()[0]
+    for _ in range(number_of_steps // 2):
+        execution_history.push_call_history_item(state, CallType.EXECUTE, hierarchy_state, {"input": 1})
+        execution_history.push_return_history_item(state, CallType.EXECUTE, hierarchy_state, {"output": 2})
+    memory = tracemalloc.get_traced_memory()[0] - start_memory
+    tracemalloc.stop()
+    execution_history.destroy()
+    return memory / float(number_of_steps)
+
+
+@measure_time
+def test_history_item_memory(number_of_steps=100000):
+    start = timer()
+    bytes_per_item = measure_history_item_memory(number_of_steps)
+    logger.info("History items: {0:.0f} bytes per item, {1:.1f} s for {2} items".format(
+        bytes_per_item, timer() - start, number_of_steps))
+    assert bytes_per_item < PREVIOUS_BYTES_PER_HISTORY_ITEM / 2.
+
+
+def measure_status_updates_per_second(state_machine, number_of_updates=2000, lock_state_machine=False):
+    """Lets each child of the root state update its runtime status in its own thread
+
+    With `lock_state_machine`, each update acquires the modification lock of the state machine, as the status setters
+    did before.
+    """
+    from rafcon.core.states.state import StateExecutionStatus
+
+    def update_status(state):
+        for _ in range(number_of_updates):
+            for status in (StateExecutionStatus.ACTIVE, StateExecutionStatus.INACTIVE):
+                if lock_state_machine:
+                    with state_machine.modification_lock():
+                        state.state_execution_status = status
+                        state.preempted = False
+                else:
+                    state.state_execution_status = status
+                    state.preempted = False
+
+    threads = [threading.Thread(target=update_status, args=(state, ))
+               for state in state_machine.root_state.states.values()]
+    start = timer()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(threads) * number_of_updates * 2 / (timer() - start)
+
+
+@measure_time
+def test_runtime_status_contention(number_child_states=10, number_of_updates=2000):
+    barrier_state = create_barrier_concurrency_state(number_child_states, 1)
+    state_machine = StateMachine(barrier_state)
+    with_lock = measure_status_updates_per_second(state_machine, number_of_updates, lock_state_machine=True)
+    without_lock = measure_status_updates_per_second(state_machine, number_of_updates)
+    logger.info("Status updates per second of {0} concurrent states with modification lock: {1:.0f}; without: {2:.0f}"
+                "".format(number_child_states, with_lock, without_lock))
+    # without the state machine lock, the concurrent updates must not be slower
+    assert without_lock > 0.8 * with_lock
+
+
 if __name__ == '__main__':
     # test_hierarchy_state_execution(10)
     test_hierarchy_state_execution(100)
@@ -121,3 +297,8 @@ if __name__ == '__main__':
     # test_barrier_concurrency_state_execution(10, 10)
     # test_barrier_concurrency_state_execution(100, 100)
     # test_preemption_concurrency_state_execution(50, 20, 3)
+    # test_execution_thread_pool(500)
+    # test_runtime_status_contention(10)
+    # test_deep_hierarchy_execution(50)
+    # test_history_item_memory(1000000)
+    # test_state_profiler_overhead(50)
@@ -1,6 +1,9 @@
 from __future__ import absolute_import
+from builtins import str
+from timeit import default_timer as timer
 # local
 from rafcon.utils.timer import measure_time
+from rafcon.core.state_elements.data_port import InputDataPort, OutputDataPort
 from tests import utils as testing_utils
 
 # general tool elements
@@ -51,6 +54,83 @@ def test_gui(number_child_states=10, number_childs_per_child=10, barrier=False,
         destroy_gui(caplog)
 
 
+def create_dense_hierarchy_state(number_child_states=100, number_of_ports=10):
+    """Creates a hierarchy state whose children are connected through all their data ports"""
+    from rafcon.core.states.execution_state import ExecutionState
+    from rafcon.core.states.hierarchy_state import HierarchyState
+    hierarchy = HierarchyState("dense_hierarchy")
+    last_state = None
+    for i in range(number_child_states):
+        state = ExecutionState("state" + str(i))
+        hierarchy.add_state(state)
+        for j in range(number_of_ports):
+            state.add_input_data_port("input" + str(j), "int")
+            state.add_output_data_port("output" + str(j), "int")
+            state.add_outcome("outcome" + str(j))
+        if last_state is None:
+            hierarchy.set_start_state(state.state_id)
+        else:
+            hierarchy.add_transition(last_state.state_id, 0, state.state_id, None)
+            for j in range(number_of_ports):
+                hierarchy.add_data_flow(last_state.state_id,
+                                        last_state.get_io_data_port_id_from_name_and_type("output" + str(j),
+                                                                                          OutputDataPort),
+                                        state.state_id,
+                                        state.get_io_data_port_id_from_name_and_type("input" + str(j),
+                                                                                     InputDataPort))
+        last_state = state
+    return hierarchy
+
+
+def look_up_element_models(state_m):
+    """Looks up the model of each connection of a container state and of each port of its children by id, as the
+    graphical editor does when reconnecting views
+
+    :return: the duration in seconds
+    """
+    start = timer()
+    for transition_id in state_m.state.transitions:
+        assert state_m.get_transition_m(transition_id).transition.transition_id == transition_id
+    for data_flow_id, data_flow in state_m.state.data_flows.items():
+        assert state_m.get_data_flow_m(data_flow_id).data_flow is data_flow
+        from_state_m = state_m.states[data_flow.from_state]
+        to_state_m = state_m.states[data_flow.to_state]
+        assert from_state_m.get_data_port_m(data_flow.from_key) is from_state_m.get_output_data_port_m(
+            data_flow.from_key)
+        assert to_state_m.get_input_data_port_m(data_flow.to_key) is not None
+    for child_state_m in state_m.states.values():
+        for outcome_id in child_state_m.state.outcomes:
+            assert child_state_m.get_outcome_m(outcome_id).outcome.outcome_id == outcome_id
+    return timer() - start
+
+
+def test_element_model_lookups(number_child_states=100, number_of_ports=10, caplog=None):
+    testing_utils.dummy_gui(None)
+    testing_utils.initialize_environment(gui_config={'HISTORY_ENABLED': False, 'AUTO_BACKUP_ENABLED': False},
+                                         gui_already_started=False)
+    from rafcon.gui.models.container_state import ContainerStateModel
+    try:
+        state_m = ContainerStateModel(create_dense_hierarchy_state(number_child_states, number_of_ports))
+        number_of_lookups = len(state_m.state.transitions) + 4 * len(state_m.state.data_flows) + \
+            number_child_states * (number_of_ports + 3)
+        # the first lookups create the dictionaries of the models by id
+        first_duration = look_up_element_models(state_m)
+        duration = look_up_element_models(state_m)
+        logger.info("{0} lookups of element models in {1:.4f} s, including the creation of the indices {2:.4f} s"
+                    "".format(number_of_lookups, duration, first_duration))
+
+        # changes of the model lists are reflected by the lookups
+        data_flow_id = next(iter(state_m.state.data_flows))
+        state_m.state.remove_data_flow(data_flow_id)
+        assert state_m.get_data_flow_m(data_flow_id) is None
+        child_state_m = next(iter(state_m.states.values()))
+        outcome_id = child_state_m.state.add_outcome("additional_outcome")
+        assert child_state_m.get_outcome_m(outcome_id).outcome.outcome_id == outcome_id
+        state_m.prepare_destruction()
+    finally:
+        testing_utils.shutdown_environment(caplog=caplog, unpatch_threading=False)
+
+
 if __name__ == '__main__':
 
     # global_profiling = True